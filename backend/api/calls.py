@@ -3,17 +3,46 @@ Calls API endpoints for DisciplineCall.ai
 Handles call scheduling, execution, and management
 """
 
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Depends, Request, Query
+from pydantic import BaseModel, ValidationError
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, timezone as dt_timezone
+import base64
+import json
+import uuid
 
-from backend.core.ai_engine import PersonalityMode
-from backend.services.call_service import CallType, CallProvider
+from backend.core.ai_engine import BaseAIEngine, PersonalityMode
+from backend.core.memory import ConversationMemory
+from backend.api.streaming import (
+    NDJSONStreamingResponse, LineTooLongError, iter_ndjson_lines, ndjson_line
+)
+from backend.services.call_service import CallType, CallProvider, CallScheduler
+from backend.services.rollups import load_analytics
+from backend.services.session_store import SessionStore, new_session_state
 
 router = APIRouter()
 
 
+def get_call_scheduler(request: Request) -> CallScheduler:
+    """Scheduler created in the application lifespan"""
+    return request.app.state.call_scheduler
+
+
+def get_session_store(request: Request) -> SessionStore:
+    """Live call session store created in the application lifespan"""
+    return request.app.state.session_store
+
+
+def get_ai_engine(request: Request) -> BaseAIEngine:
+    """Default engine from the pool created in the application lifespan"""
+    return request.app.state.engine_pool.get()
+
+
+def get_memory(request: Request) -> ConversationMemory:
+    """Conversation memory created in the application lifespan"""
+    return request.app.state.memory
+
+
 # Pydantic models for API
 class CallRequest(BaseModel):
     user_id: str
@@ -42,17 +71,52 @@ class CallScheduleRequest(BaseModel):
 
 
 @router.post("/initiate", response_model=CallResponse)
-async def initiate_call(call_request: CallRequest):
+async def initiate_call(
+    call_request: CallRequest,
+    scheduler: CallScheduler = Depends(get_call_scheduler),
+    sessions: SessionStore = Depends(get_session_store),
+    ai_engine: BaseAIEngine = Depends(get_ai_engine),
+    memory: ConversationMemory = Depends(get_memory)
+):
     """Initiate a call to user"""
     
-    # TODO: Implement call initiation logic
-    # 1. Get user preferences and context
-    # 2. Generate personalized message using AI
-    # 3. Convert to voice using TTS
-    # 4. Send via requested provider
+    # TODO: Get user preferences and context
+    
+    summary = await memory.summary(call_request.user_id)
+    message = call_request.message or await ai_engine.generate_response(
+        "",
+        {"user_id": call_request.user_id, "summary": summary},
+        call_request.call_type.value,
+        personality=call_request.personality
+    )
+    
+    # TODO: Convert to voice using TTS for voice providers
+    
+    service = scheduler.call_services.get(call_request.provider)
+    if service is None:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Call provider {call_request.provider.value} is not configured"
+        )
+    result = await service.initiate_call(
+        user_phone=call_request.user_id,
+        message=message,
+        call_type=call_request.call_type
+    )
+    
+    call_id = uuid.uuid4().hex
+    await sessions.set(call_id, new_session_state(
+        user_id=call_request.user_id,
+        call_type=call_request.call_type.value,
+        provider=call_request.provider.value,
+        personality=call_request.personality.value,
+        provider_call_id=result.get("call_id"),
+        opening_message=message,
+        summary=summary
+    ))
     
     return CallResponse(
-        call_id=f"call_{datetime.now().timestamp()}",
+        call_id=call_id,
         status="initiated",
         user_id=call_request.user_id,
         call_type=call_request.call_type.value,
@@ -62,76 +126,273 @@ async def initiate_call(call_request: CallRequest):
 
 
 @router.post("/schedule", response_model=List[CallResponse])
-async def schedule_daily_calls(schedule_request: CallScheduleRequest):
+async def schedule_daily_calls(
+    schedule_request: CallScheduleRequest,
+    scheduler: CallScheduler = Depends(get_call_scheduler)
+):
     """Schedule daily calls for a user"""
     
-    # TODO: Implement call scheduling
-    # 1. Validate user exists and has preferences
-    # 2. Create scheduled tasks for each call time
-    # 3. Store in database with Celery task IDs
-    
-    calls = []
-    for call_type, time in [
-        (CallType.MORNING, schedule_request.morning_time),
-        (CallType.MIDDAY, schedule_request.midday_time),
-        (CallType.EVENING, schedule_request.evening_time)
-    ]:
-        calls.append(CallResponse(
-            call_id=f"scheduled_{call_type.value}_{datetime.now().timestamp()}",
-            status="scheduled",
+    # TODO: Validate user exists and has preferences
+    
+    try:
+        scheduled = await scheduler.schedule_daily_calls(
             user_id=schedule_request.user_id,
-            call_type=call_type.value,
-            provider=schedule_request.providers[0].value,
-            scheduled_time=datetime.now()
-        ))
+            morning_time=schedule_request.morning_time,
+            midday_time=schedule_request.midday_time,
+            evening_time=schedule_request.evening_time,
+            timezone=schedule_request.timezone,
+            provider=schedule_request.providers[0]
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    return [
+        CallResponse(
+            call_id=call["call_id"],
+            status=call["status"].value,
+            user_id=call["user_id"],
+            call_type=call["call_type"].value,
+            provider=call["provider"].value,
+            scheduled_time=call["scheduled_at"]
+        )
+        for call in scheduled
+    ]
+
+
+@router.post("/schedule/bulk")
+async def schedule_daily_calls_bulk(
+    request: Request,
+    chunk_size: int = Query(500, ge=1, le=5000),
+    scheduler: CallScheduler = Depends(get_call_scheduler)
+):
+    """
+    Schedule daily calls for many users from an NDJSON upload.
     
-    return calls
+    Each line is a CallScheduleRequest. Records are validated and stored
+    in chunks, and one NDJSON result per line is streamed back while the
+    upload is still being read, followed by a summary line.
+    """
+    
+    async def schedule_chunk(chunk):
+        results = await scheduler.schedule_daily_calls_bulk([
+            {**record.model_dump(exclude={"providers"}), "provider": record.providers[0]}
+            for _, record in chunk
+        ])
+        for (line_number, record), result in zip(chunk, results):
+            if isinstance(result, Exception):
+                yield {"line": line_number, "user_id": record.user_id, "status": "error", "error": str(result)}
+            else:
+                yield {
+                    "line": line_number,
+                    "user_id": record.user_id,
+                    "status": "scheduled",
+                    "calls": [
+                        {
+                            "call_id": call["call_id"],
+                            "call_type": call["call_type"].value,
+                            "scheduled_time": call["scheduled_at"].isoformat()
+                        }
+                        for call in result
+                    ]
+                }
+    
+    async def results():
+        counts = {"received": 0, "scheduled": 0, "failed": 0}
+        chunk = []
+        line_number = 0
+        
+        async def flush():
+            async for result in schedule_chunk(chunk):
+                counts["scheduled" if result["status"] == "scheduled" else "failed"] += 1
+                yield ndjson_line(result)
+            chunk.clear()
+        
+        try:
+            async for line in iter_ndjson_lines(request.stream()):
+                line_number += 1
+                if not line.strip():
+                    continue
+                counts["received"] += 1
+                try:
+                    record = CallScheduleRequest.model_validate_json(line)
+                    if not record.providers:
+                        raise ValueError("providers must not be empty")
+                except (ValidationError, ValueError) as e:
+                    counts["failed"] += 1
+                    yield ndjson_line({"line": line_number, "status": "error", "error": str(e)})
+                    continue
+                chunk.append((line_number, record))
+                if len(chunk) >= chunk_size:
+                    async for output in flush():
+                        yield output
+        except LineTooLongError as e:
+            yield ndjson_line({"line": line_number + 1, "status": "error", "error": str(e)})
+        
+        if chunk:
+            async for output in flush():
+                yield output
+        
+        yield ndjson_line({"summary": counts})
+    
+    return NDJSONStreamingResponse(results())
+
+
+def encode_cursor(call: Dict[str, Any]) -> str:
+    """Opaque keyset cursor for the (scheduled_at, id) of a call"""
+    raw = json.dumps([call["scheduled_at"].isoformat(), call["call_id"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Inverse of encode_cursor; anything it did not produce is a 400"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        scheduled_at, call_id = json.loads(raw)
+        position = datetime.fromisoformat(scheduled_at)
+        # Stores compare ids as UUIDs, so a malformed one must not reach them
+        call_id = uuid.UUID(str(call_id)).hex
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+    if position.tzinfo is None:
+        position = position.replace(tzinfo=dt_timezone.utc)
+    return position, call_id
+
+
+def history_item(call: Dict[str, Any]) -> Dict[str, Any]:
+    """Public shape of one call in the history"""
+    return {
+        "call_id": call["call_id"],
+        "call_type": call["call_type"].value,
+        "status": call["status"].value,
+        "provider": call["provider"].value,
+        "scheduled_time": call["scheduled_at"].isoformat(),
+        "completed_time": call["completed_at"].isoformat() if call.get("completed_at") else None
+    }
 
 
 @router.get("/history/{user_id}")
-async def get_call_history(user_id: str, limit: int = 50):
-    """Get call history for a user"""
+async def get_call_history(
+    user_id: str,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    scheduler: CallScheduler = Depends(get_call_scheduler)
+):
+    """
+    Get call history for a user, newest first.
+    
+    Pages are keyed on (scheduled_at, id); pass `next_cursor` back as
+    `cursor` for the next page. `format=ndjson` streams the whole history
+    (from `cursor` onward) for exports, one call per line.
+    """
+    
+    store = scheduler.store
+    before = decode_cursor(cursor) if cursor else None
     
-    # TODO: Implement database query for call history
+    if format == "ndjson":
+        async def export():
+            position = before
+            while store is not None:
+                page = await store.list_calls(user_id, limit, position)
+                for call in page:
+                    yield ndjson_line(history_item(call))
+                if len(page) < limit:
+                    break
+                position = (page[-1]["scheduled_at"], page[-1]["call_id"])
+        
+        return NDJSONStreamingResponse(export())
+    
+    if store is None:
+        page, stats = [], {"total_calls": 0, "completed": 0, "missed": 0, "failed": 0, "success_rate": 0.0}
+    else:
+        page = await store.list_calls(user_id, limit, before)
+        stats = await store.get_user_stats(user_id)
     
     return {
         "user_id": user_id,
-        "total_calls": 0,
-        "calls": [],
-        "stats": {
-            "completed": 0,
-            "missed": 0,
-            "success_rate": 0.0
-        }
+        "total_calls": stats.pop("total_calls"),
+        "calls": [history_item(call) for call in page],
+        "next_cursor": encode_cursor(page[-1]) if len(page) == limit else None,
+        "stats": stats
     }
 
 
 @router.post("/respond/{call_id}")
-async def handle_call_response(call_id: str, response: Dict[str, Any]):
+async def handle_call_response(
+    call_id: str,
+    response: Dict[str, Any],
+    scheduler: CallScheduler = Depends(get_call_scheduler),
+    sessions: SessionStore = Depends(get_session_store),
+    ai_engine: BaseAIEngine = Depends(get_ai_engine),
+    memory: ConversationMemory = Depends(get_memory)
+):
     """Handle user response during a call"""
     
-    # TODO: Implement call response handling
-    # 1. Get call context and conversation state
-    # 2. Process user's voice/text response
-    # 3. Generate AI follow-up using conversation engine
-    # 4. Continue conversation or end call
+    # Conversation state lives in the session store, so a turn needs no database reads
+    session = await sessions.get(call_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Active call {call_id} not found")
+    
+    # TODO: Transcribe voice responses before they reach this point
+    user_text = response.get("text") or response.get("user_response") or ""
+    
+    ai_response = await ai_engine.generate_response(
+        user_text,
+        await memory.prompt_context(session),
+        session["call_type"],
+        personality=PersonalityMode(session["personality"])
+    )
+    memory.append(session, "u", user_text)
+    memory.append(session, "a", ai_response)
+    
+    next_action = "continue_conversation"
+    service = scheduler.call_services.get(CallProvider(session["provider"]))
+    if service is not None:
+        result = await service.handle_response(user_text, session["provider_call_id"] or call_id)
+        next_action = result.get("next_action", next_action)
+    
+    if next_action == "end_call":
+        await scheduler.end_call(call_id, session)
+    else:
+        await sessions.set(call_id, session)
     
     return {
         "call_id": call_id,
         "response_processed": True,
-        "ai_response": "Thank you for the update!",
-        "next_action": "continue_conversation"
+        "ai_response": ai_response,
+        "next_action": next_action
+    }
+
+
+@router.post("/end/{call_id}")
+async def end_call(
+    call_id: str,
+    scheduler: CallScheduler = Depends(get_call_scheduler),
+    sessions: SessionStore = Depends(get_session_store)
+):
+    """End a live call, e.g. from a provider's hang-up or status webhook"""
+    
+    session = await sessions.get(call_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Active call {call_id} not found")
+    
+    await scheduler.end_call(call_id, session)
+    
+    return {
+        "call_id": call_id,
+        "status": "completed"
     }
 
 
 @router.delete("/cancel/{call_id}")
-async def cancel_call(call_id: str):
+async def cancel_call(
+    call_id: str,
+    scheduler: CallScheduler = Depends(get_call_scheduler)
+):
     """Cancel a scheduled call"""
     
-    # TODO: Implement call cancellation
-    # 1. Find scheduled task
-    # 2. Cancel Celery task
-    # 3. Update database status
+    if not await scheduler.cancel_call(call_id):
+        raise HTTPException(status_code=404, detail=f"Scheduled call {call_id} not found")
     
     return {
         "call_id": call_id,
@@ -141,25 +402,19 @@ async def cancel_call(call_id: str):
 
 
 @router.get("/analytics/{user_id}")
-async def get_call_analytics(user_id: str):
+async def get_call_analytics(
+    user_id: str,
+    scheduler: CallScheduler = Depends(get_call_scheduler)
+):
     """Get call analytics and insights for a user"""
     
-    # TODO: Implement call analytics
-    # 1. Query call history and outcomes
-    # 2. Calculate success rates and patterns
-    # 3. Generate insights using AI
+    # Served from rollups maintained as calls finish, so the cost does not
+    # grow with the length of the user's history
+    # TODO: Generate narrative insights using AI
     
-    return {
-        "user_id": user_id,
-        "analytics": {
-            "total_calls": 0,
-            "completion_rate": 0.0,
-            "best_call_time": "morning",
-            "productivity_correlation": 0.0,
-            "habit_strength": {}
-        },
-        "insights": [
-            "You respond best to morning calls",
-            "Tuesday calls have highest completion rate"
-        ]
-    }
+    if scheduler.store is None:
+        raise HTTPException(status_code=503, detail="Call analytics require a schedule store")
+    
+    result = await load_analytics(scheduler.store, user_id)
+    
+    return {"user_id": user_id, **result}
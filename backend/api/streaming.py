@@ -0,0 +1,65 @@
+"""
+NDJSON streaming helpers for DisciplineCall.ai API
+Line-by-line request parsing and streamed responses with flat memory use
+"""
+
+from typing import AsyncIterator, Any
+import json
+
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class LineTooLongError(ValueError):
+    """Raised when an NDJSON record exceeds the allowed size"""
+
+
+async def iter_ndjson_lines(
+    chunks: AsyncIterator[bytes],
+    max_line_bytes: int = 64 * 1024
+) -> AsyncIterator[bytes]:
+    """Split a byte stream into lines without buffering more than one record"""
+
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer.extend(chunk)
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end < 0:
+                break
+            yield bytes(buffer[start:end])
+            start = end + 1
+        del buffer[:start]
+        if len(buffer) > max_line_bytes:
+            raise LineTooLongError(f"NDJSON record exceeds {max_line_bytes} bytes")
+
+    if buffer:
+        yield bytes(buffer)
+
+
+def ndjson_line(payload: Any) -> bytes:
+    """Encode one NDJSON record"""
+
+    return json.dumps(payload, separators=(",", ":"), default=str).encode() + b"\n"
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    Streaming NDJSON response that may keep reading the request body.
+
+    StreamingResponse normally listens on `receive` for disconnects while
+    sending, which would swallow request body chunks that the generator has
+    not read yet. Bulk endpoints stream results while still consuming their
+    upload, so the body stream is left to the generator.
+    """
+
+    media_type = NDJSON_MEDIA_TYPE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
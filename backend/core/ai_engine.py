@@ -4,18 +4,41 @@ Supports both cloud (OpenAI) and local (open-source) models
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any, Sequence, Tuple, TYPE_CHECKING
+from datetime import date, datetime, timezone
 from enum import Enum
+import asyncio
+import json
 import logging
+import time
+
+from backend.core.instrumentation import REGISTRY
+from backend.core.memory import estimate_tokens
+from backend.core.prompts import PromptCompiler
+from backend.core.text_stream import SentenceChunker, iter_sentences
+
+if TYPE_CHECKING:
+    from backend.core.response_cache import ResponseCache
 
 logger = logging.getLogger(__name__)
 
+AI_LABELS = ("provider", "personality", "call_type")
+AI_REQUESTS = REGISTRY.counter("ai_requests_total", "AI responses by outcome", AI_LABELS + ("outcome",))
+AI_RESPONSE_SECONDS = REGISTRY.histogram("ai_response_seconds", "Time to the complete AI response", AI_LABELS)
+AI_FIRST_TOKEN_SECONDS = REGISTRY.histogram("ai_first_token_seconds", "Time to the first streamed token", AI_LABELS)
+AI_PROMPT_TOKENS = REGISTRY.counter(
+    "ai_prompt_tokens_total", "Prompt tokens sent (compiled prefix exact, the rest estimated)", AI_LABELS
+)
+AI_COMPLETION_TOKENS = REGISTRY.counter("ai_completion_tokens_total", "Completion tokens generated (estimated)", AI_LABELS)
+AI_CACHE_LOOKUPS = REGISTRY.counter("ai_cache_lookups_total", "Response cache lookups", AI_LABELS + ("result",))
+
 
 class AIProvider(Enum):
     """Supported AI providers for conversation"""
     OPENAI = "openai"
     LOCAL = "local"
     ANTHROPIC = "anthropic"
+    SIMULATED = "simulated"  # offline stand-in for load tests
 
 
 class PersonalityMode(Enum):
@@ -30,59 +53,370 @@ class PersonalityMode(Enum):
 class BaseAIEngine(ABC):
     """Abstract base class for AI conversation engines"""
     
-    def __init__(self, personality: PersonalityMode = PersonalityMode.MOTIVATOR):
+    provider_name = "unknown"  # `provider` label on the engine's metrics
+    
+    def __init__(
+        self,
+        personality: PersonalityMode = PersonalityMode.MOTIVATOR,
+        prompt_compiler: Optional[PromptCompiler] = None,
+        response_cache: Optional["ResponseCache"] = None
+    ):
+        # Default only: engines are shared, so each request may pass its own personality
         self.personality = personality
-        self.conversation_history: List[Dict[str, Any]] = []
+        self.prompts = prompt_compiler or default_prompt_compiler()
+        self.response_cache = response_cache
     
-    @abstractmethod
     async def generate_response(
         self,
         user_input: str,
         context: Dict[str, Any],
-        call_type: str = "morning"
+        call_type: str = "morning",
+        personality: Optional[PersonalityMode] = None
     ) -> str:
-        """Generate AI response based on user input and context"""
-        pass
+        """
+        Generate AI response based on user input and context.
+        
+        A reply the response cache may share between users is generated
+        from the personality and call type alone, never from this user's
+        summary or turns.
+        """
+        
+        personality = personality or self.personality
+        labels = (personality.value, call_type)
+        started = time.perf_counter()
+        cached = self._cached_response(personality, user_input, call_type)
+        if cached is not None:
+            self._record(labels, started, ok=True)
+            return cached
+        if self._shared_reply(user_input):
+            context = {}
+        
+        try:
+            response = await self._generate(user_input, context, call_type, personality)
+        except Exception:
+            self._record(labels, started, ok=False)
+            raise
+        self._record(
+            labels, started, ok=True,
+            prompt_tokens=self._prompt_tokens(user_input, context, call_type, personality),
+            completion_tokens=estimate_tokens(response)
+        )
+        self._cache_response(personality, user_input, call_type, response)
+        return response
+    
+    async def _generate(
+        self,
+        user_input: str,
+        context: Dict[str, Any],
+        call_type: str,
+        personality: PersonalityMode
+    ) -> str:
+        return "".join([
+            token async for token in self.stream_response(user_input, context, call_type, personality)
+        ])
+    
+    async def stream_response(
+        self,
+        user_input: str,
+        context: Dict[str, Any],
+        call_type: str = "morning",
+        personality: Optional[PersonalityMode] = None
+    ) -> AsyncIterator[str]:
+        """Stream the response as tokens while the model generates it"""
+        
+        personality = personality or self.personality
+        logger.info(f"Generating {call_type} response for personality: {personality}")
+        messages = self._build_messages(user_input, context, call_type, personality)
+        started = time.perf_counter()
+        first = True
+        async for token in self._stream_messages(messages):
+            if first:
+                AI_FIRST_TOKEN_SECONDS.observe(
+                    time.perf_counter() - started, self._provider_label(), personality.value, call_type
+                )
+                first = False
+            yield token
     
     @abstractmethod
+    def _stream_messages(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """Stream a completion for prepared chat messages"""
+        pass
+    
+    async def summarize(self, previous_summary: str, turns: List[List[str]], max_words: int = 80) -> str:
+        """Fold older conversation turns into the running summary of a user"""
+        
+        transcript = "\n".join(f"{'Coach' if role == 'a' else 'User'}: {text}" for role, text in turns)
+        messages = [
+            {"role": "system", "content": SUMMARY_PROMPT.format(max_words=max_words)},
+            {"role": "user", "content": f"Summary so far: {previous_summary or '(none)'}\n\n{transcript}"}
+        ]
+        return (await self._complete_messages(messages)).strip()
+    
+    async def _complete_messages(self, messages: List[Dict[str, str]]) -> str:
+        """Whole completion for prepared chat messages"""
+        return "".join([token async for token in self._stream_messages(messages)])
+    
+    async def stream_sentences(
+        self,
+        user_input: str,
+        context: Dict[str, Any],
+        call_type: str = "morning",
+        personality: Optional[PersonalityMode] = None
+    ) -> AsyncIterator[str]:
+        """Stream the response sentence by sentence, ready to hand to TTS (cached as in generate_response)"""
+        
+        personality = personality or self.personality
+        labels = (personality.value, call_type)
+        started = time.perf_counter()
+        cached = self._cached_response(personality, user_input, call_type)
+        if cached is not None:
+            self._record(labels, started, ok=True)
+            chunker = SentenceChunker()
+            for sentence in chunker.feed(cached):
+                yield sentence
+            remainder = chunker.flush()
+            if remainder:
+                yield remainder
+            return
+        if self._shared_reply(user_input):
+            context = {}
+        
+        sentences = []
+        tokens = self.stream_response(user_input, context, call_type, personality)
+        try:
+            async for sentence in iter_sentences(tokens):
+                sentences.append(sentence)
+                yield sentence
+        except Exception:
+            self._record(labels, started, ok=False)
+            raise
+        response = " ".join(sentences)
+        self._record(
+            labels, started, ok=True,
+            prompt_tokens=self._prompt_tokens(user_input, context, call_type, personality),
+            completion_tokens=estimate_tokens(response)
+        )
+        self._cache_response(personality, user_input, call_type, response)
+    
+    async def warm_up(self) -> None:
+        """Bring the model and its connections up before the first call"""
+        pass
+    
+    def _shared_reply(self, user_input: str) -> bool:
+        """Whether the reply to this input goes into the response cache, shared by every user"""
+        return self.response_cache is not None and self.response_cache.cacheable(user_input)
+    
+    def _cached_response(self, personality: PersonalityMode, user_input: str, call_type: str) -> Optional[str]:
+        if self.response_cache is None:
+            return None
+        cached = self.response_cache.get(personality.value, call_type, user_input)
+        AI_CACHE_LOOKUPS.inc(
+            self.provider_name, personality.value, call_type, "miss" if cached is None else "hit"
+        )
+        return cached
+    
+    def _cache_response(self, personality: PersonalityMode, user_input: str, call_type: str, response: str) -> None:
+        if self.response_cache is not None:
+            self.response_cache.put(personality.value, call_type, user_input, response)
+    
+    def _provider_label(self) -> str:
+        """`provider` label for the request being recorded"""
+        return self.provider_name
+    
+    def _record(
+        self,
+        labels: Tuple[str, str],
+        started: float,
+        ok: bool,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0
+    ) -> None:
+        """Record one finished request, labelled (personality, call_type); cache hits and failures carry no tokens"""
+        
+        labels = (self._provider_label(),) + labels
+        AI_REQUESTS.inc(*labels, "ok" if ok else "error")
+        if not ok:
+            return
+        AI_RESPONSE_SECONDS.observe(time.perf_counter() - started, *labels)
+        if prompt_tokens:
+            AI_PROMPT_TOKENS.inc(*labels, amount=prompt_tokens)
+        if completion_tokens:
+            AI_COMPLETION_TOKENS.inc(*labels, amount=completion_tokens)
+    
+    def _prompt_tokens(
+        self,
+        user_input: str,
+        context: Dict[str, Any],
+        call_type: str,
+        personality: PersonalityMode
+    ) -> int:
+        """Prompt size without re-tokenizing: the prefix is counted at compile time"""
+        
+        volatile = [user_input, context.get("summary", "")] + [text for _, text in context.get("turns", [])]
+        return self.prompts.prefix_tokens(personality, call_type) + sum(
+            estimate_tokens(text) for text in volatile if text
+        )
+    
     async def analyze_metrics(
         self,
         metrics: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Analyze user metrics and provide insights"""
+        
+        labels = (self.personality.value, "analysis")
+        started = time.perf_counter()
+        try:
+            analysis = await self._analyze_metrics(metrics)
+        except Exception:
+            self._record(labels, started, ok=False)
+            raise
+        self._record(labels, started, ok=True)
+        return analysis
+    
+    @abstractmethod
+    async def _analyze_metrics(self, metrics: Dict[str, Any]) -> Dict[str, Any]:
         pass
+    
+    async def analyze_metrics_batch(
+        self,
+        columns: Dict[str, List[Any]],
+        today: Optional[date] = None,
+        max_concurrency: int = 8,
+        personality: Optional[PersonalityMode] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Insights for every user in a metrics table at once.
+        
+        Trends, streaks and correlations come from vectorized passes over
+        the columns (see metrics_analysis); the model only writes the
+        narrative, and only for users with something notable. Those
+        requests run `max_concurrency` at a time, which a local engine
+        decodes together up to its `max_parallel`. Everyone else gets a
+        plain-text narrative.
+        """
+        
+        from backend.core.metrics_analysis import build_insights, plain_narrative
+        
+        today = today or datetime.now(timezone.utc).date()
+        insights = await asyncio.to_thread(build_insights, columns, today)
+        personality = personality or self.personality
+        labels = (personality.value, "insights")
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def narrate(insight: Dict[str, Any]) -> None:
+            insight["narrative"] = plain_narrative(insight)
+            if not insight["highlights"]:
+                return
+            messages = [
+                {"role": "system", "content": self._get_personality_prompt(personality, "evening")},
+                {"role": "system", "content": INSIGHT_PROMPT},
+                {"role": "user", "content": json.dumps({
+                    "highlights": insight["highlights"], "metrics": insight["metrics"]
+                })}
+            ]
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    narrative = (await self._complete_messages(messages)).strip()
+                except Exception as e:
+                    self._record(labels, started, ok=False)
+                    logger.warning(f"Insight narrative for user {insight['user_id']} failed, using plain text: {e}")
+                    return
+                self._record(
+                    labels, started, ok=True,
+                    prompt_tokens=sum(estimate_tokens(message["content"]) for message in messages),
+                    completion_tokens=estimate_tokens(narrative)
+                )
+                insight["narrative"] = narrative
+        
+        await asyncio.gather(*(narrate(insight) for insight in insights))
+        narrated = sum(1 for insight in insights if insight["highlights"])
+        logger.info(f"Analyzed metrics for {len(insights)} users, {narrated} narrated by the model")
+        return insights
+    
+    async def close(self) -> None:
+        """Release clients and background workers"""
+        pass
+    
+    def _get_personality_prompt(self, personality: PersonalityMode, call_type: str) -> str:
+        return self.prompts.system_prefix(personality, call_type)
+    
+    def _format_context(self, context: Dict[str, Any], call_type: str) -> str:
+        lines = [f"This is the user's {call_type} coaching call."]
+        if context.get("scheduled_time"):
+            lines.append(f"Local time: {context['scheduled_time']} ({context.get('timezone', 'UTC')})")
+        return "\n".join(lines)
+    
+    def _build_messages(
+        self,
+        user_input: str,
+        context: Dict[str, Any],
+        call_type: str,
+        personality: Optional[PersonalityMode] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Chat messages for a turn.
+        
+        The compiled prefix comes first and never changes within a
+        (personality, call type), then volatile context and the user's
+        memory summary, then the recent turns of this call.
+        """
+        
+        messages = [
+            {"role": "system", "content": self._get_personality_prompt(personality or self.personality, call_type)},
+            {"role": "system", "content": self._format_context(context, call_type)}
+        ]
+        if context.get("summary"):
+            messages.append({"role": "system", "content": f"Earlier with this user: {context['summary']}"})
+        for role, text in context.get("turns", []):
+            messages.append({"role": "assistant" if role == "a" else "user", "content": text})
+        if user_input:
+            messages.append({"role": "user", "content": user_input})
+        else:
+            messages.append({"role": "user", "content": "Start the call."})
+        return messages
 
 
 class CloudAIEngine(BaseAIEngine):
     """Cloud-based AI engine using OpenAI GPT models"""
     
+    provider_name = AIProvider.OPENAI.value
+    
     def __init__(self, api_key: str, model: str = "gpt-4o", **kwargs):
         super().__init__(**kwargs)
         self.api_key = api_key
         self.model = model
-        # Initialize OpenAI client here
+        self._client = None
     
-    async def generate_response(
-        self,
-        user_input: str,
-        context: Dict[str, Any],
-        call_type: str = "morning"
-    ) -> str:
-        """Generate response using OpenAI models"""
-        
-        system_prompt = self._get_personality_prompt()
-        user_context = self._format_context(context, call_type)
-        
-        # TODO: Implement OpenAI API call
-        # messages = [
-        #     {"role": "system", "content": system_prompt},
-        #     {"role": "user", "content": f"{user_context}\nUser: {user_input}"}
-        # ]
+    @property
+    def client(self):
+        if self._client is None:
+            from openai import AsyncOpenAI
+            self._client = AsyncOpenAI(api_key=self.api_key)
+        return self._client
+    
+    async def _stream_messages(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """Stream a completion from OpenAI chat completions"""
         
-        logger.info(f"Generating {call_type} response for personality: {self.personality}")
-        return f"AI Response for {call_type} call (Cloud mode)"
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
+    async def warm_up(self) -> None:
+        """Open the HTTPS connection with a free metadata call rather than a paid completion"""
+        await self.client.models.retrieve(self.model)
     
-    async def analyze_metrics(self, metrics: Dict[str, Any]) -> Dict[str, Any]:
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+    
+    async def _analyze_metrics(self, metrics: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze metrics using cloud AI"""
         # TODO: Implement metrics analysis
         return {"insights": "Cloud-based analysis", "recommendations": []}
@@ -91,27 +425,87 @@ class CloudAIEngine(BaseAIEngine):
 class LocalAIEngine(BaseAIEngine):
     """Local AI engine using open-source models"""
     
-    def __init__(self, model_path: str = "llama2", **kwargs):
+    provider_name = AIProvider.LOCAL.value
+    
+    def __init__(
+        self,
+        model_path: str = "llama2",
+        base_url: str = "http://localhost:11434",
+        max_parallel: int = 4,
+        keep_alive: str = "30m",
+        **kwargs
+    ):
+        """
+        Args:
+            model_path: Ollama model name
+            base_url: Ollama server URL
+            max_parallel: Requests in flight to Ollama at once; match
+                OLLAMA_NUM_PARALLEL so the server decodes them together
+                and the rest wait here, where a hung-up call can still drop out
+            keep_alive: How long Ollama keeps the weights loaded after a request
+        """
+        if max_parallel < 1:
+            raise ValueError("max_parallel must be at least 1")
+        
         super().__init__(**kwargs)
         self.model_path = model_path
-        # Initialize local model here (Ollama, Llama.cpp, etc.)
+        self.base_url = base_url.rstrip("/")
+        self.max_parallel = max_parallel
+        self.keep_alive = keep_alive
+        self._client = None
+        self._slots = asyncio.Semaphore(max_parallel)
     
-    async def generate_response(
-        self,
-        user_input: str,
-        context: Dict[str, Any],
-        call_type: str = "morning"
-    ) -> str:
-        """Generate response using local models"""
+    @property
+    def client(self):
+        if self._client is None:
+            import httpx
+            self._client = httpx.AsyncClient(base_url=self.base_url, timeout=None)
+        return self._client
+    
+    async def _complete_messages(self, messages: List[Dict[str, str]]) -> str:
+        return await self._complete(messages)
+    
+    async def _complete(self, messages: List[Dict[str, str]]) -> str:
+        async with self._slots:
+            response = await self.client.post(
+                "/api/chat",
+                json={"model": self.model_path, "messages": messages, "stream": False, "keep_alive": self.keep_alive}
+            )
+        response.raise_for_status()
+        return response.json()["message"]["content"]
+    
+    async def warm_up(self) -> None:
+        """Have Ollama load the model weights now instead of on the first call"""
         
-        system_prompt = self._get_personality_prompt()
-        user_context = self._format_context(context, call_type)
+        response = await self.client.post(
+            "/api/generate",
+            json={"model": self.model_path, "keep_alive": self.keep_alive}
+        )
+        response.raise_for_status()
+    
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def _stream_messages(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """Stream a completion from a local Ollama server"""
         
-        # TODO: Implement local model inference
-        logger.info(f"Generating {call_type} response locally for personality: {self.personality}")
-        return f"AI Response for {call_type} call (Local mode)"
+        payload = {"model": self.model_path, "messages": messages, "stream": True, "keep_alive": self.keep_alive}
+        async with self._slots, self.client.stream("POST", "/api/chat", json=payload) as response:
+            response.raise_for_status()
+            # Ollama streams one JSON object per line
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                token = chunk.get("message", {}).get("content")
+                if token:
+                    yield token
+                if chunk.get("done"):
+                    break
     
-    async def analyze_metrics(self, metrics: Dict[str, Any]) -> Dict[str, Any]:
+    async def _analyze_metrics(self, metrics: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze metrics using local AI"""
         # TODO: Implement local metrics analysis
         return {"insights": "Local analysis", "recommendations": []}
@@ -132,10 +526,171 @@ class AIEngineFactory:
             return CloudAIEngine(personality=personality, **kwargs)
         elif provider == AIProvider.LOCAL:
             return LocalAIEngine(personality=personality, **kwargs)
+        elif provider == AIProvider.SIMULATED:
+            from backend.core.simulated_engine import SimulatedAIEngine
+            return SimulatedAIEngine(personality=personality, **kwargs)
         else:
             raise ValueError(f"Unsupported AI provider: {provider}")
 
 
+class EnginePool:
+    """
+    Shared AI engines, one per (provider, model).
+    
+    Engines hold no per-user state (memory lives in ConversationMemory and
+    personality is passed per request), so one instance serves every
+    coroutine. Engines are created on first use with the pool's prompt
+    compiler and response cache, warmed at boot and closed on shutdown.
+    With `hedge_providers`, the default engine is a HedgedAIEngine over
+    those providers' pooled engines, primary first.
+    """
+    
+    MODEL_OPTION = {AIProvider.OPENAI: "model", AIProvider.LOCAL: "model_path", AIProvider.SIMULATED: "model"}
+    
+    def __init__(
+        self,
+        default_provider: AIProvider,
+        engine_options: Dict[AIProvider, Dict[str, Any]],
+        prompt_compiler: Optional[PromptCompiler] = None,
+        response_cache: Optional["ResponseCache"] = None,
+        hedge_providers: Sequence[AIProvider] = (),
+        hedge_options: Optional[Dict[str, Any]] = None
+    ):
+        self.default_provider = default_provider
+        self.engine_options = engine_options
+        self.prompt_compiler = prompt_compiler or default_prompt_compiler()
+        self.response_cache = response_cache
+        self.hedge_providers = list(hedge_providers)
+        self.hedge_options = hedge_options or {}
+        self._engines: Dict[Tuple[AIProvider, str], BaseAIEngine] = {}
+        self._hedged: Optional[BaseAIEngine] = None
+    
+    @classmethod
+    def from_settings(cls, settings) -> "EnginePool":
+        """Pool for the deployment mode, sharing one prompt compiler and response cache"""
+        
+        response_cache = None
+        if settings.response_cache_enabled:
+            from backend.core.response_cache import ResponseCache
+            response_cache = ResponseCache.from_settings(settings)
+        
+        local = settings.deployment_mode.value in ("local", "hybrid")
+        default_provider = AIProvider.LOCAL if local else AIProvider.OPENAI
+        if settings.ai_provider:
+            default_provider = AIProvider(settings.ai_provider)
+        return cls(
+            default_provider=default_provider,
+            engine_options={
+                AIProvider.OPENAI: {"api_key": settings.openai_api_key},
+                AIProvider.LOCAL: {
+                    "model_path": settings.local_llm_model,
+                    "base_url": settings.local_llm_url,
+                    "max_parallel": settings.local_llm_max_parallel
+                },
+                AIProvider.SIMULATED: {
+                    "latency_ms": settings.simulated_ai_latency_ms,
+                    "latency_jitter": settings.simulated_ai_latency_jitter,
+                    "latency_distribution": settings.simulated_ai_latency_distribution,
+                    "tokens_per_second": settings.simulated_ai_tokens_per_second,
+                    "error_rate": settings.simulated_ai_error_rate,
+                    "seed": settings.simulated_ai_seed
+                }
+            },
+            prompt_compiler=PromptCompiler.from_config(PERSONALITY_PROMPTS),
+            response_cache=response_cache,
+            hedge_providers=[AIProvider(name) for name in settings.ai_hedge_providers],
+            hedge_options={
+                "hedge_percentile": settings.ai_hedge_percentile,
+                "initial_delay_ms": settings.ai_hedge_initial_delay_ms,
+                "min_delay_ms": settings.ai_hedge_min_delay_ms,
+                "max_delay_ms": settings.ai_hedge_max_delay_ms
+            }
+        )
+    
+    def get(self, provider: Optional[AIProvider] = None, model: Optional[str] = None) -> BaseAIEngine:
+        """The shared engine for a provider/model, created on first use"""
+        
+        if provider is None and model is None and len(self.hedge_providers) > 1:
+            return self.hedged()
+        
+        provider = provider or self.default_provider
+        options = dict(self.engine_options.get(provider, {}))
+        if model is not None:
+            options[self.MODEL_OPTION[provider]] = model
+        key = (provider, options.get(self.MODEL_OPTION[provider], ""))
+        
+        engine = self._engines.get(key)
+        if engine is None:
+            engine = AIEngineFactory.create_engine(
+                provider,
+                prompt_compiler=self.prompt_compiler,
+                response_cache=self.response_cache,
+                **options
+            )
+            self._engines[key] = engine
+            logger.info(f"Created {provider.value} engine for model {key[1] or 'default'}")
+        return engine
+    
+    def hedged(self) -> BaseAIEngine:
+        """The shared hedging engine over `hedge_providers`"""
+        
+        if self._hedged is None:
+            from backend.core.hedging import HedgedAIEngine
+            
+            self._hedged = HedgedAIEngine(
+                {provider.value: self.get(provider) for provider in self.hedge_providers},
+                prompt_compiler=self.prompt_compiler,
+                response_cache=self.response_cache,
+                **self.hedge_options
+            )
+            logger.info(f"Hedging AI requests across {', '.join(p.value for p in self.hedge_providers)}")
+        return self._hedged
+    
+    async def warm_up(self, timeout: float = 60.0) -> None:
+        """Warm every pooled engine; failures are logged, not fatal"""
+        
+        async def warm(key: Tuple[AIProvider, str], engine: BaseAIEngine) -> None:
+            try:
+                await asyncio.wait_for(engine.warm_up(), timeout)
+                logger.info(f"Warmed {key[0].value} engine {key[1] or 'default'}")
+            except Exception as e:
+                logger.warning(f"Warm-up of {key[0].value} engine {key[1] or 'default'} failed: {e}")
+        
+        await asyncio.gather(*(warm(key, engine) for key, engine in self._engines.items()))
+    
+    async def close(self) -> None:
+        engines = list(self._engines.values())
+        self._engines.clear()
+        self._hedged = None
+        await asyncio.gather(*(engine.close() for engine in engines), return_exceptions=True)
+
+
+_default_compiler: Optional[PromptCompiler] = None
+
+
+def default_prompt_compiler() -> PromptCompiler:
+    """Shared compiler over PERSONALITY_PROMPTS alone, for engines built without one"""
+    
+    global _default_compiler
+    if _default_compiler is None:
+        _default_compiler = PromptCompiler(PERSONALITY_PROMPTS)
+    return _default_compiler
+
+
+INSIGHT_PROMPT = (
+    "Write the user's weekly progress note from the JSON facts below: two or three "
+    "spoken sentences, in character, naming the highlights and one concrete next step. "
+    "Do not invent numbers."
+)
+
+
+SUMMARY_PROMPT = (
+    "You maintain a coach's notes about a user. Merge the conversation below into "
+    "the existing summary. Keep goals, commitments, recurring struggles and wins; "
+    "drop small talk. Reply with the updated summary only, at most {max_words} words."
+)
+
+
 # Personality prompts for different coaching styles
 PERSONALITY_PROMPTS = {
     PersonalityMode.MOTIVATOR: """
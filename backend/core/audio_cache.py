@@ -0,0 +1,290 @@
+"""
+TTS audio cache for DisciplineCall.ai
+Content-addressed, size-capped disk cache shared by every worker on the volume
+"""
+
+from typing import Any, AsyncIterator, Dict, Optional, Union
+from collections import OrderedDict
+import asyncio
+import hashlib
+import json
+import logging
+import mmap
+import os
+import tempfile
+import threading
+
+from backend.core.instrumentation import REGISTRY
+from backend.core.voice_engine import BaseVoiceEngine, VoiceStyle
+
+logger = logging.getLogger(__name__)
+
+TTS_CACHE_LOOKUPS = REGISTRY.counter("tts_cache_lookups_total", "TTS audio cache lookups", ("result",))
+
+SUFFIX = ".audio"
+
+
+def audio_key(namespace: str, text: str, voice_id: Optional[str], voice_style: VoiceStyle, **params: Any) -> str:
+    """Content address of a synthesis: engine namespace, text, voice and voice parameters"""
+
+    payload = json.dumps(
+        [namespace, text, voice_id, voice_style.value, params], sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=20).hexdigest()
+
+
+class AudioCache:
+    """
+    Disk LRU of synthesized audio, capped at `max_bytes`.
+
+    Each entry is one file named by its key under a two-character fan-out
+    directory. Writes go to a temp file in the target directory and are
+    renamed into place, so a reader never sees a partial file and two
+    workers writing the same key just replace identical content. The
+    in-memory index (key -> size, in LRU order) is per process; hits touch
+    the file's mtime, so when the cap is reached the directory is rescanned
+    and the least recently used files across all workers are evicted down
+    to `low_watermark` of the cap. A file another worker evicted is a miss.
+    File IO runs in worker threads, never on the event loop. `read` maps
+    the file, so streaming an entry does not copy it into Python first;
+    `read_bytes` is for callers that need the audio as bytes anyway.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 1 << 30, low_watermark: float = 0.9):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.low_watermark = low_watermark
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        self._metrics = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        # Writes and evictions run in worker threads; the lock guards the index, not file IO
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    @classmethod
+    def from_settings(cls, settings) -> "AudioCache":
+        return cls(settings.tts_cache_dir, max_bytes=settings.tts_cache_max_mb * 1024 * 1024)
+
+    async def read(self, key: str) -> Optional[memoryview]:
+        """Memory-mapped view of a cached entry, or None"""
+        return await asyncio.to_thread(self._read, key, False)
+
+    async def read_bytes(self, key: str) -> Optional[bytes]:
+        """A cached entry read into memory, or None"""
+        return await asyncio.to_thread(self._read, key, True)
+
+    async def write(self, key: str, audio: bytes) -> None:
+        """Store an entry atomically, evicting least recently used entries past the cap"""
+
+        await asyncio.to_thread(self._write, key, audio)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {**self._metrics, "entries": len(self._index), "bytes": self._bytes}
+
+    def _read(self, key: str, load: bool) -> Optional[Union[bytes, memoryview]]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                if load:
+                    audio = f.read()
+                    size = len(audio)
+                else:
+                    size = os.fstat(f.fileno()).st_size
+                    audio = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)) if size else memoryview(b"")
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._forget(key)
+                self._metrics["misses"] += 1
+            TTS_CACHE_LOOKUPS.inc("miss")
+            return None
+
+        with self._lock:
+            if key not in self._index:
+                self._index[key] = size
+                self._bytes += size
+            self._index.move_to_end(key)
+            self._metrics["hits"] += 1
+        TTS_CACHE_LOOKUPS.inc("hit")
+        return audio
+
+    def _write(self, key: str, audio: bytes) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+        with self._lock:
+            self._forget(key)
+            self._index[key] = len(audio)
+            self._bytes += len(audio)
+            self._metrics["writes"] += 1
+            over_cap = self._bytes > self.max_bytes
+        if over_cap:
+            self._evict()
+
+    def _evict(self) -> None:
+        # Pick up entries written by other workers and their recency before choosing victims
+        self._scan()
+        target = self.max_bytes * self.low_watermark
+        victims = []
+        with self._lock:
+            while self._bytes > target and self._index:
+                key, size = self._index.popitem(last=False)
+                self._bytes -= size
+                victims.append(key)
+            self._metrics["evictions"] += len(victims)
+        for key in victims:
+            try:
+                os.unlink(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def _scan(self) -> None:
+        entries = []
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(SUFFIX):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.name[:-len(SUFFIX)], stat.st_size))
+
+        entries.sort()
+        with self._lock:
+            self._index = OrderedDict((key, size) for _, key, size in entries)
+            self._bytes = sum(self._index.values())
+
+    def _forget(self, key: str) -> None:
+        size = self._index.pop(key, None)
+        if size is not None:
+            self._bytes -= size
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + SUFFIX)
+
+
+class CachedVoiceEngine(BaseVoiceEngine):
+    """
+    Any voice engine with its TTS output cached in an AudioCache.
+
+    Concurrent requests for the same audio share one synthesis. Speech to
+    text passes straight through.
+    """
+
+    def __init__(
+        self,
+        engine: BaseVoiceEngine,
+        cache: AudioCache,
+        namespace: str,
+        voice_speed: float = 1.0,
+        voice_stability: float = 0.5
+    ):
+        self.engine = engine
+        self.audio_format = engine.audio_format
+        self.cache = cache
+        self.namespace = namespace
+        self.voice_speed = voice_speed
+        self.voice_stability = voice_stability
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def key(self, text: str, voice_id: Optional[str], voice_style: VoiceStyle) -> str:
+        return audio_key(
+            self.namespace, text, voice_id, voice_style,
+            speed=self.voice_speed, stability=self.voice_stability
+        )
+
+    async def cached_audio(
+        self,
+        text: str,
+        voice_id: Optional[str] = None,
+        voice_style: VoiceStyle = VoiceStyle.FRIENDLY
+    ) -> Optional[memoryview]:
+        """Zero-copy view of already synthesized audio, for serving paths"""
+        return await self.cache.read(self.key(text, voice_id, voice_style))
+
+    async def text_to_speech(
+        self,
+        text: str,
+        voice_id: Optional[str] = None,
+        voice_style: VoiceStyle = VoiceStyle.FRIENDLY
+    ) -> bytes:
+        """Cached audio if present, otherwise synthesize once and store it"""
+
+        key = self.key(text, voice_id, voice_style)
+        audio = await self.cache.read_bytes(key)
+        if audio is not None:
+            return audio
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            audio = await self.engine.text_to_speech(text, voice_id=voice_id, voice_style=voice_style)
+            future.set_result(audio)
+            # Stay in flight until the file lands, or a request in between would miss and synthesize again
+            try:
+                await self.cache.write(key, audio)
+            except OSError as e:
+                logger.warning(f"Could not cache TTS audio {key}: {e}")
+        except asyncio.CancelledError:
+            if not future.done():
+                future.cancel()
+            raise
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+                # Waiters re-raise it; mark it retrieved so a lone failure is not reported twice
+                future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+        return audio
+
+    async def _synthesize_chunks(
+        self,
+        sentence: str,
+        voice_id: Optional[str],
+        voice_style: VoiceStyle,
+        chunk_bytes: int
+    ) -> AsyncIterator[bytes]:
+        """Serve cached sentences straight from the mapping; stream and store the rest"""
+
+        key = self.key(sentence, voice_id, voice_style)
+        view = await self.cache.read(key)
+        if view is not None:
+            for offset in range(0, len(view), chunk_bytes):
+                yield view[offset:offset + chunk_bytes]
+            return
+
+        chunks = []
+        async for chunk in self.engine._synthesize_chunks(sentence, voice_id, voice_style, chunk_bytes):
+            chunks.append(chunk)
+            yield chunk
+        try:
+            await self.cache.write(key, b"".join(chunks))
+        except OSError as e:
+            logger.warning(f"Could not cache TTS audio {key}: {e}")
+
+    async def speech_to_text(
+        self,
+        audio_data: bytes,
+        language: str = "en"
+    ) -> str:
+        return await self.engine.speech_to_text(audio_data, language)
+
+    async def close(self) -> None:
+        await self.engine.close()
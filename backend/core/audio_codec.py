@@ -0,0 +1,433 @@
+"""
+Audio transcoding for DisciplineCall.ai
+Streaming, vectorized conversion between voice engine and call provider audio formats
+"""
+
+from enum import Enum
+from typing import AsyncIterator, List, Optional, Sequence, Tuple, Union
+import asyncio
+import logging
+import shutil
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+class AudioEncoding(Enum):
+    """Sample encodings, named as in ElevenLabs output_format strings"""
+    PCM16 = "pcm"  # signed 16-bit little-endian, raw or in WAV files
+    MULAW = "ulaw"  # G.711 mu-law, one byte per sample
+    MP3 = "mp3"
+    OGG_OPUS = "opus"
+
+
+class AudioFormat:
+    """Encoding, sample rate and channel count of an audio stream"""
+
+    def __init__(self, encoding: AudioEncoding, sample_rate: int, channels: int = 1):
+        self.encoding = encoding
+        self.sample_rate = sample_rate
+        self.channels = channels
+
+    @classmethod
+    def parse(cls, spec: str) -> "AudioFormat":
+        """From an output_format string such as pcm_16000, ulaw_8000 or mp3_44100_128"""
+
+        encoding, rate = spec.split("_")[:2]
+        return cls(AudioEncoding(encoding), int(rate))
+
+    @property
+    def compressed(self) -> bool:
+        return self.encoding in (AudioEncoding.MP3, AudioEncoding.OGG_OPUS)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, AudioFormat) and (
+            (self.encoding, self.sample_rate, self.channels) == (other.encoding, other.sample_rate, other.channels)
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.encoding, self.sample_rate, self.channels))
+
+    def __repr__(self) -> str:
+        return f"AudioFormat({self.encoding.value}, {self.sample_rate}, channels={self.channels})"
+
+
+def _mulaw_tables() -> Tuple[np.ndarray, np.ndarray]:
+    """G.711 mu-law lookup tables, bit-exact with the classic Sun/audioop codec"""
+
+    codes = ~np.arange(256, dtype=np.uint8)
+    magnitude = (((codes & 0x0F).astype(np.int32) << 3) + 0x84) << ((codes >> 4) & 0x07)
+    decode = np.where(codes & 0x80, 0x84 - magnitude, magnitude - 0x84).astype(np.int16)
+
+    pcm = np.arange(-32768, 32768, dtype=np.int32) >> 2
+    mask = np.where(pcm < 0, 0x7F, 0xFF)
+    value = np.minimum(np.abs(pcm), 8159) + 33
+    segment = np.searchsorted(np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF]), value)
+    code = np.where(segment < 8, (segment << 4) | ((value >> (segment + 1)) & 0x0F), 0x7F)
+    encoded = (code ^ mask).astype(np.uint8)
+    # Indexed by the int16 sample reinterpreted as uint16, so encoding is a single gather
+    encode = np.empty(65536, dtype=np.uint8)
+    encode[np.arange(-32768, 32768, dtype=np.int32).astype(np.int16).view(np.uint16)] = encoded
+    return decode, encode
+
+
+MULAW_DECODE, MULAW_ENCODE = _mulaw_tables()
+
+
+def mulaw_decode(data: BytesLike) -> np.ndarray:
+    """mu-law bytes to int16 samples"""
+    return MULAW_DECODE[np.frombuffer(data, dtype=np.uint8)]
+
+
+def mulaw_encode(samples: np.ndarray) -> np.ndarray:
+    """int16 samples to mu-law bytes"""
+    return MULAW_ENCODE[np.ascontiguousarray(samples, dtype=np.int16).view(np.uint16)]
+
+
+def lowpass_kernel(cutoff: float, taps: int = 31) -> np.ndarray:
+    """Blackman-windowed sinc, `cutoff` in cycles per sample, unity DC gain"""
+
+    n = np.arange(taps, dtype=np.float64) - (taps - 1) / 2
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.blackman(taps)
+    return kernel / kernel.sum()
+
+
+class StreamingResampler:
+    """
+    Sample rate conversion over a stream of chunks.
+
+    Downsampling first low-passes with a short FIR so the dropped band does
+    not alias back into speech; both directions then interpolate linearly.
+    Filter history and the fractional read position carry across chunks,
+    so chunk boundaries leave no clicks or drift, and each chunk costs one
+    convolution and one gather.
+    """
+
+    def __init__(self, src_rate: int, dst_rate: int, taps: int = 31):
+        self.src_rate = src_rate
+        self.dst_rate = dst_rate
+        self.step = src_rate / dst_rate
+        self._kernel = lowpass_kernel(0.45 / self.step, taps) if dst_rate < src_rate else None
+        # float64 throughout: numpy's double convolution is markedly faster than its float32 one
+        self._history = np.zeros(taps - 1 if self._kernel is not None else 0)
+        # Last input sample of the previous chunk and where the next output falls, relative to it
+        self._last = np.zeros(1)
+        self._position = 1.0
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """int16 samples in, int16 samples out"""
+
+        if self.src_rate == self.dst_rate:
+            return samples.astype(np.int16, copy=False)
+
+        signal = samples.astype(np.float64)
+        if self._kernel is not None:
+            padded = np.concatenate((self._history, signal))
+            self._history = padded[len(padded) - len(self._history):]
+            signal = np.convolve(padded, self._kernel, mode="valid")
+
+        buffer = np.concatenate((self._last, signal))
+        end = len(buffer) - 1
+        count = int((end - self._position) // self.step) + 1 if end >= self._position else 0
+        positions = self._position + np.arange(count) * self.step
+        index = positions.astype(np.int64)
+        fraction = positions - index
+        upper = np.minimum(index + 1, end)
+        out = buffer[index] * (1 - fraction) + buffer[upper] * fraction
+
+        self._position += count * self.step - end
+        self._last = buffer[end:]
+        return np.clip(np.rint(out), -32768, 32767).astype(np.int16)
+
+    def flush(self) -> np.ndarray:
+        """Drain the filter delay at the end of a stream"""
+
+        if self._kernel is None:
+            return np.zeros(0, dtype=np.int16)
+        return self.process(np.zeros(len(self._history) // 2, dtype=np.int16))
+
+
+class PCMDecoder:
+    """
+    16-bit PCM samples from a raw or WAV byte stream.
+
+    A stream that starts with RIFF is parsed as WAV files back to back (one
+    per synthesized sentence); the sample rate and channel count come from
+    each file's header. Anything else is raw PCM in the configured format.
+    Sample data is viewed in place with np.frombuffer; only headers and a
+    sample split across two chunks are copied.
+    """
+
+    def __init__(self, sample_rate: int, channels: int = 1):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self._state = "start"
+        self._header = bytearray()
+        self._remaining: Optional[int] = None  # data bytes left in the current WAV file, None if unbounded
+        self._skip = 0
+        self._carry = bytearray()
+
+    def feed(self, chunk: BytesLike) -> List[Tuple[int, np.ndarray]]:
+        """(sample rate, mono samples) runs decoded from one chunk"""
+
+        runs: List[Tuple[int, np.ndarray]] = []
+        view: Optional[memoryview] = memoryview(chunk).cast("B")
+        while view is not None and len(view):
+            if self._state == "data":
+                view = self._read_data(view, runs)
+            elif self._state == "skip":
+                taken = min(self._skip, len(view))
+                self._skip -= taken
+                view = view[taken:]
+                if not self._skip:
+                    self._state = "header"
+            else:
+                view = self._read_header(view)
+        return runs
+
+    def _read_header(self, view: memoryview) -> Optional[memoryview]:
+        header = self._header
+        header += view
+        while True:
+            if self._state == "start":
+                if len(header) < 4:
+                    return None
+                if header[:4] != b"RIFF":
+                    return self._start_data(None)
+                self._state = "header"
+            if len(header) < 8:
+                return None
+
+            chunk_id = bytes(header[:4])
+            size = int.from_bytes(header[4:8], "little")
+            if chunk_id == b"RIFF":
+                if len(header) < 12:
+                    return None
+                if header[8:12] != b"WAVE":
+                    raise ValueError("RIFF stream is not WAVE audio")
+                del header[:12]
+            elif chunk_id == b"fmt ":
+                if len(header) < 8 + size:
+                    return None
+                fmt = bytes(header[8:8 + size])
+                tag = int.from_bytes(fmt[0:2], "little")
+                channels = int.from_bytes(fmt[2:4], "little")
+                rate = int.from_bytes(fmt[4:8], "little")
+                bits = int.from_bytes(fmt[14:16], "little")
+                if tag not in (1, 0xFFFE) or bits != 16:
+                    raise ValueError(f"Unsupported WAV encoding: format {tag}, {bits}-bit")
+                self.sample_rate, self.channels = rate, channels
+                del header[:8 + size + (size & 1)]
+            elif chunk_id == b"data":
+                del header[:8]
+                # Streaming writers leave the size at 0 or near 4 GiB
+                return self._start_data(size if 0 < size < 0x7FFF0000 else None)
+            else:
+                total = 8 + size + (size & 1)
+                if len(header) >= total:
+                    del header[:total]
+                else:
+                    self._skip = total - len(header)
+                    header.clear()
+                    self._state = "skip"
+                    return None
+
+    def _start_data(self, size: Optional[int]) -> memoryview:
+        self._state = "data"
+        self._remaining = size
+        rest = memoryview(bytes(self._header))
+        self._header.clear()
+        return rest
+
+    def _read_data(self, view: memoryview, runs: List[Tuple[int, np.ndarray]]) -> memoryview:
+        frame = 2 * self.channels
+        if self._remaining is not None:
+            body, view = view[:self._remaining], view[self._remaining:]
+            self._remaining -= len(body)
+        else:
+            body, view = view, view[len(view):]
+
+        if self._carry:
+            needed = frame - len(self._carry)
+            self._carry += body[:needed]
+            body = body[needed:]
+            if len(self._carry) == frame:
+                runs.append((self.sample_rate, self._mono(bytes(self._carry))))
+                self._carry.clear()
+
+        usable = len(body) - len(body) % frame
+        if usable:
+            runs.append((self.sample_rate, self._mono(body[:usable])))
+        self._carry += body[usable:]
+
+        if self._remaining == 0:
+            self._carry.clear()
+            self._state = "header"
+        return view
+
+    def _mono(self, data: BytesLike) -> np.ndarray:
+        samples = np.frombuffer(data, dtype="<i2")
+        if self.channels == 1:
+            return samples
+        return samples.reshape(-1, self.channels).mean(axis=1).astype(np.int16)
+
+
+class PCMTranscoder:
+    """
+    Chunk-by-chunk conversion between uncompressed formats: PCM16 (raw or
+    WAV) and mu-law, at any sample rates.
+
+    Each chunk is decoded, resampled and encoded with whole-array numpy
+    operations; nothing waits for the end of the stream. Output is raw
+    (headerless) audio, as media streams expect.
+    """
+
+    def __init__(self, source: AudioFormat, target: AudioFormat, taps: int = 31):
+        if source.compressed or target.compressed:
+            raise ValueError(f"PCMTranscoder cannot convert {source} to {target}")
+        self.source = source
+        self.target = target
+        self.taps = taps
+        self._decoder = PCMDecoder(source.sample_rate, source.channels) if source.encoding == AudioEncoding.PCM16 else None
+        self._resampler: Optional[StreamingResampler] = None
+
+    def process(self, chunk: BytesLike) -> memoryview:
+        if self._decoder is None:
+            runs = [(self.source.sample_rate, mulaw_decode(chunk))]
+        else:
+            runs = self._decoder.feed(chunk)
+
+        pieces = []
+        for rate, samples in runs:
+            if self._resampler is None or self._resampler.src_rate != rate:
+                # A sentence file at a different rate: drain the old filter before switching
+                if self._resampler is not None:
+                    pieces.append(self._resampler.flush())
+                self._resampler = StreamingResampler(rate, self.target.sample_rate, self.taps)
+            pieces.append(self._resampler.process(samples))
+        return self._encode(pieces)
+
+    def flush(self) -> memoryview:
+        if self._resampler is None:
+            return memoryview(b"")
+        return self._encode([self._resampler.flush()])
+
+    def _encode(self, pieces: Sequence[np.ndarray]) -> memoryview:
+        if not pieces:
+            return memoryview(b"")
+        samples = pieces[0] if len(pieces) == 1 else np.concatenate(pieces)
+        if self.target.encoding == AudioEncoding.MULAW:
+            samples = mulaw_encode(samples)
+        return memoryview(samples).cast("B")
+
+
+FFMPEG_FORMATS = {
+    AudioEncoding.MP3: (["-f", "mp3"], ["-c:a", "libmp3lame", "-b:a", "64k", "-f", "mp3"]),
+    AudioEncoding.OGG_OPUS: (["-f", "ogg"], ["-c:a", "libopus", "-b:a", "24k", "-application", "voip", "-f", "ogg"])
+}
+
+
+async def ffmpeg_stream(
+    chunks: AsyncIterator[BytesLike],
+    input_args: Sequence[str],
+    output_args: Sequence[str],
+    read_bytes: int = 65536
+) -> AsyncIterator[memoryview]:
+    """
+    Pipe a chunk stream through ffmpeg, yielding its output as it is produced.
+
+    Used for the compressed codecs (Opus, MP3), which have no numpy
+    implementation. Input is written by a separate task so a full pipe on
+    either side cannot deadlock, and the process is killed if the consumer
+    stops early.
+    """
+
+    binary = shutil.which("ffmpeg")
+    if binary is None:
+        raise RuntimeError("ffmpeg is required to transcode compressed audio")
+
+    process = await asyncio.create_subprocess_exec(
+        binary, "-hide_banner", "-loglevel", "error",
+        *input_args, "-i", "pipe:0", *output_args, "-flush_packets", "1", "pipe:1",
+        stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+
+    async def write() -> None:
+        try:
+            async for chunk in chunks:
+                if len(chunk):
+                    process.stdin.write(chunk)
+                    await process.stdin.drain()
+        finally:
+            process.stdin.close()
+
+    writer = asyncio.create_task(write())
+    try:
+        while True:
+            data = await process.stdout.read(read_bytes)
+            if not data:
+                break
+            yield memoryview(data)
+        await writer
+        errors = await process.stderr.read()
+        if await process.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed: {errors.decode(errors='replace').strip()}")
+    finally:
+        writer.cancel()
+        await asyncio.gather(writer, return_exceptions=True)
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+
+
+async def transcode(
+    chunks: AsyncIterator[BytesLike],
+    source: AudioFormat,
+    target: AudioFormat
+) -> AsyncIterator[memoryview]:
+    """
+    Convert an audio stream chunk by chunk.
+
+    PCM16 and mu-law are converted in process (see PCMTranscoder). A
+    compressed source is decoded, and a compressed target encoded, by a
+    streaming ffmpeg process around that stage.
+    """
+
+    if source == target and source.encoding != AudioEncoding.PCM16:
+        async for chunk in chunks:
+            yield memoryview(chunk)
+        return
+
+    if source.compressed:
+        decode_args, _ = FFMPEG_FORMATS[source.encoding]
+        raw = ["-f", "s16le", "-ac", "1", "-ar", str(source.sample_rate)]
+        chunks = ffmpeg_stream(chunks, decode_args, raw)
+        source = AudioFormat(AudioEncoding.PCM16, source.sample_rate)
+
+    if target.compressed:
+        pcm = _transcode_pcm(chunks, source, AudioFormat(AudioEncoding.PCM16, target.sample_rate))
+        _, encode_args = FFMPEG_FORMATS[target.encoding]
+        raw = ["-f", "s16le", "-ac", "1", "-ar", str(target.sample_rate)]
+        async for chunk in ffmpeg_stream(pcm, raw, encode_args + ["-ar", str(target.sample_rate)]):
+            yield chunk
+    else:
+        async for chunk in _transcode_pcm(chunks, source, target):
+            yield chunk
+
+
+async def _transcode_pcm(
+    chunks: AsyncIterator[BytesLike],
+    source: AudioFormat,
+    target: AudioFormat
+) -> AsyncIterator[memoryview]:
+    transcoder = PCMTranscoder(source, target)
+    async for chunk in chunks:
+        out = transcoder.process(chunk)
+        if len(out):
+            yield out
+    tail = transcoder.flush()
+    if len(tail):
+        yield tail
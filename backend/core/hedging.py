@@ -0,0 +1,228 @@
+"""
+Hedged AI requests for DisciplineCall.ai
+Fires a backup provider when the primary runs past its latency percentile
+"""
+
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+import time
+
+from backend.core.ai_engine import BaseAIEngine, PersonalityMode
+from backend.core.instrumentation import REGISTRY
+from backend.core.latency import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+AI_HEDGE_PROVIDER_SECONDS = REGISTRY.histogram(
+    "ai_hedge_provider_seconds", "Latency of winning answers per hedged provider", ("provider", "kind")
+)
+AI_HEDGE_REQUESTS = REGISTRY.counter(
+    "ai_hedge_requests_total", "Hedged requests by how they ended", ("kind", "result")
+)
+
+# Engine that answered the request running in this context, for the `provider` label
+_ANSWERED_BY: ContextVar[Optional[str]] = ContextVar("hedged_answered_by", default=None)
+
+
+class HedgedAIEngine(BaseAIEngine):
+    """
+    Wraps several engines, primary first.
+
+    Each request goes to the primary. If it has not answered by the hedge
+    deadline, the next engine gets the same request; the first good answer
+    wins and the rest are cancelled. A failure hedges to the next engine at
+    once. The deadline is the `hedge_percentile` of the primary's recent
+    latency (its histogram), clamped to [min_delay_ms, max_delay_ms], and
+    `initial_delay_ms` until `min_samples` requests have been seen.
+
+    Completions are timed to the full answer, streams to the first token,
+    in separate histograms per engine. The ai_* request metrics carry the
+    name of the engine that answered as their `provider`; only cache hits
+    and requests every engine failed are labelled "hedged".
+    """
+
+    provider_name = "hedged"
+
+    def __init__(
+        self,
+        engines: Dict[str, BaseAIEngine],
+        hedge_percentile: float = 95.0,
+        min_samples: int = 20,
+        initial_delay_ms: float = 1000.0,
+        min_delay_ms: float = 100.0,
+        max_delay_ms: float = 5000.0,
+        **kwargs
+    ):
+        if not engines:
+            raise ValueError("HedgedAIEngine needs at least one engine")
+
+        super().__init__(**kwargs)
+        self.engines = dict(engines)
+        self.hedge_quantile = hedge_percentile / 100
+        self.min_samples = min_samples
+        self.initial_delay = initial_delay_ms / 1000
+        self.min_delay = min_delay_ms / 1000
+        self.max_delay = max_delay_ms / 1000
+        self.histograms: Dict[str, Dict[str, LatencyHistogram]] = {
+            kind: {name: LatencyHistogram() for name in self.engines} for kind in ("complete", "first_token")
+        }
+        self._metrics = {"requests": 0, "hedged": 0, "backup_wins": 0, "failures": 0}
+
+    def hedge_delay(self, kind: str, name: str) -> float:
+        """Seconds to wait on `name` before firing the next engine"""
+
+        histogram = self.histograms[kind][name]
+        if histogram.recent_samples < self.min_samples:
+            return self.initial_delay
+        return min(self.max_delay, max(self.min_delay, histogram.quantile(self.hedge_quantile)))
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            **self._metrics,
+            "latency": {
+                kind: {name: histogram.snapshot() for name, histogram in histograms.items()}
+                for kind, histograms in self.histograms.items()
+            }
+        }
+
+    def _provider_label(self) -> str:
+        return _ANSWERED_BY.get() or self.provider_name
+
+    def _cached_response(self, *args: Any) -> Optional[str]:
+        # Every request starts with the cache lookup: forget the previous winner in this task
+        _ANSWERED_BY.set(None)
+        return super()._cached_response(*args)
+
+    async def _generate(
+        self,
+        user_input: str,
+        context: Dict[str, Any],
+        call_type: str,
+        personality: PersonalityMode
+    ) -> str:
+        _, response = await self._hedge(
+            "complete", lambda engine: engine._generate(user_input, context, call_type, personality)
+        )
+        return response
+
+    async def _complete_messages(self, messages: List[Dict[str, str]]) -> str:
+        _, response = await self._hedge("complete", lambda engine: engine._complete_messages(messages))
+        return response
+
+    async def _stream_messages(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """Race engines to the first token, then stream the winner alone"""
+
+        streams: Dict[str, AsyncIterator[str]] = {}
+
+        def start(name: str) -> Awaitable[str]:
+            streams[name] = self.engines[name]._stream_messages(messages)
+            return streams[name].__anext__()
+
+        winner, first = await self._hedge("first_token", start, streams=streams)
+        if first is None:
+            return
+        yield first
+        async for token in streams[winner]:
+            yield token
+
+    async def _hedge(
+        self,
+        kind: str,
+        call: Callable[[Any], Awaitable[Any]],
+        streams: Optional[Dict[str, AsyncIterator[str]]] = None
+    ) -> Tuple[str, Any]:
+        """
+        Run `call` with hedging; returns (winning engine name, first good result).
+
+        Without `streams`, `call` gets an engine. With it, `call` gets an
+        engine name and starts that engine's stream in `streams`; the result
+        is its first token (None for an empty stream) and losing streams
+        are closed.
+        """
+
+        self._metrics["requests"] += 1
+        _ANSWERED_BY.set(None)
+        names = list(self.engines)
+        running: Dict[asyncio.Task, str] = {}
+        started: Dict[str, float] = {}
+        errors: List[str] = []
+
+        def launch() -> None:
+            name = names[len(started)]
+            started[name] = time.perf_counter()
+            target = name if streams is not None else self.engines[name]
+            running[asyncio.ensure_future(call(target))] = name
+
+        launch()
+        try:
+            while True:
+                last_started = names[len(started) - 1]
+                timeout = None
+                if len(started) < len(names):
+                    elapsed = time.perf_counter() - started[last_started]
+                    timeout = max(0.0, self.hedge_delay(kind, last_started) - elapsed)
+
+                done, _ = await asyncio.wait(set(running), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self._metrics["hedged"] += 1
+                    AI_HEDGE_REQUESTS.inc(kind, "hedged")
+                    logger.info(f"Hedging {kind} request: {last_started} past its deadline, firing {names[len(started)]}")
+                    launch()
+                    continue
+
+                for task in done:
+                    name = running.pop(task)
+                    error = task.exception()
+                    if error is None or (streams is not None and isinstance(error, StopAsyncIteration)):
+                        elapsed = time.perf_counter() - started[name]
+                        self.histograms[kind][name].observe(elapsed)
+                        AI_HEDGE_PROVIDER_SECONDS.observe(elapsed, name, kind)
+                        if name != names[0]:
+                            self._metrics["backup_wins"] += 1
+                            AI_HEDGE_REQUESTS.inc(kind, "backup_won")
+                        _ANSWERED_BY.set(self.engines[name].provider_name)
+                        return name, None if error else task.result()
+
+                    errors.append(f"{name}: {error}")
+                    logger.warning(f"AI provider {name} failed a {kind} request: {error}")
+                    if len(started) < len(names):
+                        launch()
+
+                if not running:
+                    self._metrics["failures"] += 1
+                    AI_HEDGE_REQUESTS.inc(kind, "failed")
+                    raise RuntimeError(f"All AI providers failed: {'; '.join(errors)}")
+        finally:
+            await self._cancel(running, started, kind, streams)
+
+    async def _cancel(
+        self,
+        running: Dict[asyncio.Task, str],
+        started: Dict[str, float],
+        kind: str,
+        streams: Optional[Dict[str, AsyncIterator[str]]]
+    ) -> None:
+        losers: Set[asyncio.Task] = set(running)
+        for task in losers:
+            task.cancel()
+            # A loser's elapsed time is a lower bound on its latency; dropping it
+            # would leave only the fast answers in the histogram and pull the deadline down
+            name = running[task]
+            self.histograms[kind][name].observe(time.perf_counter() - started[name])
+        await asyncio.gather(*losers, return_exceptions=True)
+
+        if streams is not None:
+            for task in losers:
+                stream = streams.pop(running[task], None)
+                if stream is not None:
+                    await stream.aclose()
+
+    async def warm_up(self) -> None:
+        await asyncio.gather(*(engine.warm_up() for engine in self.engines.values()))
+
+    async def _analyze_metrics(self, metrics: Dict[str, Any]) -> Dict[str, Any]:
+        primary = next(iter(self.engines))
+        _ANSWERED_BY.set(self.engines[primary].provider_name)
+        return await self.engines[primary]._analyze_metrics(metrics)
@@ -0,0 +1,104 @@
+"""
+Latency statistics helpers for DisciplineCall.ai
+Shared percentile math and histograms for reports, benchmarks and hedging
+"""
+
+from typing import Any, Dict, List, Sequence, Tuple
+import bisect
+import math
+
+
+def exponential_buckets(start: float, factor: float, count: int) -> Tuple[float, ...]:
+    """Bucket upper bounds start, start*factor, ... (seconds)"""
+    return tuple(round(start * factor ** i, 6) for i in range(count))
+
+
+# 5ms .. ~60s in 25% steps: fine enough to place a p95 within a quarter of its value
+DEFAULT_LATENCY_BUCKETS = exponential_buckets(0.005, 1.25, 43)
+
+
+def _nearest_rank(ordered: Sequence[float], q: float) -> float:
+    rank = max(1, math.ceil(q / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile, `q` in [0, 100]"""
+
+    if not samples:
+        return 0.0
+    return _nearest_rank(sorted(samples), q)
+
+
+def summarize_latencies(samples: Sequence[float]) -> Dict[str, float]:
+    """p50/p95/p99/max/mean of latencies given in seconds, reported in ms"""
+
+    if not samples:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0, "mean_ms": 0.0}
+
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(_nearest_rank(ordered, 50) * 1000, 3),
+        "p95_ms": round(_nearest_rank(ordered, 95) * 1000, 3),
+        "p99_ms": round(_nearest_rank(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3)
+    }
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram.
+
+    `counts`, `sum` and `count` only grow, so they can be exported as
+    cumulative counters. Quantiles come from a second set of counts that is
+    halved every `decay_every` observations, so they follow the recent
+    latency of a provider instead of its lifetime average.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS, decay_every: int = 200):
+        self.buckets = tuple(buckets)
+        self.decay_every = decay_every
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._recent: List[float] = [0.0] * (len(self.buckets) + 1)
+        self._recent_total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        index = bisect.bisect_left(self.buckets, seconds)
+        self.counts[index] += 1
+        self.sum += seconds
+        self.count += 1
+
+        self._recent[index] += 1
+        self._recent_total += 1
+        if self.count % self.decay_every == 0:
+            self._recent = [c / 2 for c in self._recent]
+            self._recent_total /= 2
+
+    @property
+    def recent_samples(self) -> float:
+        return self._recent_total
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding recent quantile `q` (in [0, 1]); inf past the last bucket"""
+
+        if self._recent_total <= 0:
+            return 0.0
+        target = q * self._recent_total
+        running = 0.0
+        for index, bucket_count in enumerate(self._recent):
+            running += bucket_count
+            if running >= target:
+                return self.buckets[index] if index < len(self.buckets) else math.inf
+        return math.inf
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.sum / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.quantile(0.5) * 1000, 3),
+            "p95_ms": round(self.quantile(0.95) * 1000, 3),
+            "p99_ms": round(self.quantile(0.99) * 1000, 3)
+        }
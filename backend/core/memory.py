@@ -0,0 +1,194 @@
+"""
+Conversation memory for DisciplineCall.ai
+Token-budgeted recent turns per call plus a rolling per-user summary
+"""
+
+from typing import Awaitable, Callable, Dict, Any, Optional, List, Tuple
+from collections import OrderedDict
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Summarizer signature: (previous summary, turns to fold in, max words) -> new summary
+Summarizer = Callable[[str, List[List[str]], int], Awaitable[str]]
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap per-turn token estimate (~4 bytes per token); exact counts are for reports"""
+    return max(1, len(text.encode()) // 4)
+
+
+async def extractive_summary(previous_summary: str, turns: List[List[str]], max_words: int) -> str:
+    """Model-free fallback: keep the user's most recent statements within the word budget"""
+
+    statements = [text.strip() for role, text in turns if role == "u" and text.strip()]
+    words = " ".join(filter(None, [previous_summary] + [f"User said: {s}" for s in statements])).split()
+    return " ".join(words[-max_words:])
+
+
+class ConversationMemory:
+    """
+    Bounded conversation memory.
+
+    A call's turns live in its session state as compact [role, text] pairs
+    ("a" = AI, "u" = user). `append` keeps at most `window_turns` of them and
+    at most `token_budget` tokens; turns pushed out of the window are folded
+    into a per-user summary by a background task, one at a time per user.
+    Summaries are held in an LRU of `max_users`, so a long-running user costs
+    one short string, not an ever-growing history.
+
+    With a `store` (the schedule store's get_summary/save_summary) every new
+    summary is written through and the LRU only caches it for
+    `cache_seconds`, so summaries survive restarts and a call handled by
+    another worker sees the latest one.
+    """
+
+    def __init__(
+        self,
+        summarizer: Optional[Summarizer] = None,
+        token_budget: int = 800,
+        window_turns: int = 12,
+        summary_words: int = 80,
+        max_users: int = 50000,
+        store=None,
+        cache_seconds: float = 60.0
+    ):
+        self.summarizer = summarizer or extractive_summary
+        self.token_budget = token_budget
+        self.window_turns = window_turns
+        self.summary_words = summary_words
+        self.max_users = max_users
+        self.store = store
+        self.cache_seconds = cache_seconds
+        self._summaries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._pending: Dict[str, List[List[str]]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def from_settings(cls, settings, summarizer: Optional[Summarizer] = None, store=None) -> "ConversationMemory":
+        """Build memory from application settings"""
+
+        return cls(
+            summarizer=summarizer,
+            token_budget=settings.memory_token_budget,
+            window_turns=settings.memory_window_turns,
+            summary_words=settings.memory_summary_words,
+            max_users=settings.memory_max_users,
+            store=store,
+            cache_seconds=settings.memory_cache_seconds
+        )
+
+    async def summary(self, user_id: str) -> str:
+        entry = self._summaries.get(user_id)
+        if entry is not None and (self.store is None or time.monotonic() - entry[1] < self.cache_seconds):
+            self._summaries.move_to_end(user_id)
+            return entry[0]
+        if self.store is None:
+            return ""
+
+        try:
+            summary = await self.store.get_summary(user_id) or ""
+        except Exception as e:
+            logger.warning(f"Loading memory for user {user_id} failed: {e}")
+            return entry[0] if entry is not None else ""
+        self._cache(user_id, summary)
+        return summary
+
+    async def prompt_context(self, session: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Engine context for the next turn: user summary plus the budgeted window.
+
+        The summary is the one snapshotted into the session when the call
+        started, so a turn never reads the store. Once the call has spilled
+        turns, the summary this worker folded them into is used instead.
+        """
+
+        summary = session.get("summary", "")
+        if session.get("spilled"):
+            entry = self._summaries.get(session["user_id"])
+            if entry is not None:
+                summary = entry[0]
+        return {
+            "user_id": session["user_id"],
+            "summary": summary,
+            "turns": session["turns"]
+        }
+
+    def append(self, session: Dict[str, Any], role: str, text: str) -> None:
+        """Add a turn to a session and spill what no longer fits"""
+
+        turns = session["turns"]
+        turns.append([role, text])
+
+        spilled = 0
+        tokens = sum(estimate_tokens(turn_text) for _, turn_text in turns)
+        # The newest turn always stays, even if it alone exceeds the budget
+        while len(turns) - spilled > 1 and (
+            len(turns) - spilled > self.window_turns or tokens > self.token_budget
+        ):
+            tokens -= estimate_tokens(turns[spilled][1])
+            spilled += 1
+
+        if spilled:
+            self._fold(session["user_id"], turns[:spilled])
+            del turns[:spilled]
+            session["spilled"] = True
+
+    def end_session(self, session: Dict[str, Any]) -> None:
+        """Fold a finished call's remaining turns into the user's summary"""
+
+        if session["turns"]:
+            self._fold(session["user_id"], session["turns"])
+            session["turns"] = []
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "users": len(self._summaries),
+            "summary_tokens": sum(estimate_tokens(summary) for summary, _ in self._summaries.values()),
+            "summarizing": len(self._tasks),
+            "pending_turns": sum(len(turns) for turns in self._pending.values())
+        }
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """Let pending summaries finish and be saved, cancelling any still running after `timeout` seconds"""
+
+        tasks = list(self._tasks.values())
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _fold(self, user_id: str, turns: List[List[str]]) -> None:
+        self._pending.setdefault(user_id, []).extend(list(turn) for turn in turns)
+        if user_id not in self._tasks:
+            self._tasks[user_id] = asyncio.create_task(self._summarize(user_id))
+
+    async def _summarize(self, user_id: str) -> None:
+        try:
+            while self._pending.get(user_id):
+                turns = self._pending.pop(user_id)
+                previous = await self.summary(user_id)
+                try:
+                    summary = await self.summarizer(previous, turns, self.summary_words)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Summarizing memory for user {user_id} failed, using extractive fallback: {e}")
+                    summary = await extractive_summary(previous, turns, self.summary_words)
+                self._cache(user_id, summary)
+                if self.store is not None:
+                    try:
+                        await self.store.save_summary(user_id, summary)
+                    except Exception as e:
+                        logger.warning(f"Saving memory for user {user_id} failed: {e}")
+        finally:
+            self._tasks.pop(user_id, None)
+
+    def _cache(self, user_id: str, summary: str) -> None:
+        self._summaries[user_id] = (summary, time.monotonic())
+        self._summaries.move_to_end(user_id)
+        while len(self._summaries) > self.max_users:
+            self._summaries.popitem(last=False)
@@ -0,0 +1,180 @@
+"""
+Vectorized metrics analysis for DisciplineCall.ai
+Trends, streaks and correlations for every user in a few pandas passes
+"""
+
+from typing import Dict, Any, List, Optional
+from datetime import date
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+WINDOW_DAYS = 7
+TREND_DAYS = 28
+MIN_CORRELATION_DAYS = 7
+NOTABLE_CHANGE = 0.15  # relative week-over-week change worth narrating
+NOTABLE_CORRELATION = 0.5
+NOTABLE_STREAK = 3
+
+
+def metrics_frame(columns: Dict[str, Any]) -> pd.DataFrame:
+    """Frame with user_id, date, metric_type, value from column arrays, one row per user/metric/day"""
+
+    frame = pd.DataFrame({
+        "user_id": pd.Series(columns["user_id"], dtype="string"),
+        "date": pd.to_datetime(pd.Series(columns["date"])).dt.normalize(),
+        "metric_type": pd.Series(columns["metric_type"], dtype="string"),
+        "value": pd.to_numeric(pd.Series(columns["value"]), errors="coerce")
+    }).dropna(subset=["value"])
+    return frame.groupby(["user_id", "metric_type", "date"], as_index=False)["value"].mean()
+
+
+def metric_stats(frame: pd.DataFrame, today: date) -> pd.DataFrame:
+    """
+    Per (user, metric): this week's and last week's mean, their relative
+    change, the least-squares slope over TREND_DAYS, and the current streak
+    of days with a positive value.
+    """
+
+    days_ago = (pd.Timestamp(today) - frame["date"]).dt.days.to_numpy()
+    keys = [frame["user_id"], frame["metric_type"]]
+    values = frame["value"].to_numpy(dtype=float)
+
+    recent = days_ago < WINDOW_DAYS
+    previous = (days_ago >= WINDOW_DAYS) & (days_ago < 2 * WINDOW_DAYS)
+    stats = pd.DataFrame({
+        "recent_mean": pd.Series(np.where(recent, values, np.nan), index=frame.index).groupby(keys).mean(),
+        "previous_mean": pd.Series(np.where(previous, values, np.nan), index=frame.index).groupby(keys).mean()
+    })
+    stats["change_pct"] = (stats["recent_mean"] - stats["previous_mean"]) / stats["previous_mean"].abs()
+    stats.loc[~np.isfinite(stats["change_pct"]), "change_pct"] = np.nan
+
+    # Slope from grouped sums: (n*Sxy - Sx*Sy) / (n*Sxx - Sx^2), x in days relative to today
+    in_trend = days_ago < TREND_DAYS
+    x = np.where(in_trend, -days_ago, 0).astype(float)
+    y = np.where(in_trend, values, 0.0)
+    sums = pd.DataFrame(
+        {"n": in_trend.astype(float), "x": x, "y": y, "xy": x * y, "xx": x * x},
+        index=frame.index
+    ).groupby(keys).sum()
+    denominator = sums["n"] * sums["xx"] - sums["x"] ** 2
+    stats["trend_per_day"] = ((sums["n"] * sums["xy"] - sums["x"] * sums["y"]) / denominator).where(
+        (denominator > 0) & (sums["n"] >= 3)
+    )
+
+    stats["streak_days"] = _streaks(frame, days_ago).reindex(stats.index).fillna(0).astype(int)
+    stats.index.names = ["user_id", "metric_type"]
+    return stats.reset_index()
+
+
+def _streaks(frame: pd.DataFrame, days_ago: np.ndarray) -> pd.Series:
+    """Consecutive positive days ending today (or yesterday), per (user, metric)"""
+
+    positive = frame.loc[frame["value"].to_numpy() > 0, ["user_id", "metric_type"]].copy()
+    positive["days_ago"] = days_ago[frame["value"].to_numpy() > 0]
+    positive = positive[positive["days_ago"] >= 0].sort_values(["user_id", "metric_type", "days_ago"])
+
+    grouped = positive.groupby(["user_id", "metric_type"])
+    rank = grouped.cumcount()
+    start = grouped["days_ago"].transform("min")
+    # Days are unique and sorted, so a run from `start` is exactly the rows with days_ago - rank == start
+    in_run = (positive["days_ago"] - rank == start) & (start <= 1)
+    return in_run.groupby([positive["user_id"], positive["metric_type"]]).sum()
+
+
+def metric_correlations(frame: pd.DataFrame, today: date) -> pd.DataFrame:
+    """Pearson r for every metric pair per user over TREND_DAYS, from grouped centered sums"""
+
+    recent = frame[(pd.Timestamp(today) - frame["date"]).dt.days < TREND_DAYS]
+    wide = recent.pivot_table(index=["user_id", "date"], columns="metric_type", values="value")
+    metric_types = list(wide.columns)
+
+    results = []
+    for i, first in enumerate(metric_types):
+        for second in metric_types[i + 1:]:
+            pair = wide[[first, second]].dropna()
+            if pair.empty:
+                continue
+            pair_users = pair.index.get_level_values("user_id")
+            centered = pair - pair.groupby(pair_users).transform("mean")
+            sums = pd.DataFrame({
+                "n": 1,
+                "xy": centered[first] * centered[second],
+                "xx": centered[first] ** 2,
+                "yy": centered[second] ** 2
+            }).groupby(pair_users).sum()
+            r = sums["xy"] / np.sqrt(sums["xx"] * sums["yy"])
+            valid = (sums["n"] >= MIN_CORRELATION_DAYS) & np.isfinite(r)
+            results.append(pd.DataFrame({
+                "user_id": sums.index[valid],
+                "first": first,
+                "second": second,
+                "r": r[valid].to_numpy(),
+                "days": sums["n"][valid].to_numpy()
+            }))
+
+    if not results:
+        return pd.DataFrame(columns=["user_id", "first", "second", "r", "days"])
+    return pd.concat(results, ignore_index=True)
+
+
+def build_insights(columns: Dict[str, Any], today: date) -> List[Dict[str, Any]]:
+    """
+    Structured insights for every user in `columns`.
+
+    Each entry carries per-metric stats, the user's correlations sorted by
+    strength, and `highlights`: the facts worth a narrative. Users without
+    highlights need no LLM call.
+    """
+
+    frame = metrics_frame(columns)
+    if frame.empty:
+        return []
+
+    stats = metric_stats(frame, today)
+    correlations = metric_correlations(frame, today)
+    correlations = correlations.reindex(correlations["r"].abs().sort_values(ascending=False).index)
+
+    by_user: Dict[str, Dict[str, Any]] = {}
+    for row in stats.itertuples(index=False):
+        entry = by_user.setdefault(row.user_id, {"user_id": row.user_id, "metrics": {}, "correlations": [], "highlights": []})
+        entry["metrics"][row.metric_type] = {
+            "recent_mean": _clean(row.recent_mean),
+            "previous_mean": _clean(row.previous_mean),
+            "change_pct": _clean(row.change_pct),
+            "trend_per_day": _clean(row.trend_per_day),
+            "streak_days": int(row.streak_days)
+        }
+        if row.change_pct == row.change_pct and abs(row.change_pct) >= NOTABLE_CHANGE:
+            direction = "up" if row.change_pct > 0 else "down"
+            entry["highlights"].append(f"{row.metric_type} {direction} {abs(row.change_pct):.0%} week over week")
+        if row.streak_days >= NOTABLE_STREAK:
+            entry["highlights"].append(f"{row.streak_days}-day {row.metric_type} streak")
+
+    for row in correlations.itertuples(index=False):
+        entry = by_user.get(row.user_id)
+        if entry is None:
+            continue
+        entry["correlations"].append({
+            "metrics": [row.first, row.second], "r": round(float(row.r), 3), "days": int(row.days)
+        })
+        if abs(row.r) >= NOTABLE_CORRELATION and len(entry["correlations"]) == 1:
+            relation = "rises with" if row.r > 0 else "moves against"
+            entry["highlights"].append(f"{row.first} {relation} {row.second} (r={row.r:.2f})")
+
+    return list(by_user.values())
+
+
+def plain_narrative(insight: Dict[str, Any]) -> str:
+    """Model-free narrative for users with nothing notable (or when the model fails)"""
+
+    if insight["highlights"]:
+        return "This week: " + "; ".join(insight["highlights"]) + "."
+    return "A steady week. Keep showing up."
+
+
+def _clean(value: float) -> Optional[float]:
+    return round(float(value), 3) if value == value else None
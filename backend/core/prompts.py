@@ -0,0 +1,121 @@
+"""
+Prompt compilation for DisciplineCall.ai
+Builds each (personality, call type) system prefix once, byte-stable across turns
+so provider-side and local KV prefix caches can reuse it
+"""
+
+from typing import Dict, Any, Optional, List, Tuple
+import hashlib
+import logging
+import textwrap
+
+logger = logging.getLogger(__name__)
+
+GENERIC_CALL_TEMPLATE = {"topics": ["progress", "next step"], "tone": "focused"}
+
+
+def count_tokens(text: str, encoding: str = "cl100k_base") -> Tuple[int, str]:
+    """Token count of `text` and the tokenizer used (tiktoken when installed, else an estimate)"""
+
+    try:
+        import tiktoken
+    except ImportError:
+        # ~4 bytes per token for English BPE vocabularies
+        return max(1, round(len(text.encode()) / 4)), "estimate"
+    return len(tiktoken.get_encoding(encoding).encode(text)), f"tiktoken:{encoding}"
+
+
+class CompiledPrompt:
+    """An immutable system prefix with its size and digest"""
+
+    __slots__ = ("text", "tokens", "tokenizer", "digest")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens, self.tokenizer = count_tokens(text)
+        self.digest = hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+class PromptCompiler:
+    """
+    Precompiled system prefixes keyed by (personality, call type).
+
+    Everything in a prefix is static configuration, rendered with a fixed
+    key order, so the same pair always yields the same bytes. Per-call
+    context belongs after the prefix, never inside it.
+    """
+
+    def __init__(
+        self,
+        personality_prompts: Dict[Any, str],
+        personality_configs: Optional[Dict[str, Dict[str, Any]]] = None,
+        call_templates: Optional[Dict[str, Dict[str, Any]]] = None,
+        extra_call_types: Tuple[str, ...] = ("urgent", "followup")
+    ):
+        self.personality_prompts = {
+            getattr(personality, "value", personality): prompt
+            for personality, prompt in personality_prompts.items()
+        }
+        self.personality_configs = personality_configs or {}
+        self.call_templates = call_templates or {}
+        self._compiled: Dict[Tuple[str, str], CompiledPrompt] = {}
+
+        for personality in self.personality_prompts:
+            for call_type in list(self.call_templates) + list(extra_call_types):
+                self._compile(personality, call_type)
+
+    @classmethod
+    def from_config(cls, personality_prompts: Dict[Any, str]) -> "PromptCompiler":
+        """Compile with the voice and call-timing tables from config.settings"""
+
+        from config.settings import PERSONALITY_CONFIGS, CALL_TEMPLATES
+
+        return cls(personality_prompts, PERSONALITY_CONFIGS, CALL_TEMPLATES)
+
+    def system_prefix(self, personality: Any, call_type: str) -> str:
+        key = (getattr(personality, "value", personality), call_type)
+        compiled = self._compiled.get(key) or self._compile(*key)
+        return compiled.text
+
+    def prefix_tokens(self, personality: Any, call_type: str) -> int:
+        """Token count of a prefix, counted once at compile time"""
+
+        key = (getattr(personality, "value", personality), call_type)
+        compiled = self._compiled.get(key) or self._compile(*key)
+        return compiled.tokens
+
+    def token_report(self) -> List[Dict[str, Any]]:
+        """Per-template prompt size, for budgeting and cache-hit checks"""
+
+        return [
+            {
+                "personality": personality,
+                "call_type": call_type,
+                "tokens": compiled.tokens,
+                "bytes": len(compiled.text.encode()),
+                "tokenizer": compiled.tokenizer,
+                "digest": compiled.digest
+            }
+            for (personality, call_type), compiled in sorted(self._compiled.items())
+        ]
+
+    def _compile(self, personality: str, call_type: str) -> CompiledPrompt:
+        persona = " ".join(
+            line.strip() for line in textwrap.dedent(self.personality_prompts[personality]).splitlines()
+            if line.strip()
+        )
+        template = self.call_templates.get(call_type, GENERIC_CALL_TEMPLATE)
+        voice = self.personality_configs.get(personality, {})
+
+        lines = [persona, "", f"Call: {call_type} check-in"]
+        if template.get("duration"):
+            lines[-1] += f", about {template['duration']} seconds"
+        lines.append(f"Tone: {template.get('tone', 'focused')}")
+        lines.append(f"Cover: {', '.join(template.get('topics', []))}")
+        if voice.get("keywords"):
+            lines.append(f"Signature words: {', '.join(voice['keywords'])}")
+        lines.append("Replies are spoken aloud: keep them to two or three short sentences.")
+
+        compiled = CompiledPrompt("\n".join(lines))
+        self._compiled[(personality, call_type)] = compiled
+        return compiled
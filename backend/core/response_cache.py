@@ -0,0 +1,212 @@
+"""
+Response cache for DisciplineCall.ai
+Reuses AI replies to short, repetitive user inputs ("done", "skipped gym")
+by exact match or embedding nearest neighbour
+"""
+
+from typing import Dict, Any, Optional, Set, Tuple
+from collections import OrderedDict
+import hashlib
+import logging
+import re
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r"[^\w\s']+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_input(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", text.lower())).strip()
+
+
+class HashingEmbedder:
+    """
+    Dependency-free embedder: character n-grams hashed into a fixed vector.
+
+    Good enough to match typos and small additions to short replies
+    ("skipped the gym" / "skiped the gym lol") without a model download.
+    """
+
+    def __init__(self, dim: int = 512, ngram: int = 3):
+        self.dim = dim
+        self.ngram = ngram
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        padded = f" {text} "
+        for i in range(max(1, len(padded) - self.ngram + 1)):
+            digest = hashlib.blake2b(padded[i:i + self.ngram].encode(), digest_size=4).digest()
+            vector[int.from_bytes(digest, "big") % self.dim] += 1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class SentenceTransformerEmbedder:
+    """Semantic embedder backed by a local sentence-transformers model"""
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.model.encode(text, normalize_embeddings=True).astype(np.float32)
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache of AI replies keyed by (personality, call_type, normalized input).
+
+    Replies are shared by every user, so the key carries no conversation
+    state and engines generate cacheable replies without the user's
+    summary or turns (see BaseAIEngine.generate_response).
+    Misses on the exact key fall back to a nearest-neighbour search over the
+    embeddings of cached inputs with the same personality and call type; a
+    neighbour at or above `similarity_threshold` (cosine) is a hit.
+    Embeddings live in one preallocated matrix and each group tracks its
+    rows, so a lookup scores only that group's rows. Only inputs up to
+    `max_input_words` words are cached, since
+    longer replies are personal and rarely repeat. `max_entries=0` disables
+    the cache.
+    """
+
+    def __init__(
+        self,
+        embedder=None,
+        max_entries: int = 5000,
+        ttl_seconds: int = 86400,
+        similarity_threshold: float = 0.85,
+        max_input_words: int = 8
+    ):
+        if max_entries < 0:
+            raise ValueError("max_entries must not be negative")
+
+        self.embedder = embedder or HashingEmbedder()
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.max_input_words = max_input_words
+
+        # key -> (response, expires_at, row)
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[str, float, int]]" = OrderedDict()
+        self._matrix = np.zeros((max_entries, self.embedder.dim), dtype=np.float32)
+        self._row_keys: Dict[int, Tuple[str, str, str]] = {}
+        self._free_rows = list(range(max_entries - 1, -1, -1))
+        # (personality, call_type) -> matrix rows of its entries
+        self._group_rows: Dict[Tuple[str, str], Set[int]] = {}
+        self._metrics = {
+            "exact_hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "skipped": 0,
+            "evictions": 0,
+            "expirations": 0
+        }
+
+    @classmethod
+    def from_settings(cls, settings) -> "ResponseCache":
+        """Build a cache from application settings"""
+
+        embedder = None
+        if settings.response_cache_embedder == "sentence-transformers":
+            embedder = SentenceTransformerEmbedder()
+        return cls(
+            embedder=embedder,
+            max_entries=settings.response_cache_max_entries,
+            ttl_seconds=settings.response_cache_ttl_seconds,
+            similarity_threshold=settings.response_cache_similarity
+        )
+
+    def cacheable(self, user_input: str) -> bool:
+        if self.max_entries < 1:
+            return False
+        normalized = normalize_input(user_input)
+        return bool(normalized) and len(normalized.split()) <= self.max_input_words
+
+    def get(self, personality: str, call_type: str, user_input: str) -> Optional[str]:
+        """Cached reply for this input, or None"""
+
+        if not self.cacheable(user_input):
+            self._metrics["skipped"] += 1
+            return None
+
+        key = (personality, call_type, normalize_input(user_input))
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._metrics["exact_hits"] += 1
+                return entry[0]
+            self._drop(key)
+            self._metrics["expirations"] += 1
+
+        neighbour = self._nearest(key)
+        if neighbour is not None:
+            self._entries.move_to_end(neighbour)
+            self._metrics["semantic_hits"] += 1
+            return self._entries[neighbour][0]
+
+        self._metrics["misses"] += 1
+        return None
+
+    def put(self, personality: str, call_type: str, user_input: str, response: str) -> None:
+        if not self.cacheable(user_input) or not response:
+            return
+
+        key = (personality, call_type, normalize_input(user_input))
+        self._drop(key)
+        while len(self._entries) >= self.max_entries:
+            evicted = next(iter(self._entries))
+            self._drop(evicted)
+            self._metrics["evictions"] += 1
+
+        row = self._free_rows.pop()
+        self._matrix[row] = self.embedder.embed(key[2])
+        self._group_rows.setdefault(key[:2], set()).add(row)
+        self._row_keys[row] = key
+        self._entries[key] = (response, time.monotonic() + self.ttl_seconds, row)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Hit counters, hit rate over cacheable lookups, and size"""
+
+        hits = self._metrics["exact_hits"] + self._metrics["semantic_hits"]
+        lookups = hits + self._metrics["misses"]
+        return {
+            **self._metrics,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries)
+        }
+
+    def _nearest(self, key: Tuple[str, str, str]) -> Optional[Tuple[str, str, str]]:
+        group_rows = self._group_rows.get(key[:2])
+        if not group_rows:
+            return None
+
+        rows = np.fromiter(group_rows, dtype=np.int64, count=len(group_rows))
+        scores = self._matrix[rows] @ self.embedder.embed(key[2])
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+        row = int(rows[best])
+
+        neighbour = self._row_keys[row]
+        if self._entries[neighbour][1] <= time.monotonic():
+            self._drop(neighbour)
+            self._metrics["expirations"] += 1
+            return None
+        return neighbour
+
+    def _drop(self, key: Tuple[str, str, str]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        row = entry[2]
+        self._group_rows[key[:2]].discard(row)
+        del self._row_keys[row]
+        self._free_rows.append(row)
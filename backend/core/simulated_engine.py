@@ -0,0 +1,122 @@
+"""
+Simulated AI engine for DisciplineCall.ai
+Deterministic offline replies with configurable latency, streaming speed and errors
+"""
+
+from typing import Any, AsyncIterator, Callable, Dict, List
+import asyncio
+import hashlib
+import json
+import logging
+import random
+
+from backend.core.ai_engine import AIProvider, BaseAIEngine
+
+logger = logging.getLogger(__name__)
+
+
+REPLY_SENTENCES = (
+    "Good morning, let's make today count.",
+    "You said you would do it, so let's hear how it went.",
+    "Small steps every day add up faster than you think.",
+    "No excuses today, just the next right action.",
+    "I'm proud of the work you've put in this week.",
+    "What is the one thing you will finish before lunch?",
+    "Skipping once is a slip; skipping twice is a pattern.",
+    "Drink some water and get moving.",
+    "Tell me exactly what got in the way.",
+    "Tomorrow starts with what you do tonight.",
+    "That's a win, write it down.",
+    "Let's set a time for it right now."
+)
+
+
+class SimulatedAIError(RuntimeError):
+    """Injected provider failure"""
+
+
+class SimulatedAIEngine(BaseAIEngine):
+    """
+    Offline stand-in for a model provider, for load tests and benchmarks.
+
+    The reply is a pure function of the prompt: the same messages always
+    produce the same two or three sentences. Time to first token is drawn
+    from `latency_distribution` around `latency_ms`, tokens then arrive at
+    `tokens_per_second`, and `error_rate` of requests fail after their
+    latency, as a provider timeout would. Latency and error draws come from
+    a generator seeded with `seed`, so a run is reproducible.
+    """
+
+    provider_name = AIProvider.SIMULATED.value
+
+    def __init__(
+        self,
+        model: str = "simulated",
+        latency_ms: float = 300.0,
+        latency_jitter: float = 0.5,
+        latency_distribution: str = "lognormal",
+        tokens_per_second: float = 50.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        **kwargs
+    ):
+        """
+        Args:
+            model: Name reported in logs; it also salts the replies
+            latency_ms: Median time to first token ("fixed", "lognormal"),
+                mean for "exponential", centre for "uniform"
+            latency_jitter: Lognormal sigma, or the +/- fraction for "uniform"
+            latency_distribution: fixed, uniform, lognormal or exponential
+            tokens_per_second: Streaming speed after the first token; 0 sends
+                the reply at once
+            error_rate: Share of requests that fail with SimulatedAIError
+            seed: Seed for latency and error draws
+        """
+        super().__init__(**kwargs)
+        samplers: Dict[str, Callable[[], float]] = {
+            "fixed": lambda: latency_ms,
+            "uniform": lambda: latency_ms * self._rng.uniform(1 - latency_jitter, 1 + latency_jitter),
+            "lognormal": lambda: self._rng.lognormvariate(0.0, latency_jitter) * latency_ms,
+            "exponential": lambda: self._rng.expovariate(1 / latency_ms) if latency_ms > 0 else 0.0
+        }
+        if latency_distribution not in samplers:
+            raise ValueError(f"Unsupported latency distribution: {latency_distribution}")
+
+        self.model = model
+        self.latency_ms = latency_ms
+        self.latency_distribution = latency_distribution
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self._sample_latency = samplers[latency_distribution]
+        self._rng = random.Random(seed)
+
+    def reply_for(self, messages: List[Dict[str, str]]) -> str:
+        """The deterministic reply to a conversation"""
+
+        digest = hashlib.blake2b(
+            json.dumps([self.model, messages], sort_keys=True).encode(), digest_size=8
+        ).digest()
+        count = 2 + digest[0] % 2
+        return " ".join(REPLY_SENTENCES[b % len(REPLY_SENTENCES)] for b in digest[1:1 + count])
+
+    async def _stream_messages(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """Stream the deterministic reply at the configured pace"""
+
+        first_token = max(0.0, self._sample_latency()) / 1000
+        failed = self._rng.random() < self.error_rate
+        await asyncio.sleep(first_token)
+        if failed:
+            raise SimulatedAIError(f"Simulated {self.model} failure after {first_token * 1000:.0f}ms")
+
+        words = self.reply_for(messages).split(" ")
+        interval = 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+        for i, word in enumerate(words):
+            if i and interval:
+                await asyncio.sleep(interval)
+            yield word if i == len(words) - 1 else word + " "
+
+    async def _analyze_metrics(self, metrics: Dict[str, Any]) -> Dict[str, Any]:
+        """Deterministic analysis of a metrics dict"""
+
+        reply = self.reply_for([{"role": "user", "content": json.dumps(metrics, sort_keys=True, default=str)}])
+        return {"insights": reply, "recommendations": []}
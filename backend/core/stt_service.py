@@ -0,0 +1,227 @@
+"""
+Speech-to-text service for DisciplineCall.ai
+One preloaded STT model per process, shared by every voice engine
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import io
+import logging
+import time
+
+from backend.core.instrumentation import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+STT_QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "stt_queue_wait_seconds", "Time a transcription waited for a free STT worker", ("backend",)
+)
+STT_INFERENCE_SECONDS = REGISTRY.histogram(
+    "stt_inference_seconds", "Time spent transcribing once a worker picked the request up", ("backend",)
+)
+STT_REQUESTS = REGISTRY.counter("stt_requests_total", "Transcriptions by outcome", ("backend", "outcome"))
+
+
+class STTOverloadedError(RuntimeError):
+    """The transcription queue is full"""
+
+
+class BaseSTTBackend(ABC):
+    """A speech-to-text model or API, loaded once"""
+
+    name = "unknown"
+
+    async def load(self) -> None:
+        """Load weights or open clients before the first request"""
+        pass
+
+    @abstractmethod
+    async def transcribe(self, audio_data: bytes, language: str = "en") -> str:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class WhisperAPIBackend(BaseSTTBackend):
+    """OpenAI Whisper API"""
+
+    name = "whisper-api"
+
+    def __init__(self, api_key: Optional[str] = None, model: str = "whisper-1"):
+        self.api_key = api_key
+        self.model = model
+        self._client = None
+
+    async def load(self) -> None:
+        from openai import AsyncOpenAI
+        self._client = AsyncOpenAI(api_key=self.api_key)
+
+    async def transcribe(self, audio_data: bytes, language: str = "en") -> str:
+        result = await self._client.audio.transcriptions.create(
+            model=self.model, file=("audio.wav", audio_data), language=language
+        )
+        return result.text
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+class LocalWhisperBackend(BaseSTTBackend):
+    """
+    openai-whisper running in this process.
+
+    Audio is 16 kHz mono 16-bit PCM (WAV headers are skipped). Inference
+    runs in a worker thread so the event loop keeps serving other calls.
+    """
+
+    name = "whisper-local"
+
+    def __init__(self, model_size: str = "base", device: Optional[str] = None):
+        self.model_size = model_size
+        self.device = device
+        self._model = None
+
+    async def load(self) -> None:
+        import whisper
+
+        started = time.perf_counter()
+        self._model = await asyncio.to_thread(whisper.load_model, self.model_size, self.device)
+        logger.info(f"Loaded Whisper {self.model_size} in {time.perf_counter() - started:.1f}s")
+
+    async def transcribe(self, audio_data: bytes, language: str = "en") -> str:
+        return await asyncio.to_thread(self._transcribe, audio_data, language)
+
+    def _transcribe(self, audio_data: bytes, language: str) -> str:
+        samples = pcm16_to_float32(audio_data)
+        result = self._model.transcribe(samples, language=language, fp16=False)
+        return result["text"].strip()
+
+
+def pcm16_to_float32(audio_data: bytes):
+    """16-bit PCM (raw or WAV) as float32 samples in [-1, 1]"""
+
+    import numpy as np
+
+    view = memoryview(audio_data)
+    if bytes(view[:4]) == b"RIFF":
+        import wave
+        with wave.open(io.BytesIO(audio_data)) as wav:
+            view = memoryview(wav.readframes(wav.getnframes()))
+    return np.frombuffer(view, dtype="<i2").astype(np.float32) / 32768.0
+
+
+class STTService:
+    """
+    Process-wide transcription service.
+
+    The backend is loaded once by `start`. Requests wait in a queue of at
+    most `max_queue`; `max_concurrency` workers take them in order (one is
+    right for a CPU model that already uses every core). A full queue
+    rejects new requests with STTOverloadedError instead of letting
+    latency grow without bound. Queue wait and inference time are recorded
+    separately, so an overloaded node is told apart from a slow model.
+    """
+
+    def __init__(self, backend: BaseSTTBackend, max_queue: int = 64, max_concurrency: int = 1):
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self._queue: "asyncio.Queue[Tuple[bytes, str, float, asyncio.Future]]" = asyncio.Queue(maxsize=max_queue)
+        self._workers: List[asyncio.Task] = []
+        self._ready = False
+        self._metrics = {"transcribed": 0, "failed": 0, "rejected": 0}
+
+    @classmethod
+    def from_settings(cls, settings, pool=None) -> "STTService":
+        """
+        Local Whisper in local/hybrid mode (in the voice worker pool if it
+        loaded one), the Whisper API otherwise.
+
+        Workers match what can run at once: one per pool process, or
+        `stt_max_concurrency` for a model in this process, or
+        `stt_api_max_concurrency` API requests. Raises ValueError for an
+        unsupported local model.
+        """
+
+        if settings.deployment_mode.value in ("local", "hybrid"):
+            if settings.local_stt_model != "whisper":
+                raise ValueError(f"Unsupported local STT model: {settings.local_stt_model}")
+            if pool is not None and pool.stt_model is not None:
+                from backend.core.voice_pool import PooledSTTBackend
+                backend: BaseSTTBackend = PooledSTTBackend(pool)
+                max_concurrency = pool.workers
+            else:
+                backend = LocalWhisperBackend(settings.local_stt_model_size)
+                max_concurrency = settings.stt_max_concurrency
+        else:
+            backend = WhisperAPIBackend(settings.openai_api_key)
+            max_concurrency = settings.stt_api_max_concurrency
+        return cls(backend, max_queue=settings.stt_max_queue, max_concurrency=max_concurrency)
+
+    async def start(self) -> None:
+        """Load the backend and start the workers"""
+
+        await self.backend.load()
+        self._ready = True
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.max_concurrency)]
+        logger.info(f"STT service ready: {self.backend.name}, {self.max_concurrency} worker(s)")
+
+    async def transcribe(self, audio_data: bytes, language: str = "en") -> str:
+        """Queue a transcription and wait for its text"""
+
+        if not self._ready:
+            raise RuntimeError("STT service is not started")
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((audio_data, language, time.perf_counter(), future))
+        except asyncio.QueueFull:
+            self._metrics["rejected"] += 1
+            STT_REQUESTS.inc(self.backend.name, "rejected")
+            raise STTOverloadedError(f"STT queue is full ({self._queue.maxsize} waiting)")
+        return await future
+
+    def metrics(self) -> Dict[str, Any]:
+        return {**self._metrics, "queued": self._queue.qsize(), "backend": self.backend.name}
+
+    async def close(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._ready = False
+        while not self._queue.empty():
+            *_, future = self._queue.get_nowait()
+            if not future.done():
+                future.cancel()
+        await self.backend.close()
+
+    async def _work(self) -> None:
+        while True:
+            audio_data, language, enqueued, future = await self._queue.get()
+            if future.done():
+                continue
+
+            started = time.perf_counter()
+            STT_QUEUE_WAIT_SECONDS.observe(started - enqueued, self.backend.name)
+            try:
+                text = await self.backend.transcribe(audio_data, language)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                self._metrics["failed"] += 1
+                STT_REQUESTS.inc(self.backend.name, "error")
+                logger.error(f"Transcription with {self.backend.name} failed: {e}")
+                if not future.done():
+                    future.set_exception(e)
+                continue
+
+            STT_INFERENCE_SECONDS.observe(time.perf_counter() - started, self.backend.name)
+            self._metrics["transcribed"] += 1
+            STT_REQUESTS.inc(self.backend.name, "ok")
+            if not future.done():
+                future.set_result(text)
@@ -0,0 +1,73 @@
+"""
+Text stream chunking for DisciplineCall.ai
+Regroups streamed LLM tokens into sentences so TTS can start on the first one
+"""
+
+from typing import AsyncIterator, List, Optional
+import re
+
+# Sentence end: terminal punctuation (plus closing quotes/brackets) followed by whitespace
+_BOUNDARY = re.compile(r"[.!?…]+[\"')\]]*\s+")
+_SOFT_BREAK = re.compile(r"[,;:—-]\s+")
+_ABBREVIATIONS = {"mr.", "mrs.", "ms.", "dr.", "st.", "vs.", "etc.", "e.g.", "i.e.", "a.m.", "p.m."}
+
+
+class SentenceChunker:
+    """
+    Incremental sentence splitter.
+
+    `feed` takes text as it arrives and returns the sentences it completed;
+    `flush` returns whatever is left once the stream ends. Fragments shorter
+    than `min_chars` are merged into the next sentence so TTS is not asked
+    for one-word clips, and run-ons are cut at a soft break (or a space)
+    once they pass `max_chars`.
+    """
+
+    def __init__(self, min_chars: int = 20, max_chars: int = 240):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in _BOUNDARY.finditer(self._buffer):
+            candidate = self._buffer[start:match.end()]
+            last_word = candidate.rstrip().rsplit(None, 1)[-1].lower()
+            if len(candidate.strip()) < self.min_chars or last_word in _ABBREVIATIONS:
+                continue
+            sentences.append(candidate.strip())
+            start = match.end()
+        self._buffer = self._buffer[start:]
+
+        while len(self._buffer) > self.max_chars:
+            head = self._buffer[:self.max_chars]
+            breaks = list(_SOFT_BREAK.finditer(head))
+            cut = breaks[-1].end() if breaks else head.rfind(" ") + 1
+            if cut <= 0:
+                cut = self.max_chars
+            sentences.append(self._buffer[:cut].strip())
+            self._buffer = self._buffer[cut:]
+
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        remainder, self._buffer = self._buffer.strip(), ""
+        return remainder or None
+
+
+async def iter_sentences(
+    tokens: AsyncIterator[str],
+    min_chars: int = 20,
+    max_chars: int = 240
+) -> AsyncIterator[str]:
+    """Regroup a token stream into sentences as soon as each one completes"""
+
+    chunker = SentenceChunker(min_chars, max_chars)
+    async for token in tokens:
+        for sentence in chunker.feed(token):
+            yield sentence
+    remainder = chunker.flush()
+    if remainder:
+        yield remainder
@@ -4,13 +4,29 @@ Handles text-to-speech and speech-to-text operations
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from typing import AsyncIterator, Optional, Dict, Any, Union, TYPE_CHECKING
 from enum import Enum
+import asyncio
 import logging
 import io
+import time
+
+from backend.core.instrumentation import REGISTRY
+from backend.core.audio_codec import AudioEncoding, AudioFormat
+from backend.core.text_stream import SentenceChunker, iter_sentences
+
+if TYPE_CHECKING:
+    from backend.core.stt_service import STTService
+    from backend.core.voice_pool import VoiceWorkerPool
 
 logger = logging.getLogger(__name__)
 
+TTS_FIRST_AUDIO_SECONDS = REGISTRY.histogram(
+    "tts_first_audio_seconds", "Time from stream start to the first audio chunk", ("engine",)
+)
+
+_END_OF_STREAM = object()
+
 
 class VoiceProvider(Enum):
     """Supported voice providers"""
@@ -39,6 +55,9 @@ class VoiceStyle(Enum):
 class BaseVoiceEngine(ABC):
     """Abstract base class for voice processing"""
     
+    # What text_to_speech and stream_speech produce; WAV headers override the rate
+    audio_format = AudioFormat(AudioEncoding.PCM16, 22050)
+    
     @abstractmethod
     async def text_to_speech(
         self,
@@ -49,6 +68,71 @@ class BaseVoiceEngine(ABC):
         """Convert text to speech audio"""
         pass
     
+    async def stream_speech(
+        self,
+        text: Union[str, AsyncIterator[str]],
+        voice_id: Optional[str] = None,
+        voice_style: VoiceStyle = VoiceStyle.FRIENDLY,
+        chunk_bytes: int = 4096,
+        max_buffered_chunks: int = 16
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream speech audio in chunks as it is synthesized.
+        
+        `text` is a whole message or an async iterator of sentences (for
+        example `stream_sentences` from the AI engine), synthesized one
+        sentence at a time. A background producer runs ahead of the
+        consumer by at most `max_buffered_chunks` chunks: a slow consumer
+        pauses synthesis instead of growing memory, and the first chunk is
+        yielded as soon as the first sentence produces audio. Chunks are
+        bytes-like (memoryview slices when served from the audio cache).
+        """
+        
+        sentences = iter_sentences(_single(text)) if isinstance(text, str) else text
+        buffer: "asyncio.Queue[Any]" = asyncio.Queue(maxsize=max_buffered_chunks)
+        
+        async def produce() -> None:
+            try:
+                async for sentence in sentences:
+                    async for chunk in self._synthesize_chunks(sentence, voice_id, voice_style, chunk_bytes):
+                        await buffer.put(chunk)
+                await buffer.put(_END_OF_STREAM)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await buffer.put(e)
+        
+        started = time.perf_counter()
+        producer = asyncio.create_task(produce())
+        first = True
+        try:
+            while True:
+                chunk = await buffer.get()
+                if chunk is _END_OF_STREAM:
+                    break
+                if isinstance(chunk, Exception):
+                    raise chunk
+                if first:
+                    TTS_FIRST_AUDIO_SECONDS.observe(time.perf_counter() - started, type(self).__name__)
+                    first = False
+                yield chunk
+        finally:
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+    
+    async def _synthesize_chunks(
+        self,
+        sentence: str,
+        voice_id: Optional[str],
+        voice_style: VoiceStyle,
+        chunk_bytes: int
+    ) -> AsyncIterator[bytes]:
+        """Audio for one sentence in chunks; engines with a streaming API override this"""
+        
+        audio = memoryview(await self.text_to_speech(sentence, voice_id=voice_id, voice_style=voice_style))
+        for offset in range(0, len(audio), chunk_bytes):
+            yield bytes(audio[offset:offset + chunk_bytes])
+    
     @abstractmethod
     async def speech_to_text(
         self,
@@ -57,14 +141,46 @@ class BaseVoiceEngine(ABC):
     ) -> str:
         """Convert speech audio to text"""
         pass
+    
+    async def close(self) -> None:
+        """Release clients and model workers"""
+        pass
 
 
 class ElevenLabsVoiceEngine(BaseVoiceEngine):
     """ElevenLabs voice engine for high-quality TTS"""
     
-    def __init__(self, api_key: str):
+    BASE_URL = "https://api.elevenlabs.io"
+    
+    def __init__(
+        self,
+        api_key: str,
+        model_id: str = "eleven_turbo_v2",
+        stability: float = 0.5,
+        similarity_boost: float = 0.75,
+        output_format: str = "mp3_44100_128",
+        stt_service: Optional["STTService"] = None
+    ):
         self.api_key = api_key
+        self.stt_service = stt_service
+        self._whisper: Optional[WhisperVoiceEngine] = None
         self.default_voice_id = "21m00Tcm4TlvDq8ikWAM"  # Rachel voice
+        self.model_id = model_id
+        self.stability = stability
+        self.similarity_boost = similarity_boost
+        self.output_format = output_format
+        # pcm_* or ulaw_* formats let the call transcoder skip the MP3 decode
+        self.audio_format = AudioFormat.parse(output_format)
+        self._client = None
+    
+    @property
+    def client(self):
+        if self._client is None:
+            import httpx
+            self._client = httpx.AsyncClient(
+                base_url=self.BASE_URL, headers={"xi-api-key": self.api_key}, timeout=30.0
+            )
+        return self._client
     
     async def text_to_speech(
         self,
@@ -72,33 +188,68 @@ class ElevenLabsVoiceEngine(BaseVoiceEngine):
         voice_id: Optional[str] = None,
         voice_style: VoiceStyle = VoiceStyle.FRIENDLY
     ) -> bytes:
-        """Generate speech using ElevenLabs API"""
+        """Generate speech using ElevenLabs API, collected from its streaming endpoint"""
         
-        voice_id = voice_id or self.default_voice_id
-        
-        # TODO: Implement ElevenLabs API call
         logger.info(f"Converting text to speech using ElevenLabs: {text[:50]}...")
+        chunks = [chunk async for chunk in self._synthesize_chunks(text, voice_id, voice_style, 65536)]
+        return b"".join(chunks)
+    
+    async def _synthesize_chunks(
+        self,
+        sentence: str,
+        voice_id: Optional[str],
+        voice_style: VoiceStyle,
+        chunk_bytes: int
+    ) -> AsyncIterator[bytes]:
+        """Relay the ElevenLabs streaming endpoint, which sends audio while it synthesizes"""
         
-        # Placeholder - return empty audio data
-        return b"audio_data_placeholder"
+        voice_id = voice_id or self.default_voice_id
+        payload = {
+            "text": sentence,
+            "model_id": self.model_id,
+            "voice_settings": {"stability": self.stability, "similarity_boost": self.similarity_boost}
+        }
+        async with self.client.stream(
+            "POST",
+            f"/v1/text-to-speech/{voice_id}/stream",
+            params={"output_format": self.output_format},
+            json=payload
+        ) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes(chunk_bytes):
+                yield chunk
+    
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
     
     async def speech_to_text(
         self,
         audio_data: bytes,
         language: str = "en"
     ) -> str:
-        """ElevenLabs doesn't provide STT, fallback to Whisper"""
-        # Fallback to OpenAI Whisper
-        whisper_engine = WhisperVoiceEngine()
-        return await whisper_engine.speech_to_text(audio_data, language)
+        """ElevenLabs doesn't provide STT: use the shared STT service, or Whisper"""
+        
+        if self.stt_service is not None:
+            return await self.stt_service.transcribe(audio_data, language)
+        if self._whisper is None:
+            self._whisper = WhisperVoiceEngine()
+        return await self._whisper.speech_to_text(audio_data, language)
 
 
 class WhisperVoiceEngine(BaseVoiceEngine):
     """OpenAI Whisper for speech-to-text"""
     
-    def __init__(self, api_key: Optional[str] = None, local_model: bool = False):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        local_model: bool = False,
+        stt_service: Optional["STTService"] = None
+    ):
         self.api_key = api_key
         self.local_model = local_model
+        self.stt_service = stt_service
     
     async def text_to_speech(
         self,
@@ -116,6 +267,9 @@ class WhisperVoiceEngine(BaseVoiceEngine):
     ) -> str:
         """Convert speech to text using Whisper"""
         
+        if self.stt_service is not None:
+            return await self.stt_service.transcribe(audio_data, language)
+        
         if self.local_model:
             # TODO: Implement local Whisper model
             logger.info("Converting speech to text using local Whisper model")
@@ -129,9 +283,31 @@ class WhisperVoiceEngine(BaseVoiceEngine):
 class LocalVoiceEngine(BaseVoiceEngine):
     """Local voice engine using open-source models"""
     
-    def __init__(self, tts_model: str = "espeak", stt_model: str = "wav2vec2"):
+    def __init__(
+        self,
+        tts_model: str = "espeak",
+        stt_model: str = "wav2vec2",
+        max_clause_chars: int = 120,
+        stt_service: Optional["STTService"] = None,
+        pool: Optional["VoiceWorkerPool"] = None
+    ):
+        """
+        Args:
+            tts_model: Local TTS model (espeak, coqui)
+            stt_model: Local STT model (wav2vec2, whisper)
+            max_clause_chars: Streaming synthesizes long sentences in clauses
+                of about this length, since local synthesis time grows with
+                the text and nothing plays until a clause is done
+            stt_service: Shared STT service with the model preloaded
+            pool: Worker processes running the TTS model off the event loop
+        """
         self.tts_model = tts_model
         self.stt_model = stt_model
+        self.max_clause_chars = max_clause_chars
+        self.stt_service = stt_service
+        self.pool = pool
+        self._model_loaded = False
+        self._model_lock = asyncio.Lock()
     
     async def text_to_speech(
         self,
@@ -139,11 +315,40 @@ class LocalVoiceEngine(BaseVoiceEngine):
         voice_id: Optional[str] = None,
         voice_style: VoiceStyle = VoiceStyle.FRIENDLY
     ) -> bytes:
-        """Generate speech using local TTS"""
+        """Generate speech using local TTS, in the worker pool if there is one"""
+        
+        if self.pool is not None:
+            return await self.pool.synthesize(text, voice_id)
+        
+        from backend.core import voice_pool
         
-        # TODO: Implement local TTS (Coqui TTS, espeak, etc.)
-        logger.info(f"Converting text to speech locally: {text[:50]}...")
-        return b"local_audio_data_placeholder"
+        # No pool: one copy of the model in this process, in a thread, one synthesis at a time
+        async with self._model_lock:
+            if not self._model_loaded:
+                await asyncio.to_thread(voice_pool.load_models, self.tts_model)
+                self._model_loaded = True
+            return await asyncio.to_thread(voice_pool.synthesize_audio, text, voice_id)
+    
+    async def _synthesize_chunks(
+        self,
+        sentence: str,
+        voice_id: Optional[str],
+        voice_style: VoiceStyle,
+        chunk_bytes: int
+    ) -> AsyncIterator[bytes]:
+        """Synthesize clause by clause so the first audio does not wait for a whole long sentence"""
+        
+        chunker = SentenceChunker(max_chars=self.max_clause_chars)
+        # No trailing space: the sentence's own end is not a boundary, so long ones are cut into clauses
+        clauses = chunker.feed(sentence)
+        remainder = chunker.flush()
+        if remainder:
+            clauses.append(remainder)
+        
+        for clause in clauses:
+            audio = memoryview(await self.text_to_speech(clause, voice_id=voice_id, voice_style=voice_style))
+            for offset in range(0, len(audio), chunk_bytes):
+                yield bytes(audio[offset:offset + chunk_bytes])
     
     async def speech_to_text(
         self,
@@ -152,6 +357,9 @@ class LocalVoiceEngine(BaseVoiceEngine):
     ) -> str:
         """Convert speech to text using local STT"""
         
+        if self.stt_service is not None:
+            return await self.stt_service.transcribe(audio_data, language)
+        
         # TODO: Implement local STT (wav2vec2, vosk, etc.)
         logger.info("Converting speech to text using local model")
         return "Local transcription placeholder"
@@ -171,17 +379,57 @@ class VoiceEngineFactory:
             api_key = kwargs.get('api_key')
             if not api_key:
                 raise ValueError("ElevenLabs API key required")
-            return ElevenLabsVoiceEngine(api_key=api_key)
+            return ElevenLabsVoiceEngine(api_key=api_key, stt_service=kwargs.get('stt_service'))
         
         elif provider == VoiceProvider.OPENAI:
             api_key = kwargs.get('api_key')
-            return WhisperVoiceEngine(api_key=api_key, local_model=False)
+            return WhisperVoiceEngine(api_key=api_key, local_model=False, stt_service=kwargs.get('stt_service'))
         
         elif provider == VoiceProvider.LOCAL:
             return LocalVoiceEngine(**kwargs)
         
         else:
             raise ValueError(f"Unsupported voice provider: {provider}")
+    
+    @staticmethod
+    def create_from_settings(
+        settings,
+        stt_service: Optional["STTService"] = None,
+        voice_pool: Optional["VoiceWorkerPool"] = None
+    ) -> BaseVoiceEngine:
+        """Create the TTS engine matching the deployment mode, behind the audio cache if enabled"""
+        
+        if settings.deployment_mode.value in ("local", "hybrid") or not settings.elevenlabs_api_key:
+            engine = LocalVoiceEngine(
+                tts_model=settings.local_tts_model,
+                stt_model=settings.local_stt_model,
+                stt_service=stt_service,
+                pool=voice_pool
+            )
+            namespace = f"{VoiceProvider.LOCAL.value}:{settings.local_tts_model}"
+        else:
+            engine = ElevenLabsVoiceEngine(
+                api_key=settings.elevenlabs_api_key,
+                stability=settings.voice_stability,
+                stt_service=stt_service
+            )
+            namespace = VoiceProvider.ELEVENLABS.value
+        
+        if not settings.tts_cache_enabled:
+            return engine
+        
+        from backend.core.audio_cache import AudioCache, CachedVoiceEngine
+        return CachedVoiceEngine(
+            engine,
+            AudioCache.from_settings(settings),
+            namespace=namespace,
+            voice_speed=settings.voice_speed,
+            voice_stability=settings.voice_stability
+        )
+
+
+async def _single(text: str) -> AsyncIterator[str]:
+    yield text
 
 
 # Voice configuration presets
@@ -0,0 +1,339 @@
+"""
+Voice worker pool for DisciplineCall.ai
+Local TTS/STT inference in worker processes, with audio passed through shared memory
+"""
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Union
+import asyncio
+import io
+import logging
+import math
+import multiprocessing
+import os
+import shutil
+import signal
+import subprocess
+import time
+import wave
+
+from backend.core.instrumentation import REGISTRY
+from backend.core.stt_service import BaseSTTBackend, pcm16_to_float32
+
+logger = logging.getLogger(__name__)
+
+VOICE_POOL_SECONDS = REGISTRY.histogram(
+    "voice_pool_seconds", "Local voice inference time in the worker pool, including slot wait", ("task",)
+)
+VOICE_POOL_SPILLS = REGISTRY.counter(
+    "voice_pool_spills_total", "Audio too large for a shared-memory slot, sent through the pipe instead", ("task",)
+)
+
+COQUI_MODEL = "tts_models/en/ljspeech/vits"
+SAMPLE_RATE = 22050
+STT_MODELS = ("whisper",)
+
+# Per-process models, loaded once by load_models when a worker starts
+_tts: Optional[Callable[[str, Optional[str]], bytes]] = None
+_stt = None
+_segments: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def pcm16_wav(samples, sample_rate: int = SAMPLE_RATE) -> bytes:
+    """Float samples in [-1, 1] as a 16-bit mono WAV"""
+
+    import numpy as np
+
+    pcm = (np.clip(np.asarray(samples, dtype=np.float32), -1.0, 1.0) * 32767).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def _espeak() -> Callable[[str, Optional[str]], bytes]:
+    binary = shutil.which("espeak-ng") or shutil.which("espeak")
+    if binary is None:
+        raise RuntimeError("espeak-ng is not installed")
+
+    def synthesize(text: str, voice_id: Optional[str]) -> bytes:
+        return subprocess.run(
+            [binary, "--stdout", "-v", voice_id or "en", text], capture_output=True, check=True
+        ).stdout
+
+    return synthesize
+
+
+def _coqui(model_name: str) -> Callable[[str, Optional[str]], bytes]:
+    from TTS.api import TTS
+
+    model = TTS(model_name=model_name, progress_bar=False)
+    sample_rate = model.synthesizer.output_sample_rate
+
+    def synthesize(text: str, voice_id: Optional[str]) -> bytes:
+        return pcm16_wav(model.tts(text, speaker=voice_id), sample_rate)
+
+    return synthesize
+
+
+def _simulated(cpu_ms_per_char: float) -> Callable[[str, Optional[str]], bytes]:
+    import numpy as np
+
+    def synthesize(text: str, voice_id: Optional[str]) -> bytes:
+        # Hold the CPU (and the GIL) the way a real model does, then return a tone of matching length
+        deadline = time.perf_counter() + len(text) * cpu_ms_per_char / 1000
+        while time.perf_counter() < deadline:
+            pass
+        t = np.arange(int(SAMPLE_RATE * 0.06 * max(1, len(text))), dtype=np.float32) / SAMPLE_RATE
+        return pcm16_wav(0.3 * np.sin(2 * math.pi * 220.0 * t))
+
+    return synthesize
+
+
+def load_models(
+    tts_model: str,
+    stt_model: Optional[str] = None,
+    stt_model_size: str = "base",
+    coqui_model: str = COQUI_MODEL,
+    simulated_cpu_ms_per_char: float = 0.5
+) -> None:
+    """Load this process's models"""
+
+    global _tts, _stt
+
+    started = time.perf_counter()
+    if tts_model == "espeak":
+        _tts = _espeak()
+    elif tts_model == "coqui":
+        _tts = _coqui(coqui_model)
+    elif tts_model == "simulated":
+        _tts = _simulated(simulated_cpu_ms_per_char)
+    else:
+        raise ValueError(f"Unsupported local TTS model: {tts_model}")
+
+    if stt_model == "whisper":
+        import whisper
+        _stt = whisper.load_model(stt_model_size)
+    elif stt_model is not None:
+        raise ValueError(f"Unsupported local STT model: {stt_model}")
+    logger.info(f"Voice worker {os.getpid()} loaded {tts_model}/{stt_model} in {time.perf_counter() - started:.1f}s")
+
+
+def synthesize_audio(text: str, voice_id: Optional[str] = None) -> bytes:
+    """Synthesize with this process's TTS model"""
+    return _tts(text, voice_id)
+
+
+def transcribe_audio(audio_data: Union[bytes, memoryview], language: str = "en") -> str:
+    """Transcribe 16-bit PCM with this process's STT model"""
+
+    if _stt is None:
+        raise RuntimeError("No STT model loaded in this worker")
+    result = _stt.transcribe(pcm16_to_float32(audio_data), language=language, fp16=False)
+    return result["text"].strip()
+
+
+def _init_worker(*args: Any) -> None:
+    # Ctrl-C goes to the API process, which shuts the pool down in order
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    load_models(*args)
+
+
+def _segment(name: str) -> shared_memory.SharedMemory:
+    segment = _segments.get(name)
+    if segment is None:
+        segment = _segments[name] = shared_memory.SharedMemory(name=name)
+    return segment
+
+
+def _ping() -> int:
+    time.sleep(0.05)
+    return os.getpid()
+
+
+def _synthesize_into(slot: str, text: str, voice_id: Optional[str]) -> Union[int, bytes]:
+    """Write audio into the slot and return its length; audio that does not fit is returned as bytes"""
+
+    audio = synthesize_audio(text, voice_id)
+    buffer = _segment(slot).buf
+    if len(audio) > len(buffer):
+        return audio
+    buffer[:len(audio)] = audio
+    return len(audio)
+
+
+def _transcribe_from(slot: str, size: int, language: str) -> str:
+    view = _segment(slot).buf[:size]
+    try:
+        return transcribe_audio(view, language)
+    finally:
+        view.release()
+
+
+class VoiceWorkerPool:
+    """
+    Local TTS/STT models in a pool of worker processes.
+
+    Local inference is CPU-bound and holds the GIL, so run inline (or in a
+    thread) it stalls every other call on the event loop. Each worker
+    process loads the models once at start. Audio never goes through
+    pickle: the pool owns `2 * workers` shared-memory slots of `slot_bytes`.
+    A request takes a free slot and the worker reads its input from the slot
+    or writes its output into it, so only the slot name, a length and the
+    text cross the pipe. Audio larger than a slot is sent through the pipe
+    instead and counted in voice_pool_spills_total.
+    """
+
+    def __init__(
+        self,
+        tts_model: str = "espeak",
+        stt_model: Optional[str] = None,
+        stt_model_size: str = "base",
+        workers: int = 2,
+        slot_bytes: int = 8 * 1024 * 1024,
+        coqui_model: str = COQUI_MODEL,
+        simulated_cpu_ms_per_char: float = 0.5
+    ):
+        """
+        Args:
+            tts_model: espeak, coqui or simulated (a CPU-burning tone, for benchmarks)
+            stt_model: whisper, or None for a TTS-only pool
+            stt_model_size: Whisper checkpoint
+            workers: Worker processes; each holds its own copy of the models
+            slot_bytes: Size of each shared-memory slot
+            coqui_model: Coqui TTS model name
+            simulated_cpu_ms_per_char: CPU time the simulated model spends per character
+        """
+        self.tts_model = tts_model
+        self.stt_model = stt_model
+        self.stt_model_size = stt_model_size
+        self.workers = workers
+        self.slot_bytes = slot_bytes
+        self.coqui_model = coqui_model
+        self.simulated_cpu_ms_per_char = simulated_cpu_ms_per_char
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._segments: List[shared_memory.SharedMemory] = []
+        self._slots: "asyncio.Queue[shared_memory.SharedMemory]" = asyncio.Queue()
+
+    @classmethod
+    def from_settings(cls, settings) -> "VoiceWorkerPool":
+        """Size the pool per CPU core; an STT model the workers cannot load leaves the pool TTS-only"""
+
+        workers = max(1, round((os.cpu_count() or 1) * settings.voice_pool_processes_per_core))
+        stt_model = settings.local_stt_model
+        if stt_model not in STT_MODELS:
+            logger.warning(f"Voice pool runs TTS only: unsupported local STT model {stt_model}")
+            stt_model = None
+        return cls(
+            tts_model=settings.local_tts_model,
+            stt_model=stt_model,
+            stt_model_size=settings.local_stt_model_size,
+            workers=workers,
+            slot_bytes=settings.voice_pool_slot_mb * 1024 * 1024
+        )
+
+    async def start(self) -> None:
+        """Start the workers and wait until they have loaded their models"""
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            # Fork would copy the event loop and its threads into the workers
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                self.tts_model, self.stt_model, self.stt_model_size,
+                self.coqui_model, self.simulated_cpu_ms_per_char
+            )
+        )
+        for _ in range(2 * self.workers):
+            segment = shared_memory.SharedMemory(create=True, size=self.slot_bytes)
+            self._segments.append(segment)
+            self._slots.put_nowait(segment)
+
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        # A model that fails to load breaks the pool here rather than on the first call
+        pids = await asyncio.gather(*(loop.run_in_executor(self._executor, _ping) for _ in range(self.workers)))
+        logger.info(
+            f"Voice pool ready: {len(set(pids))}/{self.workers} workers with {self.tts_model}/{self.stt_model} "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+    async def synthesize(self, text: str, voice_id: Optional[str] = None) -> bytes:
+        """Synthesize in a worker; the audio comes back through a shared-memory slot"""
+
+        started = time.perf_counter()
+        slot = await self._slots.get()
+        result = await self._run(slot, _synthesize_into, slot.name, text, voice_id)
+        if isinstance(result, int):
+            audio = bytes(slot.buf[:result])
+        else:
+            VOICE_POOL_SPILLS.inc("tts")
+            audio = result
+        self._slots.put_nowait(slot)
+        VOICE_POOL_SECONDS.observe(time.perf_counter() - started, "tts")
+        return audio
+
+    async def transcribe(self, audio_data: bytes, language: str = "en") -> str:
+        """Transcribe in a worker; the audio goes in through a shared-memory slot"""
+
+        started = time.perf_counter()
+        if len(audio_data) > self.slot_bytes:
+            VOICE_POOL_SPILLS.inc("stt")
+            text = await asyncio.get_running_loop().run_in_executor(
+                self._executor, transcribe_audio, audio_data, language
+            )
+        else:
+            slot = await self._slots.get()
+            slot.buf[:len(audio_data)] = audio_data
+            text = await self._run(slot, _transcribe_from, slot.name, len(audio_data), language)
+            self._slots.put_nowait(slot)
+        VOICE_POOL_SECONDS.observe(time.perf_counter() - started, "stt")
+        return text
+
+    async def close(self) -> None:
+        """Let running inference finish, drop queued work, stop the workers and free the slots"""
+
+        if self._executor is not None:
+            await asyncio.to_thread(self._executor.shutdown, wait=True, cancel_futures=True)
+            self._executor = None
+        for segment in self._segments:
+            segment.close()
+            segment.unlink()
+        self._segments = []
+        self._slots = asyncio.Queue()
+
+    async def _run(self, slot: shared_memory.SharedMemory, fn: Callable, *args: Any) -> Any:
+        """Run fn in a worker; on error the slot goes back, on cancellation only once the worker is done with it"""
+
+        future: Future = self._executor.submit(fn, *args)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # The worker may still be writing into the slot, so it cannot be reused yet
+            loop = asyncio.get_running_loop()
+            future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release, slot))
+            raise
+        except BaseException:
+            self._slots.put_nowait(slot)
+            raise
+
+    def _release(self, slot: shared_memory.SharedMemory) -> None:
+        if slot in self._segments:
+            self._slots.put_nowait(slot)
+
+
+class PooledSTTBackend(BaseSTTBackend):
+    """STT backend that runs in a VoiceWorkerPool; the pool's lifecycle belongs to its owner"""
+
+    name = "whisper-pool"
+
+    def __init__(self, pool: VoiceWorkerPool):
+        self.pool = pool
+
+    async def transcribe(self, audio_data: bytes, language: str = "en") -> str:
+        return await self.pool.transcribe(audio_data, language)
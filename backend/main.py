@@ -5,7 +5,9 @@ Main FastAPI application entry point
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 import os
 
@@ -14,6 +16,20 @@ from backend.api.auth import router as auth_router
 from backend.api.users import router as users_router
 from backend.api.calls import router as calls_router
 from backend.api.metrics import router as metrics_router
+from backend.core.ai_engine import EnginePool
+from backend.core.instrumentation import REGISTRY
+from backend.core.memory import ConversationMemory
+from backend.core.stt_service import STTService
+from backend.core.voice_engine import VoiceEngineFactory
+from backend.core.voice_pool import VoiceWorkerPool
+from backend.services.call_service import CallScheduler, CallServiceFactory
+from backend.services.call_executor import CallBatchExecutor
+from backend.services.load_shaping import LoadShaper
+from backend.services.prerender import CallPrerenderer
+from backend.services.schedule_store import ScheduleStoreFactory
+from backend.services.session_store import SessionStore
+from backend.services.sharding import ShardCoordinator
+from config.settings import settings
 
 
 # Configure logging
@@ -26,18 +42,112 @@ async def lifespan(app: FastAPI):
     """Application lifespan events"""
     logger.info("🚀 DisciplineCall.ai starting up...")
     
-    # TODO: Initialize database connections
-    # TODO: Initialize AI engines
-    # TODO: Initialize call services
-    # TODO: Start background task scheduler
+    os.makedirs("user_data", exist_ok=True)
+    schedule_store = ScheduleStoreFactory.create_store(settings.database_url)
+    await schedule_store.initialize()
+    
+    engine_pool = EnginePool.from_settings(settings)
+    ai_engine = engine_pool.get()
+    if settings.ai_warmup_enabled:
+        await engine_pool.warm_up(settings.ai_warmup_timeout)
+    prompt_sizes = [entry["tokens"] for entry in engine_pool.prompt_compiler.token_report()]
+    logger.info(
+        f"Compiled {len(prompt_sizes)} prompt prefixes "
+        f"({min(prompt_sizes)}-{max(prompt_sizes)} tokens)"
+    )
+    voice_pool = None
+    if settings.deployment_mode.value in ("local", "hybrid") and settings.voice_pool_processes_per_core > 0:
+        voice_pool = VoiceWorkerPool.from_settings(settings)
+        try:
+            await voice_pool.start()
+        except Exception as e:
+            logger.error(f"Voice worker pool failed to start, local models run in-process: {e}")
+            await voice_pool.close()
+            voice_pool = None
+    app.state.voice_pool = voice_pool
+    stt_service = None
+    try:
+        stt_service = STTService.from_settings(settings, pool=voice_pool)
+        await stt_service.start()
+    except Exception as e:
+        logger.error(f"STT model failed to load, voice engines fall back to their defaults: {e}")
+        if stt_service is not None:
+            await stt_service.close()
+        stt_service = None
+    app.state.stt_service = stt_service
+    voice_engine = VoiceEngineFactory.create_from_settings(
+        settings, stt_service=stt_service, voice_pool=voice_pool
+    )
+    call_services = CallServiceFactory.create_from_settings(settings)
+    session_store = SessionStore.from_settings(settings)
+    memory = ConversationMemory.from_settings(settings, summarizer=ai_engine.summarize, store=schedule_store)
+    app.state.engine_pool = engine_pool
+    app.state.session_store = session_store
+    app.state.memory = memory
+    
+    load_shaper = LoadShaper.from_settings(settings) if settings.load_shaping_enabled else None
+    prerenderer = CallPrerenderer(
+        ai_engine,
+        voice_engine,
+        lead_time_minutes=settings.prerender_lead_minutes if settings.prerender_enabled else 0,
+        max_concurrency=settings.prerender_max_concurrency,
+        memory=memory,
+        take_timeout=settings.prerender_take_timeout
+    )
+    shard_coordinator = None
+    if settings.scheduler_sharding_enabled:
+        shard_coordinator = ShardCoordinator.from_settings(settings)
+        await shard_coordinator.rebalance()
+    
+    app.state.call_scheduler = CallScheduler(
+        load_shaper=load_shaper,
+        prerenderer=prerenderer,
+        call_services=call_services,
+        store=schedule_store,
+        node_id=shard_coordinator.node_id if shard_coordinator else None,
+        lease_seconds=settings.dispatch_lease_seconds,
+        session_store=session_store,
+        shard_coordinator=shard_coordinator,
+        max_call_duration=settings.max_call_duration,
+        memory=memory
+    )
+    await app.state.call_scheduler.restore()
+    app.state.call_executor = CallBatchExecutor.from_settings(app.state.call_scheduler, settings)
+    
+    background_tasks = [
+        asyncio.create_task(app.state.call_executor.run_forever(settings.dispatch_poll_interval))
+    ]
+    if shard_coordinator is not None:
+        background_tasks.append(asyncio.create_task(
+            shard_coordinator.run_forever(on_rebalance=app.state.call_scheduler.on_rebalance)
+        ))
+    if settings.prerender_enabled:
+        background_tasks.append(asyncio.create_task(
+            prerenderer.run_forever(app.state.call_scheduler, settings.prerender_poll_interval)
+        ))
     
     yield
     
     logger.info("📞 DisciplineCall.ai shutting down...")
     
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    if shard_coordinator is not None:
+        await shard_coordinator.stop()
+    
+    # Memory saves its last summaries through the engines and the schedule store, so it goes first
+    await memory.close()
+    await session_store.close()
+    await schedule_store.close()
+    await engine_pool.close()
+    await voice_engine.close()
+    if stt_service is not None:
+        await stt_service.close()
+    if voice_pool is not None:
+        await voice_pool.close()
+    
     # TODO: Clean up resources
-    # TODO: Close database connections
-    # TODO: Stop background tasks
 
 
 # Create FastAPI application
@@ -88,6 +198,12 @@ async def health_check():
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
 # Include API routers
 app.include_router(auth_router, prefix="/api/v1/auth", tags=["Authentication"])
 app.include_router(users_router, prefix="/api/v1/users", tags=["Users"])
@@ -0,0 +1,264 @@
+"""
+Batch call executor for DisciplineCall.ai
+Fans due calls out to CallScheduler.execute_call with bounded concurrency
+and per-provider rate limits
+"""
+
+from typing import Dict, Any, Optional, List, Set, Tuple
+from datetime import datetime
+import asyncio
+import logging
+import time
+
+from backend.core.latency import summarize_latencies
+from backend.services.call_service import CallProvider, CallScheduler, CallStatus
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter for asyncio.
+
+    Callers reserve a token up front and sleep until it is available, so
+    waiters are served in arrival order without a lock.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("Token bucket rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _reserve(self, tokens: float) -> float:
+        """Take tokens (possibly going into debt) and return the wait in seconds"""
+
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= tokens
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """Wait until `tokens` are available, returning the time waited"""
+
+        delay = self._reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+
+class CallBatchExecutor:
+    """Runs batches of due calls through CallScheduler.execute_call"""
+
+    def __init__(
+        self,
+        scheduler: CallScheduler,
+        max_concurrency: int = 200,
+        rate_limits: Optional[Dict[CallProvider, Tuple[float, float]]] = None,
+        batch_size: int = 1000,
+        sweep_interval: float = 30.0
+    ):
+        """
+        Args:
+            scheduler: Source of due calls and the per-call execution path
+            max_concurrency: Upper bound on execute_call coroutines in flight
+            rate_limits: Per-provider (calls per second, burst) limits;
+                providers without an entry are not rate limited
+            batch_size: Maximum calls claimed per dispatch cycle
+            sweep_interval: Seconds between CallScheduler.sweep runs in run_forever
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self.scheduler = scheduler
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
+        self.sweep_interval = sweep_interval
+        self.buckets: Dict[CallProvider, TokenBucket] = {
+            provider: TokenBucket(rate, burst)
+            for provider, (rate, burst) in (rate_limits or {}).items()
+        }
+        self.last_report: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_settings(cls, scheduler: CallScheduler, settings) -> "CallBatchExecutor":
+        """Build an executor from application settings"""
+
+        return cls(
+            scheduler,
+            max_concurrency=settings.dispatch_max_concurrency,
+            batch_size=settings.dispatch_batch_size,
+            sweep_interval=settings.dispatch_sweep_interval,
+            rate_limits={
+                CallProvider.TWILIO: (
+                    settings.twilio_calls_per_second,
+                    settings.twilio_calls_per_second
+                ),
+                CallProvider.TELEGRAM: (
+                    settings.telegram_messages_per_second,
+                    settings.telegram_messages_per_second
+                ),
+                CallProvider.WHATSAPP: (
+                    settings.whatsapp_messages_per_second,
+                    settings.whatsapp_messages_per_second
+                )
+            }
+        )
+
+    async def dispatch_due(
+        self,
+        now: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Claim the scheduler's due set and execute it as one batch"""
+
+        calls = await self.scheduler.claim_due_calls(now, limit or self.batch_size)
+        return await self.run_batch(calls)
+
+    async def run_batch(self, calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Execute calls concurrently and return a throughput/latency report"""
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        outcomes: List[Tuple[Optional[Dict[str, Any]], float, float]] = []
+
+        async def run_one(call_info: Dict[str, Any]) -> None:
+            outcomes.append(await self._execute(call_info, semaphore))
+
+        batch_started = time.perf_counter()
+        await asyncio.gather(*(run_one(call_info) for call_info in calls))
+        duration = time.perf_counter() - batch_started
+
+        results = [result for result, _, _ in outcomes if result is not None]
+        failures = sum(1 for result, _, _ in outcomes if result is None or not result.get("call_executed"))
+        latencies = [latency for _, _, latency in outcomes]
+        waits = [wait for _, wait, _ in outcomes]
+
+        by_provider: Dict[str, int] = {}
+        for call_info in calls:
+            provider = call_info.get("provider")
+            key = provider.value if isinstance(provider, CallProvider) else str(provider)
+            by_provider[key] = by_provider.get(key, 0) + 1
+
+        report = {
+            "calls": len(calls),
+            "succeeded": len(calls) - failures,
+            "failed": failures,
+            "duration_s": round(duration, 3),
+            "throughput_per_s": round(len(calls) / duration, 1) if duration > 0 else 0.0,
+            "latency": summarize_latencies(latencies),
+            "queue_wait": summarize_latencies(waits),
+            "by_provider": by_provider,
+            "results": results
+        }
+
+        if calls:
+            logger.info(
+                f"Dispatched {len(calls)} calls in {report['duration_s']}s "
+                f"({report['throughput_per_s']}/s, p99 {report['latency']['p99_ms']}ms, "
+                f"{failures} failed)"
+            )
+
+        self.last_report = {key: value for key, value in report.items() if key != "results"}
+        return report
+
+    async def run_forever(self, poll_interval: float = 1.0) -> None:
+        """
+        Dispatch due calls until cancelled, sweeping stale calls every sweep_interval.
+
+        Each provider has its own lane that claims that provider's due calls
+        and claims again as soon as its calls finish, so a rate-limited
+        provider never holds up the others. A lane keeps at most as many
+        calls as its rate can start in half a dispatch lease, so claimed
+        calls do not lapse back to scheduled while waiting for a token.
+        """
+
+        logger.info(f"Call dispatcher started (concurrency {self.max_concurrency})")
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        lanes = [
+            asyncio.create_task(self._run_lane(provider, semaphore, poll_interval))
+            for provider in CallProvider
+        ]
+        try:
+            while True:
+                await asyncio.sleep(self.sweep_interval)
+                try:
+                    await self.scheduler.sweep()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Call sweep failed: {e}")
+        finally:
+            for lane in lanes:
+                lane.cancel()
+            await asyncio.gather(*lanes, return_exceptions=True)
+
+    async def _run_lane(self, provider: CallProvider, semaphore: asyncio.Semaphore, poll_interval: float) -> None:
+        bucket = self.buckets.get(provider)
+        capacity = self.max_concurrency
+        if bucket is not None:
+            capacity = max(1, min(capacity, int(bucket.rate * self.scheduler.lease_seconds / 2)))
+        in_flight: Set[asyncio.Task] = set()
+
+        try:
+            while True:
+                room = min(self.batch_size, capacity - len(in_flight))
+                claimed = 0
+                if room > 0:
+                    try:
+                        calls = await self.scheduler.claim_due_calls(limit=room, providers=[provider])
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        logger.error(f"Claiming {provider.value} calls failed: {e}")
+                        calls = []
+                    claimed = len(calls)
+                    for call_info in calls:
+                        in_flight.add(asyncio.create_task(self._execute(call_info, semaphore)))
+
+                if room > 0 and claimed == room:
+                    # A full claim means more calls are already due
+                    continue
+                if room > 0 or not in_flight:
+                    await asyncio.sleep(poll_interval)
+                else:
+                    # Lane is full: claim again as soon as a call finishes
+                    await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in [task for task in in_flight if task.done()]:
+                    in_flight.discard(task)
+                    if not task.cancelled() and task.exception() is not None:
+                        logger.error(f"Recording a {provider.value} call outcome failed: {task.exception()}")
+        finally:
+            for task in in_flight:
+                task.cancel()
+            await asyncio.gather(*in_flight, return_exceptions=True)
+
+    async def _execute(
+        self,
+        call_info: Dict[str, Any],
+        semaphore: asyncio.Semaphore
+    ) -> Tuple[Optional[Dict[str, Any]], float, float]:
+        """Run one call through its provider's rate limit and the concurrency cap; returns (result, wait, latency)"""
+
+        queued = time.perf_counter()
+        bucket = self.buckets.get(call_info.get("provider"))
+        if bucket is not None:
+            await bucket.acquire()
+
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                result = await self.scheduler.execute_call(call_info)
+            except Exception as e:
+                logger.error(f"Call {call_info.get('call_id')} for user {call_info.get('user_id')} failed: {e}")
+                await self.scheduler.finish_call(call_info["call_id"], CallStatus.FAILED)
+                return None, started - queued, time.perf_counter() - started
+            latency = time.perf_counter() - started
+
+        if result.get("call_executed"):
+            await self.scheduler.record_dispatched(call_info)
+        else:
+            await self.scheduler.finish_call(call_info["call_id"], CallStatus.FAILED)
+        return result, started - queued, latency
@@ -4,10 +4,26 @@ Handles phone calls, Telegram, and WhatsApp voice interactions
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List
+from typing import AsyncIterator, Dict, Any, Optional, List, Tuple, Union, TYPE_CHECKING
 from enum import Enum
 import logging
-from datetime import datetime
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from backend.core.audio_codec import AudioEncoding, AudioFormat, transcode
+from backend.core.memory import ConversationMemory
+from backend.core.voice_engine import BaseVoiceEngine, VoiceStyle
+from backend.services.schedule_engine import DispatchQueue, next_fire_time
+from backend.services.load_shaping import LoadShaper
+from backend.services.prerender import CallPrerenderer
+
+from backend.services.session_store import SessionStore, new_session_state
+
+if TYPE_CHECKING:
+    from backend.services.schedule_store import BaseScheduleStore
+    from backend.services.sharding import ShardCoordinator
 
 logger = logging.getLogger(__name__)
 
@@ -37,17 +53,37 @@ class CallStatus(Enum):
     FAILED = "failed"
 
 
+# Closing phrases that end a live call
+SIGN_OFFS = frozenset({"bye", "goodbye", "bye bye", "thats all", "talk later", "hang up", "im done here"})
+
+
 class BaseCallService(ABC):
     """Abstract base class for call services"""
     
+    # Audio the provider accepts
+    audio_format = AudioFormat(AudioEncoding.PCM16, 16000)
+    
+    def speech_stream(
+        self,
+        voice_engine: BaseVoiceEngine,
+        text: Union[str, AsyncIterator[str]],
+        voice_id: Optional[str] = None,
+        voice_style: VoiceStyle = VoiceStyle.FRIENDLY
+    ) -> AsyncIterator[memoryview]:
+        """Stream the engine's speech transcoded chunk by chunk into this provider's format"""
+        
+        speech = voice_engine.stream_speech(text, voice_id=voice_id, voice_style=voice_style)
+        return transcode(speech, voice_engine.audio_format, self.audio_format)
+    
     @abstractmethod
     async def initiate_call(
         self,
         user_phone: str,
         message: str,
-        call_type: CallType
+        call_type: CallType,
+        audio_data: Optional[bytes] = None
     ) -> Dict[str, Any]:
-        """Initiate a call/message to user"""
+        """Initiate a call/message to user, using pre-rendered audio when given"""
         pass
     
     @abstractmethod
@@ -58,11 +94,21 @@ class BaseCallService(ABC):
     ) -> Dict[str, Any]:
         """Handle user's response during call"""
         pass
+    
+    @staticmethod
+    def is_sign_off(user_response: str) -> bool:
+        """Whether the user is closing the conversation"""
+        
+        words = user_response.lower().strip(" .!").replace("'", "")
+        return words in SIGN_OFFS or any(words.endswith(f" {phrase}") for phrase in SIGN_OFFS)
 
 
 class TwilioCallService(BaseCallService):
     """Twilio service for actual phone calls"""
     
+    # Media streams carry 8 kHz mu-law
+    audio_format = AudioFormat(AudioEncoding.MULAW, 8000)
+    
     def __init__(self, account_sid: str, auth_token: str, phone_number: str):
         self.account_sid = account_sid
         self.auth_token = auth_token
@@ -73,14 +119,15 @@ class TwilioCallService(BaseCallService):
         self,
         user_phone: str,
         message: str,
-        call_type: CallType
+        call_type: CallType,
+        audio_data: Optional[bytes] = None
     ) -> Dict[str, Any]:
         """Make actual phone call using Twilio"""
         
         logger.info(f"Initiating {call_type.value} call to {user_phone}")
         
         # TODO: Implement Twilio voice call
-        # 1. Convert message to audio using TTS
+        # 1. Convert message to audio using TTS (unless audio_data is pre-rendered)
         # 2. Create Twilio call with TwiML for voice interaction
         # 3. Handle voice responses and convert to text
         
@@ -104,7 +151,10 @@ class TwilioCallService(BaseCallService):
         # TODO: Implement response handling
         # 1. Process user's spoken response
         # 2. Generate AI follow-up
-        # 3. Continue conversation or end call
+        
+        # Silence means the caller hung up
+        if not user_response.strip() or self.is_sign_off(user_response):
+            return {"response_processed": True, "next_action": "end_call"}
         
         return {
             "response_processed": True,
@@ -116,6 +166,9 @@ class TwilioCallService(BaseCallService):
 class TelegramCallService(BaseCallService):
     """Telegram service for voice messages"""
     
+    # Voice notes are OGG/Opus
+    audio_format = AudioFormat(AudioEncoding.OGG_OPUS, 48000)
+    
     def __init__(self, bot_token: str):
         self.bot_token = bot_token
         # TODO: Initialize Telegram bot
@@ -124,14 +177,15 @@ class TelegramCallService(BaseCallService):
         self,
         user_phone: str,  # Actually user_id for Telegram
         message: str,
-        call_type: CallType
+        call_type: CallType,
+        audio_data: Optional[bytes] = None
     ) -> Dict[str, Any]:
         """Send voice message via Telegram"""
         
         logger.info(f"Sending {call_type.value} voice message to Telegram user {user_phone}")
         
         # TODO: Implement Telegram voice message
-        # 1. Convert message to audio using TTS
+        # 1. Convert message to audio using TTS (unless audio_data is pre-rendered)
         # 2. Send voice message via Telegram Bot API
         # 3. Wait for user's voice response
         
@@ -162,6 +216,9 @@ class TelegramCallService(BaseCallService):
 class WhatsAppCallService(BaseCallService):
     """WhatsApp Business service for voice messages"""
     
+    # Voice messages are OGG/Opus
+    audio_format = AudioFormat(AudioEncoding.OGG_OPUS, 16000)
+    
     def __init__(self, api_token: str, phone_number_id: str):
         self.api_token = api_token
         self.phone_number_id = phone_number_id
@@ -171,14 +228,15 @@ class WhatsAppCallService(BaseCallService):
         self,
         user_phone: str,
         message: str,
-        call_type: CallType
+        call_type: CallType,
+        audio_data: Optional[bytes] = None
     ) -> Dict[str, Any]:
         """Send voice message via WhatsApp"""
         
         logger.info(f"Sending {call_type.value} voice message to WhatsApp {user_phone}")
         
         # TODO: Implement WhatsApp voice message
-        # 1. Convert message to audio
+        # 1. Convert message to audio (unless audio_data is pre-rendered)
         # 2. Upload audio to WhatsApp
         # 3. Send voice message via WhatsApp Business API
         
@@ -235,63 +293,479 @@ class CallServiceFactory:
         
         else:
             raise ValueError(f"Unsupported call provider: {provider}")
+    
+    @staticmethod
+    def create_from_settings(settings) -> Dict[CallProvider, BaseCallService]:
+        """Create a service for every provider that has credentials configured"""
+        
+        services: Dict[CallProvider, BaseCallService] = {}
+        
+        if settings.twilio_account_sid and settings.twilio_auth_token and settings.twilio_phone_number:
+            services[CallProvider.TWILIO] = TwilioCallService(
+                account_sid=settings.twilio_account_sid,
+                auth_token=settings.twilio_auth_token,
+                phone_number=settings.twilio_phone_number
+            )
+        
+        if settings.telegram_bot_token:
+            services[CallProvider.TELEGRAM] = TelegramCallService(settings.telegram_bot_token)
+        
+        if settings.whatsapp_api_token and settings.whatsapp_phone_number_id:
+            services[CallProvider.WHATSAPP] = WhatsAppCallService(
+                api_token=settings.whatsapp_api_token,
+                phone_number_id=settings.whatsapp_phone_number_id
+            )
+        
+        return services
 
 
 class CallScheduler:
     """Service for scheduling and managing calls"""
     
-    def __init__(self):
-        self.scheduled_calls: List[Dict[str, Any]] = []
+    DAILY_CALL_TYPES = (CallType.MORNING, CallType.MIDDAY, CallType.EVENING)
+    
+    def __init__(
+        self,
+        queue: Optional[DispatchQueue] = None,
+        load_shaper: Optional[LoadShaper] = None,
+        prerenderer: Optional[CallPrerenderer] = None,
+        call_services: Optional[Dict[CallProvider, BaseCallService]] = None,
+        store: Optional["BaseScheduleStore"] = None,
+        node_id: Optional[str] = None,
+        lease_seconds: int = 60,
+        session_store: Optional[SessionStore] = None,
+        shard_coordinator: Optional["ShardCoordinator"] = None,
+        max_call_duration: int = 300,
+        memory: Optional[ConversationMemory] = None
+    ):
+        self.queue = queue or DispatchQueue()
+        self.load_shaper = load_shaper
+        self.prerenderer = prerenderer
+        self.call_services = call_services or {}
+        self.store = store
+        self.node_id = node_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.session_store = session_store
+        self.shard_coordinator = shard_coordinator
+        self.max_call_duration = max_call_duration
+        self.memory = memory
+        self._slots: Dict[Tuple[str, CallType], str] = {}
+    
+    @property
+    def scheduled_calls(self) -> List[Dict[str, Any]]:
+        """All pending calls ordered by fire time"""
+        return self.queue.snapshot()
+    
+    def owns(self, user_id: str) -> bool:
+        """Whether this node currently dispatches the user's calls"""
+        return self.shard_coordinator is None or self.shard_coordinator.owns(user_id)
+    
+    async def restore(self, now: Optional[datetime] = None, max_call_duration: Optional[int] = None) -> Dict[str, int]:
+        """Repair in-flight calls and reload pending ones from the store"""
+        
+        if self.store is None:
+            return {"requeued": 0, "missed": 0, "loaded": 0}
+        
+        now = now or datetime.now(dt_timezone.utc)
+        repaired = await self.store.recover(now, max_call_duration or self.max_call_duration)
+        pending = await self.store.load_pending()
+        
+        for call_info in pending:
+            self.queue.push(call_info["call_id"], call_info["scheduled_at"], call_info)
+            self._slots[(call_info["user_id"], call_info["call_type"])] = call_info["call_id"]
+            if self.load_shaper is not None:
+                self.load_shaper.register(
+                    call_info["user_id"], call_info["call_type"], call_info["provider"],
+                    call_info["requested_time"], call_info["scheduled_time"], call_info["timezone"], now
+                )
+        
+        logger.info(
+            f"Restored {len(pending)} scheduled calls "
+            f"({repaired['requeued']} re-queued, {repaired['missed']} marked missed)"
+        )
+        return {**repaired, "loaded": len(pending)}
+    
+    async def recover(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Requeue calls whose claim lapsed and mark calls that outlived max_call_duration missed"""
+        
+        if self.store is None:
+            return {"requeued": 0, "missed": 0}
+        
+        repaired = await self.store.recover(now or datetime.now(dt_timezone.utc), self.max_call_duration)
+        if repaired["requeued"] or repaired["missed"]:
+            logger.info(f"Recovered calls: {repaired['requeued']} re-queued, {repaired['missed']} marked missed")
+        return repaired
+    
+    async def sweep(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Periodic upkeep run by the dispatcher.
+        
+        Calls whose session went idle past its TTL are closed: completed if
+        the user replied, missed if not. Then calls that outlived
+        max_call_duration without a session are marked missed and lapsed
+        claims are requeued.
+        """
+        
+        ended = []
+        if self.session_store is not None:
+            ended = await self.session_store.sweep()
+        for call_id, session in ended:
+            replied = any(role == "u" for role, _ in session["turns"])
+            await self.end_call(call_id, session, CallStatus.COMPLETED if replied else CallStatus.MISSED)
+        
+        return {**await self.recover(now), "ended": len(ended)}
+    
+    async def on_rebalance(self, report: Dict[str, Any]) -> None:
+        """Pick up calls left in flight on shards this node just took over"""
+        
+        if report["gained"]:
+            await self.recover()
     
     async def schedule_daily_calls(
         self,
         user_id: str,
         morning_time: str = "08:00",
         midday_time: str = "13:00",
-        evening_time: str = "20:00"
+        evening_time: str = "20:00",
+        timezone: str = "UTC",
+        provider: CallProvider = CallProvider.TELEGRAM,
+        now: Optional[datetime] = None
     ) -> List[Dict[str, Any]]:
         """Schedule daily calls for a user"""
         
-        calls = [
-            {
-                "user_id": user_id,
-                "call_type": CallType.MORNING,
-                "scheduled_time": morning_time,
-                "status": CallStatus.SCHEDULED
-            },
-            {
-                "user_id": user_id,
-                "call_type": CallType.MIDDAY,
-                "scheduled_time": midday_time,
-                "status": CallStatus.SCHEDULED
-            },
-            {
-                "user_id": user_id,
-                "call_type": CallType.EVENING,
-                "scheduled_time": evening_time,
-                "status": CallStatus.SCHEDULED
-            }
+        [result] = await self.schedule_daily_calls_bulk([{
+            "user_id": user_id,
+            "morning_time": morning_time,
+            "midday_time": midday_time,
+            "evening_time": evening_time,
+            "timezone": timezone,
+            "provider": provider
+        }], now)
+        
+        if isinstance(result, Exception):
+            raise result
+        return result
+    
+    async def schedule_daily_calls_bulk(
+        self,
+        entries: List[Dict[str, Any]],
+        now: Optional[datetime] = None
+    ) -> List[Union[List[Dict[str, Any]], Exception]]:
+        """
+        Schedule daily calls for many users with one store write.
+        
+        Returns one item per entry: the user's scheduled calls, or the error
+        that rejected that entry. Rejected entries leave existing calls
+        intact. When a user appears more than once the last entry wins, as
+        separate requests would. If the store write fails, every entry
+        reports that error and nothing is queued.
+        """
+        
+        results: List[Union[str, Exception]] = []
+        replaced: List[str] = []
+        scheduled: Dict[Tuple[str, CallType], Dict[str, Any]] = {}
+        
+        for entry in entries:
+            user_id = entry["user_id"]
+            timezone = entry.get("timezone", "UTC")
+            times = (
+                entry.get("morning_time", "08:00"),
+                entry.get("midday_time", "13:00"),
+                entry.get("evening_time", "20:00")
+            )
+            try:
+                for local_time in times:
+                    next_fire_time(local_time, timezone, now)
+            except ValueError as e:
+                results.append(e)
+                continue
+            
+            replaced.extend(
+                self._slots[(user_id, call_type)]
+                for call_type in self.DAILY_CALL_TYPES
+                if (user_id, call_type) in self._slots
+            )
+            for call_type, local_time in zip(self.DAILY_CALL_TYPES, times):
+                scheduled[(user_id, call_type)] = self._new_call(
+                    user_id, call_type, local_time, timezone,
+                    entry.get("provider", CallProvider.TELEGRAM), now
+                )
+            results.append(user_id)
+            logger.debug(f"Scheduled 3 daily calls for user {user_id} ({timezone})")
+        
+        if self.store is not None and scheduled:
+            try:
+                await self.store.replace_calls(replaced, list(scheduled.values()))
+            except Exception as e:
+                logger.error(f"Storing daily calls for {len(scheduled) // 3} users failed: {e}")
+                self._unshape(scheduled.values())
+                return [result if isinstance(result, Exception) else e for result in results]
+        
+        for call_info in scheduled.values():
+            self._enqueue(call_info)
+        
+        logger.info(f"Scheduled daily calls for {len(scheduled) // 3} users ({len(scheduled)} calls)")
+        
+        return [
+            result if isinstance(result, Exception)
+            else [scheduled[(result, call_type)] for call_type in self.DAILY_CALL_TYPES]
+            for result in results
         ]
+    
+    async def cancel_call(self, call_id: str) -> bool:
+        """Cancel a pending call"""
+        
+        call_info = self.queue.cancel(call_id)
+        if call_info is not None:
+            if self.prerenderer is not None:
+                self.prerenderer.discard(call_id)
+            slot = (call_info["user_id"], call_info["call_type"])
+            if self._slots.get(slot) == call_id:
+                del self._slots[slot]
+                if self.load_shaper is not None:
+                    self.load_shaper.release(*slot)
+        
+        deleted = False
+        if self.store is not None:
+            deleted = await self.store.delete_call(call_id)
+        
+        return call_info is not None or deleted
+    
+    def pop_due_calls(
+        self,
+        now: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        providers: Optional[List[CallProvider]] = None
+    ) -> List[Dict[str, Any]]:
+        """Remove every call that is due (on `providers`, if given) and queue the next daily occurrence"""
+        
+        now = now or datetime.now(dt_timezone.utc)
+        if providers is None:
+            due = self.queue.pop_due(now, limit)
+        else:
+            matching = sorted(
+                (call_info for call_info in self.queue.iter_due_before(now) if call_info["provider"] in providers),
+                key=lambda call_info: call_info["scheduled_at"]
+            )[:limit]
+            due = [self.queue.cancel(call_info["call_id"]) for call_info in matching]
+        
+        for call_info in due:
+            self._queue_next_occurrence(call_info, now)
+        
+        return due
+    
+    async def claim_due_calls(
+        self,
+        now: Optional[datetime] = None,
+        limit: int = 1000,
+        providers: Optional[List[CallProvider]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Take the next batch of due calls for execution.
+        
+        With a store the batch is claimed under a lease, so several
+        schedulers can share one database without double-dispatching.
+        With a shard coordinator only calls in this node's shards are claimed.
+        `providers` limits the batch to calls on those platforms.
+        """
+        
+        now = now or datetime.now(dt_timezone.utc)
+        if self.store is None:
+            return self.pop_due_calls(now, limit, providers)
+        
+        shards = None
+        if self.shard_coordinator is not None:
+            shards = self.shard_coordinator.owned_shards
+            if not shards:
+                return []
+        
+        claimed = await self.store.claim_due_batch(
+            now, limit, self.node_id, self.lease_seconds, shards=shards, providers=providers
+        )
+        
+        next_calls = []
+        for call_info in claimed:
+            self.queue.cancel(call_info["call_id"])
+            next_call = self._queue_next_occurrence(call_info, now)
+            if next_call is not None:
+                next_calls.append(next_call)
+        if next_calls:
+            inserted = set(await self.store.insert_calls(next_calls))
+            for next_call in next_calls:
+                # Otherwise another node already filled the slot and its call is the one that fires
+                if next_call["call_id"] in inserted:
+                    self._enqueue(next_call)
         
-        self.scheduled_calls.extend(calls)
-        logger.info(f"Scheduled 3 daily calls for user {user_id}")
+        # Local copies of calls another scheduler claimed are never popped here
+        self.queue.pop_due(now - timedelta(seconds=self.lease_seconds))
         
-        return calls
+        return claimed
+    
+    async def record_dispatched(self, call_info: Dict[str, Any]) -> None:
+        """Mark a call as handed to its provider"""
+        
+        if self.store is not None:
+            await self.store.mark_dispatched(call_info["call_id"], datetime.now(dt_timezone.utc))
+    
+    async def finish_call(self, call_id: str, status: CallStatus) -> None:
+        """Record a call's final status"""
+        
+        if self.store is not None:
+            await self.store.update_status(call_id, status, datetime.now(dt_timezone.utc))
+    
+    async def end_call(
+        self,
+        call_id: str,
+        session: Optional[Dict[str, Any]] = None,
+        status: CallStatus = CallStatus.COMPLETED
+    ) -> None:
+        """Close a live call: drop its session, fold its turns into memory and record the outcome"""
+        
+        if self.session_store is not None:
+            await self.session_store.delete(call_id)
+        if session is not None and self.memory is not None:
+            self.memory.end_session(session)
+        await self.finish_call(call_id, status)
+    
+    def _queue_next_occurrence(
+        self,
+        call_info: Dict[str, Any],
+        now: datetime
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Build tomorrow's occurrence of a daily call that just fired.
+        
+        Without a store it is queued right away. With a store the caller
+        queues it only once insert_calls reports it was stored, since
+        another node may already hold the slot.
+        """
+        
+        slot = (call_info["user_id"], call_info["call_type"])
+        if self._slots.get(slot) == call_info["call_id"]:
+            del self._slots[slot]
+        if call_info["call_type"] not in self.DAILY_CALL_TYPES:
+            return None
+        if self.store is None and slot in self._slots:
+            return None
+        
+        next_call = self._new_call(
+            call_info["user_id"],
+            call_info["call_type"],
+            call_info["requested_time"],
+            call_info["timezone"],
+            call_info["provider"],
+            now
+        )
+        if self.store is None:
+            self._enqueue(next_call)
+        return next_call
+    
+    def _new_call(
+        self,
+        user_id: str,
+        call_type: CallType,
+        local_time: str,
+        timezone: str,
+        provider: CallProvider,
+        now: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """Build the next occurrence of one call at its shaped time"""
+        
+        scheduled_time = local_time
+        if self.load_shaper is not None:
+            scheduled_time = self.load_shaper.shape(
+                user_id, call_type, provider, local_time, timezone, now
+            )
+        
+        return {
+            "call_id": uuid.uuid4().hex,
+            "user_id": user_id,
+            "call_type": call_type,
+            "requested_time": local_time,
+            "scheduled_time": scheduled_time,
+            "timezone": timezone,
+            "scheduled_at": next_fire_time(scheduled_time, timezone, now),
+            "provider": provider,
+            "status": CallStatus.SCHEDULED
+        }
+    
+    def _unshape(self, calls) -> None:
+        """Give back the load shaping of calls that were never stored"""
+        
+        if self.load_shaper is None:
+            return
+        for call_info in calls:
+            slot = (call_info["user_id"], call_info["call_type"])
+            self.load_shaper.release(*slot)
+            pending = self.queue.get(self._slots[slot]) if slot in self._slots else None
+            if pending is not None:
+                self.load_shaper.register(
+                    pending["user_id"], pending["call_type"], pending["provider"],
+                    pending["requested_time"], pending["scheduled_time"], pending["timezone"]
+                )
+    
+    def _enqueue(self, call_info: Dict[str, Any]) -> None:
+        """Put a call in the local queue, dropping any other pending call in its slot"""
+        
+        slot = (call_info["user_id"], call_info["call_type"])
+        previous_id = self._slots.get(slot)
+        if previous_id is not None:
+            self.queue.cancel(previous_id)
+            if self.prerenderer is not None:
+                self.prerenderer.discard(previous_id)
+        
+        self.queue.push(call_info["call_id"], call_info["scheduled_at"], call_info)
+        self._slots[slot] = call_info["call_id"]
     
     async def execute_call(self, call_info: Dict[str, Any]) -> Dict[str, Any]:
         """Execute a scheduled call"""
         
-        # TODO: Implement call execution logic
-        # 1. Get user preferences and context
-        # 2. Generate personalized message
-        # 3. Choose appropriate call service
-        # 4. Initiate call
-        # 5. Track call status
+        # TODO: Get user preferences and context
         
         logger.info(f"Executing {call_info['call_type'].value} call for user {call_info['user_id']}")
         
+        rendered = None
+        prerendered = False
+        if self.prerenderer is not None:
+            rendered = await self.prerenderer.take(call_info["call_id"])
+            prerendered = rendered is not None
+            if rendered is None:
+                rendered = await self.prerenderer.render(call_info)
+        
+        service = self.call_services.get(call_info["provider"])
+        if service is None:
+            logger.warning(f"No call service configured for {call_info['provider'].value}")
+            return {
+                "call_executed": False,
+                "call_id": call_info["call_id"],
+                "user_id": call_info["user_id"],
+                "prerendered": prerendered
+            }
+        
+        result = await service.initiate_call(
+            user_phone=call_info.get("contact") or call_info["user_id"],
+            message=rendered["message"] if rendered else "",
+            call_type=call_info["call_type"],
+            audio_data=rendered["audio"] if rendered else None
+        )
+        
+        if self.session_store is not None:
+            personality = getattr(getattr(self.prerenderer, "ai_engine", None), "personality", None)
+            summary = await self.memory.summary(call_info["user_id"]) if self.memory is not None else ""
+            await self.session_store.set(call_info["call_id"], new_session_state(
+                user_id=call_info["user_id"],
+                call_type=call_info["call_type"].value,
+                provider=call_info["provider"].value,
+                personality=personality.value if personality else "motivator",
+                provider_call_id=result.get("call_id"),
+                opening_message=rendered["message"] if rendered else "",
+                summary=summary
+            ))
+        
         return {
             "call_executed": True,
-            "call_id": f"exec_{datetime.now().timestamp()}",
-            "user_id": call_info['user_id']
+            "call_id": call_info["call_id"],
+            "provider_call_id": result.get("call_id"),
+            "user_id": call_info["user_id"],
+            "prerendered": prerendered
         }
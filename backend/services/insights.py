@@ -0,0 +1,91 @@
+"""
+Nightly insights for DisciplineCall.ai
+Analyzes every user's metrics in one batch and writes the narratives out
+"""
+
+from typing import Dict, Any, List, Optional
+from datetime import date, datetime, timedelta, timezone
+import argparse
+import asyncio
+import json
+import logging
+import sys
+
+from backend.core.metrics_analysis import TREND_DAYS, build_insights, plain_narrative
+
+logger = logging.getLogger(__name__)
+
+
+async def run_insights(
+    store,
+    engine=None,
+    today: Optional[date] = None,
+    max_concurrency: int = 8
+) -> List[Dict[str, Any]]:
+    """
+    Insights for all users with metrics in the last TREND_DAYS.
+
+    Without an engine every narrative is plain text, which is enough for
+    dashboards and costs no inference.
+    """
+
+    today = today or datetime.now(timezone.utc).date()
+    columns = await store.load_metrics((today - timedelta(days=TREND_DAYS - 1)).isoformat())
+    logger.info(f"Loaded {len(columns['user_id'])} metric rows for insights")
+
+    if engine is not None:
+        return await engine.analyze_metrics_batch(columns, today, max_concurrency)
+
+    insights = await asyncio.to_thread(build_insights, columns, today)
+    for insight in insights:
+        insight["narrative"] = plain_narrative(insight)
+    return insights
+
+
+async def run(database_url: str, use_model: bool, max_concurrency: int, output) -> int:
+    from backend.services.schedule_store import ScheduleStoreFactory
+
+    store = ScheduleStoreFactory.create_store(database_url)
+    await store.initialize()
+    engine_pool = None
+    try:
+        engine = None
+        if use_model:
+            from backend.core.ai_engine import EnginePool
+            from config.settings import settings
+
+            engine_pool = EnginePool.from_settings(settings)
+            engine = engine_pool.get()
+
+        insights = await run_insights(store, engine, max_concurrency=max_concurrency)
+        for insight in insights:
+            output.write(json.dumps(insight) + "\n")
+        return len(insights)
+    finally:
+        if engine_pool is not None:
+            await engine_pool.close()
+        await store.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Nightly metrics insights (one JSON line per user)")
+    parser.add_argument("command", choices=["run"])
+    parser.add_argument("--database-url", help="defaults to the configured database_url")
+    parser.add_argument("--no-model", action="store_true", help="plain-text narratives only")
+    parser.add_argument("--max-concurrency", type=int, help="defaults to insights_narrative_concurrency")
+    args = parser.parse_args(argv)
+
+    database_url = args.database_url
+    max_concurrency = args.max_concurrency
+    if database_url is None or max_concurrency is None:
+        from config.settings import settings
+        database_url = database_url or settings.database_url
+        max_concurrency = max_concurrency or settings.insights_narrative_concurrency
+
+    logging.basicConfig(level=logging.INFO)
+    analyzed = asyncio.run(run(database_url, not args.no_model, max_concurrency, sys.stdout))
+    logger.info(f"Wrote insights for {analyzed} users")
+
+
+if __name__ == "__main__":
+    main()
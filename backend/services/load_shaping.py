@@ -0,0 +1,180 @@
+"""
+Load shaping for DisciplineCall.ai
+Spreads call times inside a per-user tolerance window so no provider minute
+exceeds its capacity
+"""
+
+from typing import Dict, Any, Optional, Tuple
+from datetime import datetime, timedelta
+import hashlib
+import logging
+
+from backend.services.schedule_engine import next_fire_time, parse_call_time
+
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+
+
+class LoadShaper:
+    """
+    Assigns each (user, call type) a stable minute near its requested time.
+
+    Buckets are UTC minutes of the day per provider, each capped at the
+    provider's per-minute capacity. A user's first choice is a deterministic
+    offset derived from a hash of the user and call type, so slots spread
+    evenly and come out the same on every day and every restart. When that
+    minute is full the nearest free minute inside the window is used, and
+    only when the whole window is full does a bucket exceed its target.
+    """
+
+    def __init__(
+        self,
+        capacity_per_minute: Dict[Any, int],
+        tolerance_minutes: int = 10,
+        default_capacity: Optional[int] = None
+    ):
+        """
+        Args:
+            capacity_per_minute: Target calls per minute, keyed by provider
+            tolerance_minutes: Maximum shift either side of the requested time
+            default_capacity: Capacity for providers missing from the map
+                (unlimited when None)
+        """
+        if tolerance_minutes < 0:
+            raise ValueError("tolerance_minutes must be non-negative")
+
+        self.capacity_per_minute = capacity_per_minute
+        self.tolerance_minutes = tolerance_minutes
+        self.default_capacity = default_capacity
+        self._load: Dict[Tuple[Any, int], int] = {}
+        self._assignments: Dict[Tuple[str, Any], Tuple[Any, int, int]] = {}
+
+    @classmethod
+    def from_settings(cls, settings) -> "LoadShaper":
+        """Capacity model derived from provider send rates"""
+
+        from backend.services.call_service import CallProvider
+
+        def per_minute(rate: float) -> int:
+            return max(1, int(rate * 60 * settings.load_shaping_utilization))
+
+        return cls(
+            capacity_per_minute={
+                CallProvider.TWILIO: per_minute(settings.twilio_calls_per_second),
+                CallProvider.TELEGRAM: per_minute(settings.telegram_messages_per_second),
+                CallProvider.WHATSAPP: per_minute(settings.whatsapp_messages_per_second)
+            },
+            tolerance_minutes=settings.call_time_tolerance_minutes
+        )
+
+    def shape(
+        self,
+        user_id: str,
+        call_type: Any,
+        provider: Any,
+        local_time: str,
+        tz_name: str = "UTC",
+        now: Optional[datetime] = None
+    ) -> str:
+        """Return the shaped local "HH:MM" for a requested local call time"""
+
+        requested_at = next_fire_time(local_time, tz_name, now)
+        requested_minute = requested_at.hour * 60 + requested_at.minute
+
+        key = (user_id, call_type)
+        current = self._assignments.get(key)
+        if current is not None and current[:2] == (provider, requested_minute):
+            offset = current[2]
+        else:
+            self.release(user_id, call_type)
+            offset = self._pick_offset(key, provider, requested_minute)
+            slot = (provider, (requested_minute + offset) % MINUTES_PER_DAY)
+            self._load[slot] = self._load.get(slot, 0) + 1
+            self._assignments[key] = (provider, requested_minute, offset)
+
+        base = parse_call_time(local_time)
+        shaped = datetime(2000, 1, 1, base.hour, base.minute) + timedelta(minutes=offset)
+        return shaped.strftime("%H:%M")
+
+    def register(
+        self,
+        user_id: str,
+        call_type: Any,
+        provider: Any,
+        local_time: str,
+        scheduled_time: str,
+        tz_name: str = "UTC",
+        now: Optional[datetime] = None
+    ) -> None:
+        """Count a call that was already shaped to `scheduled_time`, e.g. one reloaded from the store"""
+
+        requested_at = next_fire_time(local_time, tz_name, now)
+        requested_minute = requested_at.hour * 60 + requested_at.minute
+
+        requested, scheduled = parse_call_time(local_time), parse_call_time(scheduled_time)
+        offset = (scheduled.hour - requested.hour) * 60 + scheduled.minute - requested.minute
+        # Shaping can cross midnight, e.g. 23:55 shifted to 00:03
+        offset = (offset + MINUTES_PER_DAY // 2) % MINUTES_PER_DAY - MINUTES_PER_DAY // 2
+
+        self.release(user_id, call_type)
+        slot = (provider, (requested_minute + offset) % MINUTES_PER_DAY)
+        self._load[slot] = self._load.get(slot, 0) + 1
+        self._assignments[(user_id, call_type)] = (provider, requested_minute, offset)
+
+    def release(self, user_id: str, call_type: Any) -> None:
+        """Free the slot held by a (user, call type)"""
+
+        current = self._assignments.pop((user_id, call_type), None)
+        if current is None:
+            return
+        provider, requested_minute, offset = current
+        slot = (provider, (requested_minute + offset) % MINUTES_PER_DAY)
+        remaining = self._load.get(slot, 0) - 1
+        if remaining > 0:
+            self._load[slot] = remaining
+        else:
+            self._load.pop(slot, None)
+
+    def load_profile(self, provider: Any) -> Dict[int, int]:
+        """Assigned calls per UTC minute of day for one provider"""
+
+        return {minute: count for (p, minute), count in self._load.items() if p == provider}
+
+    def peak_load(self, provider: Any) -> int:
+        """Busiest minute for one provider"""
+
+        return max(self.load_profile(provider).values(), default=0)
+
+    def _capacity(self, provider: Any) -> Optional[int]:
+        return self.capacity_per_minute.get(provider, self.default_capacity)
+
+    def _preferred_offset(self, key: Tuple[str, Any]) -> int:
+        if self.tolerance_minutes == 0:
+            return 0
+        call_type = getattr(key[1], "value", key[1])
+        digest = hashlib.blake2b(f"{key[0]}:{call_type}".encode(), digest_size=8).digest()
+        span = 2 * self.tolerance_minutes + 1
+        return int.from_bytes(digest, "big") % span - self.tolerance_minutes
+
+    def _pick_offset(self, key: Tuple[str, Any], provider: Any, requested_minute: int) -> int:
+        capacity = self._capacity(provider)
+        preferred = self._preferred_offset(key)
+        if capacity is None:
+            return preferred
+
+        window = range(-self.tolerance_minutes, self.tolerance_minutes + 1)
+        candidates = sorted(window, key=lambda offset: (abs(offset - preferred), offset))
+
+        def load(offset: int) -> int:
+            return self._load.get((provider, (requested_minute + offset) % MINUTES_PER_DAY), 0)
+
+        for offset in candidates:
+            if load(offset) < capacity:
+                return offset
+
+        logger.warning(
+            f"Load shaping window full for {getattr(provider, 'value', provider)} "
+            f"around minute {requested_minute}; exceeding target rate"
+        )
+        return min(candidates, key=load)
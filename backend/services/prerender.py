@@ -0,0 +1,158 @@
+"""
+Call pre-rendering for DisciplineCall.ai
+Generates and synthesizes scheduled call messages ahead of their fire time
+"""
+
+from typing import Dict, Any, Optional, List
+from datetime import datetime, timedelta, timezone
+import asyncio
+import logging
+
+from backend.core.ai_engine import BaseAIEngine
+from backend.core.memory import ConversationMemory
+from backend.core.voice_engine import BaseVoiceEngine, VoiceStyle, VOICE_PRESETS
+
+logger = logging.getLogger(__name__)
+
+
+class CallPrerenderer:
+    """
+    Runs the AI + TTS pipeline for upcoming calls ahead of time.
+
+    Calls due within `lead_time_minutes` are rendered in the background and
+    held until dispatch takes them. A call that fires while its pre-render
+    is still running waits up to `take_timeout` seconds for it; the same
+    `render` path is used inline only when there was no pre-render or it
+    failed or timed out.
+    """
+
+    def __init__(
+        self,
+        ai_engine: BaseAIEngine,
+        voice_engine: BaseVoiceEngine,
+        lead_time_minutes: int = 10,
+        max_concurrency: int = 20,
+        memory: Optional[ConversationMemory] = None,
+        take_timeout: float = 10.0
+    ):
+        self.ai_engine = ai_engine
+        self.memory = memory
+        self.voice_engine = voice_engine
+        self.lead_time = timedelta(minutes=lead_time_minutes)
+        self.max_concurrency = max_concurrency
+        self.take_timeout = take_timeout
+        self._rendered: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def render(self, call_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate the call message and its audio"""
+
+        call_type = call_info["call_type"].value
+        context = {
+            "user_id": call_info["user_id"],
+            "scheduled_time": call_info.get("scheduled_time"),
+            "timezone": call_info.get("timezone", "UTC")
+        }
+        if self.memory is not None:
+            context["summary"] = await self.memory.summary(call_info["user_id"])
+
+        message = await self.ai_engine.generate_response("", context, call_type)
+
+        preset = VOICE_PRESETS.get(self.ai_engine.personality.value, {})
+        audio = await self.voice_engine.text_to_speech(
+            message,
+            voice_id=preset.get("elevenlabs_voice_id"),
+            voice_style=preset.get("style", VoiceStyle.FRIENDLY)
+        )
+
+        return {
+            "message": message,
+            "audio": audio,
+            "scheduled_at": call_info.get("scheduled_at"),
+            "rendered_at": datetime.now(timezone.utc)
+        }
+
+    def schedule_upcoming(self, scheduler, now: Optional[datetime] = None) -> int:
+        """Start background renders for calls due within the lead time"""
+
+        now = now or datetime.now(timezone.utc)
+        upcoming = [
+            call_info for call_info in scheduler.queue.iter_due_before(now + self.lead_time)
+            if call_info["call_id"] not in self._rendered
+            and call_info["call_id"] not in self._pending
+            and scheduler.owns(call_info["user_id"])
+        ]
+
+        for call_info in upcoming:
+            task = asyncio.create_task(self._render_ahead(call_info))
+            self._pending[call_info["call_id"]] = task
+
+        self._prune(now)
+        return len(upcoming)
+
+    async def take(self, call_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Hand over a render for dispatch.
+
+        A render still in flight is awaited for up to `take_timeout`
+        seconds. Returns None when there is no render, or it failed or
+        timed out; the caller then renders inline.
+        """
+
+        task = self._pending.get(call_id)
+        if task is not None:
+            try:
+                # wait_for cancels the render if it misses the deadline
+                await asyncio.wait_for(task, self.take_timeout)
+            except asyncio.TimeoutError:
+                logger.info(f"Pre-render for call {call_id} missed its {self.take_timeout}s deadline, rendering inline")
+                return None
+        return self._rendered.pop(call_id, None)
+
+    def discard(self, call_id: str) -> None:
+        """Forget a call that was cancelled or rescheduled"""
+
+        task = self._pending.pop(call_id, None)
+        if task is not None:
+            task.cancel()
+        self._rendered.pop(call_id, None)
+
+    async def run_forever(self, scheduler, poll_interval: float = 30.0) -> None:
+        """Keep the pre-render window filled until cancelled"""
+
+        logger.info(f"Call pre-renderer started (lead time {self.lead_time})")
+        try:
+            while True:
+                try:
+                    self.schedule_upcoming(scheduler)
+                except Exception as e:
+                    logger.error(f"Pre-render cycle failed: {e}")
+                await asyncio.sleep(poll_interval)
+        finally:
+            for task in self._pending.values():
+                task.cancel()
+            self._pending.clear()
+
+    async def _render_ahead(self, call_info: Dict[str, Any]) -> None:
+        call_id = call_info["call_id"]
+        try:
+            async with self._semaphore:
+                self._rendered[call_id] = await self.render(call_info)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Pre-render failed for call {call_id}: {e}")
+        finally:
+            self._pending.pop(call_id, None)
+
+    def _prune(self, now: datetime) -> None:
+        """Drop renders that were never dispatched"""
+
+        cutoff = now - self.lead_time
+        stale: List[str] = [
+            call_id for call_id, rendered in self._rendered.items()
+            if rendered["scheduled_at"] is not None and rendered["scheduled_at"] < cutoff
+        ]
+        for call_id in stale:
+            del self._rendered[call_id]
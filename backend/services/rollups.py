@@ -0,0 +1,196 @@
+"""
+Call analytics rollups for DisciplineCall.ai
+Bucketing for incrementally maintained per-user counters, the analytics
+built from them, and a rebuild command for backfills
+
+    python -m backend.services.rollups rebuild [--database-url URL]
+"""
+
+from typing import Dict, Any, Optional, List, Tuple
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+import argparse
+import asyncio
+import logging
+import statistics
+
+logger = logging.getLogger(__name__)
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+RECENT_DAYS = 30
+MIN_CORRELATION_DAYS = 7
+
+
+def local_time(moment: datetime, tz_name: Optional[str] = "UTC") -> datetime:
+    """`moment` in the user's timezone; unknown zones fall back to the moment as given"""
+
+    try:
+        return moment.astimezone(ZoneInfo(tz_name or "UTC"))
+    except (KeyError, ValueError):
+        return moment
+
+
+def rollup_buckets(call_type: str, scheduled_at: datetime, tz_name: str = "UTC") -> List[Tuple[str, str]]:
+    """(dimension, bucket) keys a finished call counts towards, in the user's local time"""
+
+    local = local_time(scheduled_at, tz_name)
+    return [
+        ("day", local.date().isoformat()),
+        ("call_type", call_type),
+        ("weekday", str(local.weekday()))
+    ]
+
+
+def completion_rate(row: Dict[str, Any]) -> float:
+    return round(row["completed"] / row["total"], 4) if row["total"] else 0.0
+
+
+def current_streak(recent_days: List[Dict[str, Any]], today: date) -> int:
+    """Consecutive days ending today (or yesterday) with at least one completed call"""
+
+    completed_days = {row["bucket"] for row in recent_days if row["completed"] > 0}
+    day = today if today.isoformat() in completed_days else today - timedelta(days=1)
+    streak = 0
+    while day.isoformat() in completed_days:
+        streak += 1
+        day -= timedelta(days=1)
+    return streak
+
+
+def productivity_correlation(
+    recent_days: List[Dict[str, Any]],
+    metrics: Dict[str, List[Any]]
+) -> Tuple[Optional[str], float]:
+    """
+    The tracked metric that moves most with daily call completion.
+
+    Pearson r between each day's completion rate and the metric's value on
+    the same day, over days that have both; metrics with fewer than
+    MIN_CORRELATION_DAYS such days are skipped. Returns (metric, r), or
+    (None, 0.0) when nothing qualifies.
+    """
+
+    rates = {row["bucket"]: completion_rate(row) for row in recent_days if row["total"] > 0}
+    by_metric: Dict[str, Dict[str, float]] = {}
+    for day, metric_type, value in zip(metrics["date"], metrics["metric_type"], metrics["value"]):
+        if day in rates:
+            by_metric.setdefault(metric_type, {})[day] = value
+
+    best: Tuple[Optional[str], float] = (None, 0.0)
+    for metric_type, values in sorted(by_metric.items()):
+        if len(values) < MIN_CORRELATION_DAYS:
+            continue
+        days = sorted(values)
+        try:
+            r = statistics.correlation([rates[day] for day in days], [values[day] for day in days])
+        except statistics.StatisticsError:
+            # One side never changed
+            continue
+        if abs(r) > abs(best[1]):
+            best = (metric_type, round(r, 3))
+    return best
+
+
+def build_analytics(
+    stats: Dict[str, Any],
+    by_call_type: List[Dict[str, Any]],
+    by_weekday: List[Dict[str, Any]],
+    recent_days: List[Dict[str, Any]],
+    today: date,
+    metrics: Optional[Dict[str, List[Any]]] = None
+) -> Dict[str, Any]:
+    """Analytics payload from rollup rows; cost depends only on the number of buckets"""
+
+    def best(rows: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        rows = [row for row in rows if row["total"] > 0]
+        return max(rows, key=lambda row: (completion_rate(row), row["total"])) if rows else None
+
+    best_type = best(by_call_type)
+    best_day = best(by_weekday)
+    recent = {
+        "total": sum(row["total"] for row in recent_days),
+        "completed": sum(row["completed"] for row in recent_days)
+    }
+    recent["completion_rate"] = completion_rate(recent)
+    correlated_metric, correlation = productivity_correlation(
+        recent_days, metrics or {"date": [], "metric_type": [], "value": []}
+    )
+
+    analytics = {
+        "total_calls": stats["total_calls"],
+        "completion_rate": stats["success_rate"],
+        "best_call_time": best_type["bucket"] if best_type else None,
+        "best_weekday": WEEKDAYS[int(best_day["bucket"])] if best_day else None,
+        "productivity_correlation": correlation,
+        "correlated_metric": correlated_metric,
+        "habit_strength": {row["bucket"]: completion_rate(row) for row in by_call_type},
+        "current_streak_days": current_streak(recent_days, today),
+        f"last_{RECENT_DAYS}_days": recent
+    }
+
+    insights = []
+    if best_type:
+        insights.append(f"You respond best to {best_type['bucket']} calls")
+    if best_day:
+        insights.append(f"{analytics['best_weekday']} calls have highest completion rate")
+    if abs(correlation) >= 0.5:
+        relation = "better" if correlation > 0 else "worse"
+        insights.append(f"Your {correlated_metric} is {relation} on days you complete your calls")
+    if analytics["current_streak_days"] >= 3:
+        insights.append(f"{analytics['current_streak_days']}-day streak - keep it going!")
+
+    return {"analytics": analytics, "insights": insights}
+
+
+async def load_analytics(store, user_id: str, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Read the bounded set of rollup rows for a user and build analytics.
+
+    Day buckets are the user's local days, so "today" is taken in the
+    timezone of their latest call.
+    """
+
+    now = now or datetime.now(timezone.utc)
+    latest = await store.list_calls(user_id, 1)
+    today = local_time(now, latest[0]["timezone"] if latest else "UTC").date()
+
+    since = (today - timedelta(days=RECENT_DAYS - 1)).isoformat()
+    stats, by_call_type, by_weekday, recent_days, metrics = await asyncio.gather(
+        store.get_user_stats(user_id),
+        store.get_rollups(user_id, "call_type"),
+        store.get_rollups(user_id, "weekday"),
+        store.get_rollups(user_id, "day", since),
+        store.load_metrics(since, user_id)
+    )
+    return build_analytics(stats, by_call_type, by_weekday, recent_days, today, metrics)
+
+
+async def rebuild(database_url: str) -> int:
+    from backend.services.schedule_store import ScheduleStoreFactory
+
+    store = ScheduleStoreFactory.create_store(database_url)
+    await store.initialize()
+    try:
+        return await store.rebuild_rollups()
+    finally:
+        await store.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Call analytics rollup maintenance")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--database-url", help="defaults to the configured database_url")
+    args = parser.parse_args(argv)
+
+    database_url = args.database_url
+    if database_url is None:
+        from config.settings import settings
+        database_url = settings.database_url
+
+    logging.basicConfig(level=logging.INFO)
+    counted = asyncio.run(rebuild(database_url))
+    logger.info(f"Rebuilt call rollups from {counted} finished calls")
+
+
+if __name__ == "__main__":
+    main()
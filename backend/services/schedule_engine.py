@@ -0,0 +1,172 @@
+"""
+Schedule engine for DisciplineCall.ai
+Indexed dispatch queue keyed by the next UTC fire time of each call
+"""
+
+from typing import Dict, Any, Optional, List, Iterator, Tuple
+from datetime import datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import heapq
+import itertools
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def parse_call_time(value: str) -> time:
+    """Parse a local "HH:MM" call time"""
+
+    try:
+        hour, minute = value.split(":")
+        return time(int(hour), int(minute))
+    except ValueError:
+        raise ValueError(f"Invalid call time (expected HH:MM): {value}")
+
+
+def get_timezone(tz_name: str) -> ZoneInfo:
+    """Resolve an IANA timezone name"""
+
+    try:
+        return ZoneInfo(tz_name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone: {tz_name}")
+
+
+def next_fire_time(
+    local_time: str,
+    tz_name: str = "UTC",
+    now: Optional[datetime] = None
+) -> datetime:
+    """Next UTC instant at which `local_time` occurs in the user's timezone"""
+
+    tz = get_timezone(tz_name)
+    at = parse_call_time(local_time)
+    now = now or datetime.now(timezone.utc)
+
+    local_day = now.astimezone(tz).date()
+    for offset in range(3):
+        candidate = datetime.combine(local_day + timedelta(days=offset), at, tzinfo=tz)
+        fire_at = candidate.astimezone(timezone.utc)
+        if fire_at > now:
+            return fire_at
+
+    raise ValueError(f"Could not resolve next fire time for {local_time} {tz_name}")
+
+
+class DispatchQueue:
+    """
+    Min-heap of scheduled calls ordered by UTC fire time.
+
+    Insert is O(log n). Cancel is O(1): the entry is dropped from the index
+    and its heap node is skipped lazily when it reaches the top. The heap is
+    compacted once stale nodes outnumber live ones, so memory stays O(n).
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, str]] = []
+        self._entries: Dict[str, Tuple[float, int, Dict[str, Any]]] = {}
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, call_id: str) -> bool:
+        return call_id in self._entries
+
+    def push(self, call_id: str, fire_at: datetime, payload: Dict[str, Any]) -> None:
+        """Insert or reschedule a call"""
+
+        if call_id in self._entries:
+            self.cancel(call_id)
+
+        timestamp = fire_at.timestamp()
+        seq = next(self._sequence)
+        self._entries[call_id] = (timestamp, seq, payload)
+        heapq.heappush(self._heap, (timestamp, seq, call_id))
+
+    def cancel(self, call_id: str) -> Optional[Dict[str, Any]]:
+        """Remove a call, returning its payload if it was scheduled"""
+
+        entry = self._entries.pop(call_id, None)
+        if entry is None:
+            return None
+
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._compact()
+        return entry[2]
+
+    def get(self, call_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a scheduled call by id"""
+
+        entry = self._entries.get(call_id)
+        return entry[2] if entry else None
+
+    def peek_time(self) -> Optional[datetime]:
+        """Fire time of the earliest live call"""
+
+        self._drop_stale_head()
+        if not self._heap:
+            return None
+        return datetime.fromtimestamp(self._heap[0][0], tz=timezone.utc)
+
+    def pop_due(self, now: Optional[datetime] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Remove and return every call due at or before `now`, earliest first"""
+
+        cutoff = (now or datetime.now(timezone.utc)).timestamp()
+        due: List[Dict[str, Any]] = []
+
+        while self._heap and (limit is None or len(due) < limit):
+            timestamp, seq, call_id = self._heap[0]
+            if timestamp > cutoff:
+                break
+            heapq.heappop(self._heap)
+            entry = self._entries.get(call_id)
+            if entry is None or entry[1] != seq:
+                continue
+            del self._entries[call_id]
+            due.append(entry[2])
+
+        return due
+
+    def iter_due_before(self, horizon: datetime) -> Iterator[Dict[str, Any]]:
+        """
+        Yield live calls due at or before `horizon` without removing them.
+
+        Walks only the heap nodes above the cutoff, so the cost is
+        proportional to the number of matches rather than the queue size.
+        Order is not guaranteed and the queue must not be mutated while
+        iterating.
+        """
+
+        cutoff = horizon.timestamp()
+        heap = self._heap
+        stack = [0] if heap else []
+
+        while stack:
+            index = stack.pop()
+            timestamp, seq, call_id = heap[index]
+            if timestamp > cutoff:
+                continue
+            entry = self._entries.get(call_id)
+            if entry is not None and entry[1] == seq:
+                yield entry[2]
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    stack.append(child)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """All live calls ordered by fire time"""
+
+        return [entry[2] for entry in sorted(self._entries.values(), key=lambda e: (e[0], e[1]))]
+
+    def _drop_stale_head(self) -> None:
+        while self._heap:
+            _, seq, call_id = self._heap[0]
+            entry = self._entries.get(call_id)
+            if entry is not None and entry[1] == seq:
+                return
+            heapq.heappop(self._heap)
+
+    def _compact(self) -> None:
+        self._heap = [(ts, seq, call_id) for call_id, (ts, seq, _) in self._entries.items()]
+        heapq.heapify(self._heap)
@@ -0,0 +1,1034 @@
+"""
+Schedule store for DisciplineCall.ai
+Durable `calls` table with lease-based claiming (SQLite locally, Postgres in cloud)
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Optional, List, Sequence, Tuple
+from datetime import datetime, timedelta, timezone
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import uuid
+
+from backend.services.call_service import CallProvider, CallType, CallStatus
+from backend.services.rollups import rollup_buckets
+from backend.services.sharding import shard_for
+
+logger = logging.getLogger(__name__)
+
+
+CALL_COLUMNS = (
+    "id", "user_id", "call_type", "status", "platform", "scheduled_at", "completed_at",
+    "requested_time", "scheduled_time", "timezone",
+    "lease_owner", "lease_expires_at", "dispatched_at", "attempts"
+)
+
+
+TERMINAL_STATUSES = (CallStatus.COMPLETED, CallStatus.MISSED, CallStatus.FAILED)
+
+# At most one fresh scheduled call per (user, call type) across every node. Calls
+# requeued after a lapsed lease have attempts > 0, so they can wait beside the
+# next occurrence that was queued when they were first claimed.
+SLOT_DEDUPE = """
+    DELETE FROM calls WHERE id IN (
+        SELECT id FROM (
+            SELECT id, ROW_NUMBER() OVER (
+                PARTITION BY user_id, call_type ORDER BY scheduled_at, id
+            ) AS position
+            FROM calls WHERE status = 'scheduled' AND attempts = 0
+        ) ranked WHERE position > 1
+    )
+"""
+
+SLOT_INDEX = """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_calls_scheduled_slot ON calls (user_id, call_type)
+    WHERE status = 'scheduled' AND attempts = 0
+"""
+
+STATS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS user_call_stats (
+        user_id TEXT PRIMARY KEY,
+        total INTEGER NOT NULL DEFAULT 0,
+        completed INTEGER NOT NULL DEFAULT 0,
+        missed INTEGER NOT NULL DEFAULT 0,
+        failed INTEGER NOT NULL DEFAULT 0
+    );
+"""
+
+STATS_UPSERT = """
+    INSERT INTO user_call_stats (user_id, total, completed, missed, failed)
+    VALUES ({placeholders})
+    ON CONFLICT (user_id) DO UPDATE SET
+        total = user_call_stats.total + excluded.total,
+        completed = user_call_stats.completed + excluded.completed,
+        missed = user_call_stats.missed + excluded.missed,
+        failed = user_call_stats.failed + excluded.failed
+"""
+
+
+ROLLUPS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS call_rollups (
+        user_id TEXT NOT NULL,
+        dimension TEXT NOT NULL,
+        bucket TEXT NOT NULL,
+        total INTEGER NOT NULL DEFAULT 0,
+        completed INTEGER NOT NULL DEFAULT 0,
+        missed INTEGER NOT NULL DEFAULT 0,
+        failed INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, dimension, bucket)
+    );
+"""
+
+ROLLUPS_UPSERT = """
+    INSERT INTO call_rollups (user_id, dimension, bucket, total, completed, missed, failed)
+    VALUES ({placeholders})
+    ON CONFLICT (user_id, dimension, bucket) DO UPDATE SET
+        total = call_rollups.total + excluded.total,
+        completed = call_rollups.completed + excluded.completed,
+        missed = call_rollups.missed + excluded.missed,
+        failed = call_rollups.failed + excluded.failed
+"""
+
+OUTCOME_COLUMNS = ("user_id", "status", "call_type", "scheduled_at", "timezone")
+
+
+# Rolling conversation summary per user, written by ConversationMemory
+SUMMARIES_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS user_summaries (
+        user_id TEXT PRIMARY KEY,
+        summary TEXT NOT NULL
+    );
+"""
+
+SUMMARY_UPSERT = """
+    INSERT INTO user_summaries (user_id, summary) VALUES ({placeholders})
+    ON CONFLICT (user_id) DO UPDATE SET summary = excluded.summary
+"""
+
+
+# One value per user, metric and day; `date` is an ISO day string so both backends sort it alike
+METRICS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS metrics (
+        user_id TEXT NOT NULL,
+        date TEXT NOT NULL,
+        metric_type TEXT NOT NULL,
+        value DOUBLE PRECISION NOT NULL,
+        source TEXT NOT NULL DEFAULT 'call',
+        PRIMARY KEY (user_id, metric_type, date)
+    );
+    CREATE INDEX IF NOT EXISTS idx_metrics_date ON metrics (date);
+"""
+
+METRICS_UPSERT = """
+    INSERT INTO metrics (user_id, date, metric_type, value, source)
+    VALUES ({placeholders})
+    ON CONFLICT (user_id, metric_type, date) DO UPDATE SET
+        value = excluded.value,
+        source = excluded.source
+"""
+
+METRIC_COLUMNS = ("user_id", "date", "metric_type", "value")
+
+
+def metric_rows(metrics: Sequence[Dict[str, Any]]) -> List[tuple]:
+    return [
+        (m["user_id"], str(m["date"])[:10], m["metric_type"], float(m["value"]), m.get("source", "call"))
+        for m in metrics
+    ]
+
+
+def metric_columns(rows: Sequence[Sequence[Any]]) -> Dict[str, List[Any]]:
+    """Transpose metric rows into the column lists the vectorized analysis loads"""
+
+    columns = list(zip(*rows)) if rows else [()] * len(METRIC_COLUMNS)
+    return {name: list(values) for name, values in zip(METRIC_COLUMNS, columns)}
+
+
+def outcome_deltas(outcomes: Sequence[Dict[str, Any]]) -> Tuple[List[tuple], List[tuple]]:
+    """
+    Collapse terminal call outcomes into counter increments.
+
+    Returns (user_call_stats rows, call_rollups rows), each already summed
+    per key so one upsert per key is enough.
+    """
+
+    status_index = {
+        CallStatus.COMPLETED.value: 1,
+        CallStatus.MISSED.value: 2,
+        CallStatus.FAILED.value: 3
+    }
+    stats: Dict[str, List[int]] = {}
+    rollups: Dict[Tuple[str, str, str], List[int]] = {}
+
+    for outcome in outcomes:
+        index = status_index.get(outcome["status"])
+        if index is None:
+            continue
+        keys = [stats.setdefault(outcome["user_id"], [0, 0, 0, 0])]
+        for dimension, bucket in rollup_buckets(
+            outcome["call_type"], outcome["scheduled_at"], outcome["timezone"]
+        ):
+            keys.append(rollups.setdefault((outcome["user_id"], dimension, bucket), [0, 0, 0, 0]))
+        for counts in keys:
+            counts[0] += 1
+            counts[index] += 1
+
+    return (
+        [(user_id, *counts) for user_id, counts in stats.items()],
+        [(*key, *counts) for key, counts in rollups.items()]
+    )
+
+
+def stats_from_row(row: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Shape a user_call_stats row for the API"""
+
+    row = dict(row) if row else {}
+    total = row.get("total", 0)
+    completed = row.get("completed", 0)
+    return {
+        "total_calls": total,
+        "completed": completed,
+        "missed": row.get("missed", 0),
+        "failed": row.get("failed", 0),
+        "success_rate": round(completed / total, 4) if total else 0.0
+    }
+
+
+def call_to_row(call_info: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a scheduler call dict onto `calls` columns"""
+
+    return {
+        "id": call_info["call_id"],
+        "user_id": call_info["user_id"],
+        "shard": shard_for(call_info["user_id"]),
+        "call_type": call_info["call_type"].value,
+        "status": call_info["status"].value,
+        "platform": call_info["provider"].value,
+        "scheduled_at": call_info["scheduled_at"],
+        "requested_time": call_info.get("requested_time", call_info.get("scheduled_time")),
+        "scheduled_time": call_info.get("scheduled_time"),
+        "timezone": call_info.get("timezone", "UTC")
+    }
+
+
+def last_per_slot(calls: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The last call given for each (user, call type); a slot holds one scheduled call"""
+
+    latest: Dict[Tuple[str, Any], Dict[str, Any]] = {}
+    for call_info in calls:
+        latest[(call_info["user_id"], call_info["call_type"])] = call_info
+    return list(latest.values())
+
+
+def row_to_call(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a `calls` row back onto a scheduler call dict"""
+
+    return {
+        "call_id": row["id"],
+        "user_id": row["user_id"],
+        "call_type": CallType(row["call_type"]),
+        "requested_time": row["requested_time"],
+        "scheduled_time": row["scheduled_time"],
+        "timezone": row["timezone"],
+        "scheduled_at": row["scheduled_at"],
+        "provider": CallProvider(row["platform"]),
+        "status": CallStatus(row["status"]),
+        "completed_at": row.get("completed_at"),
+        "attempts": row.get("attempts", 0)
+    }
+
+
+class BaseScheduleStore(ABC):
+    """Abstract base class for durable call schedule storage"""
+
+    @abstractmethod
+    async def initialize(self) -> None:
+        """Create the schema if needed"""
+        pass
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Release connections"""
+        pass
+
+    @abstractmethod
+    async def insert_calls(self, calls: Sequence[Dict[str, Any]]) -> List[str]:
+        """
+        Persist next occurrences, skipping slots that already hold a scheduled
+        call. Returns the ids of the calls that were actually stored.
+        """
+        pass
+
+    @abstractmethod
+    async def replace_calls(self, replaced_ids: Sequence[str], calls: Sequence[Dict[str, Any]]) -> None:
+        """
+        Delete the scheduled calls in `replaced_ids` and any other scheduled
+        call in the slots of `calls`, then insert `calls`, in one transaction.
+        When `calls` holds several calls for one slot the last one is kept.
+        """
+        pass
+
+    @abstractmethod
+    async def delete_call(self, call_id: str) -> bool:
+        """Remove a scheduled call that has not been claimed"""
+        pass
+
+    @abstractmethod
+    async def claim_due_batch(
+        self,
+        now: datetime,
+        limit: int,
+        owner: str,
+        lease_seconds: int,
+        shards: Optional[Sequence[int]] = None,
+        providers: Optional[Sequence[CallProvider]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Atomically move up to `limit` due calls to in_progress under a lease.
+
+        Concurrent claimers never receive the same call. `shards` restricts
+        the claim to users in those shards and `providers` to calls on those
+        platforms (None claims from every shard / platform).
+        """
+        pass
+
+    @abstractmethod
+    async def mark_dispatched(self, call_id: str, now: datetime) -> None:
+        """Release the dispatch lease once the provider accepted the call"""
+        pass
+
+    @abstractmethod
+    async def update_status(
+        self,
+        call_id: str,
+        status: CallStatus,
+        completed_at: Optional[datetime] = None
+    ) -> None:
+        """Record a call outcome"""
+        pass
+
+    @abstractmethod
+    async def recover(self, now: datetime, max_call_duration: int) -> Dict[str, int]:
+        """
+        Repair in-flight calls after a crash or a shard handover.
+
+        Claims whose lease expired before dispatch go back to scheduled;
+        dispatched calls older than `max_call_duration` seconds are missed.
+        """
+        pass
+
+    @abstractmethod
+    async def load_pending(self) -> List[Dict[str, Any]]:
+        """Scheduled calls ordered by scheduled_at"""
+        pass
+
+    @abstractmethod
+    async def list_calls(
+        self,
+        user_id: str,
+        limit: int,
+        before: Optional[Tuple[datetime, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        One page of a user's calls, newest first.
+
+        Keyset pagination over (scheduled_at, id): `before` is the key of
+        the last call on the previous page.
+        """
+        pass
+
+    @abstractmethod
+    async def get_user_stats(self, user_id: str) -> Dict[str, Any]:
+        """Outcome counters maintained as calls reach a terminal status"""
+        pass
+
+    @abstractmethod
+    async def get_rollups(
+        self,
+        user_id: str,
+        dimension: str,
+        since: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Rollup rows for one dimension, optionally from bucket `since` onward"""
+        pass
+
+    @abstractmethod
+    async def rebuild_rollups(self, batch_size: int = 10000) -> int:
+        """Recompute counters and rollups from the calls table, returning calls counted"""
+        pass
+
+    @abstractmethod
+    async def record_metrics(self, metrics: Sequence[Dict[str, Any]]) -> None:
+        """Upsert daily metric values (user_id, date, metric_type, value, source)"""
+        pass
+
+    @abstractmethod
+    async def load_metrics(self, since: str, user_id: Optional[str] = None) -> Dict[str, List[Any]]:
+        """All users' (or one user's) metrics from day `since` onward, as column lists"""
+        pass
+
+    @abstractmethod
+    async def get_summary(self, user_id: str) -> Optional[str]:
+        """A user's conversation summary, or None if none was saved"""
+        pass
+
+    @abstractmethod
+    async def save_summary(self, user_id: str, summary: str) -> None:
+        """Replace a user's conversation summary"""
+        pass
+
+
+class SQLiteScheduleStore(BaseScheduleStore):
+    """SQLite store for local deployments"""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS calls (
+        id TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        shard INTEGER,
+        call_type TEXT NOT NULL,
+        status TEXT NOT NULL,
+        platform TEXT NOT NULL,
+        scheduled_at REAL NOT NULL,
+        completed_at REAL,
+        requested_time TEXT,
+        scheduled_time TEXT,
+        timezone TEXT NOT NULL DEFAULT 'UTC',
+        lease_owner TEXT,
+        lease_expires_at REAL,
+        dispatched_at REAL,
+        attempts INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE INDEX IF NOT EXISTS idx_calls_status_scheduled_at ON calls (status, scheduled_at);
+    CREATE INDEX IF NOT EXISTS idx_calls_status_lease ON calls (status, lease_expires_at);
+    CREATE INDEX IF NOT EXISTS idx_calls_user_history ON calls (user_id, scheduled_at, id);
+    CREATE INDEX IF NOT EXISTS idx_calls_shard_due ON calls (status, shard, scheduled_at);
+    """ + STATS_SCHEMA + ROLLUPS_SCHEMA + METRICS_SCHEMA + SUMMARIES_SCHEMA
+
+    TIME_COLUMNS = ("scheduled_at", "completed_at", "lease_expires_at", "dispatched_at")
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    async def initialize(self) -> None:
+        def setup():
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA busy_timeout=5000")
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(calls)")}
+            if columns and "shard" not in columns:
+                connection.execute("ALTER TABLE calls ADD COLUMN shard INTEGER")
+            connection.executescript(self.SCHEMA)
+            unsharded = connection.execute("SELECT id, user_id FROM calls WHERE shard IS NULL").fetchall()
+            if unsharded:
+                connection.executemany(
+                    "UPDATE calls SET shard = ? WHERE id = ?",
+                    [(shard_for(row["user_id"]), row["id"]) for row in unsharded]
+                )
+                logger.info(f"Assigned shards to {len(unsharded)} existing calls")
+            if connection.execute(SLOT_DEDUPE).rowcount:
+                logger.warning("Dropped duplicate scheduled calls before enforcing one per slot")
+            connection.execute(SLOT_INDEX)
+            return connection
+
+        self._connection = await asyncio.to_thread(setup)
+        logger.info(f"SQLite schedule store ready at {self.path}")
+
+    async def close(self) -> None:
+        if self._connection is not None:
+            await asyncio.to_thread(self._connection.close)
+            self._connection = None
+
+    async def insert_calls(self, calls: Sequence[Dict[str, Any]]) -> List[str]:
+        return await self._write_calls([], calls, replace=False)
+
+    async def replace_calls(self, replaced_ids: Sequence[str], calls: Sequence[Dict[str, Any]]) -> None:
+        await self._write_calls(replaced_ids, calls, replace=True)
+
+    async def _write_calls(
+        self,
+        replaced_ids: Sequence[str],
+        calls: Sequence[Dict[str, Any]],
+        replace: bool
+    ) -> List[str]:
+        if replace:
+            calls = last_per_slot(calls)
+        rows = [self._encode(call_to_row(call_info)) for call_info in calls]
+        if not rows and not replaced_ids:
+            return []
+        columns = list(rows[0]) if rows else []
+        # OR IGNORE skips a next occurrence whose slot another node already filled
+        sql = (
+            f"INSERT OR {'REPLACE' if replace else 'IGNORE'} INTO calls ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)})"
+        )
+
+        def apply(db: sqlite3.Connection) -> List[str]:
+            def statements() -> List[str]:
+                if replaced_ids:
+                    db.execute(
+                        "DELETE FROM calls WHERE id IN (SELECT value FROM json_each(?)) AND status = ?",
+                        (json.dumps(list(replaced_ids)), CallStatus.SCHEDULED.value)
+                    )
+                if replace and rows:
+                    db.execute(
+                        "DELETE FROM calls WHERE status = ? AND (user_id, call_type) IN "
+                        "(SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]') FROM json_each(?))",
+                        (CallStatus.SCHEDULED.value, json.dumps([[row["user_id"], row["call_type"]] for row in rows]))
+                    )
+                if not rows:
+                    return []
+                db.executemany(sql, [[row[c] for c in columns] for row in rows])
+                # Ids are fresh, so any of them present now was written by this statement
+                stored = db.execute(
+                    "SELECT id FROM calls WHERE id IN (SELECT value FROM json_each(?))",
+                    (json.dumps([row["id"] for row in rows]),)
+                ).fetchall()
+                return [row[0] for row in stored]
+            return self._transaction(db, statements)
+
+        return await self._run(apply)
+
+    async def delete_call(self, call_id: str) -> bool:
+        cursor = await self._run(lambda db: db.execute(
+            "DELETE FROM calls WHERE id = ? AND status = ?",
+            (call_id, CallStatus.SCHEDULED.value)
+        ))
+        return cursor.rowcount > 0
+
+    async def claim_due_batch(
+        self,
+        now: datetime,
+        limit: int,
+        owner: str,
+        lease_seconds: int,
+        shards: Optional[Sequence[int]] = None,
+        providers: Optional[Sequence[CallProvider]] = None
+    ) -> List[Dict[str, Any]]:
+        # SQLite has no row locks: the single UPDATE ... RETURNING runs under
+        # the database write lock, so concurrent claimers see disjoint rows.
+        filters = ""
+        params: Tuple[Any, ...] = (
+            CallStatus.IN_PROGRESS.value, owner, now.timestamp() + lease_seconds,
+            CallStatus.SCHEDULED.value, now.timestamp()
+        )
+        if shards is not None:
+            filters += " AND shard IN (SELECT value FROM json_each(?))"
+            params += (json.dumps(sorted(shards)),)
+        if providers is not None:
+            filters += " AND platform IN (SELECT value FROM json_each(?))"
+            params += (json.dumps([provider.value for provider in providers]),)
+        params += (limit,)
+        sql = f"""
+            UPDATE calls
+            SET status = ?, lease_owner = ?, lease_expires_at = ?, attempts = attempts + 1
+            WHERE id IN (
+                SELECT id FROM calls
+                WHERE status = ? AND scheduled_at <= ?{filters}
+                ORDER BY scheduled_at
+                LIMIT ?
+            )
+            RETURNING {', '.join(CALL_COLUMNS)}
+        """
+        rows = await self._run(lambda db: db.execute(sql, params).fetchall())
+        calls = [row_to_call(self._decode(row)) for row in rows]
+        calls.sort(key=lambda call_info: call_info["scheduled_at"])
+        return calls
+
+    async def mark_dispatched(self, call_id: str, now: datetime) -> None:
+        await self._run(lambda db: db.execute(
+            "UPDATE calls SET lease_owner = NULL, lease_expires_at = NULL, dispatched_at = ? "
+            "WHERE id = ?",
+            (now.timestamp(), call_id)
+        ))
+
+    async def update_status(
+        self,
+        call_id: str,
+        status: CallStatus,
+        completed_at: Optional[datetime] = None
+    ) -> None:
+        def apply(db: sqlite3.Connection) -> None:
+            def statements() -> None:
+                # Terminal rows are never updated again, so counters move once per call
+                row = db.execute(
+                    "UPDATE calls SET status = ?, completed_at = ?, lease_owner = NULL, "
+                    "lease_expires_at = NULL WHERE id = ? AND status NOT IN (?, ?, ?) "
+                    f"RETURNING {', '.join(OUTCOME_COLUMNS)}",
+                    (status.value, completed_at.timestamp() if completed_at else None, call_id,
+                     *(terminal.value for terminal in TERMINAL_STATUSES))
+                ).fetchone()
+                if row is not None:
+                    self._record_outcomes(db, [self._decode(row)])
+            self._transaction(db, statements)
+
+        await self._run(apply)
+
+    async def recover(self, now: datetime, max_call_duration: int) -> Dict[str, int]:
+        def repair(db: sqlite3.Connection) -> Dict[str, int]:
+            def statements() -> Dict[str, int]:
+                requeued = db.execute(
+                    "UPDATE calls SET status = ?, lease_owner = NULL, lease_expires_at = NULL "
+                    "WHERE status = ? AND lease_expires_at IS NOT NULL AND lease_expires_at < ?",
+                    (CallStatus.SCHEDULED.value, CallStatus.IN_PROGRESS.value, now.timestamp())
+                ).rowcount
+                missed = db.execute(
+                    "UPDATE calls SET status = ?, completed_at = ? "
+                    "WHERE status = ? AND lease_expires_at IS NULL AND dispatched_at < ? "
+                    f"RETURNING {', '.join(OUTCOME_COLUMNS)}",
+                    (CallStatus.MISSED.value, now.timestamp(), CallStatus.IN_PROGRESS.value,
+                     now.timestamp() - max_call_duration)
+                ).fetchall()
+                self._record_outcomes(db, [self._decode(row) for row in missed])
+                return {"requeued": requeued, "missed": len(missed)}
+            return self._transaction(db, statements)
+
+        return await self._run(repair)
+
+    async def load_pending(self) -> List[Dict[str, Any]]:
+        sql = (
+            f"SELECT {', '.join(CALL_COLUMNS)} FROM calls "
+            "WHERE status = ? ORDER BY scheduled_at"
+        )
+        rows = await self._run(lambda db: db.execute(sql, (CallStatus.SCHEDULED.value,)).fetchall())
+        return [row_to_call(self._decode(row)) for row in rows]
+
+    async def list_calls(
+        self,
+        user_id: str,
+        limit: int,
+        before: Optional[Tuple[datetime, str]] = None
+    ) -> List[Dict[str, Any]]:
+        sql = f"SELECT {', '.join(CALL_COLUMNS)} FROM calls WHERE user_id = ?"
+        params: List[Any] = [user_id]
+        if before is not None:
+            sql += " AND (scheduled_at, id) < (?, ?)"
+            params.extend([before[0].timestamp(), before[1]])
+        sql += " ORDER BY scheduled_at DESC, id DESC LIMIT ?"
+        params.append(limit)
+
+        rows = await self._run(lambda db: db.execute(sql, params).fetchall())
+        return [row_to_call(self._decode(row)) for row in rows]
+
+    async def get_user_stats(self, user_id: str) -> Dict[str, Any]:
+        row = await self._run(lambda db: db.execute(
+            "SELECT total, completed, missed, failed FROM user_call_stats WHERE user_id = ?",
+            (user_id,)
+        ).fetchone())
+        return stats_from_row(row)
+
+    async def get_rollups(
+        self,
+        user_id: str,
+        dimension: str,
+        since: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        sql = (
+            "SELECT bucket, total, completed, missed, failed FROM call_rollups "
+            "WHERE user_id = ? AND dimension = ? AND bucket >= ? ORDER BY bucket"
+        )
+        rows = await self._run(lambda db: db.execute(sql, (user_id, dimension, since or "")).fetchall())
+        return [dict(row) for row in rows]
+
+    async def rebuild_rollups(self, batch_size: int = 10000) -> int:
+        def rebuild(db: sqlite3.Connection) -> int:
+            def statements() -> int:
+                db.execute("DELETE FROM user_call_stats")
+                db.execute("DELETE FROM call_rollups")
+                cursor = db.execute(
+                    f"SELECT {', '.join(OUTCOME_COLUMNS)} FROM calls WHERE status IN (?, ?, ?)",
+                    tuple(terminal.value for terminal in TERMINAL_STATUSES)
+                )
+                counted = 0
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        return counted
+                    self._record_outcomes(db, [self._decode(row) for row in rows])
+                    counted += len(rows)
+            return self._transaction(db, statements)
+
+        return await self._run(rebuild)
+
+    async def record_metrics(self, metrics: Sequence[Dict[str, Any]]) -> None:
+        rows = metric_rows(metrics)
+        if rows:
+            sql = METRICS_UPSERT.format(placeholders="?, ?, ?, ?, ?")
+            await self._run(lambda db: self._transaction(db, lambda: db.executemany(sql, rows)))
+
+    async def load_metrics(self, since: str, user_id: Optional[str] = None) -> Dict[str, List[Any]]:
+        sql = f"SELECT {', '.join(METRIC_COLUMNS)} FROM metrics WHERE date >= ?"
+        params: List[Any] = [since]
+        if user_id is not None:
+            sql += " AND user_id = ?"
+            params.append(user_id)
+        rows = await self._run(lambda db: db.execute(sql, params).fetchall())
+        return metric_columns(rows)
+
+    async def get_summary(self, user_id: str) -> Optional[str]:
+        row = await self._run(lambda db: db.execute(
+            "SELECT summary FROM user_summaries WHERE user_id = ?", (user_id,)
+        ).fetchone())
+        return row[0] if row else None
+
+    async def save_summary(self, user_id: str, summary: str) -> None:
+        await self._run(lambda db: db.execute(SUMMARY_UPSERT.format(placeholders="?, ?"), (user_id, summary)))
+
+    @staticmethod
+    def _record_outcomes(db: sqlite3.Connection, outcomes: Sequence[Dict[str, Any]]) -> None:
+        stats, rollups = outcome_deltas(outcomes)
+        if stats:
+            db.executemany(STATS_UPSERT.format(placeholders="?, ?, ?, ?, ?"), stats)
+        if rollups:
+            db.executemany(ROLLUPS_UPSERT.format(placeholders="?, ?, ?, ?, ?, ?, ?"), rollups)
+
+    async def _run(self, operation):
+        if self._connection is None:
+            raise RuntimeError("Schedule store is not initialized")
+
+        def locked():
+            with self._lock:
+                return operation(self._connection)
+
+        return await asyncio.to_thread(locked)
+
+    @staticmethod
+    def _transaction(db: sqlite3.Connection, body):
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            result = body()
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+        return result
+
+    def _encode(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            key: value.timestamp() if key in self.TIME_COLUMNS and isinstance(value, datetime) else value
+            for key, value in row.items()
+        }
+
+    def _decode(self, row: sqlite3.Row) -> Dict[str, Any]:
+        decoded = dict(row)
+        for key in self.TIME_COLUMNS:
+            if decoded.get(key) is not None:
+                decoded[key] = datetime.fromtimestamp(decoded[key], tz=timezone.utc)
+        return decoded
+
+
+class PostgresScheduleStore(BaseScheduleStore):
+    """Postgres store for cloud deployments (asyncpg)"""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS calls (
+        id UUID PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        shard INTEGER,
+        call_type TEXT NOT NULL,
+        status TEXT NOT NULL,
+        platform TEXT NOT NULL,
+        scheduled_at TIMESTAMPTZ NOT NULL,
+        completed_at TIMESTAMPTZ,
+        requested_time TEXT,
+        scheduled_time TEXT,
+        timezone TEXT NOT NULL DEFAULT 'UTC',
+        lease_owner TEXT,
+        lease_expires_at TIMESTAMPTZ,
+        dispatched_at TIMESTAMPTZ,
+        attempts INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE INDEX IF NOT EXISTS idx_calls_status_scheduled_at ON calls (status, scheduled_at);
+    CREATE INDEX IF NOT EXISTS idx_calls_status_lease ON calls (status, lease_expires_at);
+    CREATE INDEX IF NOT EXISTS idx_calls_user_history ON calls (user_id, scheduled_at, id);
+    CREATE INDEX IF NOT EXISTS idx_calls_shard_due ON calls (status, shard, scheduled_at);
+    """ + STATS_SCHEMA + ROLLUPS_SCHEMA + METRICS_SCHEMA + SUMMARIES_SCHEMA
+
+    def __init__(self, dsn: str, min_size: int = 1, max_size: int = 10):
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self._pool = None
+
+    async def initialize(self) -> None:
+        import asyncpg
+
+        self._pool = await asyncpg.create_pool(self.dsn, min_size=self.min_size, max_size=self.max_size)
+        async with self._pool.acquire() as connection:
+            await connection.execute("ALTER TABLE IF EXISTS calls ADD COLUMN IF NOT EXISTS shard INTEGER")
+            await connection.execute(self.SCHEMA)
+            unsharded = await connection.fetch("SELECT id, user_id FROM calls WHERE shard IS NULL")
+            if unsharded:
+                await connection.executemany(
+                    "UPDATE calls SET shard = $1 WHERE id = $2",
+                    [(shard_for(row["user_id"]), row["id"]) for row in unsharded]
+                )
+                logger.info(f"Assigned shards to {len(unsharded)} existing calls")
+            if not (await connection.execute(SLOT_DEDUPE)).endswith(" 0"):
+                logger.warning("Dropped duplicate scheduled calls before enforcing one per slot")
+            await connection.execute(SLOT_INDEX)
+        logger.info("Postgres schedule store ready")
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    async def insert_calls(self, calls: Sequence[Dict[str, Any]]) -> List[str]:
+        return await self._write_calls([], calls, replace=False)
+
+    async def replace_calls(self, replaced_ids: Sequence[str], calls: Sequence[Dict[str, Any]]) -> None:
+        await self._write_calls(replaced_ids, calls, replace=True)
+
+    async def _write_calls(
+        self,
+        replaced_ids: Sequence[str],
+        calls: Sequence[Dict[str, Any]],
+        replace: bool
+    ) -> List[str]:
+        if replace:
+            calls = last_per_slot(calls)
+        rows = [call_to_row(call_info) for call_info in calls]
+        if not rows and not replaced_ids:
+            return []
+        columns = list(rows[0]) if rows else []
+        placeholders = ", ".join(f"${i}" for i in range(1, len(columns) + 1))
+        updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in columns if c != "id")
+        # DO NOTHING skips a next occurrence whose slot another node already filled
+        sql = (
+            f"INSERT INTO calls ({', '.join(columns)}) VALUES ({placeholders}) "
+            + (f"ON CONFLICT (id) DO UPDATE SET {updates}" if replace else "ON CONFLICT DO NOTHING")
+        )
+        records = [[uuid.UUID(row["id"])] + [row[c] for c in columns[1:]] for row in rows]
+        async with self._pool.acquire() as connection:
+            async with connection.transaction():
+                if replaced_ids:
+                    await connection.execute(
+                        "DELETE FROM calls WHERE id = ANY($1::uuid[]) AND status = $2",
+                        [uuid.UUID(call_id) for call_id in replaced_ids], CallStatus.SCHEDULED.value
+                    )
+                if replace and rows:
+                    await connection.execute(
+                        "DELETE FROM calls WHERE status = $1 AND (user_id, call_type) IN "
+                        "(SELECT * FROM unnest($2::text[], $3::text[]))",
+                        CallStatus.SCHEDULED.value,
+                        [row["user_id"] for row in rows], [row["call_type"] for row in rows]
+                    )
+                if not records:
+                    return []
+                await connection.executemany(sql, records)
+                # Ids are fresh, so any of them present now was written by this statement
+                stored = await connection.fetch(
+                    "SELECT id FROM calls WHERE id = ANY($1::uuid[])", [record[0] for record in records]
+                )
+        return [row["id"].hex for row in stored]
+
+    async def delete_call(self, call_id: str) -> bool:
+        result = await self._pool.execute(
+            "DELETE FROM calls WHERE id = $1 AND status = $2",
+            uuid.UUID(call_id), CallStatus.SCHEDULED.value
+        )
+        return result.endswith(" 1")
+
+    async def claim_due_batch(
+        self,
+        now: datetime,
+        limit: int,
+        owner: str,
+        lease_seconds: int,
+        shards: Optional[Sequence[int]] = None,
+        providers: Optional[Sequence[CallProvider]] = None
+    ) -> List[Dict[str, Any]]:
+        # SKIP LOCKED lets concurrent schedulers claim disjoint batches
+        # without waiting on each other's row locks.
+        filters = ""
+        params: List[Any] = [
+            CallStatus.IN_PROGRESS.value, owner, now + timedelta(seconds=lease_seconds),
+            CallStatus.SCHEDULED.value, now, limit
+        ]
+        if shards is not None:
+            params.append(sorted(shards))
+            filters += f" AND shard = ANY(${len(params)}::int[])"
+        if providers is not None:
+            params.append([provider.value for provider in providers])
+            filters += f" AND platform = ANY(${len(params)}::text[])"
+        sql = f"""
+            UPDATE calls
+            SET status = $1, lease_owner = $2, lease_expires_at = $3, attempts = attempts + 1
+            WHERE id IN (
+                SELECT id FROM calls
+                WHERE status = $4 AND scheduled_at <= $5{filters}
+                ORDER BY scheduled_at
+                LIMIT $6
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING {', '.join(CALL_COLUMNS)}
+        """
+        rows = await self._pool.fetch(sql, *params)
+        calls = [row_to_call(self._decode(row)) for row in rows]
+        calls.sort(key=lambda call_info: call_info["scheduled_at"])
+        return calls
+
+    async def mark_dispatched(self, call_id: str, now: datetime) -> None:
+        await self._pool.execute(
+            "UPDATE calls SET lease_owner = NULL, lease_expires_at = NULL, dispatched_at = $1 "
+            "WHERE id = $2",
+            now, uuid.UUID(call_id)
+        )
+
+    async def update_status(
+        self,
+        call_id: str,
+        status: CallStatus,
+        completed_at: Optional[datetime] = None
+    ) -> None:
+        async with self._pool.acquire() as connection:
+            async with connection.transaction():
+                # Terminal rows are never updated again, so counters move once per call
+                row = await connection.fetchrow(
+                    "UPDATE calls SET status = $1, completed_at = $2, lease_owner = NULL, "
+                    "lease_expires_at = NULL WHERE id = $3 AND status <> ALL($4::text[]) "
+                    f"RETURNING {', '.join(OUTCOME_COLUMNS)}",
+                    status.value, completed_at, uuid.UUID(call_id),
+                    [terminal.value for terminal in TERMINAL_STATUSES]
+                )
+                if row is not None:
+                    await self._record_outcomes(connection, [dict(row)])
+
+    async def recover(self, now: datetime, max_call_duration: int) -> Dict[str, int]:
+        async with self._pool.acquire() as connection:
+            async with connection.transaction():
+                requeued = await connection.execute(
+                    "UPDATE calls SET status = $1, lease_owner = NULL, lease_expires_at = NULL "
+                    "WHERE status = $2 AND lease_expires_at IS NOT NULL AND lease_expires_at < $3",
+                    CallStatus.SCHEDULED.value, CallStatus.IN_PROGRESS.value, now
+                )
+                missed = await connection.fetch(
+                    "UPDATE calls SET status = $1, completed_at = $2 "
+                    "WHERE status = $3 AND lease_expires_at IS NULL AND dispatched_at < $4 "
+                    f"RETURNING {', '.join(OUTCOME_COLUMNS)}",
+                    CallStatus.MISSED.value, now, CallStatus.IN_PROGRESS.value,
+                    now - timedelta(seconds=max_call_duration)
+                )
+                await self._record_outcomes(connection, [dict(row) for row in missed])
+        return {"requeued": int(requeued.split()[-1]), "missed": len(missed)}
+
+    async def load_pending(self) -> List[Dict[str, Any]]:
+        rows = await self._pool.fetch(
+            f"SELECT {', '.join(CALL_COLUMNS)} FROM calls WHERE status = $1 ORDER BY scheduled_at",
+            CallStatus.SCHEDULED.value
+        )
+        return [row_to_call(self._decode(row)) for row in rows]
+
+    async def list_calls(
+        self,
+        user_id: str,
+        limit: int,
+        before: Optional[Tuple[datetime, str]] = None
+    ) -> List[Dict[str, Any]]:
+        sql = f"SELECT {', '.join(CALL_COLUMNS)} FROM calls WHERE user_id = $1"
+        params: List[Any] = [user_id]
+        if before is not None:
+            sql += " AND (scheduled_at, id) < ($2, $3)"
+            params.extend([before[0], uuid.UUID(before[1])])
+        sql += f" ORDER BY scheduled_at DESC, id DESC LIMIT ${len(params) + 1}"
+        params.append(limit)
+
+        rows = await self._pool.fetch(sql, *params)
+        return [row_to_call(self._decode(row)) for row in rows]
+
+    async def get_user_stats(self, user_id: str) -> Dict[str, Any]:
+        row = await self._pool.fetchrow(
+            "SELECT total, completed, missed, failed FROM user_call_stats WHERE user_id = $1",
+            user_id
+        )
+        return stats_from_row(row)
+
+    async def get_rollups(
+        self,
+        user_id: str,
+        dimension: str,
+        since: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        rows = await self._pool.fetch(
+            "SELECT bucket, total, completed, missed, failed FROM call_rollups "
+            "WHERE user_id = $1 AND dimension = $2 AND bucket >= $3 ORDER BY bucket",
+            user_id, dimension, since or ""
+        )
+        return [dict(row) for row in rows]
+
+    async def rebuild_rollups(self, batch_size: int = 10000) -> int:
+        counted = 0
+        async with self._pool.acquire() as connection:
+            async with connection.transaction():
+                await connection.execute("TRUNCATE user_call_stats, call_rollups")
+                cursor = await connection.cursor(
+                    f"SELECT {', '.join(OUTCOME_COLUMNS)} FROM calls WHERE status = ANY($1::text[])",
+                    [terminal.value for terminal in TERMINAL_STATUSES]
+                )
+                while True:
+                    rows = await cursor.fetch(batch_size)
+                    if not rows:
+                        break
+                    await self._record_outcomes(connection, [dict(row) for row in rows])
+                    counted += len(rows)
+        return counted
+
+    async def record_metrics(self, metrics: Sequence[Dict[str, Any]]) -> None:
+        rows = metric_rows(metrics)
+        if rows:
+            await self._pool.executemany(METRICS_UPSERT.format(placeholders="$1, $2, $3, $4, $5"), rows)
+
+    async def load_metrics(self, since: str, user_id: Optional[str] = None) -> Dict[str, List[Any]]:
+        sql = f"SELECT {', '.join(METRIC_COLUMNS)} FROM metrics WHERE date >= $1"
+        params: List[Any] = [since]
+        if user_id is not None:
+            sql += " AND user_id = $2"
+            params.append(user_id)
+        rows = await self._pool.fetch(sql, *params)
+        return metric_columns([tuple(row) for row in rows])
+
+    async def get_summary(self, user_id: str) -> Optional[str]:
+        return await self._pool.fetchval("SELECT summary FROM user_summaries WHERE user_id = $1", user_id)
+
+    async def save_summary(self, user_id: str, summary: str) -> None:
+        await self._pool.execute(SUMMARY_UPSERT.format(placeholders="$1, $2"), user_id, summary)
+
+    @staticmethod
+    async def _record_outcomes(connection, outcomes: Sequence[Dict[str, Any]]) -> None:
+        stats, rollups = outcome_deltas(outcomes)
+        if stats:
+            await connection.executemany(
+                STATS_UPSERT.format(placeholders="$1, $2, $3, $4, $5"), stats
+            )
+        if rollups:
+            await connection.executemany(
+                ROLLUPS_UPSERT.format(placeholders="$1, $2, $3, $4, $5, $6, $7"), rollups
+            )
+
+    @staticmethod
+    def _decode(row) -> Dict[str, Any]:
+        decoded = dict(row)
+        decoded["id"] = decoded["id"].hex
+        return decoded
+
+
+class ScheduleStoreFactory:
+    """Factory for creating schedule stores"""
+
+    @staticmethod
+    def create_store(database_url: str) -> BaseScheduleStore:
+        """Create the store matching a database URL"""
+
+        if database_url.startswith("sqlite:///"):
+            return SQLiteScheduleStore(database_url[len("sqlite:///"):])
+        elif database_url.startswith(("postgresql://", "postgres://")):
+            return PostgresScheduleStore(database_url)
+        else:
+            raise ValueError(f"Unsupported schedule store URL: {database_url}")
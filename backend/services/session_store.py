@@ -0,0 +1,204 @@
+"""
+Conversation session store for DisciplineCall.ai
+In-process LRU with TTL, optionally backed by Redis for multi-worker deployments
+"""
+
+from typing import Dict, Any, Optional, List, Tuple
+from collections import OrderedDict
+import json
+import logging
+import time
+import zlib
+
+logger = logging.getLogger(__name__)
+
+# Serialized entries start with a one-byte marker so small sessions skip zlib
+_RAW = b"j"
+_COMPRESSED = b"z"
+
+
+def serialize_session(state: Dict[str, Any], compress_over: int = 512) -> bytes:
+    """Compact JSON encoding, zlib-compressed once it grows past `compress_over` bytes"""
+
+    payload = json.dumps(state, separators=(",", ":"), default=str).encode()
+    if len(payload) > compress_over:
+        return _COMPRESSED + zlib.compress(payload, 6)
+    return _RAW + payload
+
+
+def deserialize_session(data: bytes) -> Dict[str, Any]:
+    """Inverse of serialize_session"""
+
+    marker, payload = data[:1], data[1:]
+    if marker == _COMPRESSED:
+        payload = zlib.decompress(payload)
+    return json.loads(payload)
+
+
+def new_session_state(
+    user_id: str,
+    call_type: str,
+    provider: str,
+    personality: str,
+    provider_call_id: Optional[str],
+    opening_message: str,
+    summary: str = ""
+) -> Dict[str, Any]:
+    """
+    Initial state for a live call; turns are [role, text] pairs ("a" = AI, "u" = user).
+
+    `summary` is the user's memory summary when the call starts, so turns
+    read it from here instead of the database.
+    """
+
+    return {
+        "user_id": user_id,
+        "call_type": call_type,
+        "provider": provider,
+        "personality": personality,
+        "provider_call_id": provider_call_id,
+        "started_at": time.time(),
+        "summary": summary,
+        "turns": [["a", opening_message]]
+    }
+
+
+class SessionStore:
+    """
+    Call session state keyed by call_session_id.
+
+    The local tier is an LRU of serialized entries with a TTL, so a live
+    call's turns are served from memory. With a Redis client every write
+    goes through to Redis and local misses fall back to it; the local tier
+    assumes a call's webhooks reach the same worker, and `local_ttl_seconds`
+    bounds how stale a copy can get when they do not.
+
+    A session left idle past `ttl_seconds` is no longer served, but stays
+    until `sweep` hands it over so the call can be closed and its turns
+    folded into memory.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl_seconds: int = 300,
+        redis_client=None,
+        local_ttl_seconds: Optional[int] = None,
+        key_prefix: str = "session:"
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.local_ttl_seconds = min(local_ttl_seconds or ttl_seconds, ttl_seconds)
+        self.redis = redis_client
+        self.key_prefix = key_prefix
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._metrics = {
+            "hits": 0,
+            "misses": 0,
+            "redis_hits": 0,
+            "evictions": 0,
+            "expirations": 0
+        }
+
+    @classmethod
+    def from_settings(cls, settings) -> "SessionStore":
+        """Size the store from settings; live calls never outlast max_call_duration"""
+
+        redis_client = None
+        if settings.session_redis_enabled:
+            import redis.asyncio as redis
+            redis_client = redis.from_url(settings.redis_url)
+
+        return cls(
+            max_entries=settings.session_cache_max_entries,
+            ttl_seconds=settings.max_call_duration,
+            redis_client=redis_client,
+            local_ttl_seconds=settings.session_local_ttl_seconds
+        )
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Load a session, or None if it is unknown or expired"""
+
+        entry = self._entries.get(session_id)
+        if entry is not None:
+            data, expires_at, written_at = entry
+            now = time.monotonic()
+            if expires_at > now:
+                self._entries.move_to_end(session_id)
+                self._metrics["hits"] += 1
+                return deserialize_session(data)
+            if now - written_at <= self.ttl_seconds:
+                # Only the local copy is stale; Redis has the current one
+                self._drop_local(session_id)
+            self._metrics["expirations"] += 1
+
+        if self.redis is not None:
+            data = await self.redis.get(self.key_prefix + session_id)
+            if data is not None:
+                self._metrics["redis_hits"] += 1
+                self._put_local(session_id, data)
+                return deserialize_session(data)
+
+        self._metrics["misses"] += 1
+        return None
+
+    async def set(self, session_id: str, state: Dict[str, Any]) -> None:
+        """Store a session, resetting its TTL"""
+
+        data = serialize_session(state)
+        self._put_local(session_id, data)
+        if self.redis is not None:
+            await self.redis.set(self.key_prefix + session_id, data, ex=self.ttl_seconds)
+
+    async def delete(self, session_id: str) -> None:
+        """Drop a finished session"""
+
+        self._drop_local(session_id)
+        if self.redis is not None:
+            await self.redis.delete(self.key_prefix + session_id)
+
+    async def sweep(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Remove and return the sessions left idle past the TTL"""
+
+        cutoff = time.monotonic() - self.ttl_seconds
+        idle = [session_id for session_id, (_, _, written_at) in self._entries.items() if written_at < cutoff]
+        ended = []
+        for session_id in idle:
+            data = self._entries[session_id][0]
+            self._drop_local(session_id)
+            # Another worker may have continued the call through Redis
+            if self.redis is not None and await self.redis.exists(self.key_prefix + session_id):
+                continue
+            ended.append((session_id, deserialize_session(data)))
+        return ended
+
+    async def close(self) -> None:
+        if self.redis is not None:
+            await self.redis.close()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters and current footprint"""
+
+        lookups = self._metrics["hits"] + self._metrics["redis_hits"] + self._metrics["misses"]
+        return {
+            **self._metrics,
+            "hit_rate": round(self._metrics["hits"] / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes
+        }
+
+    def _put_local(self, session_id: str, data: bytes) -> None:
+        self._drop_local(session_id)
+        now = time.monotonic()
+        self._entries[session_id] = (data, now + self.local_ttl_seconds, now)
+        self._bytes += len(data)
+        while len(self._entries) > self.max_entries:
+            _, (evicted, _, _) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self._metrics["evictions"] += 1
+
+    def _drop_local(self, session_id: str) -> None:
+        entry = self._entries.pop(session_id, None)
+        if entry is not None:
+            self._bytes -= len(entry[0])
@@ -0,0 +1,386 @@
+"""
+Scheduler sharding for DisciplineCall.ai
+Partitions users into shards, maps shards onto live scheduler nodes with
+consistent hashing, and holds ownership through renewable leases
+"""
+
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Dict, Any, Optional, List, Sequence, Set, FrozenSet
+import asyncio
+import bisect
+import hashlib
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Stored with every call row, so changing it requires re-sharding the calls table
+NUM_SHARDS = 256
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+def shard_for(user_id: str, num_shards: int = NUM_SHARDS) -> int:
+    """Stable shard of a user"""
+    return _hash64(user_id) % num_shards
+
+
+class HashRing:
+    """Consistent hash ring of nodes with virtual points for even spread"""
+
+    def __init__(self, nodes: Sequence[str], vnodes: int = 64):
+        points = sorted(
+            (_hash64(f"{node}#{replica}"), node)
+            for node in set(nodes)
+            for replica in range(vnodes)
+        )
+        self._hashes = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def node_for(self, key: str) -> Optional[str]:
+        if not self._nodes:
+            return None
+        index = bisect.bisect(self._hashes, _hash64(key)) % len(self._hashes)
+        return self._nodes[index]
+
+
+class BaseLeaseBackend(ABC):
+    """Abstract base class for node membership and shard lease storage"""
+
+    @abstractmethod
+    async def heartbeat(self, node_id: str, ttl_seconds: float) -> None:
+        """Announce a node as live for `ttl_seconds`"""
+        pass
+
+    @abstractmethod
+    async def leave(self, node_id: str) -> None:
+        """Remove a node from the live set"""
+        pass
+
+    @abstractmethod
+    async def live_nodes(self) -> List[str]:
+        """Nodes whose heartbeat has not expired"""
+        pass
+
+    @abstractmethod
+    async def acquire(self, keys: Sequence[str], owner: str, ttl_seconds: float) -> Set[str]:
+        """
+        Take or renew leases, returning the keys `owner` now holds.
+
+        A key is granted when it is free, expired, or already held by `owner`.
+        """
+        pass
+
+    @abstractmethod
+    async def release(self, keys: Sequence[str], owner: str) -> None:
+        """Drop leases held by `owner`"""
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisLeaseBackend(BaseLeaseBackend):
+    """Leases as expiring Redis keys, membership as a sorted set scored by expiry"""
+
+    ACQUIRE_SCRIPT = """
+    local granted = {}
+    for i, key in ipairs(KEYS) do
+        local holder = redis.call('GET', key)
+        if not holder or holder == ARGV[1] then
+            redis.call('SET', key, ARGV[1], 'PX', ARGV[2])
+            table.insert(granted, key)
+        end
+    end
+    return granted
+    """
+
+    RELEASE_SCRIPT = """
+    for i, key in ipairs(KEYS) do
+        if redis.call('GET', key) == ARGV[1] then
+            redis.call('DEL', key)
+        end
+    end
+    return 0
+    """
+
+    def __init__(self, client, key_prefix: str = "scheduler:"):
+        self.redis = client
+        self.key_prefix = key_prefix
+        self.nodes_key = f"{key_prefix}nodes"
+        self._acquire = client.register_script(self.ACQUIRE_SCRIPT)
+        self._release = client.register_script(self.RELEASE_SCRIPT)
+
+    async def heartbeat(self, node_id: str, ttl_seconds: float) -> None:
+        await self.redis.zadd(self.nodes_key, {node_id: time.time() + ttl_seconds})
+
+    async def leave(self, node_id: str) -> None:
+        await self.redis.zrem(self.nodes_key, node_id)
+
+    async def live_nodes(self) -> List[str]:
+        now = time.time()
+        await self.redis.zremrangebyscore(self.nodes_key, "-inf", now)
+        nodes = await self.redis.zrangebyscore(self.nodes_key, now, "+inf")
+        return [node.decode() if isinstance(node, bytes) else node for node in nodes]
+
+    async def acquire(self, keys: Sequence[str], owner: str, ttl_seconds: float) -> Set[str]:
+        if not keys:
+            return set()
+        granted = await self._acquire(
+            keys=[self.key_prefix + key for key in keys],
+            args=[owner, int(ttl_seconds * 1000)]
+        )
+        prefix = len(self.key_prefix)
+        return {(key.decode() if isinstance(key, bytes) else key)[prefix:] for key in granted}
+
+    async def release(self, keys: Sequence[str], owner: str) -> None:
+        if keys:
+            await self._release(keys=[self.key_prefix + key for key in keys], args=[owner])
+
+    async def close(self) -> None:
+        await self.redis.close()
+
+
+class SQLiteLeaseBackend(BaseLeaseBackend):
+    """
+    Redis stand-in backed by a shared SQLite file.
+
+    Lets several local processes coordinate without a Redis server; every
+    operation is a single transaction under SQLite's write lock.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS scheduler_nodes (
+        node_id TEXT PRIMARY KEY,
+        expires_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS scheduler_leases (
+        key TEXT PRIMARY KEY,
+        owner TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    );
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    async def heartbeat(self, node_id: str, ttl_seconds: float) -> None:
+        await self._run(lambda db: db.execute(
+            "INSERT INTO scheduler_nodes (node_id, expires_at) VALUES (?, ?) "
+            "ON CONFLICT (node_id) DO UPDATE SET expires_at = excluded.expires_at",
+            (node_id, time.time() + ttl_seconds)
+        ))
+
+    async def leave(self, node_id: str) -> None:
+        await self._run(lambda db: db.execute(
+            "DELETE FROM scheduler_nodes WHERE node_id = ?", (node_id,)
+        ))
+
+    async def live_nodes(self) -> List[str]:
+        rows = await self._run(lambda db: db.execute(
+            "SELECT node_id FROM scheduler_nodes WHERE expires_at > ? ORDER BY node_id",
+            (time.time(),)
+        ).fetchall())
+        return [row[0] for row in rows]
+
+    async def acquire(self, keys: Sequence[str], owner: str, ttl_seconds: float) -> Set[str]:
+        if not keys:
+            return set()
+
+        def grant(db: sqlite3.Connection) -> Set[str]:
+            now = time.time()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                db.executemany(
+                    "INSERT INTO scheduler_leases (key, owner, expires_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                    "WHERE scheduler_leases.owner = excluded.owner OR scheduler_leases.expires_at <= ?",
+                    [(key, owner, now + ttl_seconds, now) for key in keys]
+                )
+                held = db.execute(
+                    "SELECT key FROM scheduler_leases WHERE owner = ? AND expires_at > ?",
+                    (owner, now)
+                ).fetchall()
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+            return {row[0] for row in held} & set(keys)
+
+        return await self._run(grant)
+
+    async def release(self, keys: Sequence[str], owner: str) -> None:
+        if keys:
+            await self._run(lambda db: db.executemany(
+                "DELETE FROM scheduler_leases WHERE key = ? AND owner = ?",
+                [(key, owner) for key in keys]
+            ))
+
+    async def close(self) -> None:
+        if self._connection is not None:
+            await asyncio.to_thread(self._connection.close)
+            self._connection = None
+
+    async def _run(self, operation):
+        def locked():
+            with self._lock:
+                if self._connection is None:
+                    self._connection = sqlite3.connect(
+                        self.path, check_same_thread=False, isolation_level=None
+                    )
+                    self._connection.execute("PRAGMA journal_mode=WAL")
+                    self._connection.execute("PRAGMA busy_timeout=5000")
+                    self._connection.executescript(self.SCHEMA)
+                return operation(self._connection)
+
+        return await asyncio.to_thread(locked)
+
+
+class LeaseBackendFactory:
+    """Factory for creating lease backends"""
+
+    @staticmethod
+    def create_backend(url: str) -> BaseLeaseBackend:
+        """Create the backend matching a URL (redis:// or sqlite:///)"""
+
+        if url.startswith(("redis://", "rediss://")):
+            import redis.asyncio as redis
+            return RedisLeaseBackend(redis.from_url(url))
+        elif url.startswith("sqlite:///"):
+            return SQLiteLeaseBackend(url[len("sqlite:///"):])
+        else:
+            raise ValueError(f"Unsupported lease backend URL: {url}")
+
+
+class ShardCoordinator:
+    """
+    Keeps this node's share of the shard space leased.
+
+    Each rebalance heartbeats the node, places every shard on the hash ring
+    of live nodes, releases shards that moved away and acquires or renews
+    the ones mapped here. A shard still leased by its previous owner is
+    picked up on a later cycle, after that owner releases it or its lease
+    expires. Shards only partition the work: the store's atomic claim still
+    guarantees a call is dispatched once if two nodes briefly overlap.
+    """
+
+    def __init__(
+        self,
+        backend: BaseLeaseBackend,
+        node_id: Optional[str] = None,
+        num_shards: int = NUM_SHARDS,
+        lease_seconds: float = 15.0,
+        vnodes: int = 64
+    ):
+        self.backend = backend
+        self.node_id = node_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.num_shards = num_shards
+        self.lease_seconds = lease_seconds
+        self.vnodes = vnodes
+        self.owned_shards: FrozenSet[int] = frozenset()
+        self.live_nodes: List[str] = []
+
+    @classmethod
+    def from_settings(cls, settings, node_id: Optional[str] = None) -> "ShardCoordinator":
+        """Build a coordinator from application settings"""
+
+        return cls(
+            LeaseBackendFactory.create_backend(settings.scheduler_lease_url or settings.redis_url),
+            node_id=node_id or settings.scheduler_node_id,
+            lease_seconds=settings.shard_lease_seconds
+        )
+
+    def owns(self, user_id: str) -> bool:
+        return shard_for(user_id, self.num_shards) in self.owned_shards
+
+    async def rebalance(self) -> Dict[str, Any]:
+        """Run one membership + lease cycle and report ownership changes"""
+
+        await self.backend.heartbeat(self.node_id, self.lease_seconds)
+        nodes = await self.backend.live_nodes()
+        if self.node_id not in nodes:
+            nodes.append(self.node_id)
+
+        ring = HashRing(nodes, self.vnodes)
+        desired = {
+            shard for shard in range(self.num_shards)
+            if ring.node_for(self._key(shard)) == self.node_id
+        }
+
+        moved = self.owned_shards - desired
+        await self.backend.release([self._key(shard) for shard in moved], self.node_id)
+
+        granted = await self.backend.acquire(
+            [self._key(shard) for shard in sorted(desired)], self.node_id, self.lease_seconds
+        )
+        owned = frozenset(int(key.rsplit(":", 1)[1]) for key in granted)
+
+        report = {
+            "node_id": self.node_id,
+            "nodes": len(nodes),
+            "desired": len(desired),
+            "owned": len(owned),
+            "gained": len(owned - self.owned_shards),
+            "lost": len(self.owned_shards - owned)
+        }
+        if report["gained"] or report["lost"] or nodes != self.live_nodes:
+            logger.info(
+                f"Node {self.node_id} owns {len(owned)}/{self.num_shards} shards "
+                f"across {len(nodes)} nodes (+{report['gained']} -{report['lost']})"
+            )
+
+        self.owned_shards = owned
+        self.live_nodes = sorted(nodes)
+        return report
+
+    async def run_forever(
+        self,
+        interval: Optional[float] = None,
+        on_rebalance: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+    ) -> None:
+        """
+        Rebalance until cancelled, well inside the lease TTL.
+
+        `on_rebalance` receives each cycle's report, e.g. to recover calls a
+        departed node left in flight on shards gained here.
+        """
+
+        interval = interval or self.lease_seconds / 3
+        while True:
+            report = None
+            try:
+                report = await self.rebalance()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Stop claiming rather than risk working shards whose leases lapsed
+                logger.error(f"Shard rebalance failed on {self.node_id}: {e}")
+                self.owned_shards = frozenset()
+            if report is not None and on_rebalance is not None:
+                try:
+                    await on_rebalance(report)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Post-rebalance hook failed on {self.node_id}: {e}")
+            await asyncio.sleep(interval)
+
+    async def stop(self) -> None:
+        """Hand shards back immediately instead of waiting for lease expiry"""
+
+        await self.backend.release([self._key(shard) for shard in self.owned_shards], self.node_id)
+        await self.backend.leave(self.node_id)
+        self.owned_shards = frozenset()
+        await self.backend.close()
+
+    @staticmethod
+    def _key(shard: int) -> str:
+        return f"shard:{shard}"
@@ -0,0 +1,204 @@
+"""
+End-to-end load benchmark for the calls API
+
+Drives POST /api/v1/calls/initiate followed by `--turns` POST
+/respond/{call_id} from `--concurrency` virtual users and reports
+throughput and p50/p95/p99 per endpoint. By default the app runs in
+process against the simulated AI engine, an in-memory session store and a
+Telegram service stub, so no network or provider credits are needed;
+`--url` targets a running server instead (start it with
+AI_PROVIDER=simulated for offline numbers).
+
+    python -m benchmarks.bench_call_api --concurrency 50 --conversations 500
+    python -m benchmarks.bench_call_api --latency-ms 800 --error-rate 0.02 --json
+"""
+
+from typing import Any, Dict, Optional, Tuple
+import argparse
+import asyncio
+import json
+import time
+
+from backend.core.latency import summarize_latencies
+
+PREFIX = "/api/v1/calls"
+USER_REPLIES = ("done", "skipped the gym", "I did 20 minutes", "not yet, later today", "yes")
+
+
+def build_app(args):
+    """The calls router with its lifespan state wired to offline stand-ins"""
+
+    from fastapi import FastAPI
+
+    from backend.api.calls import router as calls_router
+    from backend.core.ai_engine import AIProvider, EnginePool
+    from backend.core.memory import ConversationMemory
+    from backend.services.call_service import CallProvider, CallScheduler, TelegramCallService
+    from backend.services.session_store import SessionStore
+
+    app = FastAPI()
+    app.include_router(calls_router, prefix=PREFIX)
+    app.state.call_scheduler = CallScheduler(call_services={CallProvider.TELEGRAM: TelegramCallService("bench")})
+    app.state.session_store = SessionStore(max_entries=max(10000, args.conversations))
+    app.state.memory = ConversationMemory()
+    app.state.engine_pool = EnginePool(
+        AIProvider.SIMULATED,
+        {AIProvider.SIMULATED: {
+            "latency_ms": args.latency_ms,
+            "latency_jitter": args.latency_jitter,
+            "latency_distribution": args.latency_distribution,
+            "tokens_per_second": args.tokens_per_second,
+            "error_rate": args.error_rate,
+            "seed": args.seed
+        }}
+    )
+    return app
+
+
+class ASGIClient:
+    """Minimal JSON-over-ASGI client: requests go straight into the app, no sockets"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def post(self, path: str, payload: Dict[str, Any]) -> Tuple[int, Any]:
+        body = json.dumps(payload).encode()
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "POST", "scheme": "http", "path": path, "raw_path": path.encode(),
+            "query_string": b"", "root_path": "",
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+            "client": ("127.0.0.1", 0), "server": ("bench", 80)
+        }
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+        status = 500
+        chunks = []
+
+        async def receive():
+            return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        raw = b"".join(chunks)
+        return status, json.loads(raw) if raw else None
+
+    async def close(self) -> None:
+        pass
+
+
+class HTTPClient:
+    """The same interface over HTTP, for a running server"""
+
+    def __init__(self, url: str, concurrency: int):
+        import aiohttp
+
+        self.url = url.rstrip("/")
+        self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency))
+
+    async def post(self, path: str, payload: Dict[str, Any]) -> Tuple[int, Any]:
+        async with self.session.post(self.url + path, json=payload) as response:
+            return response.status, await response.json(content_type=None)
+
+    async def close(self) -> None:
+        await self.session.close()
+
+
+async def run_load(client, args) -> Dict[str, Any]:
+    latencies: Dict[str, list] = {"initiate": [], "respond": []}
+    errors: Dict[str, int] = {"initiate": 0, "respond": 0}
+    remaining = iter(range(args.conversations))
+
+    async def timed(endpoint: str, path: str, payload: Dict[str, Any]) -> Optional[Any]:
+        started = time.perf_counter()
+        try:
+            status, body = await client.post(path, payload)
+        except Exception:
+            status, body = 0, None
+        if status != 200:
+            errors[endpoint] += 1
+            return None
+        latencies[endpoint].append(time.perf_counter() - started)
+        return body
+
+    async def virtual_user(worker: int) -> None:
+        for conversation in remaining:
+            body = await timed("initiate", f"{PREFIX}/initiate", {
+                "user_id": f"bench_user_{conversation}",
+                "call_type": "morning",
+                "personality": "motivator",
+                "provider": "telegram"
+            })
+            if body is None:
+                continue
+            for turn in range(args.turns):
+                reply = USER_REPLIES[(conversation + turn) % len(USER_REPLIES)]
+                await timed("respond", f"{PREFIX}/respond/{body['call_id']}", {"text": reply})
+
+    started = time.perf_counter()
+    await asyncio.gather(*(virtual_user(worker) for worker in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    report = {"concurrency": args.concurrency, "conversations": args.conversations, "seconds": round(elapsed, 3)}
+    for endpoint, samples in latencies.items():
+        report[endpoint] = {
+            "requests": len(samples),
+            "errors": errors[endpoint],
+            "throughput_rps": round(len(samples) / elapsed, 1),
+            **summarize_latencies(samples)
+        }
+    total = sum(len(samples) for samples in latencies.values())
+    report["throughput_rps"] = round(total / elapsed, 1)
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(
+        f"{report['conversations']} conversations, concurrency {report['concurrency']}, "
+        f"{report['seconds']:.1f}s, {report['throughput_rps']:.1f} req/s overall"
+    )
+    print(f"{'endpoint':<10} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for endpoint in ("initiate", "respond"):
+        row = report[endpoint]
+        print(
+            f"{endpoint:<10} {row['requests']:>9} {row['errors']:>7} {row['throughput_rps']:>8.1f} "
+            f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}"
+        )
+
+
+async def main_async(args) -> None:
+    client = HTTPClient(args.url, args.concurrency) if args.url else ASGIClient(build_app(args))
+    try:
+        report = await run_load(client, args)
+    finally:
+        await client.close()
+    if args.json:
+        print(json.dumps(report))
+    else:
+        print_report(report)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="running server to target instead of the in-process app")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--conversations", type=int, default=500)
+    parser.add_argument("--turns", type=int, default=3, help="respond calls per conversation")
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--latency-jitter", type=float, default=0.5)
+    parser.add_argument("--latency-distribution", default="lognormal")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0,
+                        help="0 returns replies at once (generate_response waits for the whole reply anyway)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="one JSON report line, for regression tracking")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
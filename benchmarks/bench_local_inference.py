@@ -0,0 +1,183 @@
+"""
+Throughput vs latency of LocalAIEngine against a parallel-decoding server
+
+Runs `--concurrency` callers through the real LocalAIEngine.generate_response
+(prompt build, httpx, Ollama's NDJSON stream) against an in-process stand-in
+for Ollama. The stand-in decodes up to `--num-parallel` requests together,
+like OLLAMA_NUM_PARALLEL, and queues the rest: one decode step costs
+`base + per_seq * active`, since most of a step streams the weights, which
+the active sequences share. Each `--max-parallel` value is one row, so the
+table shows what the engine's concurrency cap costs or buys.
+
+    python -m benchmarks.bench_local_inference
+    python -m benchmarks.bench_local_inference --num-parallel 8 --max-parallel 1 4 8 16 --json
+"""
+
+from typing import Any, AsyncIterator, Deque, Dict, List
+import argparse
+import asyncio
+import collections
+import json
+import time
+
+from backend.core.ai_engine import LocalAIEngine
+from backend.core.latency import summarize_latencies
+from backend.core.simulated_engine import REPLY_SENTENCES
+
+WORDS = " ".join(REPLY_SENTENCES).split()
+
+
+class FakeOllama:
+    """/api/chat over HTTP/1.1 keep-alive, decoding up to `num_parallel` requests per step"""
+
+    def __init__(self, num_parallel: int, base_ms: float, per_seq_ms: float, reply_tokens: int):
+        self.num_parallel = num_parallel
+        self.base = base_ms / 1000
+        self.per_seq = per_seq_ms / 1000
+        self.reply_tokens = reply_tokens
+        self.steps = 0
+        self.decoded = 0
+        self._waiting: Deque[asyncio.Queue] = collections.deque()
+        self._active: Dict[asyncio.Queue, int] = {}
+        self._wake = asyncio.Event()
+
+    async def decode(self) -> AsyncIterator[str]:
+        tokens: asyncio.Queue = asyncio.Queue()
+        self._waiting.append(tokens)
+        self._wake.set()
+        for _ in range(self.reply_tokens):
+            yield await tokens.get()
+
+    async def run_decoder(self) -> None:
+        while True:
+            while len(self._active) < self.num_parallel and self._waiting:
+                self._active[self._waiting.popleft()] = 0
+            if not self._active:
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+            await asyncio.sleep(self.base + self.per_seq * len(self._active))
+            self.steps += 1
+            self.decoded += len(self._active)
+            for tokens, produced in list(self._active.items()):
+                tokens.put_nowait(WORDS[produced % len(WORDS)] + " ")
+                if produced + 1 == self.reply_tokens:
+                    del self._active[tokens]
+                else:
+                    self._active[tokens] = produced + 1
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = json.loads(await reader.readexactly(int(headers.get("content-length", 0))) or b"{}")
+                if body.get("stream", True):
+                    await self._stream(writer)
+                else:
+                    await self._complete(writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _stream(self, writer: asyncio.StreamWriter) -> None:
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nTransfer-Encoding: chunked\r\n\r\n")
+        async for token in self.decode():
+            line = json.dumps({"message": {"role": "assistant", "content": token}, "done": False}).encode() + b"\n"
+            writer.write(b"%x\r\n%s\r\n" % (len(line), line))
+            await writer.drain()
+        line = json.dumps({"message": {"role": "assistant", "content": ""}, "done": True}).encode() + b"\n"
+        writer.write(b"%x\r\n%s\r\n0\r\n\r\n" % (len(line), line))
+        await writer.drain()
+
+    async def _complete(self, writer: asyncio.StreamWriter) -> None:
+        content = "".join([token async for token in self.decode()])
+        payload = json.dumps({"message": {"role": "assistant", "content": content}, "done": True}).encode()
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n%s"
+            % (len(payload), payload)
+        )
+        await writer.drain()
+
+
+async def run_point(max_parallel: int, args) -> Dict[str, Any]:
+    server = FakeOllama(args.num_parallel, args.base_ms, args.per_seq_ms, args.reply_tokens)
+    decoder = asyncio.create_task(server.run_decoder())
+    listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    engine = LocalAIEngine(model_path="bench", base_url=f"http://127.0.0.1:{port}", max_parallel=max_parallel)
+
+    latencies: List[float] = []
+    remaining = iter(range(args.requests))
+
+    async def caller(worker: int) -> None:
+        for i in remaining:
+            started = time.perf_counter()
+            await engine.generate_response(f"update {i}: {WORDS[i % len(WORDS)]}", {}, "morning")
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(caller(worker) for worker in range(args.concurrency)))
+    finally:
+        elapsed = time.perf_counter() - started
+        await engine.close()
+        listener.close()
+        await listener.wait_closed()
+        decoder.cancel()
+
+    return {
+        "max_parallel": max_parallel,
+        "num_parallel": args.num_parallel,
+        "requests": len(latencies),
+        "seconds": round(elapsed, 3),
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        "mean_decode_batch": round(server.decoded / max(1, server.steps), 2),
+        "latency": summarize_latencies(latencies)
+    }
+
+
+def print_report(reports: List[Dict[str, Any]], args) -> None:
+    print(
+        f"{args.requests} requests from {args.concurrency} callers, {args.reply_tokens} tokens each, "
+        f"server decodes {args.num_parallel} at a time, step {args.base_ms:.0f}ms + {args.per_seq_ms:.0f}ms/seq"
+    )
+    print(f"{'max_parallel':>12} {'req/s':>8} {'batch':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for report in reports:
+        latency = report["latency"]
+        print(
+            f"{report['max_parallel']:>12} {report['requests_per_s']:>8.1f} {report['mean_decode_batch']:>6.2f} "
+            f"{latency['p50_ms']:>8.0f} {latency['p95_ms']:>8.0f} {latency['p99_ms']:>8.0f}"
+        )
+
+
+async def main_async(args) -> None:
+    reports = [await run_point(max_parallel, args) for max_parallel in args.max_parallel]
+    if args.json:
+        for report in reports:
+            print(json.dumps(report))
+    else:
+        print_report(reports, args)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-parallel", type=int, nargs="+", default=[1, 2, 4, 8], help="engine caps to compare")
+    parser.add_argument("--num-parallel", type=int, default=4, help="server-side OLLAMA_NUM_PARALLEL")
+    parser.add_argument("--concurrency", type=int, default=16, help="callers waiting on a reply at once")
+    parser.add_argument("--requests", type=int, default=48)
+    parser.add_argument("--reply-tokens", type=int, default=20)
+    parser.add_argument("--base-ms", type=float, default=20.0, help="decode step cost shared by the batch")
+    parser.add_argument("--per-seq-ms", type=float, default=2.0, help="decode step cost per active sequence")
+    parser.add_argument("--json", action="store_true", help="one JSON report line per cap")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
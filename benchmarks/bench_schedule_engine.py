@@ -0,0 +1,111 @@
+"""
+Dispatch latency benchmark for the schedule engine
+
+Fills a DispatchQueue with N calls spread over one day and measures insert,
+cancel and per-tick "pop all due" latency as the queue grows. A flat list
+scan (the previous CallScheduler layout) is timed alongside for reference.
+
+    python -m benchmarks.bench_schedule_engine --entries 1000000
+"""
+
+from datetime import datetime, timedelta, timezone
+import argparse
+import random
+import statistics
+import time
+
+from backend.services.schedule_engine import DispatchQueue
+
+DAY_SECONDS = 24 * 60 * 60
+
+
+def build_queue(size: int, start: datetime, rng: random.Random):
+    queue = DispatchQueue()
+    offsets = [rng.randrange(DAY_SECONDS) for _ in range(size)]
+
+    began = time.perf_counter()
+    for i, offset in enumerate(offsets):
+        fire_at = start + timedelta(seconds=offset)
+        queue.push(f"call_{i}", fire_at, {"call_id": f"call_{i}", "scheduled_at": fire_at})
+    elapsed = time.perf_counter() - began
+
+    return queue, offsets, elapsed
+
+
+def measure_ticks(queue: DispatchQueue, start: datetime, ticks: int, tick_seconds: int):
+    """Pop everything due on each tick and record the time spent per tick"""
+
+    latencies = []
+    popped = 0
+    for tick in range(1, ticks + 1):
+        now = start + timedelta(seconds=tick * tick_seconds)
+        began = time.perf_counter()
+        popped += len(queue.pop_due(now))
+        latencies.append(time.perf_counter() - began)
+    return latencies, popped
+
+
+def measure_list_scan(offsets, ticks: int, tick_seconds: int):
+    """Same ticks against a flat list that has to be scanned every time"""
+
+    pending = list(offsets)
+    latencies = []
+    for tick in range(1, ticks + 1):
+        cutoff = tick * tick_seconds
+        began = time.perf_counter()
+        pending = [offset for offset in pending if offset > cutoff]
+        latencies.append(time.perf_counter() - began)
+    return latencies
+
+
+def measure_cancel(queue: DispatchQueue, size: int, samples: int, rng: random.Random):
+    latencies = []
+    for _ in range(samples):
+        call_id = f"call_{rng.randrange(size)}"
+        began = time.perf_counter()
+        queue.cancel(call_id)
+        latencies.append(time.perf_counter() - began)
+    return latencies
+
+
+def quantile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--ticks", type=int, default=120, help="dispatch ticks to time per size")
+    parser.add_argument("--tick-seconds", type=int, default=1)
+    parser.add_argument("--scan-limit", type=int, default=100_000,
+                        help="skip the list-scan baseline above this size")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    sizes = [size for size in (10_000, 100_000, 1_000_000) if size < args.entries] + [args.entries]
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    print(f"{'entries':>10} {'insert/s':>12} {'tick p50':>10} {'tick p99':>10} "
+          f"{'per call':>10} {'cancel p99':>11} {'scan p50':>10}")
+
+    for size in sizes:
+        rng = random.Random(args.seed)
+        queue, offsets, insert_seconds = build_queue(size, start, rng)
+
+        latencies, popped = measure_ticks(queue, start, args.ticks, args.tick_seconds)
+        cancels = measure_cancel(queue, size, 10_000, rng)
+        per_call = sum(latencies) / max(popped, 1)
+
+        scan = "-"
+        if size <= args.scan_limit:
+            scan_latencies = measure_list_scan(offsets, min(args.ticks, 20), args.tick_seconds)
+            scan = f"{statistics.median(scan_latencies) * 1e3:8.2f}ms"
+
+        print(f"{size:>10,} {size / insert_seconds:>12,.0f} "
+              f"{statistics.median(latencies) * 1e6:>8.1f}us {quantile(latencies, 0.99) * 1e6:>8.1f}us "
+              f"{per_call * 1e6:>8.2f}us {quantile(cancels, 0.99) * 1e6:>9.2f}us {scan:>10}")
+
+
+if __name__ == "__main__":
+    main()
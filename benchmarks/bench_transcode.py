@@ -0,0 +1,119 @@
+"""
+Throughput of the streaming audio transcoder per conversion path
+
+Feeds `--seconds` of synthetic speech-band audio through
+backend.core.audio_codec.transcode in `--chunk-bytes` chunks, the way a
+voice engine stream arrives, and reports input MB/s and how many times
+faster than real time each path runs. Paths that need ffmpeg (Opus) are
+skipped when it is not installed.
+
+    python -m benchmarks.bench_transcode
+    python -m benchmarks.bench_transcode --seconds 120 --chunk-bytes 1024 --json
+"""
+
+from typing import Any, AsyncIterator, Dict, List
+import argparse
+import asyncio
+import json
+import shutil
+import time
+
+import numpy as np
+
+from backend.core.audio_codec import AudioEncoding, AudioFormat, mulaw_encode, transcode
+from backend.core.voice_pool import pcm16_wav
+
+PCM = AudioEncoding.PCM16
+PATHS = [
+    ("local wav 22.05k -> twilio ulaw 8k", AudioFormat(PCM, 22050), AudioFormat(AudioEncoding.MULAW, 8000), "wav"),
+    ("elevenlabs pcm 24k -> twilio ulaw 8k", AudioFormat(PCM, 24000), AudioFormat(AudioEncoding.MULAW, 8000), "raw"),
+    ("twilio ulaw 8k -> stt pcm 16k", AudioFormat(AudioEncoding.MULAW, 8000), AudioFormat(PCM, 16000), "ulaw"),
+    ("pcm 44.1k stereo -> pcm 16k", AudioFormat(PCM, 44100, channels=2), AudioFormat(PCM, 16000), "raw"),
+    ("local wav 22.05k -> pcm 48k", AudioFormat(PCM, 22050), AudioFormat(PCM, 48000), "wav"),
+    ("local wav 22.05k -> telegram opus 48k", AudioFormat(PCM, 22050), AudioFormat(AudioEncoding.OGG_OPUS, 48000), "wav")
+]
+
+
+def speech_like(seconds: float, rate: int, channels: int) -> np.ndarray:
+    """Harmonics of a wandering pitch plus noise, in [-1, 1]"""
+
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * rate)) / rate
+    pitch = 140 + 40 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / rate
+    voice = sum(np.sin(k * phase) / k for k in range(1, 8)) * (0.5 + 0.5 * np.sin(2 * np.pi * 3 * t)) * 0.3
+    signal = voice + 0.02 * rng.standard_normal(len(t))
+    return np.repeat(signal[:, None], channels, axis=1).ravel() if channels > 1 else signal
+
+
+def source_bytes(source: AudioFormat, layout: str, seconds: float) -> bytes:
+    samples = speech_like(seconds, source.sample_rate, source.channels)
+    if layout == "wav":
+        # One WAV per five-second "sentence", as LocalVoiceEngine streams them
+        step = source.sample_rate * 5
+        return b"".join(pcm16_wav(samples[i:i + step], source.sample_rate) for i in range(0, len(samples), step))
+    pcm = (np.clip(samples, -1, 1) * 32767).astype("<i2")
+    return mulaw_encode(pcm).tobytes() if layout == "ulaw" else pcm.tobytes()
+
+
+async def chunked(data: bytes, chunk_bytes: int) -> AsyncIterator[memoryview]:
+    view = memoryview(data)
+    for offset in range(0, len(view), chunk_bytes):
+        yield view[offset:offset + chunk_bytes]
+
+
+async def run_path(name: str, source: AudioFormat, target: AudioFormat, layout: str, args) -> Dict[str, Any]:
+    data = source_bytes(source, layout, args.seconds)
+    best = float("inf")
+    produced = 0
+    for _ in range(args.repeat):
+        produced = 0
+        started = time.perf_counter()
+        async for chunk in transcode(chunked(data, args.chunk_bytes), source, target):
+            produced += len(chunk)
+        best = min(best, time.perf_counter() - started)
+    return {
+        "path": name,
+        "input_mb": round(len(data) / 1e6, 2),
+        "output_mb": round(produced / 1e6, 2),
+        "seconds": round(best, 4),
+        "mb_per_s": round(len(data) / 1e6 / best, 1),
+        "realtime_x": round(args.seconds / best, 1)
+    }
+
+
+def print_report(reports: List[Dict[str, Any]], args) -> None:
+    print(f"{args.seconds:.0f}s of audio per path, {args.chunk_bytes}-byte chunks, best of {args.repeat}")
+    print(f"{'path':<40} {'in MB':>7} {'out MB':>7} {'MB/s':>8} {'x realtime':>11}")
+    for report in reports:
+        print(
+            f"{report['path']:<40} {report['input_mb']:>7.2f} {report['output_mb']:>7.2f} "
+            f"{report['mb_per_s']:>8.1f} {report['realtime_x']:>11.1f}"
+        )
+
+
+async def main_async(args) -> None:
+    reports = []
+    for name, source, target, layout in PATHS:
+        if (source.compressed or target.compressed) and shutil.which("ffmpeg") is None:
+            print(f"skipping {name}: ffmpeg is not installed")
+            continue
+        reports.append(await run_path(name, source, target, layout, args))
+    if args.json:
+        for report in reports:
+            print(json.dumps(report))
+    else:
+        print_report(reports, args)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=60.0, help="audio duration per path")
+    parser.add_argument("--chunk-bytes", type=int, default=4096, help="matches stream_speech's default")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="one JSON report line per path")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Event-loop responsiveness under concurrent local synthesis
+
+Runs `--conversations` concurrent speakers, each synthesizing `--sentences`
+sentences, while a probe task sleeps 10 ms in a loop and records how late
+it wakes up. That lateness is what every other call on the API process
+would see. Modes:
+
+    inline  the model runs inside the coroutine, as an unpooled local engine would
+    thread  asyncio.to_thread; the GIL-bound model still starves the loop
+    pool    VoiceWorkerPool, models in worker processes, audio in shared memory
+
+The default model is the simulated one (CPU spin plus a tone), so no TTS
+install is needed; `--model espeak` or `--model coqui` measures a real one.
+
+    python -m benchmarks.bench_voice_pool --conversations 8 --workers 4
+    python -m benchmarks.bench_voice_pool --modes pool --model espeak --json
+"""
+
+from typing import Any, Dict, List
+import argparse
+import asyncio
+import json
+import time
+
+from backend.core import voice_pool
+from backend.core.latency import summarize_latencies
+from backend.core.simulated_engine import REPLY_SENTENCES
+
+PROBE_INTERVAL = 0.01
+
+
+async def probe(lags: List[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(max(0.0, time.perf_counter() - started - PROBE_INTERVAL))
+
+
+async def run_mode(mode: str, args) -> Dict[str, Any]:
+    pool = None
+    if mode == "pool":
+        pool = voice_pool.VoiceWorkerPool(
+            tts_model=args.model, workers=args.workers, simulated_cpu_ms_per_char=args.cpu_ms_per_char
+        )
+        await pool.start()
+        synthesize = pool.synthesize
+    else:
+        voice_pool.load_models(args.model, simulated_cpu_ms_per_char=args.cpu_ms_per_char)
+        if mode == "inline":
+            async def synthesize(text: str) -> bytes:
+                return voice_pool.synthesize_audio(text)
+        else:
+            async def synthesize(text: str) -> bytes:
+                return await asyncio.to_thread(voice_pool.synthesize_audio, text)
+
+    latencies: List[float] = []
+    audio_bytes = 0
+
+    async def speaker(conversation: int) -> None:
+        nonlocal audio_bytes
+        for i in range(args.sentences):
+            text = REPLY_SENTENCES[(conversation + i) % len(REPLY_SENTENCES)]
+            started = time.perf_counter()
+            audio_bytes += len(await synthesize(text))
+            latencies.append(time.perf_counter() - started)
+
+    lags: List[float] = []
+    stop = asyncio.Event()
+    prober = asyncio.create_task(probe(lags, stop))
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(speaker(c) for c in range(args.conversations)))
+    finally:
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await prober
+        if pool is not None:
+            await pool.close()
+
+    return {
+        "mode": mode,
+        "syntheses": len(latencies),
+        "seconds": round(elapsed, 3),
+        "syntheses_per_s": round(len(latencies) / elapsed, 1),
+        "audio_mb": round(audio_bytes / 1e6, 2),
+        "synthesis": summarize_latencies(latencies),
+        "loop_lag": summarize_latencies(lags)
+    }
+
+
+def print_report(reports: List[Dict[str, Any]], args) -> None:
+    print(
+        f"{args.conversations} conversations x {args.sentences} sentences, model {args.model}, "
+        f"pool of {args.workers}"
+    )
+    print(
+        f"{'mode':<7} {'synth/s':>8} {'synth p95 ms':>13} "
+        f"{'lag p50 ms':>11} {'lag p99 ms':>11} {'lag max ms':>11}"
+    )
+    for report in reports:
+        lag = report["loop_lag"]
+        print(
+            f"{report['mode']:<7} {report['syntheses_per_s']:>8.1f} {report['synthesis']['p95_ms']:>13.1f} "
+            f"{lag['p50_ms']:>11.1f} {lag['p99_ms']:>11.1f} {lag['max_ms']:>11.1f}"
+        )
+
+
+async def main_async(args) -> None:
+    reports = [await run_mode(mode, args) for mode in args.modes]
+    if args.json:
+        for report in reports:
+            print(json.dumps(report))
+    else:
+        print_report(reports, args)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=["inline", "thread", "pool"],
+                        choices=["inline", "thread", "pool"])
+    parser.add_argument("--model", default="simulated", help="simulated, espeak or coqui")
+    parser.add_argument("--conversations", type=int, default=8)
+    parser.add_argument("--sentences", type=int, default=5, help="sentences synthesized per conversation")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--cpu-ms-per-char", type=float, default=0.5, help="simulated model cost")
+    parser.add_argument("--json", action="store_true", help="one JSON report line per mode")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
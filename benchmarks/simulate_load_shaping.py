@@ -0,0 +1,112 @@
+"""
+Peak-minute simulation for call load shaping
+
+Schedules a synthetic population where most users keep the default
+08:00/13:00/20:00 times, then reports the busiest provider minute with and
+without a LoadShaper, and how many shaped slots survive a second day of
+rescheduling unchanged.
+
+    python -m benchmarks.simulate_load_shaping --users 50000
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+import argparse
+import asyncio
+import random
+
+from backend.services.call_service import CallScheduler, CallProvider
+from backend.services.load_shaping import LoadShaper
+
+TIMEZONES = ["UTC", "Europe/Moscow", "Europe/Berlin", "America/New_York", "Asia/Dubai"]
+PROVIDERS = [CallProvider.TELEGRAM] * 7 + [CallProvider.WHATSAPP] * 2 + [CallProvider.TWILIO]
+
+
+def random_time(rng: random.Random, default: str) -> str:
+    hour, minute = map(int, default.split(":"))
+    shifted = datetime(2000, 1, 1, hour, minute) + timedelta(minutes=rng.randrange(-90, 91, 15))
+    return shifted.strftime("%H:%M")
+
+
+def build_population(users: int, default_share: float, seed: int):
+    rng = random.Random(seed)
+    population = []
+    for i in range(users):
+        times = ("08:00", "13:00", "20:00")
+        if rng.random() > default_share:
+            times = tuple(random_time(rng, t) for t in times)
+        population.append((f"user_{i}", times, rng.choice(TIMEZONES), rng.choice(PROVIDERS)))
+    return population
+
+
+async def schedule(scheduler: CallScheduler, population, now: datetime):
+    for user_id, (morning, midday, evening), tz_name, provider in population:
+        await scheduler.schedule_daily_calls(
+            user_id, morning, midday, evening, timezone=tz_name, provider=provider, now=now
+        )
+
+
+def minute_load(scheduler: CallScheduler) -> Counter:
+    load = Counter()
+    for call in scheduler.scheduled_calls:
+        fire_at = call["scheduled_at"]
+        load[(call["provider"], fire_at.hour * 60 + fire_at.minute)] += 1
+    return load
+
+
+def peaks(load: Counter):
+    result = {}
+    for (provider, minute), count in load.items():
+        if count > result.get(provider, (0, 0))[0]:
+            result[provider] = (count, minute)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--default-share", type=float, default=0.8,
+                        help="share of users keeping the default call times")
+    parser.add_argument("--tolerance", type=int, default=10, help="minutes either side")
+    parser.add_argument("--telegram-rate", type=float, default=30.0, help="messages per second")
+    parser.add_argument("--whatsapp-rate", type=float, default=80.0, help="messages per second")
+    parser.add_argument("--twilio-rate", type=float, default=10.0, help="calls per second")
+    parser.add_argument("--utilization", type=float, default=0.8)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    capacity = {
+        CallProvider.TELEGRAM: int(args.telegram_rate * 60 * args.utilization),
+        CallProvider.WHATSAPP: int(args.whatsapp_rate * 60 * args.utilization),
+        CallProvider.TWILIO: int(args.twilio_rate * 60 * args.utilization)
+    }
+    population = build_population(args.users, args.default_share, args.seed)
+    day_one = datetime(2024, 1, 15, 0, 0, tzinfo=timezone.utc)
+
+    baseline = CallScheduler()
+    asyncio.run(schedule(baseline, population, day_one))
+
+    shaper = LoadShaper(capacity, tolerance_minutes=args.tolerance)
+    shaped = CallScheduler(load_shaper=shaper)
+    asyncio.run(schedule(shaped, population, day_one))
+    first_day = {(c["user_id"], c["call_type"]): c["scheduled_time"] for c in shaped.scheduled_calls}
+
+    asyncio.run(schedule(shaped, population, day_one + timedelta(days=1)))
+    second_day = {(c["user_id"], c["call_type"]): c["scheduled_time"] for c in shaped.scheduled_calls}
+    stable = sum(1 for key, value in first_day.items() if second_day.get(key) == value)
+
+    before, after = peaks(minute_load(baseline)), peaks(minute_load(shaped))
+
+    print(f"users={args.users:,} calls={len(first_day):,} tolerance=±{args.tolerance}min")
+    print(f"{'provider':<10} {'capacity/min':>13} {'peak before':>12} {'peak after':>11} {'reduction':>10}")
+    for provider in (CallProvider.TELEGRAM, CallProvider.WHATSAPP, CallProvider.TWILIO):
+        peak_before = before.get(provider, (0, 0))[0]
+        peak_after = after.get(provider, (0, 0))[0]
+        reduction = 1 - peak_after / peak_before if peak_before else 0.0
+        print(f"{provider.value:<10} {capacity[provider]:>13,} {peak_before:>12,} "
+              f"{peak_after:>11,} {reduction:>9.0%}")
+    print(f"slots unchanged after rescheduling next day: {stable / len(first_day):.2%}")
+
+
+if __name__ == "__main__":
+    main()
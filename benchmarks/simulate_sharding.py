@@ -0,0 +1,153 @@
+"""
+Multi-process simulation for sharded call scheduling
+
+Starts several scheduler node processes that share a SQLite schedule store
+and a SQLite lease file (the local stand-in for Redis). Calls become due
+continuously while one node is killed without releasing its leases and a
+new node joins. Reports shard ownership after each phase, calls claimed per
+node, and any call claimed more than once.
+
+    python -m benchmarks.simulate_sharding --nodes 3 --calls 20000
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+
+from backend.services.call_service import CallProvider, CallStatus, CallType
+from backend.services.schedule_store import SQLiteScheduleStore
+from backend.services.sharding import NUM_SHARDS, SQLiteLeaseBackend, ShardCoordinator
+
+
+async def seed_calls(db_path: str, calls: int, spread_seconds: float) -> None:
+    store = SQLiteScheduleStore(db_path)
+    await store.initialize()
+    start = datetime.now(timezone.utc)
+    await store.insert_calls([
+        {
+            "call_id": uuid.uuid4().hex,
+            "user_id": f"user_{i}",
+            "call_type": CallType.FOLLOWUP,
+            "requested_time": "08:00",
+            "scheduled_time": "08:00",
+            "timezone": "UTC",
+            "scheduled_at": start + timedelta(seconds=spread_seconds * i / calls),
+            "provider": CallProvider.TELEGRAM,
+            "status": CallStatus.SCHEDULED
+        }
+        for i in range(calls)
+    ])
+    await store.close()
+
+
+async def node_loop(node_id: str, db_path: str, lease_path: str, lease_seconds: float, interval: float):
+    store = SQLiteScheduleStore(db_path)
+    await store.initialize()
+    coordinator = ShardCoordinator(SQLiteLeaseBackend(lease_path), node_id, lease_seconds=lease_seconds)
+    try:
+        while True:
+            await coordinator.rebalance()
+            if coordinator.owned_shards:
+                await store.claim_due_batch(
+                    datetime.now(timezone.utc), 1000, node_id, 600, shards=coordinator.owned_shards
+                )
+            await asyncio.sleep(interval)
+    finally:
+        await coordinator.stop()
+        await store.close()
+
+
+def run_node(node_id: str, db_path: str, lease_path: str, lease_seconds: float, interval: float) -> None:
+    try:
+        asyncio.run(node_loop(node_id, db_path, lease_path, lease_seconds, interval))
+    except KeyboardInterrupt:
+        pass
+
+
+def ownership(lease_path: str) -> Counter:
+    with sqlite3.connect(lease_path) as db:
+        rows = db.execute(
+            "SELECT owner FROM scheduler_leases WHERE expires_at > ?", (time.time(),)
+        ).fetchall()
+    return Counter(owner for (owner,) in rows)
+
+
+def report_phase(label: str, lease_path: str) -> None:
+    owned = ownership(lease_path)
+    unowned = NUM_SHARDS - sum(owned.values())
+    spread = ", ".join(f"{node}={count}" for node, count in sorted(owned.items()))
+    print(f"{label:<28} {spread}  (unowned {unowned})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=3)
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--lease-seconds", type=float, default=2.0)
+    parser.add_argument("--interval", type=float, default=0.5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="sharding-")
+    db_path = os.path.join(workdir, "calls.db")
+    lease_path = os.path.join(workdir, "leases.db")
+    settle = args.lease_seconds + 3 * args.interval
+    spread = 4 * settle + 2
+
+    asyncio.run(seed_calls(db_path, args.calls, spread))
+
+    context = multiprocessing.get_context("spawn")
+
+    def start(node_id: str):
+        process = context.Process(
+            target=run_node,
+            args=(node_id, db_path, lease_path, args.lease_seconds, args.interval)
+        )
+        process.start()
+        return process
+
+    nodes = {f"node-{i}": start(f"node-{i}") for i in range(args.nodes)}
+    time.sleep(settle)
+    report_phase(f"{args.nodes} nodes", lease_path)
+
+    # Crash: no graceful release, survivors take over once the leases expire
+    victim = "node-0"
+    nodes[victim].kill()
+    nodes[victim].join()
+    time.sleep(settle)
+    report_phase(f"after killing {victim}", lease_path)
+
+    nodes["node-new"] = start("node-new")
+    time.sleep(settle)
+    report_phase("after node-new joined", lease_path)
+
+    time.sleep(max(0.0, spread - 3 * settle) + settle)
+    for process in nodes.values():
+        process.terminate()
+        process.join()
+
+    with sqlite3.connect(db_path) as db:
+        by_owner = dict(db.execute(
+            "SELECT lease_owner, COUNT(*) FROM calls WHERE status = ? GROUP BY lease_owner",
+            (CallStatus.IN_PROGRESS.value,)
+        ).fetchall())
+        unclaimed = db.execute(
+            "SELECT COUNT(*) FROM calls WHERE status = ?", (CallStatus.SCHEDULED.value,)
+        ).fetchone()[0]
+        duplicates = db.execute("SELECT COUNT(*) FROM calls WHERE attempts > 1").fetchone()[0]
+
+    print()
+    print("calls claimed per node:   " + ", ".join(f"{node}={count}" for node, count in sorted(by_owner.items())))
+    print(f"unclaimed calls:          {unclaimed}")
+    print(f"claimed more than once:   {duplicates}")
+    print(f"workdir:                  {workdir}")
+
+
+if __name__ == "__main__":
+    main()
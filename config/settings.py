@@ -34,14 +34,38 @@ class Settings(BaseSettings):
     redis_url: str = "redis://localhost:6379/0"
     
     # AI providers (Cloud mode)
+    ai_provider: Optional[str] = None  # overrides the deployment-mode default, e.g. "simulated"
     openai_api_key: Optional[str] = None
     anthropic_api_key: Optional[str] = None
     elevenlabs_api_key: Optional[str] = None
     
+    # Simulated AI engine (offline load testing, no provider calls)
+    simulated_ai_latency_ms: float = 300.0
+    simulated_ai_latency_jitter: float = 0.5
+    simulated_ai_latency_distribution: str = "lognormal"  # fixed, uniform, lognormal, exponential
+    simulated_ai_tokens_per_second: float = 50.0
+    simulated_ai_error_rate: float = 0.0
+    simulated_ai_seed: int = 0
+    
     # Local AI models (Local mode)
     local_llm_model: str = "llama2"
+    local_llm_url: str = "http://localhost:11434"  # Ollama server
+    local_llm_max_parallel: int = 4  # requests in flight to Ollama; match OLLAMA_NUM_PARALLEL
+    ai_warmup_enabled: bool = True  # load local weights / open provider connections at boot
+    ai_warmup_timeout: float = 60.0  # seconds
+    ai_hedge_providers: List[str] = []  # e.g. ["local", "openai"]: primary first, backups hedged in
+    ai_hedge_percentile: float = 95.0  # primary latency percentile that triggers the backup
+    ai_hedge_initial_delay_ms: float = 1000.0  # until the primary has a latency history
+    ai_hedge_min_delay_ms: float = 100.0
+    ai_hedge_max_delay_ms: float = 5000.0
     local_tts_model: str = "coqui"
     local_stt_model: str = "whisper"
+    local_stt_model_size: str = "base"  # Whisper checkpoint loaded once at startup
+    stt_max_queue: int = 64  # transcriptions waiting beyond this are rejected
+    stt_max_concurrency: int = 1  # in-process local model: one worker per loaded model copy
+    stt_api_max_concurrency: int = 8  # Whisper API requests in flight at once
+    voice_pool_processes_per_core: float = 0.5  # local TTS/STT worker processes; 0 runs them in the API process
+    voice_pool_slot_mb: int = 8  # shared-memory slot per in-flight request; larger audio is piped
     
     # Communication providers
     twilio_account_sid: Optional[str] = None
@@ -76,10 +100,63 @@ class Settings(BaseSettings):
     default_evening_time: str = "20:00"
     max_call_duration: int = 300  # seconds
     
+    # Call dispatch
+    dispatch_max_concurrency: int = 200
+    dispatch_poll_interval: float = 1.0  # seconds
+    dispatch_batch_size: int = 1000
+    dispatch_lease_seconds: int = 60
+    dispatch_sweep_interval: float = 30.0  # seconds between lapsed-lease / overlong-call sweeps
+    twilio_calls_per_second: float = 1.0
+    telegram_messages_per_second: float = 30.0
+    whatsapp_messages_per_second: float = 80.0
+    
+    # Load shaping (spreads calls around the requested time)
+    load_shaping_enabled: bool = False
+    call_time_tolerance_minutes: int = 10
+    load_shaping_utilization: float = 0.8  # share of provider capacity to target
+    
+    # Pre-rendering (AI message + TTS generated ahead of the call)
+    prerender_enabled: bool = True
+    prerender_lead_minutes: int = 10
+    prerender_max_concurrency: int = 20
+    prerender_poll_interval: float = 30.0  # seconds
+    prerender_take_timeout: float = 10.0  # seconds a due call waits for its in-flight pre-render
+    
+    # Sharded scheduling (several scheduler nodes split users by shard lease)
+    scheduler_sharding_enabled: bool = False
+    scheduler_node_id: Optional[str] = None  # defaults to hostname:pid
+    scheduler_lease_url: Optional[str] = None  # redis:// or sqlite:///; defaults to redis_url
+    shard_lease_seconds: int = 15
+    
+    # AI response cache (short repetitive replies like "done", "skipped gym")
+    response_cache_enabled: bool = True
+    response_cache_max_entries: int = 5000
+    response_cache_ttl_seconds: int = 86400
+    response_cache_similarity: float = 0.85  # cosine threshold for a nearest-neighbour hit
+    response_cache_embedder: str = "hashing"  # or "sentence-transformers"
+    
+    # Conversation memory (recent turns per call, rolling summary per user)
+    memory_token_budget: int = 800
+    memory_window_turns: int = 12
+    memory_summary_words: int = 80
+    memory_max_users: int = 50000
+    memory_cache_seconds: float = 60.0  # how long a worker trusts its copy of a stored summary
+    
+    # Nightly insights (vectorized metrics analysis, model-written narratives)
+    insights_narrative_concurrency: int = 8
+    
+    # Live call sessions (TTL follows max_call_duration)
+    session_cache_max_entries: int = 10000
+    session_local_ttl_seconds: Optional[int] = None  # shorter local TTL for multi-worker setups
+    session_redis_enabled: bool = False
+    
     # Voice settings
     default_voice_provider: str = "elevenlabs"
     voice_speed: float = 1.0
     voice_stability: float = 0.5
+    tts_cache_enabled: bool = True
+    tts_cache_dir: str = "audio_cache"  # docker-compose mounts ./audio_cache here
+    tts_cache_max_mb: int = 1024
     
     # Features flags
     penalty_system_enabled: bool = True
@@ -112,6 +189,9 @@ class LocalSettings(Settings):
     
     deployment_mode: DeploymentMode = DeploymentMode.LOCAL
     
+    # Local storage
+    database_url: str = "sqlite:///./user_data/disciplinecall.db"
+    
     # Local model paths
     local_models_path: str = "./models"
     local_data_path: str = "./user_data"
@@ -0,0 +1,47 @@
+"""
+Shared fixtures for the DisciplineCall.ai test suite
+
+Store tests run against SQLite, and against Postgres too when
+TEST_POSTGRES_URL points at a server the tests may create databases on.
+"""
+
+from urllib.parse import urlsplit, urlunsplit
+import os
+import sys
+import uuid
+
+import pytest
+import pytest_asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.services.schedule_store import PostgresScheduleStore, SQLiteScheduleStore  # noqa: E402
+
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+
+@pytest_asyncio.fixture(params=["sqlite", "postgres"])
+async def store(request, tmp_path):
+    if request.param == "sqlite":
+        store = SQLiteScheduleStore(str(tmp_path / "schedule.db"))
+        await store.initialize()
+        yield store
+        await store.close()
+        return
+
+    if not POSTGRES_URL:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    import asyncpg
+
+    # A throwaway database per test keeps them independent
+    name = f"test_{uuid.uuid4().hex}"
+    admin = await asyncpg.connect(POSTGRES_URL)
+    await admin.execute(f"CREATE DATABASE {name}")
+    store = PostgresScheduleStore(urlunsplit(urlsplit(POSTGRES_URL)._replace(path=f"/{name}")))
+    try:
+        await store.initialize()
+        yield store
+    finally:
+        await store.close()
+        await admin.execute(f"DROP DATABASE {name}")
+        await admin.close()
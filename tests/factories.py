@@ -0,0 +1,71 @@
+"""
+Test data builders
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+import asyncio
+import uuid
+
+from fastapi import FastAPI
+import httpx
+
+from backend.api.calls import router as calls_router
+from backend.core.voice_engine import BaseVoiceEngine, VoiceStyle
+from backend.services.call_service import CallProvider, CallStatus, CallType
+
+NOW = datetime(2026, 3, 2, 12, 0, tzinfo=timezone.utc)
+
+
+class FakeVoiceEngine(BaseVoiceEngine):
+    """Synthesizes the text's own bytes after `delay` seconds and counts syntheses"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.syntheses = 0
+
+    async def text_to_speech(
+        self,
+        text: str,
+        voice_id: Optional[str] = None,
+        voice_style: VoiceStyle = VoiceStyle.FRIENDLY
+    ) -> bytes:
+        self.syntheses += 1
+        await asyncio.sleep(self.delay)
+        return text.encode() * 100
+
+    async def speech_to_text(self, audio_data: bytes, language: str = "en") -> str:
+        return audio_data.decode()
+
+
+def make_call(
+    user_id: str = "user-1",
+    call_type: CallType = CallType.MORNING,
+    scheduled_at: datetime = NOW,
+    provider: CallProvider = CallProvider.TELEGRAM,
+    **overrides: Any
+) -> Dict[str, Any]:
+    """A scheduler call dict as CallScheduler builds them"""
+
+    return {
+        "call_id": uuid.uuid4().hex,
+        "user_id": user_id,
+        "call_type": call_type,
+        "requested_time": "08:00",
+        "scheduled_time": "08:00",
+        "timezone": "UTC",
+        "scheduled_at": scheduled_at,
+        "provider": provider,
+        "status": CallStatus.SCHEDULED,
+        **overrides
+    }
+
+
+def api_client(**state: Any) -> httpx.AsyncClient:
+    """Client for the calls API with `state` (call_scheduler, session_store, ...) on app.state"""
+
+    app = FastAPI()
+    app.include_router(calls_router, prefix="/api/v1/calls")
+    for name, value in state.items():
+        setattr(app.state, name, value)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
@@ -0,0 +1,95 @@
+import asyncio
+import os
+
+import pytest
+
+from backend.core.audio_cache import AudioCache, CachedVoiceEngine, audio_key
+from backend.core.voice_engine import BaseVoiceEngine, VoiceStyle
+
+
+class CountingEngine(BaseVoiceEngine):
+    """Synthesizes a fixed tone and counts how often it had to"""
+
+    def __init__(self):
+        self.syntheses = 0
+
+    async def text_to_speech(self, text, voice_id=None, voice_style=VoiceStyle.FRIENDLY) -> bytes:
+        self.syntheses += 1
+        await asyncio.sleep(0.01)
+        return text.encode() * 100
+
+    async def speech_to_text(self, audio_data, language="en") -> str:
+        return ""
+
+
+@pytest.mark.asyncio
+async def test_hit_serves_the_stored_audio(tmp_path):
+    engine = CountingEngine()
+    cached = CachedVoiceEngine(engine, AudioCache(str(tmp_path)), namespace="test")
+
+    first = await cached.text_to_speech("Good morning")
+    second = await cached.text_to_speech("Good morning")
+
+    assert first == second == b"Good morning" * 100
+    assert engine.syntheses == 1
+    assert bytes(await cached.cached_audio("Good morning")) == first
+
+
+@pytest.mark.asyncio
+async def test_request_during_the_cache_write_shares_the_synthesis(tmp_path):
+    cache = AudioCache(str(tmp_path))
+    write = cache._write
+
+    def slow_write(key, audio):
+        import time
+        time.sleep(0.2)
+        write(key, audio)
+
+    cache._write = slow_write
+    engine = CountingEngine()
+    cached = CachedVoiceEngine(engine, cache, namespace="test")
+
+    first = asyncio.create_task(cached.text_to_speech("Drink some water"))
+    await asyncio.sleep(0.05)
+    second = await cached.text_to_speech("Drink some water")
+
+    assert await first == second
+    assert engine.syntheses == 1
+
+
+@pytest.mark.asyncio
+async def test_cap_evicts_least_recently_used(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=2500, low_watermark=0.5)
+    for key in ("aa01", "bb02", "cc03"):
+        await cache.write(key, b"x" * 1000)
+
+    assert await cache.read_bytes("aa01") is None
+    assert await cache.read_bytes("cc03") == b"x" * 1000
+    assert cache.metrics()["bytes"] <= 2500
+    assert not os.path.exists(os.path.join(str(tmp_path), "aa", "aa01.audio"))
+
+
+def test_key_covers_text_voice_style_and_voice_parameters():
+    base = audio_key("test", "Good morning", "voice-1", VoiceStyle.FRIENDLY, speed=1.0, stability=0.5)
+
+    assert base == audio_key("test", "Good morning", "voice-1", VoiceStyle.FRIENDLY, stability=0.5, speed=1.0)
+    assert len({
+        base,
+        audio_key("other", "Good morning", "voice-1", VoiceStyle.FRIENDLY, speed=1.0, stability=0.5),
+        audio_key("test", "Good evening", "voice-1", VoiceStyle.FRIENDLY, speed=1.0, stability=0.5),
+        audio_key("test", "Good morning", "voice-2", VoiceStyle.FRIENDLY, speed=1.0, stability=0.5),
+        audio_key("test", "Good morning", "voice-1", VoiceStyle.STERN, speed=1.0, stability=0.5),
+        audio_key("test", "Good morning", "voice-1", VoiceStyle.FRIENDLY, speed=1.2, stability=0.5)
+    }) == 6
+
+
+@pytest.mark.asyncio
+async def test_entries_written_by_another_worker_are_found_after_a_restart(tmp_path):
+    writer = AudioCache(str(tmp_path))
+    await writer.write("dd04", b"audio")
+
+    restarted = AudioCache(str(tmp_path))
+
+    assert restarted.metrics()["bytes"] == 5
+    assert await restarted.read_bytes("dd04") == b"audio"
+    assert not [name for _, _, names in os.walk(str(tmp_path)) for name in names if not name.endswith(".audio")]
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from backend.core.audio_codec import AudioEncoding, AudioFormat, mulaw_decode, mulaw_encode, transcode
+from backend.core.voice_pool import pcm16_wav
+
+PCM = AudioEncoding.PCM16
+MULAW = AudioEncoding.MULAW
+
+
+def speech_like(seconds: float, rate: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * rate)) / rate
+    return 0.5 * np.sin(2 * np.pi * 220 * t) + 0.05 * rng.standard_normal(len(t))
+
+
+def pcm_bytes(samples: np.ndarray) -> bytes:
+    return (np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes()
+
+
+def two_sentence_wav(rate: int) -> bytes:
+    samples = speech_like(1.0, rate)
+    return pcm16_wav(samples[:rate // 2], rate) + pcm16_wav(samples[rate // 2:], rate)
+
+
+async def run(data: bytes, chunk_bytes: int, source: AudioFormat, target: AudioFormat) -> bytes:
+    async def chunks():
+        for offset in range(0, len(data), chunk_bytes):
+            yield data[offset:offset + chunk_bytes]
+
+    return b"".join([bytes(chunk) async for chunk in transcode(chunks(), source, target)])
+
+
+PATHS = {
+    "wav 22.05k -> ulaw 8k": (two_sentence_wav(22050), AudioFormat(PCM, 22050), AudioFormat(MULAW, 8000)),
+    "pcm 24k -> ulaw 8k": (pcm_bytes(speech_like(1.0, 24000)), AudioFormat(PCM, 24000), AudioFormat(MULAW, 8000)),
+    "ulaw 8k -> pcm 16k": (
+        mulaw_encode(np.frombuffer(pcm_bytes(speech_like(1.0, 8000)), "<i2")).tobytes(),
+        AudioFormat(MULAW, 8000), AudioFormat(PCM, 16000)
+    ),
+    "wav 22.05k -> pcm 48k": (two_sentence_wav(22050), AudioFormat(PCM, 22050), AudioFormat(PCM, 48000))
+}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", list(PATHS))
+@pytest.mark.parametrize("chunk_bytes", [1, 3, 160, 4096])
+async def test_output_does_not_depend_on_chunking(path, chunk_bytes):
+    data, source, target = PATHS[path]
+
+    whole = await run(data, len(data), source, target)
+    chunked = await run(data, chunk_bytes, source, target)
+
+    assert len(chunked) == len(whole)
+    if target.encoding == MULAW:
+        assert chunked == whole
+    else:
+        # Upsampling positions accumulate in floating point: at most one LSB apart
+        difference = np.frombuffer(chunked, "<i2").astype(int) - np.frombuffer(whole, "<i2").astype(int)
+        assert np.abs(difference).max() <= 1
+
+
+@pytest.mark.asyncio
+async def test_resampled_length_follows_the_rate():
+    data, source, target = PATHS["pcm 24k -> ulaw 8k"]
+
+    out = await run(data, 4096, source, target)
+
+    assert abs(len(out) - 8000) <= 10
+
+
+def test_mulaw_round_trip_is_close():
+    samples = (speech_like(0.1, 8000) * 32767).astype(np.int16)
+
+    decoded = mulaw_decode(mulaw_encode(samples)).astype(int)
+
+    assert np.abs(decoded - samples).max() <= 1024
+
+
+def test_mulaw_matches_audioop():
+    audioop = pytest.importorskip("audioop")
+    samples = np.arange(-32768, 32768, 7, dtype=np.int16)
+
+    assert mulaw_encode(samples).tobytes() == audioop.lin2ulaw(samples.tobytes(), 2)
+    assert mulaw_decode(bytes(range(256))).tobytes() == audioop.ulaw2lin(bytes(range(256)), 2)
+
+
+def test_output_format_strings_are_parsed():
+    assert AudioFormat.parse("pcm_16000") == AudioFormat(PCM, 16000)
+    assert AudioFormat.parse("mp3_44100_128") == AudioFormat(AudioEncoding.MP3, 44100)
+    assert AudioFormat.parse("ulaw_8000") != AudioFormat(PCM, 8000)
+
+
+@pytest.mark.asyncio
+async def test_matching_compressed_formats_pass_through():
+    mp3 = AudioFormat(AudioEncoding.MP3, 44100)
+
+    assert await run(b"not really mp3", 5, mp3, mp3) == b"not really mp3"
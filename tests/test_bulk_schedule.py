@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from backend.services.call_service import CallScheduler, CallType
+from tests.factories import api_client, make_call
+
+
+def ndjson(*records) -> bytes:
+    return b"".join(json.dumps(record).encode() + b"\n" for record in records)
+
+
+async def post_bulk(scheduler: CallScheduler, body: bytes, chunk_size: int = 500) -> list:
+    async with api_client(call_scheduler=scheduler) as client:
+        response = await client.post(f"/api/v1/calls/schedule/bulk?chunk_size={chunk_size}", content=body)
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_each_line_gets_a_result_and_a_summary(store):
+    scheduler = CallScheduler(store=store, node_id="node-a")
+    body = ndjson(
+        {"user_id": "user-1"},
+        {"user_id": "user-2", "timezone": "Mars/Olympus"},
+        {"user_id": "user-3", "morning_time": "06:30", "providers": ["twilio"]}
+    ) + b"\n{not json\n" + ndjson({"user_id": "user-4", "providers": []})
+
+    *results, summary = await post_bulk(scheduler, body, chunk_size=2)
+
+    # Malformed lines are answered at once; valid ones when their chunk is stored
+    assert [(result["line"], result["status"]) for result in results] == [
+        (1, "scheduled"), (2, "error"), (5, "error"), (6, "error"), (3, "scheduled")
+    ]
+    assert summary == {"summary": {"received": 5, "scheduled": 2, "failed": 3}}
+    assert len(await store.load_pending()) == 6
+
+
+@pytest.mark.asyncio
+async def test_duplicate_user_in_one_chunk_keeps_the_last_entry(store):
+    scheduler = CallScheduler(store=store, node_id="node-a")
+    body = ndjson(
+        {"user_id": "user-1", "morning_time": "06:00"},
+        {"user_id": "user-2"},
+        {"user_id": "user-1", "morning_time": "07:15"}
+    )
+
+    *results, summary = await post_bulk(scheduler, body)
+
+    assert summary == {"summary": {"received": 3, "scheduled": 3, "failed": 0}}
+    assert results[0]["calls"] == results[2]["calls"]
+    pending = await store.load_pending()
+    assert len(pending) == 6
+    [morning] = [call for call in pending if call["user_id"] == "user-1" and call["call_type"] == CallType.MORNING]
+    assert morning["requested_time"] == "07:15"
+    assert {call["call_id"] for call in pending} == {call["call_id"] for call in scheduler.scheduled_calls}
+
+
+@pytest.mark.asyncio
+async def test_store_failure_is_reported_per_entry_and_the_stream_goes_on(store, monkeypatch):
+    scheduler = CallScheduler(store=store, node_id="node-a")
+    await scheduler.schedule_daily_calls("user-1", morning_time="06:00")
+    original = store.replace_calls
+    writes = []
+
+    async def flaky_replace_calls(replaced_ids, calls):
+        writes.append(len(calls))
+        if len(writes) == 1:
+            raise RuntimeError("connection reset")
+        await original(replaced_ids, calls)
+
+    monkeypatch.setattr(store, "replace_calls", flaky_replace_calls)
+    body = ndjson({"user_id": "user-1", "morning_time": "09:00"}, {"user_id": "user-2"}, {"user_id": "user-3"})
+
+    *results, summary = await post_bulk(scheduler, body, chunk_size=2)
+
+    assert [(result["user_id"], result["status"]) for result in results] == [
+        ("user-1", "error"), ("user-2", "error"), ("user-3", "scheduled")
+    ]
+    assert "connection reset" in results[0]["error"]
+    assert summary == {"summary": {"received": 3, "scheduled": 1, "failed": 2}}
+    # The failed chunk left user-1's existing schedule alone, locally and in the store
+    stored = {(call["user_id"], call["call_type"]): call for call in await store.load_pending()}
+    assert stored[("user-1", CallType.MORNING)]["requested_time"] == "06:00"
+    assert ("user-2", CallType.MORNING) not in stored
+    assert {call["call_id"] for call in scheduler.scheduled_calls} == {call["call_id"] for call in stored.values()}
+
+
+@pytest.mark.asyncio
+async def test_replace_keeps_the_last_call_per_slot(store):
+    first, other, last = make_call("user-1"), make_call("user-2"), make_call("user-1")
+
+    await store.replace_calls([], [first, other, last])
+
+    assert {call["call_id"] for call in await store.load_pending()} == {other["call_id"], last["call_id"]}
@@ -0,0 +1,144 @@
+import asyncio
+import time
+
+import pytest
+
+from backend.services.call_executor import CallBatchExecutor, TokenBucket
+from backend.services.call_service import CallProvider, CallStatus
+
+
+class RecordingScheduler:
+    """Stands in for CallScheduler: executes calls slowly and records outcomes"""
+
+    lease_seconds = 60
+
+    def __init__(self, fail_users=()):
+        self.fail_users = set(fail_users)
+        self.running = 0
+        self.peak = 0
+        self.dispatched = []
+        self.finished = {}
+
+    async def execute_call(self, call_info):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(0.01)
+            if call_info["user_id"] in self.fail_users:
+                raise RuntimeError("provider down")
+            return {"call_executed": call_info["provider"] != CallProvider.WHATSAPP, "call_id": call_info["call_id"]}
+        finally:
+            self.running -= 1
+
+    async def record_dispatched(self, call_info):
+        self.dispatched.append(call_info["call_id"])
+
+    async def finish_call(self, call_id, status):
+        self.finished[call_id] = status
+
+
+def calls(count, provider=CallProvider.TELEGRAM):
+    return [
+        {"call_id": f"{provider.value}-{i}", "user_id": f"user-{i}", "provider": provider}
+        for i in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batch_never_exceeds_the_concurrency_cap():
+    scheduler = RecordingScheduler()
+    executor = CallBatchExecutor(scheduler, max_concurrency=5)
+
+    report = await executor.run_batch(calls(40))
+
+    assert scheduler.peak == 5
+    assert (report["calls"], report["succeeded"], report["failed"]) == (40, 40, 0)
+    assert len(scheduler.dispatched) == 40
+    assert executor.last_report["by_provider"] == {"telegram": 40}
+    assert "results" not in executor.last_report
+
+
+@pytest.mark.asyncio
+async def test_failed_calls_are_recorded_without_stopping_the_batch():
+    scheduler = RecordingScheduler(fail_users={"user-1"})
+    executor = CallBatchExecutor(scheduler, max_concurrency=10)
+
+    report = await executor.run_batch(calls(3) + calls(2, CallProvider.WHATSAPP))
+
+    assert (report["succeeded"], report["failed"]) == (2, 3)
+    assert scheduler.finished == {
+        "telegram-1": CallStatus.FAILED,
+        "whatsapp-0": CallStatus.FAILED,
+        "whatsapp-1": CallStatus.FAILED
+    }
+    assert sorted(scheduler.dispatched) == ["telegram-0", "telegram-2"]
+
+
+@pytest.mark.asyncio
+async def test_provider_rate_limit_spaces_out_calls():
+    scheduler = RecordingScheduler()
+    executor = CallBatchExecutor(scheduler, max_concurrency=50, rate_limits={CallProvider.TWILIO: (50.0, 1.0)})
+
+    started = time.perf_counter()
+    await executor.run_batch(calls(6, CallProvider.TWILIO) + calls(20))
+    elapsed = time.perf_counter() - started
+
+    # Five calls wait for a token at 50/s; the unlimited provider does not
+    assert 0.09 <= elapsed < 0.5
+    assert executor.last_report["queue_wait"]["max_ms"] >= 90
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_allows_the_burst_then_paces():
+    bucket = TokenBucket(rate=100.0, capacity=3)
+
+    waits = [await bucket.acquire() for _ in range(5)]
+
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert all(wait > 0 for wait in waits[3:])
+
+
+@pytest.mark.parametrize("kwargs", [{"rate": 0}, {"rate": -1}])
+def test_token_bucket_rejects_a_non_positive_rate(kwargs):
+    with pytest.raises(ValueError):
+        TokenBucket(**kwargs)
+
+
+def test_executor_rejects_zero_concurrency():
+    with pytest.raises(ValueError):
+        CallBatchExecutor(RecordingScheduler(), max_concurrency=0)
+
+
+class QueueScheduler(RecordingScheduler):
+    """Hands out pending calls per provider the way claim_due_calls does"""
+
+    def __init__(self, pending):
+        super().__init__()
+        self.pending = pending
+
+    async def claim_due_calls(self, now=None, limit=1000, providers=None):
+        [provider] = providers
+        queue = self.pending.get(provider, [])
+        claimed, self.pending[provider] = queue[:limit], queue[limit:]
+        return claimed
+
+    async def sweep(self, now=None):
+        return {}
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_provider_does_not_hold_up_the_others():
+    scheduler = QueueScheduler({CallProvider.TWILIO: calls(20, CallProvider.TWILIO), CallProvider.TELEGRAM: calls(30)})
+    executor = CallBatchExecutor(
+        scheduler, max_concurrency=50, rate_limits={CallProvider.TWILIO: (5.0, 1.0)}, sweep_interval=60
+    )
+
+    dispatcher = asyncio.create_task(executor.run_forever(poll_interval=0.01))
+    await asyncio.sleep(0.3)
+    dispatcher.cancel()
+    await asyncio.gather(dispatcher, return_exceptions=True)
+
+    telegram = [call_id for call_id in scheduler.dispatched if call_id.startswith("telegram")]
+    twilio = [call_id for call_id in scheduler.dispatched if call_id.startswith("twilio")]
+    assert len(telegram) == 30
+    assert 1 <= len(twilio) <= 3
@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta, timezone
+import base64
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from backend.api.calls import decode_cursor, encode_cursor, get_call_history
+from backend.services.call_service import CallScheduler, CallStatus, CallType
+from tests.factories import NOW, api_client, make_call
+
+
+def raw_cursor(*values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(values)).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    call = make_call(scheduled_at=NOW + timedelta(microseconds=123))
+
+    assert decode_cursor(encode_cursor(call)) == (call["scheduled_at"], call["call_id"])
+
+
+def test_naive_cursor_time_is_utc():
+    position, _ = decode_cursor(raw_cursor("2026-03-02T12:00:00", make_call()["call_id"]))
+
+    assert position == datetime(2026, 3, 2, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    raw_cursor("2026-03-02T12:00:00+00:00"),
+    raw_cursor("yesterday", "0" * 32),
+    raw_cursor("2026-03-02T12:00:00+00:00", "not-a-uuid"),
+    raw_cursor("2026-03-02T12:00:00+00:00", None)
+])
+def test_malformed_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(cursor)
+
+    assert raised.value.status_code == 400
+
+
+async def store_history(store, count: int = 7) -> list:
+    # Pairs share a timestamp, so the id has to break ties
+    calls = [make_call(scheduled_at=NOW - timedelta(hours=i // 2)) for i in range(count)]
+    for call in calls:
+        # Claim each one: the store keeps a single fresh scheduled call per slot
+        await store.insert_calls([call])
+        await store.claim_due_batch(NOW, 1, "node-a", 60)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_pages_cover_the_history_once(store):
+    calls = await store_history(store)
+    scheduler = CallScheduler(store=store)
+
+    seen, cursor = [], None
+    while True:
+        page = await get_call_history("user-1", limit=3, cursor=cursor, format="json", scheduler=scheduler)
+        seen.extend(item["call_id"] for item in page["calls"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert sorted(seen) == sorted(call["call_id"] for call in calls)
+    assert len(seen) == len(set(seen))
+
+
+@pytest.mark.asyncio
+async def test_ndjson_export_streams_everything_newest_first(store):
+    calls = await store_history(store)
+    scheduler = CallScheduler(store=store)
+
+    async with api_client(call_scheduler=scheduler) as client:
+        response = await client.get("/api/v1/calls/history/user-1", params={"format": "ndjson", "limit": 2})
+
+    exported = [json.loads(line) for line in response.text.splitlines()]
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert sorted(item["call_id"] for item in exported) == sorted(call["call_id"] for call in calls)
+    times = [item["scheduled_time"] for item in exported]
+    assert times == sorted(times, reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_bad_cursor_is_rejected_over_http(store):
+    async with api_client(call_scheduler=CallScheduler(store=store)) as client:
+        response = await client.get("/api/v1/calls/history/user-1", params={"cursor": "not base64!"})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_terminal_status_is_counted_once(store):
+    calls = [make_call(call_type=call_type) for call_type in (CallType.MORNING, CallType.MIDDAY, CallType.EVENING)]
+    await store.insert_calls(calls)
+    await store.claim_due_batch(NOW, 10, "node-a", 60)
+
+    await store.update_status(calls[0]["call_id"], CallStatus.COMPLETED, NOW)
+    await store.update_status(calls[0]["call_id"], CallStatus.COMPLETED, NOW)
+    await store.update_status(calls[0]["call_id"], CallStatus.FAILED, NOW)
+    await store.update_status(calls[1]["call_id"], CallStatus.MISSED, NOW)
+    await store.update_status(calls[2]["call_id"], CallStatus.FAILED, NOW)
+
+    assert await store.get_user_stats("user-1") == {
+        "total_calls": 3, "completed": 1, "missed": 1, "failed": 1, "success_rate": round(1 / 3, 4)
+    }
+    assert await store.get_user_stats("user-2") == {
+        "total_calls": 0, "completed": 0, "missed": 0, "failed": 0, "success_rate": 0.0
+    }
+
+
+@pytest.mark.asyncio
+async def test_history_page_carries_the_counters(store):
+    [call, *_] = await store_history(store, count=2)
+    await store.update_status(call["call_id"], CallStatus.COMPLETED, NOW)
+
+    page = await get_call_history("user-1", limit=50, cursor=None, format="json", scheduler=CallScheduler(store=store))
+
+    assert page["total_calls"] == 1
+    assert page["stats"]["completed"] == 1
+    assert page["next_cursor"] is None
@@ -0,0 +1,112 @@
+from datetime import timedelta
+
+import pytest
+
+from backend.services.call_service import CallProvider, CallScheduler, CallType
+from backend.services.session_store import SessionStore
+from tests.factories import NOW
+
+
+def fire_times(scheduler: CallScheduler) -> dict:
+    return {call["call_type"]: call["scheduled_at"] for call in scheduler.scheduled_calls}
+
+
+@pytest.mark.asyncio
+async def test_due_call_fires_once_and_queues_tomorrow():
+    scheduler = CallScheduler()
+    await scheduler.schedule_daily_calls("user-1", timezone="UTC", now=NOW)
+
+    [midday] = scheduler.pop_due_calls(NOW + timedelta(hours=1))
+
+    assert midday["call_type"] == CallType.MIDDAY
+    assert midday["scheduled_at"] == NOW + timedelta(hours=1)
+    assert scheduler.pop_due_calls(NOW + timedelta(hours=1)) == []
+    assert fire_times(scheduler)[CallType.MIDDAY] == NOW + timedelta(days=1, hours=1)
+    assert len(scheduler.scheduled_calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_rescheduling_replaces_the_pending_slot():
+    scheduler = CallScheduler()
+    await scheduler.schedule_daily_calls("user-1", evening_time="20:00", now=NOW)
+    await scheduler.schedule_daily_calls("user-1", evening_time="21:30", now=NOW)
+
+    assert len(scheduler.scheduled_calls) == 3
+    assert fire_times(scheduler)[CallType.EVENING] == NOW + timedelta(hours=9, minutes=30)
+
+
+@pytest.mark.asyncio
+async def test_pop_due_calls_filters_by_provider():
+    scheduler = CallScheduler()
+    await scheduler.schedule_daily_calls("user-1", midday_time="12:30", provider=CallProvider.TELEGRAM, now=NOW)
+    await scheduler.schedule_daily_calls("user-2", midday_time="12:10", provider=CallProvider.TWILIO, now=NOW)
+
+    due = scheduler.pop_due_calls(NOW + timedelta(hours=1), providers=[CallProvider.TELEGRAM])
+
+    assert [(call["user_id"], call["call_type"]) for call in due] == [("user-1", CallType.MIDDAY)]
+    assert [call["user_id"] for call in scheduler.pop_due_calls(NOW + timedelta(hours=1))] == ["user-2"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_call_never_fires():
+    scheduler = CallScheduler()
+    calls = await scheduler.schedule_daily_calls("user-1", now=NOW)
+    [midday] = [call for call in calls if call["call_type"] == CallType.MIDDAY]
+
+    assert await scheduler.cancel_call(midday["call_id"])
+    assert not await scheduler.cancel_call(midday["call_id"])
+    assert scheduler.pop_due_calls(NOW + timedelta(hours=2)) == []
+
+
+@pytest.mark.asyncio
+async def test_invalid_time_rejects_the_whole_entry():
+    scheduler = CallScheduler()
+
+    with pytest.raises(ValueError):
+        await scheduler.schedule_daily_calls("user-1", evening_time="8pm", now=NOW)
+    assert scheduler.scheduled_calls == []
+
+
+async def schedule_and_claim(scheduler: CallScheduler) -> list:
+    await scheduler.schedule_daily_calls("user-1", timezone="UTC", provider=CallProvider.TELEGRAM, now=NOW)
+    return await scheduler.claim_due_calls(NOW + timedelta(days=1), limit=10)
+
+
+@pytest.mark.asyncio
+async def test_claim_stores_the_next_daily_occurrence(store):
+    scheduler = CallScheduler(store=store, node_id="node-a")
+
+    claimed = await schedule_and_claim(scheduler)
+    pending = await store.load_pending()
+
+    assert sorted(call["call_type"].value for call in claimed) == ["evening", "midday", "morning"]
+    assert len(pending) == 3
+    assert all(call["scheduled_at"] > NOW + timedelta(days=1) for call in pending)
+    assert {call["call_id"] for call in pending} == {call["call_id"] for call in scheduler.scheduled_calls}
+
+
+@pytest.mark.asyncio
+async def test_restore_reloads_pending_and_requeues_lapsed_claims(store):
+    scheduler = CallScheduler(store=store, node_id="node-a", lease_seconds=30)
+    await schedule_and_claim(scheduler)
+
+    restarted = CallScheduler(store=store, node_id="node-a", lease_seconds=30)
+    report = await restarted.restore(now=NOW + timedelta(days=1, minutes=1))
+
+    assert report == {"requeued": 3, "missed": 0, "loaded": 6}
+    assert len(restarted.scheduled_calls) == 6
+
+
+@pytest.mark.asyncio
+async def test_sweep_closes_idle_sessions(store):
+    sessions = SessionStore(ttl_seconds=0)
+    scheduler = CallScheduler(store=store, node_id="node-a", session_store=sessions)
+    answered, unanswered, _ = await schedule_and_claim(scheduler)
+    await sessions.set(answered["call_id"], {"user_id": "user-1", "turns": [["a", "Hi"], ["u", "Done"]]})
+    await sessions.set(unanswered["call_id"], {"user_id": "user-1", "turns": [["a", "Hi"]]})
+
+    report = await scheduler.sweep()
+
+    assert report["ended"] == 2
+    stats = await store.get_user_stats("user-1")
+    assert (stats["completed"], stats["missed"]) == (1, 1)
@@ -0,0 +1,79 @@
+import asyncio
+
+import httpx
+import pytest
+
+from backend.core.ai_engine import AIProvider, EnginePool, LocalAIEngine, PersonalityMode
+from backend.core.response_cache import ResponseCache
+from backend.core.simulated_engine import SimulatedAIEngine
+
+OPTIONS = {
+    AIProvider.SIMULATED: {"latency_ms": 0, "tokens_per_second": 0},
+    AIProvider.LOCAL: {"model_path": "llama3"}
+}
+
+
+def ollama(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://ollama")
+
+
+def test_one_engine_per_provider_and_model():
+    cache = ResponseCache()
+    pool = EnginePool(AIProvider.SIMULATED, OPTIONS, response_cache=cache)
+
+    default = pool.get()
+
+    assert isinstance(default, SimulatedAIEngine)
+    assert pool.get(AIProvider.SIMULATED) is default
+    assert pool.get(AIProvider.SIMULATED, "other") is not default
+    assert pool.get(AIProvider.SIMULATED, "other") is pool.get(model="other")
+    assert isinstance(pool.get(AIProvider.LOCAL), LocalAIEngine)
+    assert pool.get(AIProvider.LOCAL, "mistral").model_path == "mistral"
+    assert all(engine.prompts is pool.prompt_compiler for engine in pool._engines.values())
+    assert all(engine.response_cache is cache for engine in pool._engines.values())
+
+
+@pytest.mark.asyncio
+async def test_personality_is_per_request_on_a_shared_engine():
+    engine = EnginePool(AIProvider.SIMULATED, OPTIONS).get()
+
+    replies = await asyncio.gather(
+        engine.generate_response("", {}, "morning", personality=PersonalityMode.DRILL_SERGEANT),
+        engine.generate_response("", {}, "morning", personality=PersonalityMode.FRIEND)
+    )
+
+    assert replies[0] != replies[1]
+    assert engine.personality == PersonalityMode.MOTIVATOR
+
+
+@pytest.mark.asyncio
+async def test_warm_up_loads_models_and_survives_failures():
+    loaded = []
+
+    def generate(request: httpx.Request) -> httpx.Response:
+        loaded.append(request.url.path)
+        return httpx.Response(200, json={"done": True})
+
+    def unreachable(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("connection refused")
+
+    pool = EnginePool(AIProvider.LOCAL, OPTIONS)
+    pool.get()._client = ollama(generate)
+    pool.get(model="mistral")._client = ollama(unreachable)
+
+    await pool.warm_up(timeout=1)
+
+    assert loaded == ["/api/generate"]
+
+
+@pytest.mark.asyncio
+async def test_close_releases_every_engine():
+    pool = EnginePool(AIProvider.LOCAL, OPTIONS)
+    engine = pool.get()
+    client = engine._client = ollama(lambda request: httpx.Response(200))
+
+    await pool.close()
+
+    assert client.is_closed
+    assert engine._client is None
+    assert pool.get() is not engine
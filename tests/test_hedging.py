@@ -0,0 +1,75 @@
+import pytest
+
+from backend.core.hedging import HedgedAIEngine
+from backend.core.simulated_engine import SimulatedAIEngine
+
+
+class PrimaryEngine(SimulatedAIEngine):
+    provider_name = "local"
+
+
+def hedged(primary_ms: float = 10.0, primary_errors: float = 0.0, backup_errors: float = 0.0) -> HedgedAIEngine:
+    return HedgedAIEngine(
+        {
+            "local": PrimaryEngine(
+                latency_ms=primary_ms, latency_distribution="fixed", tokens_per_second=0, error_rate=primary_errors
+            ),
+            "simulated": SimulatedAIEngine(
+                latency_ms=10.0, latency_distribution="fixed", tokens_per_second=0, error_rate=backup_errors
+            )
+        },
+        initial_delay_ms=50.0
+    )
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_answers_alone():
+    engine = hedged()
+
+    await engine.generate_response("done", {}, "morning")
+
+    assert engine.metrics()["hedged"] == 0
+    assert engine.metrics()["backup_wins"] == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_and_backup_wins():
+    engine = hedged(primary_ms=2000.0)
+
+    reply = await engine.generate_response("done", {}, "morning")
+
+    assert reply
+    assert engine.metrics()["hedged"] == 1
+    assert engine.metrics()["backup_wins"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failing_primary_fails_over_at_once():
+    engine = hedged(primary_errors=1.0)
+
+    sentences = [sentence async for sentence in engine.stream_sentences("done", {}, "evening")]
+
+    assert sentences
+    assert engine.metrics()["hedged"] == 0
+    assert engine.metrics()["backup_wins"] == 1
+
+
+@pytest.mark.asyncio
+async def test_every_engine_failing_raises():
+    engine = hedged(primary_errors=1.0, backup_errors=1.0)
+
+    with pytest.raises(RuntimeError, match="All AI providers failed"):
+        await engine.generate_response("done", {}, "morning")
+    assert engine.metrics()["failures"] == 1
+
+
+def test_hedge_delay_follows_the_primary_latency_once_sampled():
+    engine = hedged()
+
+    assert engine.hedge_delay("complete", "local") == 0.05
+    for _ in range(50):
+        engine.histograms["complete"]["local"].observe(0.3)
+    assert engine.hedge_delay("complete", "local") == pytest.approx(0.3, rel=0.2)
+    for _ in range(50):
+        engine.histograms["complete"]["local"].observe(60.0)
+    assert engine.hedge_delay("complete", "local") == engine.max_delay
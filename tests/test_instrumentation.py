@@ -0,0 +1,98 @@
+import pytest
+
+from backend.core.ai_engine import (
+    AI_CACHE_LOOKUPS, AI_COMPLETION_TOKENS, AI_FIRST_TOKEN_SECONDS, AI_PROMPT_TOKENS, AI_REQUESTS,
+    AI_RESPONSE_SECONDS, PersonalityMode
+)
+from backend.core.hedging import HedgedAIEngine
+from backend.core.instrumentation import MetricsRegistry
+from backend.core.response_cache import ResponseCache
+from backend.core.simulated_engine import SimulatedAIEngine
+
+
+class PrimaryEngine(SimulatedAIEngine):
+    provider_name = "local"
+
+
+def engine(**kwargs) -> SimulatedAIEngine:
+    return SimulatedAIEngine(latency_ms=10.0, latency_distribution="fixed", tokens_per_second=0, **kwargs)
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    requests.inc('say "hi"\n')
+    latency.observe(0.05, "/a")
+    latency.observe(0.5, "/a")
+    latency.observe(5.0, "/a")
+
+    assert registry.render().splitlines() == [
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a",le="1"} 2',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 3',
+        'latency_seconds_sum{route="/a"} 5.55',
+        'latency_seconds_count{route="/a"} 3',
+        "# HELP requests_total Requests",
+        "# TYPE requests_total counter",
+        'requests_total{route="say \\"hi\\"\\n"} 1'
+    ]
+
+
+def test_registering_twice_shares_the_metric_unless_the_shape_differs():
+    registry = MetricsRegistry()
+    counter = registry.counter("calls_total", "Calls", ("provider",))
+
+    assert registry.counter("calls_total", "Calls", ("provider",)) is counter
+    with pytest.raises(ValueError):
+        registry.counter("calls_total", "Calls", ("provider", "status"))
+    with pytest.raises(ValueError):
+        registry.histogram("calls_total", "Calls", ("provider",))
+
+
+@pytest.mark.asyncio
+async def test_generation_records_latency_tokens_and_cache_lookups():
+    labels = ("simulated", "mentor", "instrumented")
+    cached = engine(response_cache=ResponseCache())
+    before = (
+        AI_REQUESTS.value(*labels, "ok"), AI_RESPONSE_SECONDS.count(*labels), AI_FIRST_TOKEN_SECONDS.count(*labels),
+        AI_PROMPT_TOKENS.value(*labels), AI_COMPLETION_TOKENS.value(*labels)
+    )
+
+    for _ in range(2):
+        await cached.generate_response("done", {}, "instrumented", PersonalityMode.MENTOR)
+
+    assert AI_REQUESTS.value(*labels, "ok") == before[0] + 2
+    assert AI_RESPONSE_SECONDS.count(*labels) == before[1] + 2
+    assert AI_FIRST_TOKEN_SECONDS.count(*labels) == before[2] + 1
+    assert AI_PROMPT_TOKENS.value(*labels) > before[3]
+    assert AI_COMPLETION_TOKENS.value(*labels) > before[4]
+    assert AI_CACHE_LOOKUPS.value(*labels, "miss") == 1
+    assert AI_CACHE_LOOKUPS.value(*labels, "hit") == 1
+
+
+@pytest.mark.asyncio
+async def test_failures_are_counted_without_latency():
+    labels = ("simulated", "friend", "instrumented-failure")
+
+    with pytest.raises(RuntimeError):
+        await engine(error_rate=1.0).generate_response("done", {}, "instrumented-failure", PersonalityMode.FRIEND)
+
+    assert AI_REQUESTS.value(*labels, "error") == 1
+    assert AI_RESPONSE_SECONDS.count(*labels) == 0
+
+
+@pytest.mark.asyncio
+async def test_hedged_requests_are_labelled_with_the_winning_engine():
+    def hedged(primary_ms: float) -> HedgedAIEngine:
+        primary = PrimaryEngine(latency_ms=primary_ms, latency_distribution="fixed", tokens_per_second=0)
+        return HedgedAIEngine({"local": primary, "simulated": engine()}, initial_delay_ms=50.0)
+
+    await hedged(10.0).generate_response("done", {}, "instrumented-hedge")
+    await hedged(2000.0).generate_response("done", {}, "instrumented-hedge")
+
+    assert AI_REQUESTS.value("local", "motivator", "instrumented-hedge", "ok") == 1
+    assert AI_REQUESTS.value("simulated", "motivator", "instrumented-hedge", "ok") == 1
+    assert AI_REQUESTS.value("hedged", "motivator", "instrumented-hedge", "ok") == 0
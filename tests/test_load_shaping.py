@@ -0,0 +1,107 @@
+from collections import Counter
+
+import pytest
+
+from backend.services.call_service import CallProvider, CallScheduler, CallType
+from backend.services.load_shaping import LoadShaper
+from backend.services.schedule_engine import parse_call_time
+from tests.factories import NOW
+
+TELEGRAM = CallProvider.TELEGRAM
+
+
+def minutes_from(base: str, shaped: str) -> int:
+    base_time, shaped_time = parse_call_time(base), parse_call_time(shaped)
+    return (shaped_time.hour - base_time.hour) * 60 + shaped_time.minute - base_time.minute
+
+
+def test_offsets_stay_in_the_window_and_are_stable():
+    shaper = LoadShaper({TELEGRAM: 1000}, tolerance_minutes=10)
+
+    shaped = [shaper.shape(f"user-{i}", CallType.MORNING, TELEGRAM, "08:00", now=NOW) for i in range(200)]
+    restarted = LoadShaper({TELEGRAM: 1000}, tolerance_minutes=10)
+
+    assert all(abs(minutes_from("08:00", time)) <= 10 for time in shaped)
+    assert len(set(shaped)) > 10
+    assert shaped == [restarted.shape(f"user-{i}", CallType.MORNING, TELEGRAM, "08:00", now=NOW) for i in range(200)]
+    assert shaper.shape("user-0", CallType.MORNING, TELEGRAM, "08:00", now=NOW) == shaped[0]
+
+
+def test_no_minute_exceeds_capacity_while_the_window_has_room():
+    shaper = LoadShaper({TELEGRAM: 2}, tolerance_minutes=5)
+
+    shaped = Counter(shaper.shape(f"user-{i}", CallType.MORNING, TELEGRAM, "08:00", now=NOW) for i in range(22))
+
+    assert max(shaped.values()) == 2
+    assert shaper.peak_load(TELEGRAM) == 2
+    assert sum(shaper.load_profile(TELEGRAM).values()) == 22
+
+
+def test_release_frees_the_slot():
+    shaper = LoadShaper({TELEGRAM: 1}, tolerance_minutes=0)
+    shaper.shape("user-1", CallType.MORNING, TELEGRAM, "08:00", now=NOW)
+
+    shaper.release("user-1", CallType.MORNING)
+
+    assert shaper.load_profile(TELEGRAM) == {}
+
+
+def test_zero_tolerance_keeps_the_requested_time():
+    shaper = LoadShaper({TELEGRAM: 1}, tolerance_minutes=0)
+
+    assert [shaper.shape(f"user-{i}", CallType.MORNING, TELEGRAM, "08:00", now=NOW) for i in range(3)] == ["08:00"] * 3
+    assert shaper.peak_load(TELEGRAM) == 3
+
+
+def test_negative_tolerance_is_rejected():
+    with pytest.raises(ValueError):
+        LoadShaper({TELEGRAM: 1}, tolerance_minutes=-1)
+
+
+def test_register_counts_the_persisted_time():
+    shaper = LoadShaper({TELEGRAM: 1}, tolerance_minutes=10)
+
+    shaper.register("user-1", CallType.MORNING, TELEGRAM, "08:00", "08:07", now=NOW)
+
+    assert shaper.load_profile(TELEGRAM) == {8 * 60 + 7: 1}
+    # The next occurrence keeps the persisted offset
+    assert shaper.shape("user-1", CallType.MORNING, TELEGRAM, "08:00", now=NOW) == "08:07"
+
+
+def test_register_handles_a_shift_across_midnight():
+    shaper = LoadShaper({TELEGRAM: 1}, tolerance_minutes=10)
+
+    shaper.register("user-1", CallType.EVENING, TELEGRAM, "23:55", "00:03", now=NOW)
+
+    assert shaper.load_profile(TELEGRAM) == {3: 1}
+
+
+class PendingStore:
+    """Just enough of a schedule store for CallScheduler.restore"""
+
+    def __init__(self, pending):
+        self.pending = pending
+
+    async def recover(self, now, max_call_duration):
+        return {"requeued": 0, "missed": 0}
+
+    async def load_pending(self):
+        return self.pending
+
+
+@pytest.mark.asyncio
+async def test_restore_counts_stored_times_not_fresh_offsets():
+    first = CallScheduler(load_shaper=LoadShaper({TELEGRAM: 1}, tolerance_minutes=3))
+    for i in range(5):
+        await first.schedule_daily_calls(f"user-{i}", timezone="UTC", now=NOW)
+    stored = first.scheduled_calls
+    # The window was widened since these calls were shaped
+    shaper = LoadShaper({TELEGRAM: 1}, tolerance_minutes=10)
+    restarted = CallScheduler(load_shaper=shaper, store=PendingStore(stored))
+
+    await restarted.restore(now=NOW)
+
+    assert shaper.load_profile(TELEGRAM) == first.load_shaper.load_profile(TELEGRAM)
+    assert [call["scheduled_time"] for call in restarted.scheduled_calls] == [
+        call["scheduled_time"] for call in stored
+    ]
@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from backend.core.memory import ConversationMemory, estimate_tokens, extractive_summary
+from backend.services.session_store import new_session_state
+
+
+class CountingStore:
+    """In-memory summary store counting reads"""
+
+    def __init__(self, **summaries):
+        self.summaries = dict(summaries)
+        self.reads = 0
+
+    async def get_summary(self, user_id):
+        self.reads += 1
+        return self.summaries.get(user_id)
+
+    async def save_summary(self, user_id, summary):
+        self.summaries[user_id] = summary
+
+
+def session(summary: str = "") -> dict:
+    return new_session_state("user-1", "morning", "telegram", "motivator", None, "Good morning!", summary=summary)
+
+
+@pytest.mark.asyncio
+async def test_window_keeps_the_newest_turns_and_folds_the_rest():
+    memory = ConversationMemory(window_turns=3, token_budget=1000)
+    state = session()
+    for i in range(5):
+        memory.append(state, "u", f"turn {i}")
+    await memory.close()
+
+    assert state["turns"] == [["u", "turn 2"], ["u", "turn 3"], ["u", "turn 4"]]
+    assert await memory.summary("user-1") == "User said: turn 0 User said: turn 1"
+
+
+@pytest.mark.asyncio
+async def test_token_budget_spills_long_turns_but_keeps_the_newest():
+    memory = ConversationMemory(window_turns=10, token_budget=10)
+    state = session()
+    memory.append(state, "u", "x" * 200)
+    await memory.close()
+
+    assert state["turns"] == [["u", "x" * 200]]
+    assert estimate_tokens("x" * 200) == 50
+
+
+@pytest.mark.asyncio
+async def test_extractive_summary_keeps_recent_user_statements():
+    turns = [["a", "Did you run?"], ["u", "Yes, 5k"], ["u", "Then stretched"]]
+
+    summary = await extractive_summary("Trains daily.", turns, max_words=6)
+
+    assert summary == "Yes, 5k User said: Then stretched"
+
+
+@pytest.mark.asyncio
+async def test_turns_read_the_summary_snapshot_not_the_store():
+    store = CountingStore(**{"user-1": "Trains for a 10k"})
+    memory = ConversationMemory(store=store, cache_seconds=0)
+    state = session(summary=await memory.summary("user-1"))
+
+    contexts = [await memory.prompt_context(state) for _ in range(3)]
+
+    assert store.reads == 1
+    assert [context["summary"] for context in contexts] == ["Trains for a 10k"] * 3
+
+
+@pytest.mark.asyncio
+async def test_spilled_turns_reach_the_prompt_through_the_local_summary():
+    store = CountingStore(**{"user-1": "Trains for a 10k"})
+    memory = ConversationMemory(store=store, window_turns=2, cache_seconds=0)
+    state = session(summary="Trains for a 10k")
+
+    memory.append(state, "u", "I ran 5k")
+    memory.append(state, "a", "Nice work")
+    await asyncio.gather(*memory._tasks.values())
+    reads = store.reads
+    context = await memory.prompt_context(state)
+
+    assert context["summary"] == "Trains for a 10k"
+    assert "Good morning!" not in [text for _, text in context["turns"]]
+    assert store.reads == reads
+
+    memory.append(state, "u", "And stretched")
+    await asyncio.gather(*memory._tasks.values())
+    assert (await memory.prompt_context(state))["summary"].endswith("User said: I ran 5k")
+    await memory.close()
+
+
+@pytest.mark.asyncio
+async def test_summaries_are_bounded_by_max_users():
+    memory = ConversationMemory(max_users=2)
+    for user_id in ("a", "b", "c"):
+        memory.end_session({"user_id": user_id, "turns": [["u", f"{user_id} done"]]})
+    await memory.close()
+
+    assert memory.stats()["users"] == 2
+    assert await memory.summary("a") == ""
+    assert await memory.summary("c") == "User said: c done"
@@ -0,0 +1,96 @@
+from datetime import date, timedelta
+import statistics
+
+import numpy as np
+import pytest
+
+from backend.core.metrics_analysis import build_insights, plain_narrative
+from backend.core.simulated_engine import SimulatedAIEngine
+
+TODAY = date(2026, 3, 2)
+
+
+def columns(rows) -> dict:
+    """Column arrays from (user_id, days_ago, metric_type, value) rows"""
+
+    return {
+        "user_id": [row[0] for row in rows],
+        "date": [(TODAY - timedelta(days=row[1])).isoformat() for row in rows],
+        "metric_type": [row[2] for row in rows],
+        "value": [row[3] for row in rows]
+    }
+
+
+def runner_and_steady():
+    """14 days of falling sleep and varying workouts, plus a user who logs zero skipped workouts"""
+
+    rows = []
+    for days_ago in range(14):
+        rows.append(("runner", days_ago, "sleep_hours", 8.0 - 0.1 * days_ago))
+        rows.append(("runner", days_ago, "workouts", 1.0 + (13 - days_ago) % 3))
+        rows.append(("steady", days_ago, "skipped_workouts", 0.0))
+    return rows
+
+
+class NarratingEngine(SimulatedAIEngine):
+    def __init__(self, **kwargs):
+        super().__init__(latency_ms=0, tokens_per_second=0, **kwargs)
+        self.completions = 0
+
+    async def _complete_messages(self, messages):
+        self.completions += 1
+        return "Narrative."
+
+
+def test_stats_match_a_per_user_computation():
+    rows = runner_and_steady()
+    [runner, steady] = sorted(build_insights(columns(rows), TODAY), key=lambda insight: insight["user_id"])
+
+    sleep = [value for user, _, metric, value in rows if (user, metric) == ("runner", "sleep_hours")]
+    days = [-days_ago for user, days_ago, metric, _ in rows if (user, metric) == ("runner", "sleep_hours")]
+    stats = runner["metrics"]["sleep_hours"]
+    assert stats["recent_mean"] == pytest.approx(np.mean(sleep[:7]), abs=1e-3)
+    assert stats["previous_mean"] == pytest.approx(np.mean(sleep[7:]), abs=1e-3)
+    assert stats["trend_per_day"] == pytest.approx(np.polyfit(days, sleep, 1)[0], abs=1e-3)
+    assert stats["streak_days"] == 14
+
+    assert steady["metrics"]["skipped_workouts"] == {
+        "recent_mean": 0.0, "previous_mean": 0.0, "change_pct": None, "trend_per_day": 0.0, "streak_days": 0
+    }
+    assert steady["correlations"] == steady["highlights"] == []
+
+
+def test_correlations_match_pearson():
+    rows = runner_and_steady()
+    [runner] = [insight for insight in build_insights(columns(rows), TODAY) if insight["user_id"] == "runner"]
+
+    sleep = [value for user, _, metric, value in rows if (user, metric) == ("runner", "sleep_hours")]
+    workouts = [value for user, _, metric, value in rows if (user, metric) == ("runner", "workouts")]
+    [correlation] = runner["correlations"]
+    assert correlation["metrics"] == ["sleep_hours", "workouts"]
+    assert correlation["r"] == pytest.approx(statistics.correlation(sleep, workouts), abs=1e-3)
+    assert correlation["days"] == 14
+
+
+def test_streak_breaks_on_a_missed_day():
+    rows = [("user-1", days_ago, "workouts", 0.0 if days_ago == 3 else 1.0) for days_ago in range(10)]
+
+    [insight] = build_insights(columns(rows), TODAY)
+
+    assert insight["metrics"]["workouts"]["streak_days"] == 3
+    assert "3-day workouts streak" in insight["highlights"]
+
+
+def test_no_metrics_no_insights():
+    assert build_insights(columns([]), TODAY) == []
+
+
+@pytest.mark.asyncio
+async def test_only_users_with_highlights_reach_the_model():
+    engine = NarratingEngine()
+
+    insights = await engine.analyze_metrics_batch(columns(runner_and_steady()), today=TODAY)
+
+    narratives = {insight["user_id"]: insight["narrative"] for insight in insights}
+    assert engine.completions == 1
+    assert narratives == {"runner": "Narrative.", "steady": plain_narrative({"highlights": []})}
@@ -0,0 +1,99 @@
+from datetime import timedelta
+import asyncio
+
+import pytest
+
+from backend.core.simulated_engine import SimulatedAIEngine
+from backend.services.call_service import CallScheduler, CallType
+from backend.services.prerender import CallPrerenderer
+from tests.factories import NOW, FakeVoiceEngine
+
+
+def prerenderer(voice_delay: float = 0.0, take_timeout: float = 10.0) -> CallPrerenderer:
+    return CallPrerenderer(
+        SimulatedAIEngine(latency_ms=0, latency_distribution="fixed", tokens_per_second=0),
+        FakeVoiceEngine(delay=voice_delay),
+        lead_time_minutes=10,
+        take_timeout=take_timeout
+    )
+
+
+def midday(calls: list) -> dict:
+    [call] = [call for call in calls if call["call_type"] == CallType.MIDDAY]
+    return call
+
+
+@pytest.mark.asyncio
+async def test_only_calls_inside_the_lead_time_are_rendered():
+    renderer = prerenderer()
+    scheduler = CallScheduler(prerenderer=renderer)
+    calls = await scheduler.schedule_daily_calls("user-1", midday_time="12:05", now=NOW)
+
+    assert renderer.schedule_upcoming(scheduler, now=NOW) == 1
+    assert renderer.schedule_upcoming(scheduler, now=NOW) == 0
+    rendered = await renderer.take(midday(calls)["call_id"])
+
+    assert rendered["message"]
+    assert rendered["audio"] == rendered["message"].encode() * 100
+    assert await renderer.take(midday(calls)["call_id"]) is None
+
+
+@pytest.mark.asyncio
+async def test_dispatch_waits_for_a_render_in_flight():
+    renderer = prerenderer(voice_delay=0.1)
+    scheduler = CallScheduler(prerenderer=renderer)
+    call = midday(await scheduler.schedule_daily_calls("user-1", midday_time="12:05", now=NOW))
+    renderer.schedule_upcoming(scheduler, now=NOW)
+
+    result = await scheduler.execute_call(call)
+
+    assert result["prerendered"]
+    assert renderer.voice_engine.syntheses == 1
+
+
+@pytest.mark.asyncio
+async def test_render_that_misses_the_deadline_is_done_inline():
+    renderer = prerenderer(voice_delay=0.2, take_timeout=0.05)
+    scheduler = CallScheduler(prerenderer=renderer)
+    call = midday(await scheduler.schedule_daily_calls("user-1", midday_time="12:05", now=NOW))
+    renderer.schedule_upcoming(scheduler, now=NOW)
+
+    result = await scheduler.execute_call(call)
+
+    assert not result["prerendered"]
+    assert renderer.voice_engine.syntheses == 2
+
+
+@pytest.mark.asyncio
+async def test_rescheduling_discards_the_old_render():
+    renderer = prerenderer(voice_delay=0.1)
+    scheduler = CallScheduler(prerenderer=renderer)
+    old = midday(await scheduler.schedule_daily_calls("user-1", midday_time="12:05", now=NOW))
+    renderer.schedule_upcoming(scheduler, now=NOW)
+    task = renderer._pending[old["call_id"]]
+
+    await scheduler.schedule_daily_calls("user-1", midday_time="12:30", now=NOW)
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert task.cancelled()
+    assert await renderer.take(old["call_id"]) is None
+
+
+@pytest.mark.asyncio
+async def test_next_occurrence_is_queued_only_when_stored(store):
+    node_a = CallScheduler(store=store, node_id="node-a", lease_seconds=30, prerenderer=prerenderer())
+    node_b = CallScheduler(store=store, node_id="node-b", lease_seconds=30)
+    await node_a.schedule_daily_calls("user-1", now=NOW)
+    # Node B claims today's midday call, stores tomorrow's and crashes before dispatch
+    await node_b.claim_due_calls(NOW + timedelta(hours=1), providers=None)
+    await store.recover(NOW + timedelta(hours=1, minutes=1), max_call_duration=300)
+
+    [requeued] = await node_a.claim_due_calls(NOW + timedelta(hours=1, minutes=1))
+    [stored_midday] = [call for call in await store.load_pending() if call["call_type"] == CallType.MIDDAY]
+
+    assert requeued["call_type"] == CallType.MIDDAY
+    assert stored_midday["call_id"] in node_b.queue
+    # Node A's own next occurrence lost the slot, so it is neither queued nor pre-rendered
+    assert [call["call_type"] for call in node_a.scheduled_calls] == [CallType.EVENING, CallType.MORNING]
+    assert node_a.prerenderer.schedule_upcoming(node_a, now=NOW + timedelta(days=1, minutes=55)) == 2
+    assert stored_midday["call_id"] not in node_a.prerenderer._pending
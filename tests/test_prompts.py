@@ -0,0 +1,67 @@
+from backend.core.ai_engine import PERSONALITY_PROMPTS, PersonalityMode
+from backend.core.prompts import PromptCompiler
+from backend.core.simulated_engine import SimulatedAIEngine
+
+CONFIGS = {"motivator": {"keywords": ["amazing", "progress"]}}
+TEMPLATES = {
+    "morning": {"duration": 120, "topics": ["goals", "energy"], "tone": "energizing"},
+    "evening": {"duration": 180, "topics": ["wins", "tomorrow"], "tone": "reflective"}
+}
+
+
+def compiler() -> PromptCompiler:
+    return PromptCompiler(PERSONALITY_PROMPTS, CONFIGS, TEMPLATES)
+
+
+def test_prefixes_are_byte_stable_across_compilers():
+    first, second = compiler(), compiler()
+
+    assert first.token_report() == second.token_report()
+    assert first.system_prefix(PersonalityMode.MOTIVATOR, "morning") == second.system_prefix("motivator", "morning")
+
+
+def test_prefix_renders_the_personality_call_and_voice():
+    prefix = compiler().system_prefix(PersonalityMode.MOTIVATOR, "morning")
+
+    assert prefix.startswith("You are an enthusiastic, positive personal coach.")
+    assert "Call: morning check-in, about 120 seconds" in prefix
+    assert "Tone: energizing" in prefix
+    assert "Cover: goals, energy" in prefix
+    assert "Signature words: amazing, progress" in prefix
+
+
+def test_every_template_is_compiled_up_front_with_token_counts():
+    report = compiler().token_report()
+
+    pairs = {(row["personality"], row["call_type"]) for row in report}
+    assert pairs == {
+        (personality.value, call_type)
+        for personality in PERSONALITY_PROMPTS
+        for call_type in ("morning", "evening", "urgent", "followup")
+    }
+    assert all(row["tokens"] > 0 and len(row["digest"]) == 16 for row in report)
+
+
+def test_unknown_call_type_compiles_on_first_use_with_the_generic_template():
+    prompts = compiler()
+
+    prefix = prompts.system_prefix("motivator", "midday")
+
+    assert "Cover: progress, next step" in prefix
+    [row] = [row for row in prompts.token_report() if (row["personality"], row["call_type"]) == ("motivator", "midday")]
+    assert prompts.prefix_tokens("motivator", "midday") == row["tokens"]
+
+
+def test_user_context_never_enters_the_prefix():
+    engine = SimulatedAIEngine(prompt_compiler=compiler())
+    quiet = engine._build_messages("Hi", {}, "morning", PersonalityMode.MOTIVATOR)
+    busy = engine._build_messages(
+        "I skipped my run",
+        {"summary": "Trains for a 10k", "turns": [["a", "Morning!"]], "scheduled_time": "08:00"},
+        "morning",
+        PersonalityMode.MOTIVATOR
+    )
+
+    assert quiet[0] == busy[0]
+    assert busy[0]["content"] == engine.prompts.system_prefix("motivator", "morning")
+    assert busy[-1] == {"role": "user", "content": "I skipped my run"}
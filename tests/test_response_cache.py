@@ -0,0 +1,109 @@
+import pytest
+
+from backend.core.ai_engine import PersonalityMode
+from backend.core.response_cache import ResponseCache
+from backend.core.simulated_engine import SimulatedAIEngine
+
+
+class RecordingEngine(SimulatedAIEngine):
+    """Simulated engine that keeps the messages of every generated reply"""
+
+    def __init__(self, **kwargs):
+        super().__init__(latency_ms=0, tokens_per_second=0, **kwargs)
+        self.prompts_sent = []
+
+    def _stream_messages(self, messages):
+        self.prompts_sent.append(messages)
+        return super()._stream_messages(messages)
+
+
+def test_exact_and_normalized_hits():
+    cache = ResponseCache()
+    cache.put("motivator", "morning", "Done!", "Great work.")
+
+    assert cache.get("motivator", "morning", "done") == "Great work."
+    assert cache.get("drill_sergeant", "morning", "done") is None
+    assert cache.get("motivator", "evening", "done") is None
+
+
+def test_near_duplicate_input_is_a_semantic_hit():
+    cache = ResponseCache()
+    cache.put("motivator", "morning", "skipped the gym", "Tomorrow, then.")
+
+    assert cache.get("motivator", "morning", "skiped the gym") == "Tomorrow, then."
+    assert cache.metrics()["semantic_hits"] == 1
+
+
+def test_nearest_neighbour_only_scores_its_own_group():
+    cache = ResponseCache(similarity_threshold=0.5)
+    cache.put("drill_sergeant", "morning", "skipped the gym", "Drop and give me twenty.")
+    cache.put("motivator", "morning", "had a great workout", "Amazing!")
+
+    assert cache.get("motivator", "morning", "skipped the gym") is None
+    assert cache.get("drill_sergeant", "morning", "skipped gym") == "Drop and give me twenty."
+
+
+def test_dropped_rows_leave_their_group():
+    cache = ResponseCache(max_entries=1)
+    cache.put("motivator", "morning", "done", "Great work.")
+    cache.put("motivator", "evening", "done", "Rest well.")
+
+    assert cache.get("motivator", "morning", "done") is None
+    assert cache.get("motivator", "evening", "done") == "Rest well."
+    assert cache.metrics()["evictions"] == 1
+
+
+def test_long_inputs_are_not_cached():
+    cache = ResponseCache(max_input_words=3)
+    cache.put("motivator", "morning", "I went for a long run today", "Nice.")
+
+    assert cache.get("motivator", "morning", "I went for a long run today") is None
+    assert cache.metrics()["entries"] == 0
+
+
+def test_lru_evicts_the_oldest_entry():
+    cache = ResponseCache(max_entries=2, similarity_threshold=1.1)
+    for reply in ("one", "two", "three"):
+        cache.put("motivator", "morning", reply, reply.upper())
+
+    assert cache.get("motivator", "morning", "one") is None
+    assert cache.get("motivator", "morning", "three") == "THREE"
+    assert cache.metrics()["evictions"] == 1
+
+
+def test_zero_entries_disables_the_cache():
+    cache = ResponseCache(max_entries=0)
+    cache.put("motivator", "morning", "done", "Great work.")
+
+    assert cache.get("motivator", "morning", "done") is None
+    assert cache.metrics()["entries"] == 0
+
+
+def test_negative_size_is_rejected():
+    with pytest.raises(ValueError):
+        ResponseCache(max_entries=-1)
+
+
+@pytest.mark.asyncio
+async def test_shared_replies_are_generated_without_user_context():
+    engine = RecordingEngine(response_cache=ResponseCache())
+    alice = {"user_id": "alice", "summary": "Training for a 10k", "turns": [["a", "Did you run, Alice?"]]}
+    bob = {"user_id": "bob", "summary": "Quitting sugar", "turns": [["a", "Any sweets, Bob?"]]}
+
+    first = await engine.generate_response("done", alice, "morning", PersonalityMode.MOTIVATOR)
+    second = await engine.generate_response("done", bob, "morning", PersonalityMode.MOTIVATOR)
+
+    assert first == second
+    [messages] = engine.prompts_sent
+    assert not any("Alice" in m["content"] or "10k" in m["content"] for m in messages)
+
+
+@pytest.mark.asyncio
+async def test_personal_replies_keep_their_context_and_skip_the_cache():
+    engine = RecordingEngine(response_cache=ResponseCache(max_input_words=3))
+    context = {"user_id": "alice", "summary": "Training for a 10k", "turns": []}
+
+    await engine.generate_response("I ran ten kilometres before work today", context, "morning")
+
+    assert any("10k" in m["content"] for m in engine.prompts_sent[0])
+    assert engine.response_cache.metrics()["entries"] == 0
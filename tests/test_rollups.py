@@ -0,0 +1,140 @@
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from backend.core.memory import ConversationMemory
+from backend.services.call_service import CallScheduler, CallStatus, CallType
+from backend.services.rollups import build_analytics, current_streak, load_analytics, rollup_buckets
+from backend.services.session_store import SessionStore
+from tests.factories import NOW, api_client, make_call
+
+NEW_YORK = "America/New_York"
+
+
+async def finish(store, calls: list, status: CallStatus = CallStatus.COMPLETED) -> None:
+    """Store calls and run each to `status`, one at a time as the slot index requires"""
+
+    for call in calls:
+        await store.insert_calls([call])
+        await store.claim_due_batch(call["scheduled_at"], 1, "node-a", 60)
+        await store.update_status(call["call_id"], status, call["scheduled_at"])
+
+
+def evenings(first_day: date, days: int) -> list:
+    """Evening calls at 21:00 New York time, which is already the next day in UTC"""
+
+    return [
+        make_call(
+            call_type=CallType.EVENING, timezone=NEW_YORK,
+            scheduled_at=datetime.combine(first_day + timedelta(days=offset), time(21), ZoneInfo(NEW_YORK))
+        )
+        for offset in range(days)
+    ]
+
+
+def test_buckets_use_the_users_local_day():
+    late_evening = datetime(2026, 3, 3, 2, 0, tzinfo=timezone.utc)
+
+    assert rollup_buckets("evening", late_evening, NEW_YORK) == [
+        ("day", "2026-03-02"), ("call_type", "evening"), ("weekday", "0")
+    ]
+    assert rollup_buckets("evening", late_evening, "Not/AZone")[0] == ("day", "2026-03-03")
+
+
+def test_streak_ends_today_or_yesterday():
+    days = [{"bucket": f"2026-03-0{day}", "completed": 1} for day in (1, 2, 3)]
+
+    assert current_streak(days, date(2026, 3, 3)) == 3
+    assert current_streak(days, date(2026, 3, 4)) == 3
+    assert current_streak(days, date(2026, 3, 5)) == 0
+
+
+@pytest.mark.asyncio
+async def test_terminal_outcomes_feed_rollups_and_rebuild_matches(store):
+    calls = [make_call(call_type=call_type) for call_type in (CallType.MORNING, CallType.MIDDAY, CallType.EVENING)]
+    await finish(store, calls[:2])
+    await finish(store, calls[2:], CallStatus.MISSED)
+
+    by_type = {row["bucket"]: row for row in await store.get_rollups("user-1", "call_type")}
+    assert (by_type["morning"]["completed"], by_type["evening"]["missed"]) == (1, 1)
+    before = await store.get_rollups("user-1", "day")
+
+    assert await store.rebuild_rollups() == 3
+    assert await store.get_rollups("user-1", "day") == before
+    assert (await store.get_user_stats("user-1"))["total_calls"] == 3
+
+
+@pytest.mark.asyncio
+async def test_end_call_marks_completed(store):
+    memory = ConversationMemory()
+    sessions = SessionStore()
+    scheduler = CallScheduler(store=store, node_id="node-a", session_store=sessions, memory=memory)
+    await scheduler.schedule_daily_calls("user-1", now=NOW)
+    [call, *_] = await scheduler.claim_due_calls(NOW + timedelta(days=1), limit=10)
+    session = {"user_id": "user-1", "turns": [["a", "Did you train?"], ["u", "Yes, 5k run"]]}
+    await sessions.set(call["call_id"], session)
+
+    await scheduler.end_call(call["call_id"], session)
+    await memory.close()
+
+    assert await sessions.get(call["call_id"]) is None
+    stats = await store.get_user_stats("user-1")
+    assert (stats["total_calls"], stats["completed"]) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_streak_counts_the_users_local_today(store):
+    # Completed on the evenings of Feb 28 and Mar 1, New York time
+    await finish(store, evenings(date(2026, 2, 28), 2))
+    # 21:30 on Mar 2 in New York, already Mar 3 in UTC: tonight's call is still to come
+    now = datetime(2026, 3, 3, 2, 30, tzinfo=timezone.utc)
+
+    result = await load_analytics(store, "user-1", now)
+
+    assert result["analytics"]["current_streak_days"] == 2
+    assert result["analytics"]["last_30_days"]["completed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_correlation_comes_from_tracked_metrics(store):
+    calls = evenings(date(2026, 2, 20), 10)
+    for index, call in enumerate(calls):
+        await finish(store, [call], CallStatus.COMPLETED if index % 2 else CallStatus.MISSED)
+    await store.record_metrics([
+        {"user_id": "user-1", "date": f"2026-02-{20 + index}", "metric_type": "focus_hours", "value": 2 + 3 * (index % 2)}
+        for index in range(10)
+    ] + [
+        {"user_id": "user-1", "date": f"2026-02-{20 + index}", "metric_type": "weight", "value": 80.0}
+        for index in range(10)
+    ] + [
+        {"user_id": "user-2", "date": f"2026-02-{20 + index}", "metric_type": "sleep", "value": index}
+        for index in range(10)
+    ])
+
+    result = await load_analytics(store, "user-1", datetime(2026, 3, 2, 12, 0, tzinfo=timezone.utc))
+
+    assert result["analytics"]["correlated_metric"] == "focus_hours"
+    assert result["analytics"]["productivity_correlation"] == 1.0
+    assert "Your focus_hours is better on days you complete your calls" in result["insights"]
+
+
+def test_too_few_days_give_no_correlation():
+    recent_days = [{"bucket": f"2026-03-0{day}", "total": 1, "completed": day % 2} for day in range(1, 6)]
+    metrics = {"date": [row["bucket"] for row in recent_days], "metric_type": ["mood"] * 5, "value": [1, 2, 1, 2, 1]}
+    stats = {"total_calls": 5, "success_rate": 0.4}
+
+    analytics = build_analytics(stats, [], [], recent_days, date(2026, 3, 5), metrics)["analytics"]
+
+    assert (analytics["correlated_metric"], analytics["productivity_correlation"]) == (None, 0.0)
+
+
+@pytest.mark.asyncio
+async def test_analytics_endpoint_needs_a_store(store):
+    async with api_client(call_scheduler=CallScheduler()) as client:
+        assert (await client.get("/api/v1/calls/analytics/user-1")).status_code == 503
+    async with api_client(call_scheduler=CallScheduler(store=store)) as client:
+        response = await client.get("/api/v1/calls/analytics/user-1")
+
+    assert response.status_code == 200
+    assert response.json()["analytics"]["total_calls"] == 0
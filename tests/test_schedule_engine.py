@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.services.schedule_engine import DispatchQueue, next_fire_time, parse_call_time
+
+START = datetime(2026, 3, 2, 12, 0, tzinfo=timezone.utc)
+
+
+def fill(queue: DispatchQueue, minutes: list) -> None:
+    for minute in minutes:
+        queue.push(f"call-{minute}", START + timedelta(minutes=minute), {"call_id": f"call-{minute}"})
+
+
+def test_pop_due_returns_calls_in_fire_order():
+    queue = DispatchQueue()
+    fill(queue, [30, 5, 20, 10, 60])
+
+    due = queue.pop_due(START + timedelta(minutes=20))
+
+    assert [call["call_id"] for call in due] == ["call-5", "call-10", "call-20"]
+    assert len(queue) == 2
+    assert queue.peek_time() == START + timedelta(minutes=30)
+
+
+def test_pop_due_respects_the_limit():
+    queue = DispatchQueue()
+    fill(queue, [1, 2, 3])
+
+    assert [call["call_id"] for call in queue.pop_due(START + timedelta(hours=1), limit=2)] == ["call-1", "call-2"]
+    assert [call["call_id"] for call in queue.pop_due(START + timedelta(hours=1))] == ["call-3"]
+
+
+def test_cancelled_and_rescheduled_calls_fire_once():
+    queue = DispatchQueue()
+    fill(queue, [5, 10, 15])
+
+    assert queue.cancel("call-10") == {"call_id": "call-10"}
+    assert queue.cancel("call-10") is None
+    queue.push("call-5", START + timedelta(minutes=25), {"call_id": "call-5", "moved": True})
+
+    due = queue.pop_due(START + timedelta(hours=1))
+
+    assert [call["call_id"] for call in due] == ["call-15", "call-5"]
+    assert due[1]["moved"]
+    assert len(queue) == 0
+    assert queue.peek_time() is None
+
+
+def test_heap_is_compacted_after_mass_cancel():
+    queue = DispatchQueue()
+    fill(queue, range(1000))
+
+    for minute in range(990):
+        queue.cancel(f"call-{minute}")
+
+    assert len(queue._heap) <= 2 * len(queue) + 64
+    assert [call["call_id"] for call in queue.snapshot()] == [f"call-{minute}" for minute in range(990, 1000)]
+
+
+def test_iter_due_before_leaves_the_queue_alone():
+    queue = DispatchQueue()
+    fill(queue, [40, 5, 25, 15, 50])
+    queue.cancel("call-15")
+
+    upcoming = {call["call_id"] for call in queue.iter_due_before(START + timedelta(minutes=30))}
+
+    assert upcoming == {"call-5", "call-25"}
+    assert len(queue) == 4
+
+
+def test_next_fire_time_follows_the_user_timezone():
+    # 08:00 in New York is 13:00 UTC in March before the DST switch
+    assert next_fire_time("08:00", "America/New_York", START) == datetime(2026, 3, 2, 13, 0, tzinfo=timezone.utc)
+    # Already past today in Tokyo, so tomorrow
+    assert next_fire_time("08:00", "Asia/Tokyo", START) == datetime(2026, 3, 2, 23, 0, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("value", ["8am", "25:00", "08"])
+def test_invalid_call_time_is_rejected(value):
+    with pytest.raises(ValueError):
+        parse_call_time(value)
+
+
+def test_unknown_timezone_is_rejected():
+    with pytest.raises(ValueError, match="Unknown timezone"):
+        next_fire_time("08:00", "Mars/Olympus", START)
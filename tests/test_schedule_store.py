@@ -0,0 +1,139 @@
+from datetime import timedelta
+import asyncio
+
+import pytest
+
+from backend.services.call_service import CallProvider, CallStatus
+from backend.services.schedule_store import ScheduleStoreFactory, SQLiteScheduleStore
+from tests.factories import NOW, make_call
+
+
+@pytest.mark.asyncio
+async def test_claim_takes_each_due_call_once(store):
+    due = [make_call(f"user-{i}", scheduled_at=NOW - timedelta(minutes=i)) for i in range(3)]
+    later = make_call("user-9", scheduled_at=NOW + timedelta(hours=1))
+    await store.insert_calls(due + [later])
+
+    first = await store.claim_due_batch(NOW, 2, "node-a", lease_seconds=60)
+    second = await store.claim_due_batch(NOW, 10, "node-b", lease_seconds=60)
+
+    assert [call["call_id"] for call in first] == [due[2]["call_id"], due[1]["call_id"]]
+    assert [call["call_id"] for call in second] == [due[0]["call_id"]]
+    assert all(call["status"] == CallStatus.IN_PROGRESS for call in first + second)
+    assert await store.claim_due_batch(NOW, 10, "node-c", lease_seconds=60) == []
+
+
+@pytest.mark.asyncio
+async def test_concurrent_claimers_get_disjoint_batches(store):
+    await store.insert_calls([make_call(f"user-{i}", scheduled_at=NOW - timedelta(seconds=i)) for i in range(50)])
+
+    batches = await asyncio.gather(*(
+        store.claim_due_batch(NOW, 10, f"node-{i}", lease_seconds=60) for i in range(8)
+    ))
+
+    claimed = [call["call_id"] for batch in batches for call in batch]
+    assert len(claimed) == 50
+    assert len(set(claimed)) == 50
+
+
+@pytest.mark.asyncio
+async def test_claim_filters_by_provider(store):
+    telegram = make_call("user-1", provider=CallProvider.TELEGRAM)
+    twilio = make_call("user-2", provider=CallProvider.TWILIO)
+    await store.insert_calls([telegram, twilio])
+
+    claimed = await store.claim_due_batch(NOW, 10, "node-a", 60, providers=[CallProvider.TWILIO])
+
+    assert [call["call_id"] for call in claimed] == [twilio["call_id"]]
+
+
+@pytest.mark.asyncio
+async def test_lapsed_lease_is_requeued_and_claimed_again(store):
+    call = make_call()
+    await store.insert_calls([call])
+    await store.claim_due_batch(NOW, 10, "node-a", lease_seconds=30)
+
+    assert await store.recover(NOW + timedelta(seconds=10), max_call_duration=300) == {"requeued": 0, "missed": 0}
+    assert await store.recover(NOW + timedelta(seconds=31), max_call_duration=300) == {"requeued": 1, "missed": 0}
+
+    [reclaimed] = await store.claim_due_batch(NOW + timedelta(seconds=31), 10, "node-b", lease_seconds=30)
+    assert reclaimed["call_id"] == call["call_id"]
+    assert reclaimed["attempts"] == 2
+
+
+@pytest.mark.asyncio
+async def test_dispatched_call_keeps_running_until_max_duration(store):
+    call = make_call()
+    await store.insert_calls([call])
+    await store.claim_due_batch(NOW, 10, "node-a", lease_seconds=30)
+    await store.mark_dispatched(call["call_id"], NOW)
+
+    # The lease no longer applies once the provider has the call
+    assert await store.recover(NOW + timedelta(seconds=200), max_call_duration=300) == {"requeued": 0, "missed": 0}
+    assert await store.recover(NOW + timedelta(seconds=301), max_call_duration=300) == {"requeued": 0, "missed": 1}
+    [stored] = await store.list_calls(call["user_id"], 10)
+    assert stored["status"] == CallStatus.MISSED
+
+
+@pytest.mark.asyncio
+async def test_only_unclaimed_calls_can_be_deleted(store):
+    claimed, pending = make_call("user-1", scheduled_at=NOW - timedelta(minutes=1)), make_call("user-2")
+    await store.insert_calls([claimed, pending])
+    await store.claim_due_batch(NOW, 1, "node-a", 60)
+
+    assert not await store.delete_call(claimed["call_id"])
+    assert await store.delete_call(pending["call_id"])
+    assert not await store.delete_call(pending["call_id"])
+
+
+@pytest.mark.asyncio
+async def test_one_fresh_scheduled_call_per_slot(store):
+    first = make_call()
+    duplicate = make_call(scheduled_at=NOW + timedelta(days=1))
+
+    assert await store.insert_calls([first]) == [first["call_id"]]
+    assert await store.insert_calls([duplicate]) == []
+    assert [call["call_id"] for call in await store.load_pending()] == [first["call_id"]]
+
+    replacement = make_call(scheduled_at=NOW + timedelta(days=2))
+    await store.replace_calls([], [replacement])
+
+    assert [call["call_id"] for call in await store.load_pending()] == [replacement["call_id"]]
+
+
+@pytest.mark.asyncio
+async def test_requeued_call_waits_beside_next_occurrence(store):
+    call = make_call()
+    await store.insert_calls([call])
+    await store.claim_due_batch(NOW, 10, "node-a", lease_seconds=30)
+    next_call = make_call(scheduled_at=NOW + timedelta(days=1))
+    await store.insert_calls([next_call])
+    await store.recover(NOW + timedelta(seconds=31), max_call_duration=300)
+
+    pending = await store.load_pending()
+
+    assert [row["call_id"] for row in pending] == [call["call_id"], next_call["call_id"]]
+
+
+@pytest.mark.asyncio
+async def test_schedule_survives_a_restart(tmp_path):
+    path = str(tmp_path / "schedule.db")
+    first = SQLiteScheduleStore(path)
+    await first.initialize()
+    call = make_call(provider=CallProvider.WHATSAPP)
+    await first.insert_calls([call])
+    await first.close()
+
+    reopened = SQLiteScheduleStore(path)
+    await reopened.initialize()
+    [loaded] = await reopened.load_pending()
+    await reopened.close()
+
+    assert {key: loaded[key] for key in call} == call
+
+
+def test_factory_picks_the_backend_from_the_url():
+    assert isinstance(ScheduleStoreFactory.create_store("sqlite:///data/calls.db"), SQLiteScheduleStore)
+    assert ScheduleStoreFactory.create_store("sqlite:///data/calls.db").path == "data/calls.db"
+    with pytest.raises(ValueError):
+        ScheduleStoreFactory.create_store("mysql://localhost/calls")
@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+from backend.core.ai_engine import AIProvider, EnginePool
+from backend.core.memory import ConversationMemory
+from backend.services.call_service import CallScheduler
+from backend.services.session_store import (
+    SessionStore, deserialize_session, new_session_state, serialize_session
+)
+from tests.factories import api_client
+
+
+class FakeRedis:
+    """The slice of redis.asyncio the session store uses, ignoring expiry"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def close(self):
+        pass
+
+
+def session(user_id: str = "user-1", *turns) -> dict:
+    state = new_session_state(user_id, "morning", "telegram", "motivator", None, "Good morning!")
+    state["turns"].extend([list(turn) for turn in turns])
+    return state
+
+
+def test_serialization_compresses_large_sessions_only():
+    small = session()
+    large = session("user-1", *[("u", f"turn {i} " * 20) for i in range(20)])
+
+    assert serialize_session(small)[:1] == b"j"
+    assert serialize_session(large)[:1] == b"z"
+    assert len(serialize_session(large)) < len(serialize_session(large, compress_over=10 ** 9))
+    assert deserialize_session(serialize_session(large)) == large
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_session_is_evicted():
+    sessions = SessionStore(max_entries=2)
+    await sessions.set("a", session("a"))
+    await sessions.set("b", session("b"))
+    await sessions.get("a")
+    await sessions.set("c", session("c"))
+
+    assert await sessions.get("b") is None
+    assert (await sessions.get("a"))["user_id"] == "a"
+    assert sessions.metrics()["evictions"] == 1
+    assert sessions.metrics()["entries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_expired_session_is_not_served_but_is_swept():
+    sessions = SessionStore(ttl_seconds=0)
+    await sessions.set("a", session("a"))
+
+    assert await sessions.get("a") is None
+    [(session_id, state)] = await sessions.sweep()
+
+    assert (session_id, state["user_id"]) == ("a", "a")
+    assert await sessions.sweep() == []
+    assert sessions.metrics()["bytes"] == 0
+
+
+@pytest.mark.asyncio
+async def test_local_miss_falls_back_to_redis():
+    redis = FakeRedis()
+    await SessionStore(redis_client=redis).set("a", session("a", ("u", "Done")))
+
+    other_worker = SessionStore(redis_client=redis)
+    state = await other_worker.get("a")
+
+    assert state["turns"][-1] == ["u", "Done"]
+    assert other_worker.metrics()["redis_hits"] == 1
+    await other_worker.delete("a")
+    assert redis.data == {}
+
+
+@pytest.mark.asyncio
+async def test_sweep_skips_sessions_another_worker_continued():
+    redis = FakeRedis()
+    sessions = SessionStore(ttl_seconds=0, redis_client=redis)
+    await sessions.set("a", session("a"))
+
+    assert await sessions.sweep() == []
+
+
+@pytest.mark.asyncio
+async def test_respond_appends_turns_to_the_session():
+    sessions = SessionStore()
+    await sessions.set("call-1", session("user-1"))
+    client = api_client(
+        call_scheduler=CallScheduler(session_store=sessions),
+        session_store=sessions,
+        engine_pool=EnginePool(AIProvider.SIMULATED, {AIProvider.SIMULATED: {"latency_ms": 0, "tokens_per_second": 0}}),
+        memory=ConversationMemory()
+    )
+
+    async with client:
+        reply = await client.post("/api/v1/calls/respond/call-1", json={"text": "I ran 5k"})
+        missing = await client.post("/api/v1/calls/respond/call-2", json={"text": "Hello?"})
+
+    assert reply.status_code == 200
+    assert missing.status_code == 404
+    turns = (await sessions.get("call-1"))["turns"]
+    assert turns[1:] == [["u", "I ran 5k"], ["a", reply.json()["ai_response"]]]
+
+
+@pytest.mark.asyncio
+async def test_memory_close_saves_pending_summaries(store):
+    async def slow_summarizer(previous, turns, max_words):
+        await asyncio.sleep(0.05)
+        return " ".join(text for _, text in turns)
+
+    memory = ConversationMemory(summarizer=slow_summarizer, store=store)
+    memory.end_session(session("user-1", ("u", "I ran 5k")))
+
+    await memory.close()
+
+    assert await store.get_summary("user-1") == "Good morning! I ran 5k"
+    assert memory.stats()["summarizing"] == 0
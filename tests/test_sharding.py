@@ -0,0 +1,96 @@
+from collections import Counter
+from datetime import timedelta
+
+import pytest
+
+from backend.services.call_service import CallScheduler
+from backend.services.sharding import HashRing, ShardCoordinator, SQLiteLeaseBackend, shard_for
+from tests.factories import NOW, make_call
+
+NODES = ["node-a", "node-b", "node-c"]
+KEYS = [f"shard:{shard}" for shard in range(256)]
+
+
+def test_shard_for_is_stable_and_in_range():
+    shards = [shard_for(f"user-{i}") for i in range(1000)]
+
+    assert shards == [shard_for(f"user-{i}") for i in range(1000)]
+    assert all(0 <= shard < 256 for shard in shards)
+
+
+def test_ring_spreads_keys_over_every_node():
+    owners = Counter(HashRing(NODES).node_for(key) for key in KEYS)
+
+    assert set(owners) == set(NODES)
+    assert min(owners.values()) > len(KEYS) / len(NODES) / 2
+
+
+def test_ring_ownership_ignores_node_order():
+    forward, backward = HashRing(NODES), HashRing(list(reversed(NODES)))
+
+    assert all(forward.node_for(key) == backward.node_for(key) for key in KEYS)
+
+
+def test_removing_a_node_only_moves_its_keys():
+    before, after = HashRing(NODES), HashRing(NODES[:2])
+
+    moved = [key for key in KEYS if before.node_for(key) != after.node_for(key)]
+
+    assert moved
+    assert all(before.node_for(key) == "node-c" for key in moved)
+
+
+def test_empty_ring_owns_nothing():
+    assert HashRing([]).node_for("shard:0") is None
+
+
+@pytest.mark.asyncio
+async def test_coordinators_split_the_shards(tmp_path):
+    path = str(tmp_path / "leases.db")
+    coordinators = [ShardCoordinator(SQLiteLeaseBackend(path), node_id=node, num_shards=64) for node in NODES]
+    try:
+        for _ in range(2):
+            # The first round only sees the nodes that heartbeated before it
+            for coordinator in coordinators:
+                await coordinator.rebalance()
+
+        owned = [coordinator.owned_shards for coordinator in coordinators]
+        assert sum(len(shards) for shards in owned) == 64
+        assert frozenset().union(*owned) == frozenset(range(64))
+
+        user = next(f"user-{i}" for i in range(100) if shard_for(f"user-{i}", 64) in owned[0])
+        assert [coordinator.owns(user) for coordinator in coordinators] == [True, False, False]
+
+        await coordinators[2].stop()
+        for coordinator in coordinators[:2]:
+            report = await coordinator.rebalance()
+            assert report["nodes"] == 2
+        assert len(coordinators[0].owned_shards | coordinators[1].owned_shards) == 64
+    finally:
+        for coordinator in coordinators:
+            await coordinator.backend.close()
+
+
+@pytest.mark.asyncio
+async def test_store_claims_only_the_requested_shards(store):
+    calls = [make_call(f"user-{i}") for i in range(20)]
+    await store.insert_calls(calls)
+    wanted = {shard_for(call["user_id"]) for call in calls[:5]}
+
+    claimed = await store.claim_due_batch(NOW, 20, "node-a", lease_seconds=30, shards=sorted(wanted))
+
+    expected = [call for call in calls if shard_for(call["user_id"]) in wanted]
+    assert sorted(call["call_id"] for call in claimed) == sorted(call["call_id"] for call in expected)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_claims_nothing_before_owning_shards(store, tmp_path):
+    coordinator = ShardCoordinator(SQLiteLeaseBackend(str(tmp_path / "leases.db")), node_id="node-a")
+    scheduler = CallScheduler(store=store, node_id="node-a", shard_coordinator=coordinator)
+    await scheduler.schedule_daily_calls("user-1", now=NOW)
+
+    assert await scheduler.claim_due_calls(NOW + timedelta(days=1)) == []
+
+    await coordinator.rebalance()
+    assert len(await scheduler.claim_due_calls(NOW + timedelta(days=1))) == 3
+    await coordinator.stop()
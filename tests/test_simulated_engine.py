@@ -0,0 +1,82 @@
+from argparse import Namespace
+import time
+
+import pytest
+
+from backend.core.ai_engine import AIEngineFactory, AIProvider, PersonalityMode
+from backend.core.simulated_engine import REPLY_SENTENCES, SimulatedAIEngine, SimulatedAIError
+from benchmarks.bench_call_api import ASGIClient, build_app, run_load
+
+
+def engine(**kwargs) -> SimulatedAIEngine:
+    return SimulatedAIEngine(**{"latency_ms": 0, "tokens_per_second": 0, **kwargs})
+
+
+@pytest.mark.asyncio
+async def test_replies_are_a_pure_function_of_the_prompt():
+    first, second = engine(seed=1), engine(seed=2)
+    context = {"summary": "Trains for a 10k", "turns": [["a", "Morning!"]]}
+
+    reply = await first.generate_response("done", context, "morning")
+
+    assert reply == await second.generate_response("done", context, "morning")
+    assert reply != await first.generate_response("done", context, "evening")
+    assert reply != await first.generate_response("done", context, "morning", PersonalityMode.FRIEND)
+    assert 2 <= sum(sentence in reply for sentence in REPLY_SENTENCES) <= 3
+
+
+def test_latency_draws_are_reproducible_per_seed():
+    def draws(seed: int) -> list:
+        simulated = engine(latency_ms=300, seed=seed)
+        return [simulated._sample_latency() for _ in range(5)]
+
+    assert draws(7) == draws(7)
+    assert draws(7) != draws(8)
+    assert engine(latency_ms=300, latency_distribution="fixed")._sample_latency() == 300
+
+
+def test_unknown_distribution_is_rejected():
+    with pytest.raises(ValueError):
+        engine(latency_distribution="pareto")
+
+
+@pytest.mark.asyncio
+async def test_errors_are_injected_at_the_configured_rate():
+    failing = engine(error_rate=1.0)
+
+    with pytest.raises(SimulatedAIError):
+        await failing.generate_response("done", {}, "morning")
+    assert await engine(error_rate=0.0).generate_response("done", {}, "morning")
+
+
+@pytest.mark.asyncio
+async def test_tokens_stream_at_the_configured_speed():
+    simulated = engine(latency_ms=20, latency_distribution="fixed", tokens_per_second=200)
+
+    started = time.perf_counter()
+    tokens = [token async for token in simulated.stream_response("done", {}, "morning")]
+    elapsed = time.perf_counter() - started
+
+    assert elapsed >= 0.02 + (len(tokens) - 1) / 200 * 0.9
+    assert "".join(tokens) == await simulated.generate_response("done", {}, "morning")
+
+
+def test_factory_builds_the_simulated_engine():
+    created = AIEngineFactory.create_engine(AIProvider.SIMULATED, latency_ms=5)
+
+    assert isinstance(created, SimulatedAIEngine)
+    assert created.latency_ms == 5
+
+
+@pytest.mark.asyncio
+async def test_load_benchmark_runs_offline():
+    args = Namespace(
+        concurrency=4, conversations=8, turns=2, latency_ms=1.0, latency_jitter=0.5,
+        latency_distribution="lognormal", tokens_per_second=0.0, error_rate=0.0, seed=7
+    )
+
+    report = await run_load(ASGIClient(build_app(args)), args)
+
+    assert (report["initiate"]["requests"], report["initiate"]["errors"]) == (8, 0)
+    assert (report["respond"]["requests"], report["respond"]["errors"]) == (16, 0)
+    assert report["respond"]["p50_ms"] <= report["respond"]["p99_ms"]
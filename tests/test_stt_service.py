@@ -0,0 +1,114 @@
+import asyncio
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from backend.core.stt_service import (
+    STT_INFERENCE_SECONDS, STT_QUEUE_WAIT_SECONDS, BaseSTTBackend, STTOverloadedError, STTService, pcm16_to_float32
+)
+from backend.core.voice_engine import ElevenLabsVoiceEngine, WhisperVoiceEngine
+
+
+class EchoBackend(BaseSTTBackend):
+    """Transcribes audio to its own text after `delay`, tracking loads and concurrency"""
+
+    name = "echo"
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.loads = 0
+        self.active = 0
+        self.peak = 0
+
+    async def load(self) -> None:
+        self.loads += 1
+
+    async def transcribe(self, audio_data: bytes, language: str = "en") -> str:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        if audio_data == b"garbled":
+            raise ValueError("cannot decode audio")
+        return f"{language}:{audio_data.decode()}"
+
+
+@pytest.mark.asyncio
+async def test_engines_share_one_loaded_backend():
+    backend = EchoBackend()
+    service = STTService(backend)
+    await service.start()
+
+    texts = [
+        await ElevenLabsVoiceEngine(api_key="key", stt_service=service).speech_to_text(b"done"),
+        await WhisperVoiceEngine(stt_service=service).speech_to_text(b"hola", "es")
+    ]
+    await service.close()
+
+    assert texts == ["en:done", "es:hola"]
+    assert backend.loads == 1
+
+
+@pytest.mark.asyncio
+async def test_workers_bound_concurrency_and_record_wait_separately():
+    backend = EchoBackend(delay=0.02)
+    service = STTService(backend, max_concurrency=2)
+    waits, inferences = STT_QUEUE_WAIT_SECONDS.count("echo"), STT_INFERENCE_SECONDS.count("echo")
+    await service.start()
+
+    texts = await asyncio.gather(*(service.transcribe(f"{i}".encode()) for i in range(6)))
+    await service.close()
+
+    assert texts == [f"en:{i}" for i in range(6)]
+    assert backend.peak == 2
+    assert STT_QUEUE_WAIT_SECONDS.count("echo") == waits + 6
+    assert STT_INFERENCE_SECONDS.count("echo") == inferences + 6
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_instead_of_waiting():
+    service = STTService(EchoBackend(delay=0.05), max_queue=2)
+    await service.start()
+
+    running = asyncio.create_task(service.transcribe(b"first"))
+    await asyncio.sleep(0.01)
+    results = await asyncio.gather(*(service.transcribe(b"x") for _ in range(4)), return_exceptions=True)
+    await running
+    await service.close()
+
+    assert [isinstance(result, STTOverloadedError) for result in results] == [False, False, True, True]
+    assert service.metrics()["rejected"] == 2
+
+
+@pytest.mark.asyncio
+async def test_a_failed_transcription_only_fails_its_caller():
+    service = STTService(EchoBackend())
+    await service.start()
+
+    results = await asyncio.gather(service.transcribe(b"garbled"), service.transcribe(b"done"), return_exceptions=True)
+    await service.close()
+
+    assert isinstance(results[0], ValueError)
+    assert results[1] == "en:done"
+    assert service.metrics()["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_transcribe_before_start_is_an_error():
+    with pytest.raises(RuntimeError):
+        await STTService(EchoBackend()).transcribe(b"done")
+
+
+def test_pcm_is_decoded_with_or_without_a_wav_header():
+    pcm = np.array([0, 16384, -32768], dtype="<i2").tobytes()
+    wav = io.BytesIO()
+    with wave.open(wav, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(16000)
+        writer.writeframes(pcm)
+
+    assert pcm16_to_float32(pcm).tolist() == [0.0, 0.5, -1.0]
+    assert pcm16_to_float32(wav.getvalue()).tolist() == [0.0, 0.5, -1.0]
@@ -0,0 +1,94 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from backend.core.ai_engine import LocalAIEngine
+from backend.core.text_stream import SentenceChunker, iter_sentences
+
+
+async def tokens(*parts):
+    for part in parts:
+        yield part
+
+
+def ollama_engine(*parts: str) -> LocalAIEngine:
+    """A local engine whose Ollama server streams `parts` as chat chunks"""
+
+    def chat(request: httpx.Request) -> httpx.Response:
+        lines = [json.dumps({"message": {"content": part}, "done": False}) for part in parts]
+        lines.append(json.dumps({"message": {"content": ""}, "done": True}))
+        return httpx.Response(200, text="\n".join(lines))
+
+    engine = LocalAIEngine(model_path="test-model")
+    engine._client = httpx.AsyncClient(transport=httpx.MockTransport(chat), base_url=engine.base_url)
+    return engine
+
+
+def test_chunker_emits_sentences_as_they_complete():
+    chunker = SentenceChunker()
+
+    assert chunker.feed("Good morning, let's make today") == []
+    assert chunker.feed(" count. What is your first ") == ["Good morning, let's make today count."]
+    assert chunker.flush() == "What is your first"
+    assert chunker.flush() is None
+
+
+def test_chunker_merges_short_fragments_and_skips_abbreviations():
+    chunker = SentenceChunker(min_chars=20)
+
+    assert chunker.feed("Ok. Call Dr. Smith at 9 a.m. tomorrow. Then rest. ") == [
+        "Ok. Call Dr. Smith at 9 a.m. tomorrow."
+    ]
+    assert chunker.flush() == "Then rest."
+
+
+def test_chunker_cuts_run_ons_at_a_soft_break():
+    chunker = SentenceChunker(max_chars=40)
+
+    sentences = chunker.feed("First you stretch for ten minutes, then you run the long loop around the park")
+
+    assert sentences == ["First you stretch for ten minutes,", "then you run the long loop around the"]
+    assert chunker.flush() == "park"
+
+
+@pytest.mark.asyncio
+async def test_iter_sentences_regroups_a_token_stream():
+    stream = tokens("You said ", "you would do it. ", "Tell me ", "how it went!")
+
+    assert [s async for s in iter_sentences(stream)] == ["You said you would do it.", "Tell me how it went!"]
+
+
+@pytest.mark.asyncio
+async def test_local_engine_streams_ollama_tokens():
+    engine = ollama_engine("Drink some ", "water and get moving. ", "Then call me back.")
+
+    streamed = [token async for token in engine.stream_response("Hi", {}, "morning")]
+    sentences = [s async for s in engine.stream_sentences("Hi", {}, "morning")]
+    await engine.close()
+
+    assert streamed == ["Drink some ", "water and get moving. ", "Then call me back."]
+    assert sentences == ["Drink some water and get moving.", "Then call me back."]
+
+
+@pytest.mark.asyncio
+async def test_local_engine_keeps_at_most_max_parallel_requests_in_flight():
+    in_flight, peak = 0, 0
+
+    async def chat(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, text=json.dumps({"message": {"content": "Done."}, "done": True}))
+
+    engine = LocalAIEngine(model_path="test-model", max_parallel=2)
+    engine._client = httpx.AsyncClient(transport=httpx.MockTransport(chat), base_url=engine.base_url)
+
+    replies = await asyncio.gather(*(engine.generate_response(f"update {i}", {}, "morning") for i in range(6)))
+    await engine.close()
+
+    assert replies == ["Done."] * 6
+    assert peak == 2
@@ -0,0 +1,108 @@
+import asyncio
+import io
+from multiprocessing import shared_memory
+import time
+import wave
+
+import pytest
+
+from backend.core.voice_engine import LocalVoiceEngine
+from backend.core.voice_pool import (
+    SAMPLE_RATE, VOICE_POOL_SECONDS, VOICE_POOL_SPILLS, PooledSTTBackend, VoiceWorkerPool, load_models
+)
+
+
+def duration(audio: bytes) -> float:
+    with wave.open(io.BytesIO(audio)) as wav:
+        assert wav.getframerate() == SAMPLE_RATE
+        return wav.getnframes() / wav.getframerate()
+
+
+async def started(**kwargs) -> VoiceWorkerPool:
+    pool = VoiceWorkerPool(tts_model="simulated", **{"workers": 1, "slot_bytes": 1024 * 1024, **kwargs})
+    await pool.start()
+    return pool
+
+
+@pytest.mark.asyncio
+async def test_synthesis_in_workers_leaves_the_event_loop_free():
+    pool = await started(workers=2, simulated_cpu_ms_per_char=5.0)
+    texts = [f"Time to get up, number {i}." for i in range(4)]
+    synthesized = VOICE_POOL_SECONDS.count("tts")
+    gaps = []
+
+    async def ticker():
+        last = time.perf_counter()
+        while True:
+            await asyncio.sleep(0.01)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    ticking = asyncio.create_task(ticker())
+    audio = await asyncio.gather(*(pool.synthesize(text) for text in texts))
+    ticking.cancel()
+    await pool.close()
+
+    assert [duration(clip) for clip in audio] == pytest.approx([0.06 * len(text) for text in texts], abs=1e-3)
+    # Four syntheses burn over half a second of CPU; inline, the loop would stall for all of it
+    assert max(gaps) < 0.1
+    assert VOICE_POOL_SECONDS.count("tts") == synthesized + 4
+
+
+@pytest.mark.asyncio
+async def test_audio_larger_than_a_slot_goes_through_the_pipe():
+    pool = await started(slot_bytes=1024)
+    spills = VOICE_POOL_SPILLS.value("tts")
+
+    audio = await pool.synthesize("A sentence far longer than one kilobyte of audio.")
+    await pool.close()
+
+    assert duration(audio) == pytest.approx(0.06 * 49, abs=1e-3)
+    assert VOICE_POOL_SPILLS.value("tts") == spills + 1
+
+
+@pytest.mark.asyncio
+async def test_a_failed_request_returns_its_slot():
+    pool = await started()
+    backend = PooledSTTBackend(pool)
+
+    # A TTS-only pool has no STT model in its workers
+    with pytest.raises(RuntimeError, match="No STT model"):
+        await backend.transcribe(b"\x00\x00" * 160)
+    free = pool._slots.qsize()
+    audio = await pool.synthesize("Still working.")
+    await pool.close()
+
+    assert free == 2
+    assert duration(audio) == pytest.approx(0.06 * 14, abs=1e-3)
+
+
+@pytest.mark.asyncio
+async def test_close_frees_the_shared_memory():
+    pool = await started()
+    names = [segment.name for segment in pool._segments]
+
+    await pool.close()
+
+    assert len(names) == 2
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+
+def test_unknown_models_are_rejected():
+    with pytest.raises(ValueError):
+        load_models("festival")
+    with pytest.raises(ValueError):
+        load_models("simulated", stt_model="wav2vec2")
+
+
+@pytest.mark.asyncio
+async def test_without_a_pool_the_model_is_loaded_once_in_process():
+    engine = LocalVoiceEngine(tts_model="simulated")
+
+    audio = await asyncio.gather(engine.text_to_speech("Up."), engine.text_to_speech("Go!"))
+
+    assert engine._model_loaded
+    assert [duration(clip) for clip in audio] == pytest.approx([0.18, 0.18], abs=1e-3)
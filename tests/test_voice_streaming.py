@@ -0,0 +1,111 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from backend.core.audio_cache import AudioCache, CachedVoiceEngine
+from backend.core.voice_engine import ElevenLabsVoiceEngine, VoiceStyle
+from tests.factories import FakeVoiceEngine
+
+
+def elevenlabs(requests: list) -> ElevenLabsVoiceEngine:
+    """An ElevenLabs engine whose API streams the request text back as audio"""
+
+    def synthesize(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, content=json.loads(request.content)["text"].encode() * 10)
+
+    engine = ElevenLabsVoiceEngine(api_key="key", output_format="pcm_16000")
+    engine._client = httpx.AsyncClient(
+        transport=httpx.MockTransport(synthesize), base_url=engine.BASE_URL, headers={"xi-api-key": "key"}
+    )
+    return engine
+
+
+async def sentences(*texts):
+    for text in texts:
+        yield text
+
+
+@pytest.mark.asyncio
+async def test_elevenlabs_text_to_speech_collects_the_stream():
+    requests = []
+    engine = elevenlabs(requests)
+
+    audio = await engine.text_to_speech("Good morning", voice_id="voice-1")
+    await engine.close()
+
+    assert audio == b"Good morning" * 10
+    [request] = requests
+    assert request.url.path == "/v1/text-to-speech/voice-1/stream"
+    assert request.url.params["output_format"] == "pcm_16000"
+    assert request.headers["xi-api-key"] == "key"
+
+
+@pytest.mark.asyncio
+async def test_stream_speech_synthesizes_sentence_by_sentence():
+    requests = []
+    engine = elevenlabs(requests)
+
+    chunks = [chunk async for chunk in engine.stream_speech(sentences("Wake up.", "Drink water."), chunk_bytes=16)]
+    await engine.close()
+
+    assert b"".join(chunks) == b"Wake up." * 10 + b"Drink water." * 10
+    assert [json.loads(request.content)["text"] for request in requests] == ["Wake up.", "Drink water."]
+
+
+@pytest.mark.asyncio
+async def test_slow_consumer_pauses_synthesis():
+    engine = FakeVoiceEngine()
+    text = sentences(*[f"Sentence number {i} of the message." for i in range(10)])
+    stream = engine.stream_speech(text, chunk_bytes=4096, max_buffered_chunks=2)
+
+    first = await stream.__anext__()
+    await asyncio.sleep(0.05)
+
+    assert first
+    # One sentence is one chunk here: two buffered and one waiting to be put, at most
+    assert engine.syntheses <= 4
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_synthesis_errors_reach_the_consumer():
+    class FailingEngine(FakeVoiceEngine):
+        async def text_to_speech(self, text, voice_id=None, voice_style=VoiceStyle.FRIENDLY):
+            if "fail" in text:
+                raise RuntimeError("TTS unavailable")
+            return await super().text_to_speech(text, voice_id, voice_style)
+
+    received = []
+    with pytest.raises(RuntimeError, match="TTS unavailable"):
+        async for chunk in FailingEngine().stream_speech(sentences("This one works.", "This one will fail.")):
+            received.append(chunk)
+
+    assert b"".join(received) == b"This one works." * 100
+
+
+@pytest.mark.asyncio
+async def test_streaming_a_cache_hit_yields_the_whole_entry(tmp_path):
+    engine = FakeVoiceEngine()
+    cached = CachedVoiceEngine(engine, AudioCache(str(tmp_path)), namespace="test")
+    audio = await cached.text_to_speech("Let's go")
+
+    chunks = [bytes(chunk) async for chunk in cached.stream_speech("Let's go", chunk_bytes=64)]
+
+    assert b"".join(chunks) == audio
+    assert engine.syntheses == 1
+
+
+@pytest.mark.asyncio
+async def test_streamed_miss_is_stored_for_the_next_call(tmp_path):
+    requests = []
+    cached = CachedVoiceEngine(elevenlabs(requests), AudioCache(str(tmp_path)), namespace="elevenlabs")
+
+    streamed = b"".join([chunk async for chunk in cached.stream_speech("Let's go")])
+    whole = await cached.text_to_speech("Let's go")
+    await cached.close()
+
+    assert streamed == whole == b"Let's go" * 10
+    assert len(requests) == 1